@@ -1,16 +1,39 @@
-from toon_format import DecodeOptions, decode
-from typing import Dict, Any
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Tuple
 import json
-from textwrap import dedent
+import re
+from helpers.cancellation import check_cancelled
+from helpers.logger import get_logger
+from helpers.payload_format import PayloadFormat, format_of_fence
+from helpers.metrics import LLM_LATENCY
+from helpers.schemas import validate_schema
+from helpers.token_budget import get_counter
+from helpers.tracing import tracer
+from config import STRUCTURED_OUTPUT
+
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "\n\nRespond only with a JSON object matching the requested schema, "
+    "ignoring any other output format described above."
+)
+
 
 class Agent:
     """
     Base class for all agents.
     """
 
+    # JSON schema of the agent's output, None if the output is free text
+    output_schema: Dict[str, Any] | None = None
+
     def __init__(self, client):
         self.client = client
         self.on_log = None
+        self.logger = get_logger(type(self).__module__)
+        self.structured_output = STRUCTURED_OUTPUT
+
+        # Tokens sent per prompt section, over all the prompts of the agent
+        self.section_tokens: Counter = Counter()
 
     def set_logger(self, on_log):
         """
@@ -18,95 +41,187 @@ class Agent:
         """
         self.on_log = on_log
 
-    def log(self, message: str):
+    def log(self, message: str, *args, level: int = logging.INFO):
         """
-        Logs a message using the callback if available, otherwise prints it.
+        Logs a message to the agent's logger and to the callback if available. The message
+        is formatted with the %-style args only if the level is enabled.
         """
+        if not self.logger.isEnabledFor(level):
+            return
         if self.on_log:
-            self.on_log(message)
-        print(message)
+            self.on_log(message % args if args else message)
+        self.logger.log(level, message, *args)
+
+    def generate(self, user_prompt: str, system_prompt: str, temperature: float = None) -> str:
+        """
+        Calls the LLM client, requesting output constrained to the agent's schema if enabled.
+        """
+        schema = self.output_schema if self.structured_output else None
+
+        if schema:
+            system_prompt = system_prompt + STRUCTURED_OUTPUT_INSTRUCTION
+
+        # The client's own temperature is used unless overridden
+        options = {} if temperature is None else {"temperature": temperature}
+
+        sections = getattr(user_prompt, "sections", None)
+        if sections:
+            self.log_prompt_tokens(sections)
+
+        return self.call_client(user_prompt, system_prompt, schema=schema, **options)
+
+    def call_client(self, user_prompt: str, system_prompt: str, **options) -> str:
+        """
+        Calls the LLM client in an llm span recording the prompt and completion tokens,
+        and observes its latency. The counts reported by the backend are used when available.
+        Raises RunCancelled instead if the run was cancelled.
+        """
+        check_cancelled()
+        client = type(self.client).__name__
+        with tracer.span(f"{client}.generate", "llm", agent=type(self).__name__) as span:
+            previous = getattr(self.client, "last_latency", None)
+            with LLM_LATENCY.time(client=client, model=getattr(self.client, "model", None) or "default"):
+                response = self.client.generate(user_prompt=user_prompt, system_prompt=system_prompt, **options)
+            if tracer.enabled:
+                latency = getattr(self.client, "last_latency", None)
+                if latency is not None and latency is not previous:
+                    span.set(prompt_tokens=latency.prompt_eval_count, completion_tokens=latency.eval_count)
+                else:
+                    counter = get_counter()
+                    span.set(prompt_tokens=counter.count(system_prompt) + counter.count(user_prompt), completion_tokens=counter.count(str(response)))
+            return response
+
+    def log_prompt_tokens(self, sections: Dict[str, Tuple[int, int]]):
+        """
+        Logs the tokens of each prompt section, with the count before trimming if it was trimmed.
+        """
+        parts = []
+        for name, (original, final) in sections.items():
+            self.section_tokens[name] += final
+            parts.append(f"{name}={final}" if final == original else f"{name}={final} (trimmed from {original})")
+
+        total = sum(final for _, final in sections.values())
+        self.log("[%s] Prompt tokens: %d (%s)", type(self).__name__, total, ", ".join(parts))
+
+    def validate_response(self, response: Dict[str, Any]) -> List[str]:
+        """
+        Validates an extracted response against the agent's schema. Returns the violations.
+        """
+        if self.output_schema is None:
+            return []
+
+        return validate_schema(response, self.output_schema)
+
+    def extract_code(self, response: str) -> str:
+        """
+        Extracts the 'code' field of a response. If the response violates the schema,
+        the raw response is returned as code and left to the validation tools.
+        """
+        code_json = self.extract_response(response)
+
+        violations = self.validate_response(code_json)
+        if violations:
+            self.log("[%s] Response rejected by schema: %s", type(self).__name__, violations, level=logging.WARNING)
+            return response
+
+        return code_json["code"]
 
     def extract_response(self, response: str) -> Dict[str, Any]:
-        """Robustly extracts response from a string, handling markdown and extra text."""
+        """
+        Extracts the response object from a string, handling markdown fences and extra text.
+        Scans the response once: fenced blocks (json, toon, yaml, reverty, python) and JSON objects
+        found along the way are candidates, and the first one valid against the agent's
+        schema is returned. Without a valid candidate the first one is returned, so the
+        caller can report its violations; without candidates the raw response is the code.
+        After _MAX_FAILED_DECODES braces failing to decode, the later ones are skipped.
+        """
 
-        print(f"[EXTRACT RESPONSE] Response: {response}")
+        first_candidate: Dict[str, Any] | None = None
+        failed_decodes = 0
+        pos = 0
 
-        # 1. Try direct parsing a JSON object
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
+        while True:
+            match = _CANDIDATE_START.search(response, pos)
+            if match is None:
+                break
 
-        # 2. Try extracting from markdown code blocks
-        try:
-            if "```json" in response:
-                block = response.split("```json")[1].split("```")[0].strip()
-                return json.loads(block)
-            elif "```reverty" in response:
-                block = response.split("```reverty")[1].split("```")[0].strip()
-                json_block = {"code": block}
-                return json_block
-            elif "```python" in response:
-                block = response.split("```python")[1].split("```")[0].strip()
-                json_block = {"code": block}
-                return json_block
-            elif "```toon" in response:
-                return self._extract_toon(response)
-            elif "```" in response:
-                block = response.split("```")[1].split("```")[0].strip()
-                return json.loads(block)
-        except json.JSONDecodeError:
-            pass
-            
-        # 3. Try finding the first '{' and last '}' (greedy)
-        try:
-            start = response.find("{")
-            end = response.rfind("}")
-            if start != -1 and end != -1:
-                json_str = response[start : end + 1]
-                return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-
-        # 4. Try finding the largest valid JSON object (nested braces)
-        # This is a heuristic for when the model outputs multiple JSON-like things
-        try:
-            stack = []
-            start_idx = -1
-            for i, char in enumerate(response):
-                if char == "{":
-                    if not stack:
-                        start_idx = i
-                    stack.append(char)
-                elif char == "}":
-                    if stack:
-                        stack.pop()
-                        if not stack:
-                            # Found a complete top-level object
-                            try:
-                                return json.loads(response[start_idx : i + 1])
-                            except json.JSONDecodeError:
-                                continue  # Keep looking
-        except Exception:
-            pass
-
-        # If all fails, return raw response as code
+            if match.group(1) is None:
+                # Opening brace: try decoding a JSON object right here
+                pos = match.end()
+                if failed_decodes >= _MAX_FAILED_DECODES:
+                    continue
+                try:
+                    candidate, pos = _JSON_DECODER.raw_decode(response, match.start())
+                except (json.JSONDecodeError, RecursionError):
+                    failed_decodes += 1
+                    continue
+            else:
+                candidate, pos = self._extract_fenced(response, match)
+
+            if not isinstance(candidate, dict):
+                continue
+
+            if not self.validate_response(candidate):
+                return candidate
+
+            if first_candidate is None:
+                first_candidate = candidate
+
+        if first_candidate is not None:
+            return first_candidate
+
+        # No object found, return raw response as code
         return {"code": response}
 
-    def _extract_toon(self, response: str) -> Dict[str, Any]:
+    def _extract_fenced(self, response: str, match: re.Match) -> Tuple[Any, int]:
         """
-        Extracts and parses TOON content, handling indentation and whitespace safely.
+        Parses the markdown block opened by the fence match.
+        Returns the candidate (None if the block cannot be parsed) and the position after the block.
+        """
+
+        language = match.group(1).lower()
+        line_end = response.find("\n", match.end())
+        block_start = len(response) if line_end == -1 else line_end + 1
+
+        block_end = response.find("```", block_start)
+        if block_end == -1:
+            block_end = next_pos = len(response)
+        else:
+            next_pos = block_end + 3
+
+        block = response[block_start:block_end]
+
+        if language in ("reverty", "python"):
+            return {"code": block.strip()}, next_pos
+
+        payload_format = format_of_fence(language)
+        if payload_format is not None and payload_format.name != "json":
+            return self._decode_payload(block, payload_format), next_pos
+
+        # json or unlabeled block
+        try:
+            return json.loads(block), next_pos
+        except (json.JSONDecodeError, RecursionError):
+            # The block may still contain an object surrounded by text: scan inside it
+            return None, block_start
+
+    def _decode_payload(self, block: str, payload_format: PayloadFormat) -> Dict[str, Any] | None:
+        """
+        Parses a TOON or YAML block, None if it is not valid.
         """
         try:
-            # Isolate toon block
-            raw_block = response.split("```toon")[1].split("```")[0]
-            
-            # Remove common line indentation
-            clean_block = dedent(raw_block).strip()
-            
-            # Pass the clean block to the decoder
-            return decode(clean_block, DecodeOptions(indent=4, strict=False))
-            
-        except Exception as e:
-            print(f"[Evaluator Agent] Error decoding TOON: {e}")
-            raise json.JSONDecodeError("Failed to parse TOON", response, 0)
+            return payload_format.decode(block)
+        except ValueError as e:
+            self.log("[%s] Error decoding %s: %s", type(self).__name__, payload_format.name.upper(), e, level=logging.WARNING)
+            return None
+
+
+# Start of a candidate response: a markdown fence (group 1 is its language) or a brace
+# opening a JSON object. Braces in prose ('{name}', '{ {') are skipped without decoding,
+# since every failed decode costs a scan back to the start to locate the error.
+_CANDIDATE_START = re.compile(r'```([A-Za-z]*)|\{(?=\s*["}])')
+_JSON_DECODER = json.JSONDecoder()
+
+# Braces failing to decode before the others are skipped: each failure costs a scan back to
+# the start, and a deeply nested one a RecursionError, so a response full of them is linear
+_MAX_FAILED_DECODES = 32
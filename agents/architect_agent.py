@@ -1,4 +1,4 @@
-import json
+import logging
 from typing import Dict, Any
 from agents.agent import Agent
 from helpers.prompt_generator import generate_architect_request
@@ -6,6 +6,9 @@ from helpers.system_prompts import (
     ARCHITECT_SYSTEM_PROMPT_SIMPLE,
     ARCHITECT_SYSTEM_PROMPT_COMPLEX,
 )
+from helpers.schemas import CONTRACT_SCHEMA
+from helpers.tracing import traced
+from config import MAX_CONTRACT_RETRIES
 
 
 class ArchitectAgent(Agent):
@@ -14,33 +17,43 @@ class ArchitectAgent(Agent):
     Uses LLM to generate a contract from a user prompt.
     """
 
+    output_schema = CONTRACT_SCHEMA
+
+    def __init__(self, client, max_contract_retries: int = MAX_CONTRACT_RETRIES):
+        super().__init__(client)
+        self.max_contract_retries = max_contract_retries
+
+    @traced("agent")
     def create_contract(self, user_prompt: str, complexity: int) -> Dict[str, Any]:
         """
         Creates a formal contract/specification for the requested code.
         """
 
-        self.log(f"[Architect Agent] Designing contract for: '{user_prompt}'...")
+        self.log("[Architect Agent] Designing contract for: '%s'...", user_prompt)
         if complexity <= 5:
-            self.log(
-                f"[Architect Agent] Complexity is {complexity}, using simple system prompt."
-            )
+            self.log("[Architect Agent] Complexity is %d, using simple system prompt.", complexity)
             system_prompt = ARCHITECT_SYSTEM_PROMPT_SIMPLE
         else:
-            self.log(
-                f"[Architect Agent] Complexity is {complexity}, using complex system prompt."
-            )
+            self.log("[Architect Agent] Complexity is %d, using complex system prompt.", complexity)
             system_prompt = ARCHITECT_SYSTEM_PROMPT_COMPLEX
 
         request: str = generate_architect_request(user_prompt, complexity)
-        print(f"[Architect Agent] Request: {request}")
-        response: str = self.client.generate(user_prompt=request, system_prompt=system_prompt)
+        self.log("[Architect Agent] Request: %s", request, level=logging.DEBUG)
+
+        for _ in range(self.max_contract_retries + 1):
+            response: str = self.generate(user_prompt=request, system_prompt=system_prompt)
 
-        # Try to parse response
-        try:
+            # Without an object in the response, the extraction falls back to the raw text
             contract: Dict[str, Any] = self.extract_response(response)
-            return contract
-        except json.JSONDecodeError as e:
-            self.log(f"[Architect Agent] Error decoding JSON: {e}")
-            self.log(f"[Architect Agent] Response was: {response[:200]}")
-            return {}
+            if contract == {"code": response}:
+                self.log("[Architect Agent] No contract found in the response: %s", response[:200], level=logging.WARNING)
+                continue
+
+            # Reject contracts violating the schema before they reach the coder
+            violations = self.validate_response(contract)
+            if not violations:
+                return contract
+
+            self.log("[Architect Agent] Invalid contract: %s", violations, level=logging.WARNING)
 
+        return {}
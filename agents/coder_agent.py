@@ -1,20 +1,41 @@
 from helpers.utils import print_ast_string
-from helpers.utils import print_ast
 from helpers.system_prompts import CODER_SYSTEM_PROMPT
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, TYPE_CHECKING
 from agents.agent import Agent
 import json
-import traceback
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tools.parser import Parser
 from tools.transpiler import Transpiler
 from tools.linter import Linter
 from tools.type_checker import TypeChecker
-from helpers.prompt_generator import generate_test_fix_request, generate_initial_code_request, generate_static_fix_request
-from lark import Tree
-from helpers.enums import AnalysisResult, Status, ErrorType
-from config import MAX_VALIDATION_ITERATIONS
+from tools.auto_repair import AutoRepair
+from helpers.prompt_generator import generate_test_fix_request, generate_initial_code_request, generate_static_fix_request, generate_error_history
+from helpers.enums import AnalysisResult, CodeScope, Status, ErrorType, FixStrategy
+from helpers.code_scope import failing_functions, renumber_errors, scope_code, splice_functions
+from helpers.cancellation import RunCancelled
+from helpers.fingerprint import FixHistory
+from helpers.metrics import ERRORS
+from helpers.run_context import llm_session, propagate
+from helpers.schemas import CODE_SCHEMA
+from helpers.tracing import traced
+from config import MAX_VALIDATION_ITERATIONS, GRAMMAR_CONSTRAINED_DECODING, LLM_TEMPERATURE, SPECULATIVE_CANDIDATES, SPECULATIVE_TEMPERATURE_STEP, CYCLE_DETECTION, CYCLE_TEMPERATURE_STEP, AUTO_REPAIR, MAX_LOCAL_REPAIRS, SCOPED_FIX_PROMPTS
+
+if TYPE_CHECKING:
+    from lark import Tree
+
+GRAMMAR_OUTPUT_INSTRUCTION = (
+    "\n\nRespond only with the Reverty code, without any JSON, TOON or markdown wrapping."
+)
+
+class CandidateCancelled(Exception):
+    """Raised inside a speculative candidate once another candidate has won."""
+
+
+class FixLoopCycle(Exception):
+    """Raised when a fix loop keeps returning code and errors it has already produced."""
 
-import streamlit as st
 
 class CoderAgent(Agent):
     """
@@ -22,82 +43,277 @@ class CoderAgent(Agent):
     Uses LLM to generate code based on a contract.
     """
 
-    def __init__(self, client, grammar, model="llama3.2", max_validation_iterations: int = MAX_VALIDATION_ITERATIONS):
+    output_schema = CODE_SCHEMA
+
+    def __init__(self, client, grammar, model="llama3.2", max_validation_iterations: int = MAX_VALIDATION_ITERATIONS, candidates: int = SPECULATIVE_CANDIDATES):
         super().__init__(client)
         self.model = model
         self.grammar = grammar
-        self.contract : Dict[str, Any] | None = None
         self.parser = Parser(grammar)
         self.transpiler = Transpiler()
         self.linter = Linter()
         self.type_checker = TypeChecker()
+        self.auto_repair = AutoRepair()
         self.max_validation_iterations = max_validation_iterations
+
+        # Built once so every coder call sends an identical, cacheable prefix
+        self.system_prompt = CODER_SYSTEM_PROMPT + "\n\n" + self.grammar
+
+        # GBNF version of the grammar, exported on first use
+        self.grammar_constrained = GRAMMAR_CONSTRAINED_DECODING
+        self._gbnf: str | None = None
+
+        # Speculative generation: temperature and cancellation flag of the candidate
+        # running in the current thread
+        self.candidates = candidates
+        self._candidate = threading.local()
+
+        # Fingerprint the fix loop candidates and change strategy when they repeat
+        self.cycle_detection = CYCLE_DETECTION
+
+        # Try the local repair rules before asking the LLM for a fix
+        self.local_repair = AUTO_REPAIR
+
+        # ExampleRetriever of validated programs added to the initial prompt, if any
+        self.examples = None
+
+        # Send only the functions with errors in the fix prompts of multi-function programs
+        self.scoped_fixes = SCOPED_FIX_PROMPTS
         
 
+    @traced("agent")
     def build_initial_code(self, contract: Dict[str, Any]) -> Tuple[str, str, AnalysisResult]:
         """
         Generates Reverty code based on the contract.
         """
         
-        self.contract = contract
-        coder_prompt = generate_initial_code_request(contract)
+        examples = self.examples.retrieve(contract) if self.examples is not None else []
+        coder_prompt = generate_initial_code_request(contract, examples)
+
+        self.log("[Coder Agent] Initial code prompt:\n%s", coder_prompt, level=logging.DEBUG)
 
-        self.log(f"[Coder Agent] Initial code prompt:\n{coder_prompt}")
+        if self.candidates > 1:
+            return self._build_speculative_code(coder_prompt, contract)
 
         reverty_code = self._generate_code(coder_prompt)
 
-        self.log(f"[Coder Agent] Initial code:\n{reverty_code}")
+        self.log("[Coder Agent] Initial code:\n%s", reverty_code, level=logging.DEBUG)
 
-        return self._validate_code(reverty_code)
+        return self._validate_code(reverty_code, contract)
 
-    def fix_code(self, contract: Dict[str, Any], reverty_code: str, python_code: str, errors: str) -> Tuple[str, str, AnalysisResult]:
+    @traced("agent")
+    def fix_code(self, contract: Dict[str, Any], reverty_code: str, python_code: str, errors: str, temperature: float = None) -> Tuple[str, str, AnalysisResult]:
         """
         Fixes Reverty code based on the contract, python code and errors.
         """
 
-        coder_prompt = generate_test_fix_request(contract, reverty_code, python_code, errors)
+        scope = self._scope_fix(errors, reverty_code, python_code, None, contract)
+        if scope is not None:
+            coder_prompt = generate_test_fix_request(contract, scope.reverty_code, scope.python_code, renumber_errors(errors, scope), scope.signatures)
+        else:
+            coder_prompt = generate_test_fix_request(contract, reverty_code, python_code, errors)
 
-        self.log(f"[Coder Agent] Fix code prompt:\n{coder_prompt}")
+        self.log("[Coder Agent] Fix code prompt:\n%s", coder_prompt, level=logging.DEBUG)
 
-        reverty_code = self._generate_code(coder_prompt)
+        fixed_code = self._generate_code(coder_prompt, temperature)
+        reverty_code = self._splice_fix(reverty_code, scope, fixed_code) if scope is not None else fixed_code
+
+        self.log("[Coder Agent] Fixed code:\n%s", reverty_code, level=logging.DEBUG)
+
+        return self._validate_code(reverty_code, contract)
+
+    def _scope_fix(self, errors: str, reverty_code: str, python_code: str, error_type: str | None, contract: Dict[str, Any]) -> CodeScope | None:
+        """
+        Functions of the program the fix prompt is scoped to, None to send the whole program.
+        """
+
+        if not self.scoped_fixes:
+            return None
+
+        names = failing_functions(errors, reverty_code, python_code, error_type, contract.get("function_name"))
+        scope = scope_code(reverty_code, python_code, names)
+        if scope is not None:
+            self.log("[Coder Agent] Fix scoped to %s, %d other function(s) sent as signatures", ", ".join(scope.names), len(scope.signatures))
+        return scope
+
+    def _splice_fix(self, reverty_code: str, scope: CodeScope, fixed_code: str) -> str:
+        """
+        Full program with the fixed functions in place of the scoped ones.
+        """
+
+        spliced = splice_functions(reverty_code, scope, fixed_code)
+        self.log("[Coder Agent] Fixed functions spliced into the program:\n%s", spliced, level=logging.DEBUG)
+        return spliced.rstrip("\n") + "\n"
+
+    def _build_speculative_code(self, coder_prompt: str, contract: Dict[str, Any]) -> Tuple[str, str, AnalysisResult]:
+        """
+        Generates and validates several candidates in parallel, each with a different
+        temperature. The first one passing validation wins and the others are cancelled:
+        pending ones never start, running ones stop before their next LLM call.
+        If no candidate succeeds, the first one to finish is returned. A candidate raising,
+        like on a client timeout, only counts as failed: the error is raised if all of them do.
+        """
+
+        cancelled = threading.Event()
+        temperatures = self._candidate_temperatures()
+        self.log("[Coder Agent] Generating %d speculative candidates (temperatures: %s)", len(temperatures), temperatures)
+
+        pool = ThreadPoolExecutor(max_workers=len(temperatures), thread_name_prefix="coder-candidate")
+        futures = {
+            pool.submit(propagate(self._build_candidate), coder_prompt, contract, temperature, cancelled): index
+            for index, temperature in enumerate(temperatures)
+        }
+
+        fallback = None
+        errors = []
+        try:
+            for future in as_completed(futures):
+                try:
+                    reverty_code, python_code, result = future.result()
+                except RunCancelled:
+                    raise
+                except Exception as e:
+                    self.log("[Coder Agent] Candidate %d failed: %s", futures[future] + 1, e, level=logging.WARNING)
+                    errors.append(e)
+                    continue
+
+                if result.status == Status.SUCCESS:
+                    self.log("[Coder Agent] Candidate %d won", futures[future] + 1)
+                    return reverty_code, python_code, result
+
+                if fallback is None:
+                    fallback = (reverty_code, python_code, result)
+        finally:
+            # Do not wait for the losing candidates: they stop on their own
+            cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if fallback is None:
+            raise errors[0]
+        return fallback
+
+    def _build_candidate(self, coder_prompt: str, contract: Dict[str, Any], temperature: float, cancelled: threading.Event) -> Tuple[str, str, AnalysisResult]:
+        """
+        Generates and validates one speculative candidate. Its calls are stateless: the
+        candidates run at once, their turns would interleave in a shared session conversation.
+        """
+
+        self._candidate.temperature = temperature
+        self._candidate.cancelled = cancelled
+
+        try:
+            with llm_session(None):
+                reverty_code = self._generate_code(coder_prompt)
+                return self._validate_code(reverty_code, contract)
+        except CandidateCancelled:
+            return "", "", AnalysisResult(Status.ERROR, "Candidate cancelled.")
+        finally:
+            self._candidate.temperature = None
+            self._candidate.cancelled = None
+
+    def _candidate_temperatures(self):
+        """
+        Temperatures of the candidates: the client's one, then higher ones for diversity.
+        """
 
-        self.log(f"[Coder Agent] Fixed code:\n{coder_prompt}")
+        base = getattr(self.client, "temperature", LLM_TEMPERATURE)
+        return [round(min(base + i * SPECULATIVE_TEMPERATURE_STEP, 1.0), 2) for i in range(self.candidates)]
 
-        return self._validate_code(reverty_code)
+    def escalated_temperature(self) -> float:
+        """
+        Temperature of the fix requests once a fix loop repeats itself.
+        """
 
-    def _generate_code(self, coder_prompt: str) -> str:
+        base = getattr(self._candidate, "temperature", None)
+        if base is None:
+            base = getattr(self.client, "temperature", LLM_TEMPERATURE)
+        return round(min(base + CYCLE_TEMPERATURE_STEP, 1.0), 2)
+
+    def _generate_code(self, coder_prompt: str, temperature: float = None) -> str:
 
         """
         Generates Reverty code based on the coder prompt (can be initial or fix prompt).
         """
         
-        response = self.client.generate(
-            user_prompt=coder_prompt,
-            system_prompt=CODER_SYSTEM_PROMPT + "\n\n" + self.grammar,
-        )
+        response = self._request_code(coder_prompt, temperature)
 
-        self.log(f"[Coder Agent] Response: {response}")
-        reverty_code_json = self.extract_response(response)
-        reverty_code = reverty_code_json["code"] + "\n"
+        self.log("[Coder Agent] Response: %s", response, level=logging.DEBUG)
+        reverty_code = response + "\n"
 
         return reverty_code
 
+    def _request_code(self, prompt: str, temperature: float = None) -> str:
+        """
+        Asks the LLM for Reverty code. If the client supports grammars, the output is
+        constrained to the GBNF grammar and is already plain code.
+        """
+
+        cancelled = getattr(self._candidate, "cancelled", None)
+        if cancelled is not None and cancelled.is_set():
+            raise CandidateCancelled()
+
+        # Temperature of the speculative candidate, None outside speculation
+        if temperature is None:
+            temperature = getattr(self._candidate, "temperature", None)
+
+        if self._use_grammar():
+            options = {} if temperature is None else {"temperature": temperature}
+            if getattr(prompt, "sections", None):
+                self.log_prompt_tokens(prompt.sections)
+            return self.call_client(
+                prompt,
+                self.system_prompt + GRAMMAR_OUTPUT_INSTRUCTION,
+                grammar=self.gbnf,
+                **options,
+            )
+
+        response = self.generate(
+            user_prompt=prompt,
+            system_prompt=self.system_prompt,
+            temperature=temperature,
+        )
+        return self.extract_code(response)
+
+    def _use_grammar(self) -> bool:
+        """
+        Returns True if the generation has to be constrained with the GBNF grammar.
+        """
+        return self.grammar_constrained and getattr(self.client, "supports_grammar", False) is True
+
+    @property
+    def gbnf(self) -> str:
+        """
+        GBNF grammar of Reverty, exported once.
+        """
+        if self._gbnf is None:
+            from tools.gbnf_exporter import GbnfExporter
+
+            self._gbnf = GbnfExporter(self.grammar).export()
+        return self._gbnf
+
 
-    def _validate_code(self, reverty_code: str) -> Tuple[str, str, AnalysisResult]:
+    def _validate_code(self, reverty_code: str, contract: Dict[str, Any]) -> Tuple[str, str, AnalysisResult]:
         """
         Validates Reverty code doing multiple iterations of parsing, transpiling, linting and type checking.
         """
 
-        self.log(f"[Coder Agent] Reverty Code:\n {reverty_code}")
+        self.log("[Coder Agent] Reverty Code:\n %s", reverty_code, level=logging.DEBUG)
         final_status = AnalysisResult(Status.ERROR, "")
+        history = FixHistory(enabled=self.cycle_detection)
 
         try:
-            for i in range(self.max_validation_iterations):
-                self.log(f"\n[Coder Agent] --------------- Starting validation loop: iteration {i + 1}/{self.max_validation_iterations} ----------------------------")
+            i = 0
+            while i < self.max_validation_iterations:
+                # An iteration ended by a local repair instead of an LLM fix is not counted
+                if not history.repaired_locally:
+                    i += 1
+                history.repaired_locally = False
+
+                self.log("\n[Coder Agent] --------------- Starting validation loop: iteration %d/%d ----------------------------", i, self.max_validation_iterations)
 
                 # --- PARSING ---
                 # Parse Reverty code to AST
-                parser_response = self._parse_reverty_code(reverty_code)
+                parser_response = self._parse_reverty_code(reverty_code, contract, history)
 
                 # Update Reverty code if there's a parsing error
                 if parser_response.status == Status.ERROR:
@@ -107,14 +323,12 @@ class CoderAgent(Agent):
 
                 # Get AST from response
                 ast = parser_response.message
-                print_ast(ast)
-
                 ast_string = print_ast_string(ast)
-                st.session_state["shared_ast_string"] = ast_string
+                self.log("[Coder Agent] AST:\n%s", ast_string, level=logging.DEBUG)
 
                 # --- TRANSPILATION ---
                 # Transpile AST to Python
-                transpiler_response = self._transpile_ast_to_python(ast, reverty_code)
+                transpiler_response = self._transpile_ast_to_python(ast, reverty_code, contract, history)
 
                 # Update Reverty code if there's a transpilation error
                 if transpiler_response.status == Status.ERROR:
@@ -127,40 +341,54 @@ class CoderAgent(Agent):
 
                 # --- LINTING ---
                 # Check for linting errors
-                linter_response = self._check_linting_errors(python_code, reverty_code)
+                linter_response = self._check_linting_errors(python_code, reverty_code, contract, history)
 
                 if linter_response.status == Status.ERROR:
                     final_status = AnalysisResult(Status.ERROR, "Linting failed.")
                     reverty_code = linter_response.message
                     continue
 
+                # Layout findings are repaired on the Python code itself
+                if linter_response.data is not None:
+                    python_code = linter_response.data
+
                 # --- TYPE CHECKING ---
                 # Check for type errors
-                type_checker_response = self._check_type_errors(python_code, reverty_code)
+                type_checker_response = self._check_type_errors(python_code, reverty_code, contract, history)
 
                 if type_checker_response.status == Status.ERROR:
                     final_status = AnalysisResult(Status.ERROR, "Type checking failed.")
                     reverty_code = type_checker_response.message
                     continue
 
-                final_status = AnalysisResult(Status.SUCCESS, "Code built successfully.")
+                final_status = AnalysisResult(Status.SUCCESS, "Code built successfully.", data=ast_string)
 
-                self.log(f"[Coder Agent] Python code: {python_code}")
+                self.log("[Coder Agent] Python code: %s", python_code, level=logging.DEBUG)
 
                 return reverty_code, python_code, final_status
 
+        except (CandidateCancelled, RunCancelled):
+            raise
+
+        except FixLoopCycle as e:
+            self.log("[Coder Agent] %s", e, level=logging.WARNING)
+            final_status = AnalysisResult(Status.ERROR, str(e))
+
         except Exception:
-            traceback.print_exc()
+            self.logger.exception("[Coder Agent] Exception occurred during code building.")
             final_status = AnalysisResult(
                 Status.ERROR, "Exception occurred during code building."
             )
 
         finally:
-            self.log(f"[Coder] Finished execution with status: {final_status.status.value}")
+            final_status.llm_calls_saved = history.local_repairs
+            if history.local_repairs:
+                self.log("[Coder Agent] LLM calls saved by local repairs: %d", history.local_repairs)
+            self.log("[Coder] Finished execution with status: %s", final_status.status.value)
 
         return reverty_code, "", final_status
 
-    def _parse_reverty_code(self, reverty_code: str) -> AnalysisResult:
+    def _parse_reverty_code(self, reverty_code: str, contract: Dict[str, Any], history: FixHistory) -> AnalysisResult:
         """
         Parses Reverty code to AST. If there's a parsing error, it fixes it and returns the fixed code.
         """
@@ -173,6 +401,8 @@ class CoderAgent(Agent):
                 errors=parser_response.message,
                 reverty_code=reverty_code,
                 error_type=ErrorType.PARSING.value,
+                contract=contract,
+                history=history,
             )
 
             # Return fixed code
@@ -181,7 +411,7 @@ class CoderAgent(Agent):
         # Return AST
         return AnalysisResult(Status.SUCCESS, parser_response.message)
 
-    def _transpile_ast_to_python(self, ast: Tree, reverty_code: str) -> AnalysisResult:
+    def _transpile_ast_to_python(self, ast: "Tree", reverty_code: str, contract: Dict[str, Any], history: FixHistory) -> AnalysisResult:
         """
         Transpiles AST to Python. If there's a transpilation error, it fixes it and returns the fixed code.
         """
@@ -194,6 +424,8 @@ class CoderAgent(Agent):
                 errors=transpiler_response.message,
                 reverty_code=reverty_code,
                 error_type=ErrorType.TRANSPILATION.value,
+                contract=contract,
+                history=history,
             )
 
             # Return fixed code
@@ -202,19 +434,28 @@ class CoderAgent(Agent):
         # Return Python code
         return AnalysisResult(Status.SUCCESS, transpiler_response.message)
 
-    def _check_linting_errors(self, python_code: str, reverty_code: str) -> AnalysisResult:
+    def _check_linting_errors(self, python_code: str, reverty_code: str, contract: Dict[str, Any], history: FixHistory) -> AnalysisResult:
         """
         Lints Python code. If there's a linting error, it fixes it and returns the fixed code.
         """
         # Check for linting errors
         linter_response = self.linter.run(python_code)
 
+        # Layout findings of the transpiled code are repaired locally
+        if linter_response.status == Status.ERROR:
+            repaired_python = self._repair_python_locally(python_code, linter_response.message, history)
+            if repaired_python is not None:
+                return AnalysisResult(Status.SUCCESS, "Layout repaired locally.", data=repaired_python)
+
         # If there's a linting error, fix it
         if linter_response.status == Status.ERROR:
             reverty_code = self._fix_static_errors(
                 errors=linter_response.message,
                 reverty_code=reverty_code,
+                python_code=python_code,
                 error_type=ErrorType.LINTING.value,
+                contract=contract,
+                history=history,
             )
 
             # Return fixed code
@@ -223,7 +464,7 @@ class CoderAgent(Agent):
         # Return success status
         return AnalysisResult(Status.SUCCESS, linter_response.message)
 
-    def _check_type_errors(self, python_code: str, reverty_code: str) -> AnalysisResult:
+    def _check_type_errors(self, python_code: str, reverty_code: str, contract: Dict[str, Any], history: FixHistory) -> AnalysisResult:
         """
         Checks for type errors in Python code. If there's a type error, it fixes it and returns the fixed code.
         """
@@ -235,7 +476,10 @@ class CoderAgent(Agent):
             reverty_code = self._fix_static_errors(
                 errors=type_checker_response.message,
                 reverty_code=reverty_code,
+                python_code=python_code,
                 error_type=ErrorType.TYPE_CHECKING.value,
+                contract=contract,
+                history=history,
             )
 
             # Return fixed code
@@ -244,26 +488,79 @@ class CoderAgent(Agent):
         # Return success status
         return AnalysisResult(Status.SUCCESS, type_checker_response.message)
 
-    def _fix_static_errors(self, errors: str, reverty_code: str, error_type: str) -> AnalysisResult:
+    def _fix_static_errors(self, errors: str, reverty_code: str, error_type: str, contract: Dict[str, Any], history: FixHistory, python_code: str = "") -> str:
         """
-        Fixes Reverty code based on error messages.
+        Fixes Reverty code based on error messages, with the local repair rules if they apply,
+        otherwise with the LLM. If the loop has already seen this code with these errors,
+        the fix is requested with a higher temperature, then with the earlier errors in
+        the prompt; after too many repeats the loop is stopped. Python code is given for
+        the errors found on it, so the prompt can be scoped to the functions they point at.
         """
 
-        # Build fix prompt
+        ERRORS.inc(error_type=error_type)
+
+        strategy = history.record(reverty_code, errors)
+        if strategy == FixStrategy.ABORT:
+            raise FixLoopCycle(f"Fix loop stopped: the same code and errors came back {history.repeats} times.")
+
+        repaired_code = self._repair_reverty_locally(reverty_code, errors, error_type, history)
+        if repaired_code is not None:
+            return repaired_code
+
+        temperature = None
+        error_history = ""
+        if strategy != FixStrategy.RETRY:
+            temperature = self.escalated_temperature()
+            self.log("[Coder Agent] Fix loop repeated %d time(s), strategy: %s (temperature %s)", history.repeats, strategy.value, temperature)
+        if strategy == FixStrategy.ADD_HISTORY:
+            error_history = generate_error_history(history.previous_errors(), history.repeats)
+
+        # Build fix prompt, scoped to the functions with errors if possible
+        scope = self._scope_fix(errors, reverty_code, python_code, error_type, contract)
         fix_prompt = generate_static_fix_request(
-            reverty_code=reverty_code,
-            errors=errors,
+            reverty_code=scope.reverty_code if scope is not None else reverty_code,
+            errors=renumber_errors(errors, scope, error_type) if scope is not None else errors,
             error_type=error_type,
-            contract=self.contract,
+            contract=contract,
+            error_history=error_history,
+            signatures=scope.signatures if scope is not None else None,
         )
 
         # Call LLM
-        self.log(f"\n[Coder Agent] Fix Prompt: {fix_prompt}")
-        response = self.client.generate(
-            user_prompt=fix_prompt,
-            system_prompt=CODER_SYSTEM_PROMPT + "\n\n" + self.grammar,
-        )
+        self.log("\n[Coder Agent] Fix Prompt: %s", fix_prompt, level=logging.DEBUG)
+        fixed_code = self._request_code(fix_prompt, temperature)
+        return self._splice_fix(reverty_code, scope, fixed_code) if scope is not None else fixed_code
+
+    def _repair_reverty_locally(self, reverty_code: str, errors: str, error_type: str, history: FixHistory) -> str | None:
+        """
+        Applies the local repair rules to Reverty code. The repair is kept only if the code still parses.
+        """
+
+        if not self.local_repair or history.local_repairs >= MAX_LOCAL_REPAIRS:
+            return None
+
+        repaired_code = self.auto_repair.repair_reverty(reverty_code, errors, error_type)
+        if repaired_code is None or self.parser.run(repaired_code).status != Status.SUCCESS:
+            return None
+
+        history.local_repairs += 1
+        history.repaired_locally = True
+        self.log("[Coder Agent] %s errors repaired locally", error_type.capitalize())
+        self.log("[Coder Agent] Repaired code:\n%s", repaired_code, level=logging.DEBUG)
+        return repaired_code
+
+    def _repair_python_locally(self, python_code: str, errors: str, history: FixHistory) -> str | None:
+        """
+        Repairs the layout findings of flake8 on the transpiled code, if they are the only ones.
+        """
+
+        if not self.local_repair:
+            return None
 
-        fix_result = self.extract_response(response)
+        repaired_python = self.auto_repair.repair_python(python_code, errors)
+        if repaired_python is None or self.linter.run(repaired_python).status != Status.SUCCESS:
+            return None
 
-        return fix_result["code"]
+        history.local_repairs += 1
+        self.log("[Coder Agent] Linting layout repaired locally")
+        return repaired_python
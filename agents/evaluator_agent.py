@@ -1,8 +1,12 @@
 from agents.agent import Agent
 from typing import Dict, Any
 from helpers.system_prompts import EVALUATOR_SYSTEM_PROMPT
-from config import MAX_EVALUATION_RETRIES
-import json
+from helpers.schemas import EVALUATOR_SCHEMA
+from helpers.complexity_estimator import ComplexityEstimator, log_evaluation
+from helpers.tracing import traced
+from config import MAX_EVALUATION_RETRIES, ESTIMATOR_CONFIDENCE_THRESHOLD
+import logging
+import time
 
 
 class EvaluatorAgent(Agent):
@@ -11,44 +15,71 @@ class EvaluatorAgent(Agent):
     to create an adequate contract for the requested code.
     """
 
-    def __init__(self, client, max_evaluation_retries: int = MAX_EVALUATION_RETRIES):
+    output_schema = EVALUATOR_SCHEMA
+
+    def __init__(
+        self,
+        client,
+        max_evaluation_retries: int = MAX_EVALUATION_RETRIES,
+        estimator: ComplexityEstimator = None,
+        confidence_threshold: float = ESTIMATOR_CONFIDENCE_THRESHOLD,
+        evaluation_log: str = None,
+    ):
         super().__init__(client)
         self.max_evaluation_retries = max_evaluation_retries
 
+        # Local estimator answering in place of the LLM when confident enough
+        self.estimator = estimator
+        self.confidence_threshold = confidence_threshold
+
+        # JSONL file the LLM evaluations are appended to, to train the estimator
+        self.evaluation_log = evaluation_log
+
+    @traced("agent")
     def evaluate_request(self, user_prompt: str) -> int:
         """
         Evaluates the complexity of a user prompt to create an adequate contract for the requested code.
         """
-        self.log(f"[Evaluator Agent] Evaluating request: '{user_prompt}'...")
+        self.log("[Evaluator Agent] Evaluating request: '%s'...", user_prompt)
 
+        if self.estimator is not None:
+            estimate = self.estimator.estimate(user_prompt)
+            if estimate.confidence >= self.confidence_threshold:
+                self.log("[Evaluator Agent] Local estimate: %d (confidence %.2f)", estimate.complexity, estimate.confidence)
+                return estimate.complexity
+
+            self.log("[Evaluator Agent] Local estimate not confident (%.2f), asking the LLM...", estimate.confidence)
+
+        start = time.perf_counter()
         response: str = self._make_request(user_prompt)
 
-        # Try to parse response
-        try:
+        # A response without an object comes back as raw text and fails the schema below
+        evaluation: Dict[str, Any] = self.extract_response(response)
+
+        # Retry for responses violating the schema
+        i = 0
+        violations = self.validate_response(evaluation)
+        while violations and i < self.max_evaluation_retries:
+            self.log("[Evaluator Agent] Invalid evaluation: %s", violations, level=logging.WARNING)
+            i += 1
+            response: str = self._make_request(user_prompt)
             evaluation: Dict[str, Any] = self.extract_response(response)
+            violations = self.validate_response(evaluation)
 
-            # Retry for bad response
-            i = 0
-            while not isinstance(evaluation.get("complexity"), int) and i < self.max_evaluation_retries:
-                i += 1
-                response: str = self._make_request(user_prompt)
-                evaluation: Dict[str, Any] = self.extract_response(response)
+        if violations:
+            return 5  # Default complexity
 
-            if not isinstance(evaluation.get("complexity"), int):
-                return 5  # Default complexity
+        if self.evaluation_log:
+            log_evaluation(self.evaluation_log, user_prompt, evaluation["complexity"], time.perf_counter() - start)
 
-            return evaluation["complexity"]
-        except json.JSONDecodeError as e:
-            self.log(f"[Evaluator Agent] Error decoding JSON: {e}")
-            self.log(f"[Evaluator Agent] Response was: {response[:200]}")
-            return 5 # Default complexity
+        return evaluation["complexity"]
 
 
     def _make_request(self, user_prompt: str) -> str:
         """
         Makes a request to the LLM client to evaluate the complexity of a user prompt.
         """
-        return self.client.generate(
+        return self.generate(
             user_prompt=user_prompt,
             system_prompt=EVALUATOR_SYSTEM_PROMPT
         )
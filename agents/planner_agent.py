@@ -0,0 +1,42 @@
+import logging
+from typing import Dict, Any, Tuple
+from agents.agent import Agent
+from helpers.prompt_generator import generate_planner_request
+from helpers.system_prompts import PLANNER_SYSTEM_PROMPT
+from helpers.schemas import PLAN_SCHEMA
+from helpers.tracing import traced
+
+
+class PlannerAgent(Agent):
+    """
+    Planner Agent: Evaluator and Architect in a single LLM call.
+    Rates the complexity of a user prompt and designs its contract together.
+    """
+
+    output_schema = PLAN_SCHEMA
+
+    # Evaluator-only fields that do not belong to the contract
+    EVALUATION_FIELDS = ("detected_logic", "reasoning")
+
+    @traced("agent")
+    def plan_request(self, user_prompt: str) -> Tuple[int, Dict[str, Any]] | None:
+        """
+        Returns the complexity and the contract of the requested code,
+        or None if the answer is not a valid plan.
+        """
+        self.log("[Planner Agent] Planning request: '%s'...", user_prompt)
+
+        response: str = self.generate(
+            user_prompt=generate_planner_request(user_prompt),
+            system_prompt=PLANNER_SYSTEM_PROMPT,
+        )
+
+        plan: Dict[str, Any] = self.extract_response(response)
+
+        violations = self.validate_response(plan)
+        if violations:
+            self.log("[Planner Agent] Invalid plan: %s", violations, level=logging.WARNING)
+            return None
+
+        contract = {key: value for key, value in plan.items() if key not in self.EVALUATION_FIELDS}
+        return plan["complexity"], contract
@@ -1,32 +1,44 @@
+import logging
 from helpers.enums import Status, ExecutionResult
 from typing import Dict, Any
 from agents.agent import Agent
 from helpers.system_prompts import TESTER_SYSTEM_PROMPT
 from helpers.prompt_generator import generate_tester_request
 from tools.test_executor import TestExecutor
+from tools.failure_triage import FailureTriage
+from helpers.schemas import TESTER_SCHEMA
+from helpers.tracing import traced
+from config import LOCAL_FAILURE_TRIAGE
 
 class TesterAgent(Agent):
     """
     Analyzes test failures and refines either the code or tests.
     """
 
+    output_schema = TESTER_SCHEMA
+
     def __init__(self, client):
         super().__init__(client)
         self.executor = TestExecutor()
 
+        # Clear failures are blamed locally, the ambiguous ones are left to the LLM
+        self.triage = FailureTriage()
+        self.local_triage = LOCAL_FAILURE_TRIAGE
+
+    @traced("agent")
     def test(self, contract: Dict[str, Any], python_code: str, reverty_code: str, tests: str) -> Dict[str, Any]:
         """
         Analyzes test failures and notifies issues with either the code or tests.
         """
 
         self.log("[Tester Agent] Testing...")
-        self.log(f"[Tester Agent] Python code: \n{python_code}")
-        self.log(f"[Tester Agent] Tests: \n{tests}")
+        self.log("[Tester Agent] Python code: \n%s", python_code, level=logging.DEBUG)
+        self.log("[Tester Agent] Tests: \n%s", tests, level=logging.DEBUG)
 
         # Run tests
         test_result: ExecutionResult = self.executor.run_tests(python_code, tests)
 
-        self.log(f"[Tester Agent] Test result in run tests: {test_result.status.value}")
+        self.log("[Tester Agent] Test result in run tests: %s", test_result.status.value)
         if test_result.status == Status.SUCCESS:
             return {
                 "status": Status.SUCCESS.value,
@@ -36,16 +48,32 @@ class TesterAgent(Agent):
             error_output: str = test_result.code_failures
             failed_tests: str = test_result.failed_tests
 
+            triaged = self.triage.triage(contract, python_code, test_result.failures) if self.local_triage else None
+            if triaged is not None:
+                self.log("[Tester Agent] Failures triaged locally: code %s, tests %s", "blamed" if triaged["code_failures"] else "clear", "blamed" if triaged["test_failures"] else "clear")
+                return {
+                    "status": Status.ERROR.value,
+                    "code_failures": triaged["code_failures"],
+                    "test_failures": triaged["test_failures"],
+                    "llm_calls_saved": 1,
+                }
+
             tester_prompt: str = generate_tester_request(
                 contract, python_code, reverty_code, tests, failed_tests, error_output
             )
 
-            response_raw: str = self.client.generate(
+            response_raw: str = self.generate(
                 user_prompt=tester_prompt, system_prompt=TESTER_SYSTEM_PROMPT
             )
 
             response: Dict[str, Any] = self.extract_response(response_raw)
 
+            # An analysis violating the schema cannot assign the blame: treat it as a code failure
+            violations = self.validate_response(response)
+            if violations:
+                self.log("[Tester Agent] Invalid analysis: %s", violations, level=logging.WARNING)
+                response = {"code_failures": error_output, "test_failures": None}
+
             final_result: Dict[str, Any] = {
                 "status": Status.ERROR.value,
                 "code_failures": response.get("code_failures") if response.get("code_failures") != "" else None,
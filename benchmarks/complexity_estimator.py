@@ -0,0 +1,79 @@
+"""
+Offline accuracy vs latency report of the local complexity estimator against the
+logged evaluator outputs, with k-fold cross validation.
+
+For each confidence threshold it reports how many requests skip the evaluator LLM,
+how often the local estimate on those matches the LLM (exactly, within one point, and
+on the same side of the simple/complex architect threshold) and the expected
+evaluation latency per request. Without a log, the seed examples are used
+leave-one-out. Run from the project root:
+    python -m benchmarks.complexity_estimator [path/to/evaluations.jsonl]
+"""
+
+import statistics
+import sys
+import time
+from typing import List, Tuple
+from config import evaluation_log_path
+from helpers.complexity_estimator import ComplexityEstimator, SEED_EXAMPLES, read_evaluation_log
+
+THRESHOLDS = (0.0, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 0.95)
+
+# Mean LLM evaluation latency assumed when the log has no timings
+DEFAULT_LLM_LATENCY_S = 2.0
+
+
+def cross_validate(examples: List[Tuple[str, int]], folds: int, seed: bool) -> List[Tuple[int, int, float, float]]:
+    """
+    Returns (expected, estimated, confidence, estimate seconds) for every example,
+    each estimated by a model trained without its fold.
+    """
+    predictions = []
+    for fold in range(folds):
+        training = [example for i, example in enumerate(examples) if i % folds != fold]
+        estimator = ComplexityEstimator.from_log(seed=seed).fit(training)
+
+        for prompt, expected in examples[fold::folds]:
+            start = time.perf_counter()
+            estimate = estimator.estimate(prompt)
+            elapsed = time.perf_counter() - start
+            predictions.append((expected, estimate.complexity, estimate.confidence, elapsed))
+
+    return predictions
+
+
+def main(log_path: str = evaluation_log_path, folds: int = 5):
+    records = read_evaluation_log(log_path)
+
+    if records:
+        examples = [(record["prompt"], record["complexity"]) for record in records]
+        timed = [record["latency_s"] for record in records if isinstance(record.get("latency_s"), (int, float))]
+        llm_latency = statistics.mean(timed) if timed else DEFAULT_LLM_LATENCY_S
+        predictions = cross_validate(examples, min(folds, len(examples)), seed=True)
+        print(f"{len(examples)} logged evaluations from {log_path}, {folds}-fold, mean LLM latency {llm_latency:.2f} s\n")
+    else:
+        examples = SEED_EXAMPLES
+        llm_latency = DEFAULT_LLM_LATENCY_S
+        predictions = cross_validate(examples, len(examples), seed=False)
+        print(f"No log at {log_path}: seed examples leave-one-out, assumed LLM latency {llm_latency:.2f} s\n")
+
+    estimate_latency = statistics.mean(elapsed for *_, elapsed in predictions)
+    print(f"Local estimate: {estimate_latency * 1e6:.0f} us per request\n")
+    print(f"{'threshold':>9}{'skipped':>9}{'exact':>8}{'±1':>8}{'band':>8}{'latency s':>11}")
+
+    for threshold in THRESHOLDS:
+        skipped = [(expected, estimated) for expected, estimated, confidence, _ in predictions if confidence >= threshold]
+        coverage = len(skipped) / len(predictions)
+        latency = estimate_latency + (1 - coverage) * llm_latency
+
+        if skipped:
+            exact = sum(expected == estimated for expected, estimated in skipped) / len(skipped)
+            close = sum(abs(expected - estimated) <= 1 for expected, estimated in skipped) / len(skipped)
+            band = sum((expected <= 5) == (estimated <= 5) for expected, estimated in skipped) / len(skipped)
+            print(f"{threshold:>9.2f}{coverage:>9.0%}{exact:>8.0%}{close:>8.0%}{band:>8.0%}{latency:>11.2f}")
+        else:
+            print(f"{threshold:>9.2f}{coverage:>9.0%}{'-':>8}{'-':>8}{'-':>8}{latency:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,113 @@
+"""
+Compares the single-pass Agent.extract_response with the previous multi-stage
+extractor on long, chatty LLM outputs.
+
+Run from the project root:
+    python -m benchmarks.extract_response
+"""
+
+import json
+import timeit
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Callable, Dict
+from agents.agent import Agent
+from helpers.schemas import EVALUATOR_SCHEMA
+
+ANSWER = '{"complexity": 6, "detected_logic": "recursion", "reasoning": "needs a base case"}'
+
+
+def legacy_extract(response: str) -> Dict[str, Any]:
+    """
+    The previous extractor: direct parse, fence splits, greedy braces, then one
+    json.loads per top-level brace span. It printed the whole response every time.
+    """
+
+    print(f"[EXTRACT RESPONSE] Response: {response}")
+
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        if "```json" in response:
+            return json.loads(response.split("```json")[1].split("```")[0].strip())
+        elif "```" in response:
+            return json.loads(response.split("```")[1].split("```")[0].strip())
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        start = response.find("{")
+        end = response.rfind("}")
+        if start != -1 and end != -1:
+            return json.loads(response[start : end + 1])
+    except json.JSONDecodeError:
+        pass
+
+    stack = []
+    start_idx = -1
+    for i, char in enumerate(response):
+        if char == "{":
+            if not stack:
+                start_idx = i
+            stack.append(char)
+        elif char == "}" and stack:
+            stack.pop()
+            if not stack:
+                try:
+                    return json.loads(response[start_idx : i + 1])
+                except json.JSONDecodeError:
+                    continue
+
+    return {"code": response}
+
+
+def build_cases(size: int) -> Dict[str, str]:
+    """
+    Pathological outputs of roughly `size` characters, all containing the same answer.
+    """
+
+    prose = "The function {name} iterates over {items} and keeps {state} in a dict. "
+    nested = "{ " * 40 + "not json " + "} " * 40
+    example = '{"detected_logic": "example only"} '
+    fence = "```python\ndef f(x):\n    return {k: v for k, v in x.items()}\n```\n"
+
+    return {
+        "prose with braces": prose * (size // len(prose)) + ANSWER,
+        "deep unbalanced nesting": nested * (size // len(nested)) + ANSWER,
+        "schema-invalid examples first": example * (size // len(example)) + ANSWER,
+        "code fences then json fence": fence * (size // len(fence)) + "```json\n" + ANSWER + "\n```",
+        "answer then chatter": ANSWER + " Hope it helps! {" + prose * (size // len(prose)),
+    }
+
+
+def measure(extract: Callable[[str], Dict[str, Any]], response: str, number: int) -> float:
+    """
+    Average time of one extraction in milliseconds, with the output discarded.
+    """
+
+    with redirect_stdout(StringIO()):
+        return timeit.timeit(lambda: extract(response), number=number) / number * 1000
+
+
+def main(sizes=(2_000, 8_000, 32_000), number: int = 20):
+    agent = Agent(client=None)
+    agent.output_schema = EVALUATOR_SCHEMA
+
+    print(f"{'case':<32}{'size':>8}{'legacy ms':>12}{'single-pass ms':>16}  legacy ok / single-pass ok")
+    for size in sizes:
+        for name, response in build_cases(size).items():
+            legacy_ms = measure(legacy_extract, response, number)
+            single_ms = measure(agent.extract_response, response, number)
+
+            with redirect_stdout(StringIO()):
+                legacy_ok = legacy_extract(response).get("complexity") == 6
+                single_ok = agent.extract_response(response).get("complexity") == 6
+
+            print(f"{name:<32}{len(response):>8}{legacy_ms:>12.3f}{single_ms:>16.3f}  {legacy_ok} / {single_ok}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+A/B harness for the few-shot examples of the initial coder prompt.
+
+Arm A builds the code of every contract without examples, arm B with the examples
+retrieved for it. Each arm reports the success rate and, per successful build, the
+LLM calls and validation iterations spent. Run from the project root:
+    python -m benchmarks.few_shot_retrieval                    # simulated model
+    python -m benchmarks.few_shot_retrieval --client ollama     # real model
+
+The simulated model only exercises the harness: its keyword slip rate is an assumption
+(lower when the prompt has examples), not a measurement. Local repairs are disabled in
+both arms so the slips reach the LLM fix loop.
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict
+from agents.coder_agent import CoderAgent
+from clients.llm_client_abstract import LLMClient
+from helpers.enums import LLMClientType, Status
+from helpers.example_retriever import ExampleRetriever
+from helpers.utils import load_grammar
+
+# Contracts of the benchmark, with the code the simulated model writes for them
+CONTRACTS = [
+    (
+        {"function_name": "power", "args": [{"name": "base", "type": "int"}, {"name": "exponent", "type": "int"}], "return_type": "int", "docstring": "Raises base to exponent iteratively."},
+        ": tni -> (tni: base, tni: exponent) power fed\n    result: tni = 1\n    : range(exponent) ni i rof\n        result = result * base\n    nruter result\n",
+    ),
+    (
+        {"function_name": "is_even", "args": [{"name": "n", "type": "int"}], "return_type": "bool", "docstring": "Checks whether a number is even."},
+        ": loob -> (tni: n) is_even fed\n    nruter n % 2 == 0\n",
+    ),
+    (
+        {"function_name": "max_of_two", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}], "return_type": "int", "docstring": "Largest of two numbers."},
+        ": tni -> (tni: a, tni: b) max_of_two fed\n    : a > b fi\n        nruter a\n    nruter b\n",
+    ),
+    (
+        {"function_name": "grade", "args": [{"name": "score", "type": "int"}], "return_type": "str", "docstring": "Letter grade of a score from 0 to 100."},
+        ': rts -> (tni: score) grade fed\n    : score >= 90 fi\n        nruter "A"\n    : score >= 70 file\n        nruter "B"\n    : esle\n        nruter "C"\n',
+    ),
+    (
+        {"function_name": "sum_of_squares", "args": [{"name": "n", "type": "int"}], "return_type": "int", "docstring": "Sums the squares of the numbers from 1 to n."},
+        ": tni -> (tni: n) sum_of_squares fed\n    total: tni = 0\n    : range(n + 1) ni i rof\n        total = total + i * i\n    nruter total\n",
+    ),
+]
+
+# Python words the simulated model slips into its Reverty code
+SLIPS = {"nruter": "return", "fed": "def", "fi": "if", "elihw": "while"}
+
+
+class SimulatedLLM(LLMClient):
+    """
+    Writes the right code of the contract, slipping Python keywords into it with a
+    probability that depends on whether the prompt shows examples.
+    """
+
+    temperature = 0.3
+
+    def __init__(self, slip_rate: float, slip_rate_with_examples: float, seed: int):
+        self.slip_rate = slip_rate
+        self.slip_rate_with_examples = slip_rate_with_examples
+        self.random = random.Random(seed)
+
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None, schema: Dict[str, Any] = None, temperature: float = None) -> str:
+        code = next(code for contract, code in CONTRACTS if f"function_name: {contract['function_name']}\n" in user_prompt)
+        slip_rate = self.slip_rate_with_examples if "Example 1:" in user_prompt else self.slip_rate
+
+        if self.random.random() < slip_rate:
+            word = self.random.choice([word for word in SLIPS if f" {word}" in code])
+            code = code.replace(f" {word}", f" {SLIPS[word]}", 1)
+        return code
+
+
+class CountingClient:
+    """
+    Forwards everything to a client, counting the generate calls.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, *args, **kwargs) -> str:
+        with self.lock:
+            self.calls += 1
+        return self.client.generate(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def build_backend(client_type: str):
+    """
+    Client of a real model, set up as the orchestrator does.
+    """
+    from orchestrator import Orchestrator
+    with redirect_stdout(StringIO()):
+        return Orchestrator(LLMClientType(client_type), preload_model=False).client
+
+
+def run_arm(client_type: str, few_shot: bool, repeats: int, iterations: int) -> Dict[str, float]:
+    agent = CoderAgent(None, load_grammar(), max_validation_iterations=iterations)
+    agent.examples = ExampleRetriever.from_store(None) if few_shot else None
+    agent.local_repair = False
+    backend = build_backend(client_type) if client_type != "simulated" else None
+
+    successes, calls, seconds = 0, [], []
+    for repeat in range(repeats):
+        for contract, _ in CONTRACTS:
+            seed = repeat * 100 + len(contract["function_name"])
+            client = CountingClient(backend or SimulatedLLM(slip_rate=0.5, slip_rate_with_examples=0.2, seed=seed))
+            agent.client = client
+
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                _, _, result = agent.build_initial_code(contract)
+            elapsed = time.perf_counter() - start
+
+            if result.status == Status.SUCCESS:
+                successes += 1
+                calls.append(client.calls)
+                seconds.append(elapsed)
+
+    builds = repeats * len(CONTRACTS)
+    return {
+        "success_rate": successes / builds,
+        "calls_per_success": statistics.mean(calls) if calls else float("nan"),
+        "first_pass_rate": sum(1 for count in calls if count == 1) / builds,
+        "seconds_per_success": statistics.mean(seconds) if seconds else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client", default="simulated", choices=["simulated"] + [client.value for client in LLMClientType if client != LLMClientType.MOCK])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{len(CONTRACTS)} contracts x {args.repeats} repeats, client {args.client}, {args.iterations} validation iterations\n")
+    print(f"{'arm':<16}{'success':>9}{'first pass':>12}{'calls/success':>15}{'s/success':>11}")
+
+    # Each successful build spends one validation iteration per LLM call
+    for name, few_shot in (("A: no examples", False), ("B: few-shot", True)):
+        stats = run_arm(args.client, few_shot, args.repeats, args.iterations)
+        print(f"{name:<16}{stats['success_rate']:>9.0%}{stats['first_pass_rate']:>12.0%}{stats['calls_per_success']:>15.2f}{stats['seconds_per_success']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
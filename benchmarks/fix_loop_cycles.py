@@ -0,0 +1,99 @@
+"""
+Replays recorded shapes of coder fix loops with and without cycle detection and
+reports the LLM calls (validation iterations) each one spends.
+
+Every scenario is a scripted sequence of LLM answers: loops stuck on the same broken
+code, loops flipping between two versions, loops that only escape when the strategy
+changes, and loops that converge on their own. Run from the project root:
+    python -m benchmarks.fix_loop_cycles
+"""
+
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict, List
+from agents.coder_agent import CoderAgent
+from clients.llm_client_abstract import LLMClient
+from helpers.enums import Status
+from helpers.utils import load_grammar
+
+CONTRACT = {"function_name": "double", "args": [{"name": "x", "type": "int"}], "return_type": "int"}
+
+VALID = ": tni -> (tni: x) double fed\n    nruter x * 2\n"
+BROKEN = ": tni -> (tni: x) double def\n    return x * 2\n"
+BROKEN_FLIP = ": tni -> (tni: x) double fed\n    return x * 2\n"
+UNUSED = ": tni -> (tni: x) double fed\n    y: tni = 1\n    nruter x * 2\n"
+
+# name: (scripted answers, answer once the temperature is raised, answer once the history is added)
+SCENARIOS = {
+    "stuck on the same code": ([BROKEN], None, None),
+    "flipping between two versions": ([BROKEN, BROKEN_FLIP], None, None),
+    "escapes at higher temperature": ([BROKEN], VALID, None),
+    "escapes with the error history": ([BROKEN], None, VALID),
+    "converges on its own": ([BROKEN, UNUSED, VALID], None, None),
+    "valid at first try": ([VALID], None, None),
+}
+
+
+class ReplayLLM(LLMClient):
+    """
+    Answers with the script, cycling on its last answers, unless the request escalated.
+    """
+
+    temperature = 0.3
+
+    def __init__(self, script: List[str], on_temperature: str | None, on_history: str | None):
+        self.script = script
+        self.on_temperature = on_temperature
+        self.on_history = on_history
+        self.calls = 0
+
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None, schema: Dict[str, Any] = None, temperature: float = None) -> str:
+        self.calls += 1
+
+        if self.on_history and "change approach" in user_prompt:
+            return self.on_history
+        if self.on_temperature and temperature is not None and temperature > self.temperature:
+            return self.on_temperature
+
+        # Past the script, keep cycling on its last two answers
+        index = self.calls - 1
+        if index >= len(self.script):
+            tail = self.script[-2:]
+            index = len(self.script) - len(tail) + (index - len(self.script)) % len(tail)
+        return self.script[index]
+
+
+def replay(script, on_temperature, on_history, cycle_detection: bool, iterations: int):
+    client = ReplayLLM(script, on_temperature, on_history)
+    agent = CoderAgent(client, load_grammar(), max_validation_iterations=iterations)
+    agent.cycle_detection = cycle_detection
+
+    # The scripted errors would be repaired locally: measure the LLM loop alone
+    agent.local_repair = False
+
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        _, _, result = agent.build_initial_code(CONTRACT)
+
+    return client.calls, result.status == Status.SUCCESS, time.perf_counter() - start
+
+
+def main(iterations: int = 8):
+    print(f"Validation loop of {iterations} iterations\n")
+    print(f"{'scenario':<32}{'calls off':>10}{'calls on':>10}{'saved':>7}{'ok off/on':>13}{'s off':>8}{'s on':>7}")
+
+    total_off = total_on = 0
+    for name, (script, on_temperature, on_history) in SCENARIOS.items():
+        calls_off, ok_off, seconds_off = replay(script, on_temperature, on_history, False, iterations)
+        calls_on, ok_on, seconds_on = replay(script, on_temperature, on_history, True, iterations)
+        total_off += calls_off
+        total_on += calls_on
+
+        print(f"{name:<32}{calls_off:>10}{calls_on:>10}{calls_off - calls_on:>7}{f'{ok_off}/{ok_on}':>13}{seconds_off:>8.2f}{seconds_on:>7.2f}")
+
+    print(f"\nLLM calls: {total_off} without cycle detection, {total_on} with it ({total_off - total_on} wasted iterations removed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Overhead of the pipeline logs: unconditional prints against level-gated logging.
+
+A run of the mock pipeline is recorded at DEBUG, then its log calls are replayed:
+printed eagerly, as the pipeline did before the logging layer, and through the loggers
+at each level. The report gives the microseconds and the bytes written per run; the
+end-to-end runs compare the wall time of whole runs at INFO and DEBUG. Run from the
+project root:
+    python -m benchmarks.logging_overhead
+    python -m benchmarks.logging_overhead --runs 5 --scale 20   # payloads of a real model
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import List
+from helpers.logger import ROOT, configure_logging
+from orchestrator import Orchestrator
+
+PROMPT = "Sum two numbers"
+
+REPLAYS = 200
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+def record_run() -> List[logging.LogRecord]:
+    """
+    Log records of a mock run, every level included.
+    """
+    configure_logging("DEBUG")
+    recorder = RecordingHandler()
+    logging.getLogger(ROOT).addHandler(recorder)
+    try:
+        with redirect_stdout(StringIO()):
+            Orchestrator().run(PROMPT)
+    finally:
+        logging.getLogger(ROOT).removeHandler(recorder)
+    return recorder.records
+
+
+def scaled(records: List[logging.LogRecord], scale: int) -> List[logging.LogRecord]:
+    """
+    Records with their string arguments repeated, for programs and prompts of real models.
+    """
+    if scale == 1:
+        return records
+    copies = []
+    for record in records:
+        copy = logging.makeLogRecord(vars(record))
+        if isinstance(record.args, tuple):
+            copy.args = tuple(arg * scale if isinstance(arg, str) else arg for arg in record.args)
+        copies.append(copy)
+    return copies
+
+
+def replay_prints(records: List[logging.LogRecord]):
+    for record in records:
+        print(record.msg % record.args if record.args else record.msg)
+
+
+def replay_logs(records: List[logging.LogRecord]):
+    # The components hold their logger in a module global: resolve them outside the timing
+    loggers = {record.name: logging.getLogger(record.name) for record in records}
+    for record in records:
+        # A single mapping argument was unpacked by the record: pass it back as is
+        args = (record.args,) if isinstance(record.args, dict) else record.args
+        loggers[record.name].log(record.levelno, record.msg, *args)
+
+
+def measure(replay, records: List[logging.LogRecord]) -> tuple[float, int]:
+    """
+    Microseconds per run and bytes written by one replay of the records, written to a
+    file as a console or a log collector would receive them.
+    """
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as output:
+        with redirect_stdout(output):
+            replay(records)
+            start = time.perf_counter()
+            for _ in range(REPLAYS):
+                replay(records)
+            output.flush()
+            elapsed = time.perf_counter() - start
+        written = output.tell()
+    return elapsed / REPLAYS * 1e6, written // (REPLAYS + 1)
+
+
+def end_to_end(level: str, runs: int) -> float:
+    configure_logging(level)
+    seconds = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        orchestrator = Orchestrator()
+        for _ in range(runs):
+            start = time.perf_counter()
+            orchestrator.run(PROMPT)
+            seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="End-to-end runs per level.")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the logged programs, prompts and responses this many times.")
+    args = parser.parse_args()
+
+    records = scaled(record_run(), args.scale)
+    levels = {logging.getLevelName(level): sum(1 for record in records if record.levelno == level) for level in sorted({record.levelno for record in records})}
+    print(f"{len(records)} log calls in a run: " + ", ".join(f"{count} {name}" for name, count in levels.items()))
+
+    print(f"\n{'replay':<16}{'us/run':>10}{'bytes/run':>12}")
+    micros, written = measure(replay_prints, records)
+    print(f"{'print (before)':<16}{micros:>10.0f}{written:>12}")
+    for level in ("DEBUG", "INFO", "WARNING"):
+        configure_logging(level)
+        micros, written = measure(replay_logs, records)
+        print(f"{'log ' + level:<16}{micros:>10.0f}{written:>12}")
+
+    print(f"\nEnd to end, median of {args.runs} runs")
+    for level in ("DEBUG", "INFO"):
+        print(f"{level:<8}{end_to_end(level, args.runs):>8.3f} s")
+    configure_logging()
+
+
+if __name__ == "__main__":
+    main()
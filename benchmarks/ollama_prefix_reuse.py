@@ -0,0 +1,61 @@
+"""
+Compares the prompt-eval token counts of a coder call sequence (initial code + fixes)
+with and without Ollama session mode.
+
+Requires a running Ollama server. Run from the project root:
+    python -m benchmarks.ollama_prefix_reuse
+"""
+
+from typing import List
+from clients.ollama_client import OllamaClient
+from helpers.prompt_generator import generate_initial_code_request, generate_static_fix_request
+from helpers.system_prompts import CODER_SYSTEM_PROMPT
+from helpers.utils import load_grammar
+from helpers.run_context import llm_session
+from config import OLLAMA_LLM_MODEL
+
+CONTRACT = {
+    "function_name": "factorial",
+    "args": [{"name": "n", "type": "int"}],
+    "return_type": "int",
+}
+
+BROKEN_CODE = ": tni -> (tni: n) factorial def\n    nruter n\n"
+
+
+def run_sequence(session_mode: bool, fix_rounds: int = 3) -> List[int]:
+    """
+    Runs one initial coder call followed by fix calls and returns the prompt-eval counts.
+    """
+
+    client = OllamaClient(model=OLLAMA_LLM_MODEL, session_mode=session_mode)
+    system_prompt = CODER_SYSTEM_PROMPT + "\n\n" + load_grammar()
+
+    # Session mode keeps a conversation only for the calls of a session, like those of a run
+    with llm_session("benchmark"):
+        client.generate(generate_initial_code_request(CONTRACT), system_prompt=system_prompt)
+        for _ in range(fix_rounds):
+            fix_prompt = generate_static_fix_request(
+                reverty_code=BROKEN_CODE,
+                errors="Unexpected token Token('NAME', 'def')",
+                error_type="parsing",
+                contract=CONTRACT,
+            )
+            client.generate(fix_prompt, system_prompt=system_prompt)
+    client.end_session("benchmark")
+
+    return [latency.prompt_eval_count for latency in client.latencies]
+
+
+def main():
+    before = run_sequence(session_mode=False)
+    after = run_sequence(session_mode=True)
+
+    print("\ncall | prompt eval tokens (stateless) | prompt eval tokens (session)")
+    for i, (b, a) in enumerate(zip(before, after)):
+        print(f"{i + 1:>4} | {b:>30} | {a:>28}")
+    print(f"total | {sum(before):>29} | {sum(after):>28}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Token cost and parse failures of the payload formats (TOON, compact JSON, YAML-like).
+
+Every recorded contract (seed examples, benchmark contracts, architect-style contracts
+and the solution store, if any) is encoded in each format and counted with the tokenizer
+of each model family. With a model, the model is also asked to return each contract in
+the same format with one more edge case; a response that does not decode to a valid
+contract is a parse failure. The cheapest format within the failure limit is the one to
+set for the client in CLIENT_PAYLOAD_FORMATS. Run from the project root:
+    python -m benchmarks.payload_formats                  # token counts only
+    python -m benchmarks.payload_formats --client ollama   # token counts and parse failures
+"""
+
+import argparse
+import re
+import statistics
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict, List
+from benchmarks.few_shot_retrieval import CONTRACTS, build_backend
+from helpers.enums import LLMClientType
+from helpers.example_retriever import SEED_EXAMPLES
+from helpers.payload_format import FORMATS, PayloadFormat
+from helpers.schemas import CONTRACT_SCHEMA, validate_schema
+from helpers.solution_store import read_solutions
+from helpers.token_budget import CLIENT_FAMILIES, ENCODINGS, TokenCounter
+from config import solution_store_path
+
+# Contracts as the architect writes them for longer requests
+ARCHITECT_CONTRACTS = [
+    {
+        "function_name": "calculator",
+        "args": [{"name": "op", "type": "str"}, {"name": "a", "type": "float"}, {"name": "b", "type": "float"}],
+        "return_type": "float",
+        "docstring": "Applies the operation op to a and b.",
+        "requirements": ["Support the operations +, -, * and /", "Return the result as a float"],
+        "constraints": ["op is one of +, -, *, /", "b != 0 when op is /"],
+        "edge_cases": ["Division by zero raises ValueError", "Unknown operation raises ValueError"],
+    },
+    {
+        "function_name": "word_count",
+        "args": [{"name": "text", "type": "str"}],
+        "return_type": "int",
+        "docstring": "Counts the words of a text: sequences of characters separated by spaces.",
+        "requirements": ["Ignore leading and trailing spaces", "Treat consecutive spaces as one separator"],
+        "constraints": [],
+        "edge_cases": ["Empty text returns 0", "Text of only spaces returns 0"],
+    },
+]
+
+REQUEST = (
+    "Here is a contract in {name}:\n{payload}\n"
+    "Return the same contract in {name}, adding one more edge case to edge_cases.\n"
+    "Return only the {name} object in a ```{fence} block, with no other text.\n"
+)
+SYSTEM_PROMPT = "You edit technical specifications of functions, keeping their format."
+
+# Highest parse failure rate of a format still considered reliable
+MAX_FAILURE_RATE = 0.05
+
+FENCED = re.compile(r"```[A-Za-z]*\n(.*?)(?:```|$)", re.DOTALL)
+
+
+def recorded_contracts() -> List[Dict[str, Any]]:
+    contracts = [contract for contract, _ in SEED_EXAMPLES] + [contract for contract, _ in CONTRACTS] + ARCHITECT_CONTRACTS
+    contracts += [solution.contract for solution in read_solutions(solution_store_path) if isinstance(solution.contract, dict)]
+    return contracts
+
+
+def decodes_to_contract(payload_format: PayloadFormat, response: str) -> bool:
+    """
+    True if the response holds a valid contract in the format, fenced or not.
+    """
+    match = FENCED.search(response)
+    try:
+        decoded = payload_format.decode(match.group(1) if match else response)
+    except ValueError:
+        return False
+    return isinstance(decoded, dict) and not validate_schema(decoded, CONTRACT_SCHEMA)
+
+
+def measure(contracts: List[Dict[str, Any]], client, counter: TokenCounter) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, payload_format in FORMATS.items():
+        payloads = [payload_format.encode(contract) for contract in contracts]
+        round_trips = sum(1 for contract, payload in zip(contracts, payloads) if _round_trips(payload_format, payload, contract))
+        stats = {
+            "tokens": statistics.mean(counter.count(payload) for payload in payloads),
+            "round_trip": round_trips / len(contracts),
+        }
+
+        if client is not None:
+            failures, completion = 0, []
+            for payload in payloads:
+                fence = payload_format.fences[0] or "json"
+                with redirect_stdout(StringIO()):
+                    response = client.generate(user_prompt=REQUEST.format(name=name.upper(), payload=payload, fence=fence), system_prompt=SYSTEM_PROMPT)
+                failures += not decodes_to_contract(payload_format, response)
+                completion.append(counter.count(response))
+            stats["failure_rate"] = failures / len(payloads)
+            stats["completion_tokens"] = statistics.mean(completion)
+
+        results[name] = stats
+    return results
+
+
+def _round_trips(payload_format: PayloadFormat, payload: str, contract: Dict[str, Any]) -> bool:
+    try:
+        return payload_format.decode(payload) == contract
+    except ValueError:
+        return False
+
+
+def cheapest_reliable(results: Dict[str, Dict[str, float]]) -> str | None:
+    reliable = {name: stats for name, stats in results.items() if stats["round_trip"] == 1 and stats.get("failure_rate", 0) <= MAX_FAILURE_RATE}
+    if not reliable:
+        return None
+    return min(reliable, key=lambda name: reliable[name]["tokens"] + reliable[name].get("completion_tokens", 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client", choices=[client.value for client in LLMClientType if client != LLMClientType.MOCK])
+    args = parser.parse_args()
+
+    contracts = recorded_contracts()
+    client = build_backend(args.client) if args.client else None
+    client_family = CLIENT_FAMILIES.get(args.client)
+    print(f"{len(contracts)} recorded contracts" + (f", client {args.client}" if client else ", no model: parse failures not measured"))
+
+    # The model is asked once, with the tokenizer of its own family
+    for family in ENCODINGS:
+        results = measure(contracts, client if family == client_family else None, TokenCounter(family))
+        print(f"\nTokenizer family {family}")
+        print(f"{'format':<8}{'tokens':>8}{'round trip':>12}{'failures':>10}{'completion':>12}")
+        for name, stats in results.items():
+            measured = f"{stats['failure_rate']:>10.0%}{stats['completion_tokens']:>12.1f}" if "failure_rate" in stats else f"{'-':>10}{'-':>12}"
+            print(f"{name:<8}{stats['tokens']:>8.1f}{stats['round_trip']:>12.0%}{measured}")
+
+        best = cheapest_reliable(results)
+        print(f"Cheapest reliable format: {best}")
+        if family == client_family and best:
+            print(f'Set it in config.py: CLIENT_PAYLOAD_FORMATS = {{"{args.client}": "{best}"}}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Tokens of the fix prompts sent whole and scoped to the failing function.
+
+Programs of growing size have one function with a parsing error; for each size the
+report gives the prompt tokens of the static fix request and the tokens of the code the
+model has to return, with the whole program and with the scoped function. Run from the
+project root:
+    python -m benchmarks.scoped_fix_prompts
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from helpers.code_scope import failing_functions, renumber_errors, scope_code
+from helpers.enums import ErrorType
+from helpers.prompt_generator import generate_static_fix_request
+from helpers.token_budget import get_counter
+from helpers.utils import load_grammar
+from tools.parser import Parser
+
+SIZES = (1, 2, 4, 8, 16)
+
+CONTRACT = {"function_name": "calculator", "args": [{"name": "op", "type": "str"}, {"name": "a", "type": "int"}, {"name": "b", "type": "int"}], "return_type": "int"}
+
+
+def program(size: int) -> str:
+    """
+    Program of helper functions and one entry function calling them, the last helper broken.
+    """
+    helpers = []
+    for index in range(size):
+        body = f"    result: tni = a * {index + 1}\n    : result > b fi\n        nruter result - b\n    nruter result + b\n"
+        if index == size - 1:
+            body = body.replace("nruter result + b", "nruter (result + b")
+        helpers.append(f": tni -> (tni: a, tni: b) step_{index} fed\n{body}")
+
+    calls = "".join(f'    : op == "{index}" {"fi" if index == 0 else "file"}\n        nruter step_{index}(a, b)\n' for index in range(size))
+    return "\n".join(helpers) + f"\n: tni -> (rts: op, tni: a, tni: b) calculator fed\n{calls}    nruter 0\n"
+
+
+def main():
+    parser = Parser(load_grammar())
+    counter = get_counter()
+    print(f"{'functions':>10}{'prompt whole':>14}{'prompt scoped':>15}{'code whole':>12}{'code scoped':>13}")
+
+    for size in SIZES:
+        code = program(size)
+        with redirect_stdout(StringIO()):
+            errors = parser.run(code).message
+        parsing = ErrorType.PARSING.value
+
+        whole = generate_static_fix_request(code, errors, parsing, CONTRACT)
+        scope = scope_code(code, "", failing_functions(errors, code, error_type=parsing))
+        scoped = generate_static_fix_request(scope.reverty_code, renumber_errors(errors, scope, parsing), parsing, CONTRACT, signatures=scope.signatures) if scope else whole
+        scoped_code = scope.reverty_code if scope else code
+
+        print(f"{size + 1:>10}{whole.tokens:>14}{scoped.tokens:>15}{counter.count(code):>12}{counter.count(scoped_code):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Lookup latency of the solution store against a full pipeline run.
+
+Stores of growing size are filled with synthetic requests; for each one the report
+gives the load time and the exact-hit, near-duplicate and miss lookup latencies in
+milliseconds. The full run is measured with the mock client, so it is a lower bound:
+with a real model every LLM call adds seconds. Run from the project root:
+    python -m benchmarks.solution_store
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Callable, List
+from helpers.enums import LLMClientType, StoredSolution
+from helpers.solution_store import SolutionStore
+from orchestrator import Orchestrator
+
+SIZES = (100, 1000, 10000)
+LOOKUPS = 200
+
+TASKS = ["factorial of n", "bubble sort of a list", "palindrome check of a string", "fibonacci number", "greatest common divisor", "binary search in a sorted list", "word count of a text", "prime check of a number"]
+VARIANTS = ["using recursion", "iteratively", "with memoization", "for negative numbers too", "returning a tuple", "ignoring case", "in place", "with a generator"]
+
+
+def synthetic_prompt(index: int) -> str:
+    task = TASKS[index % len(TASKS)]
+    variant = VARIANTS[(index // len(TASKS)) % len(VARIANTS)]
+    return f"Write a function computing the {task} {variant}, case {index}"
+
+
+def fill(path: str, size: int):
+    store = SolutionStore(path)
+    for index in range(size):
+        store.add(StoredSolution(prompt=synthetic_prompt(index), contract={"function_name": "f"}, reverty_code="", python_code="", tests=""))
+
+
+def percentiles(lookup: Callable[[int], object], count: int) -> List[float]:
+    timings = []
+    for index in range(count):
+        start = time.perf_counter()
+        lookup(index)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return [statistics.median(timings), timings[int(len(timings) * 0.95) - 1]]
+
+
+def full_run_ms() -> float:
+    orchestrator = Orchestrator(LLMClientType.MOCK)
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        orchestrator.run("Compute the factorial of n")
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'entries':>8}{'load ms':>10}{'exact p50/p95':>18}{'near p50/p95':>18}{'miss p50/p95':>18}")
+
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "solutions.jsonl")
+            fill(path, size)
+
+            start = time.perf_counter()
+            store = SolutionStore(path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            exact = percentiles(lambda i: store.lookup(synthetic_prompt(i % size).upper()), LOOKUPS)
+            near = percentiles(lambda i: store.lookup("Please " + synthetic_prompt(i % size).replace("computing", "that computes")), LOOKUPS)
+            miss = percentiles(lambda i: store.lookup(f"Reverse the words of sentence number {i}"), LOOKUPS)
+
+        print(f"{size:>8}{load_ms:>10.1f}" + "".join(f"{f'{p50:.3f}/{p95:.3f}':>18}" for p50, p95 in (exact, near, miss)))
+
+    print(f"\nFull run with the mock client (no LLM latency): {full_run_ms():.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares the end-to-end latency of CoderAgent.build_initial_code with one candidate
+and with speculative parallel candidates.
+
+The LLM is simulated: every call takes `latency` seconds and returns valid code with
+probability `success_rate`, broken code otherwise, so slow fix loops are reproduced
+without a model server. Run from the project root:
+    python -m benchmarks.speculative_candidates
+"""
+
+import random
+import statistics
+import threading
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict, List
+from agents.coder_agent import CoderAgent
+from clients.llm_client_abstract import LLMClient
+from helpers.enums import Status
+from helpers.utils import load_grammar
+
+CONTRACT = {"function_name": "double", "args": [{"name": "x", "type": "int"}], "return_type": "int"}
+
+VALID_CODE = ": tni -> (tni: x) double fed\n    nruter x * 2\n"
+BROKEN_CODE = ": tni -> (tni: x) double def\n    return x * 2\n"
+
+
+class SimulatedLLM(LLMClient):
+    """
+    LLM with a fixed latency and a fixed probability of answering with valid code.
+    """
+
+    temperature = 0.3
+
+    def __init__(self, latency: float, success_rate: float, seed: int):
+        self.latency = latency
+        self.success_rate = success_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None, schema: Dict[str, Any] = None, temperature: float = None) -> str:
+        with self.lock:
+            self.calls += 1
+            valid = self.random.random() < self.success_rate
+
+        time.sleep(self.latency)
+        return VALID_CODE if valid else BROKEN_CODE
+
+
+def run(candidates: int, runs: int, latency: float, success_rate: float) -> Dict[str, float]:
+    """
+    Runs build_initial_code `runs` times and summarizes latency, success rate and LLM calls.
+    """
+
+    grammar = load_grammar()
+    latencies: List[float] = []
+    successes = 0
+    calls = 0
+
+    for seed in range(runs):
+        client = SimulatedLLM(latency, success_rate, seed)
+        agent = CoderAgent(client, grammar, candidates=candidates)
+
+        # The broken answers would be repaired locally: measure the LLM loop alone
+        agent.local_repair = False
+
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            _, _, result = agent.build_initial_code(CONTRACT)
+        latencies.append(time.perf_counter() - start)
+
+        successes += result.status == Status.SUCCESS
+        calls += client.calls
+
+    return {
+        "median_s": statistics.median(latencies),
+        "max_s": max(latencies),
+        "success_rate": successes / runs,
+        "llm_calls": calls / runs,
+    }
+
+
+def main(runs: int = 10, latency: float = 1.0, success_rate: float = 0.35):
+    print(f"Simulated LLM: {latency:.1f} s per call, {success_rate:.0%} valid answers, {runs} runs\n")
+    print(f"{'candidates':>10}{'median s':>10}{'max s':>8}{'success':>9}{'LLM calls':>11}")
+
+    for candidates in (1, 2, 3, 4):
+        stats = run(candidates, runs, latency, success_rate)
+        print(f"{candidates:>10}{stats['median_s']:>10.2f}{stats['max_s']:>8.2f}{stats['success_rate']:>9.0%}{stats['llm_calls']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
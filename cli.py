@@ -0,0 +1,244 @@
+"""
+Headless command line entry point.
+
+    python cli.py batch prompts.jsonl -o results.jsonl --workers 4 --client ollama
+
+Every input line is a JSON object with a 'prompt' and an optional 'id'. Results are
+appended to the output file as soon as each prompt finishes; running the same command
+again skips the ids already in the output, except the prompts whose run raised (like an
+unreachable backend), so a crashed job can be resumed.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from helpers.enums import LLMClientType, Status, OrchestratorEvent
+from config import LLM_TEMPERATURE, MAX_ORCHESTRATOR_ITERATIONS, MAX_VALIDATION_ITERATIONS, MAX_EVALUATION_RETRIES, SPECULATIVE_CANDIDATES, CONTRACT_FIRST_TESTS, FUSED_PLANNING, LOCAL_COMPLEXITY_ESTIMATOR, SOLUTION_STORE, REVALIDATE_STORED_SOLUTIONS, FEW_SHOT_RETRIEVAL, TRACING, LOG_LEVEL, LOG_FORMAT, BATCH_WORKERS, github_token
+
+# Message prefix of the records of prompts whose run raised
+EXCEPTION_PREFIX = "Exception: "
+
+# Orchestrator of the current worker process, created once by _init_worker
+_worker_orchestrator = None
+_worker_verbose = False
+_worker_devnull = None
+
+
+def read_prompts(input_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (id, prompt) pairs from a JSONL file. Lines without an id get 'line-<n>'.
+    """
+    with open(input_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+            if "prompt" not in entry:
+                raise ValueError(f"{input_path}:{line_number}: missing 'prompt'")
+
+            yield str(entry.get("id", f"line-{line_number}")), entry["prompt"]
+
+
+def completed_ids(output_path: str, retry_failed: bool = False) -> Set[str]:
+    """
+    Ids already present in the output file with a result of the pipeline. With retry_failed,
+    only successful ones. Prompts that raised (like an unreachable backend) never ran, so
+    they are always run again. A truncated last line (crash while writing) is ignored.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if record.get("status") == Status.SUCCESS.value or not (retry_failed or _raised(record)):
+                done.add(str(record["id"]))
+
+    return done
+
+
+def _raised(record: Dict[str, Any]) -> bool:
+    """
+    True for the records of prompts whose run raised instead of returning a result.
+    """
+    return str(record.get("message", "")).startswith(EXCEPTION_PREFIX)
+
+
+def _init_worker(settings: Dict[str, Any]):
+    """
+    Creates the orchestrator reused by every prompt of this worker process.
+    """
+    global _worker_orchestrator, _worker_verbose, _worker_devnull
+    from helpers.logger import configure_logging
+    from orchestrator import Orchestrator
+
+    _worker_verbose = settings.pop("verbose", False)
+    configure_logging(settings.pop("log_level", LOG_LEVEL), settings.pop("log_format", LOG_FORMAT))
+    if _worker_devnull is None:
+        _worker_devnull = open(os.devnull, "w")
+    with _pipeline_output():
+        _worker_orchestrator = Orchestrator(**settings)
+
+
+def _pipeline_output():
+    """
+    The pipeline prints a lot: discard it unless running verbose.
+    """
+    if _worker_verbose:
+        return contextlib.nullcontext()
+    return contextlib.redirect_stdout(_worker_devnull)
+
+
+def _run_prompt(prompt_id: str, prompt: str) -> Dict[str, Any]:
+    """
+    Runs one prompt in the worker and builds its output record.
+    Timings are the seconds elapsed from the start until the first event of each type.
+    """
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    def on_event(event: OrchestratorEvent):
+        timings.setdefault(f"{event.type.value}_s", round(time.perf_counter() - start, 3))
+
+    _worker_orchestrator.on_event = on_event
+
+    try:
+        with _pipeline_output():
+            result = _worker_orchestrator.run(prompt)
+    except Exception as e:
+        return {
+            "id": prompt_id,
+            "status": Status.ERROR.value,
+            "message": f"{EXCEPTION_PREFIX}{e}",
+            "timings": {"total_s": round(time.perf_counter() - start, 3)},
+        }
+
+    timings["total_s"] = round(time.perf_counter() - start, 3)
+
+    return {
+        "id": prompt_id,
+        "status": result.status.value,
+        "message": result.message,
+        "complexity": result.complexity,
+        "iterations": result.iterations,
+        "llm_calls_saved": result.llm_calls_saved,
+        "store_hit": result.store_hit,
+        "trace_file": result.trace_file,
+        "reverty_code": result.reverty_code,
+        "python_code": result.python_code,
+        "timings": timings,
+    }
+
+
+def run_batch(input_path: str, output_path: str, workers: int, settings: Dict[str, Any], retry_failed: bool = False) -> Dict[str, int]:
+    """
+    Runs every pending prompt of the input file and appends the results to the output file.
+    Returns the count of records per status.
+    """
+    done = completed_ids(output_path, retry_failed)
+    pending: List[Tuple[str, str]] = [(prompt_id, prompt) for prompt_id, prompt in read_prompts(input_path) if prompt_id not in done]
+
+    print(f"[Batch] {len(pending)} prompts to run, {len(done)} already completed")
+    counts: Dict[str, int] = {}
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        # A crash may have left a truncated line: start on a new one
+        if output.tell() > 0:
+            with open(output_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    output.write("\n")
+
+        def write(record: Dict[str, Any]):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            total = record["timings"].get("total_s", 0)
+            print(f"[Batch] {sum(counts.values())}/{len(pending)} {record['id']}: {record['status']} ({total:.1f} s)")
+
+        if workers <= 1:
+            _init_worker(dict(settings))
+            for prompt_id, prompt in pending:
+                write(_run_prompt(prompt_id, prompt))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dict(settings),)) as pool:
+                futures = [pool.submit(_run_prompt, prompt_id, prompt) for prompt_id, prompt in pending]
+                for future in as_completed(futures):
+                    write(future.result())
+
+    print(f"[Batch] Finished: {counts}")
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="reverty", description="Reverty command line interface.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    batch = subcommands.add_parser("batch", help="Run the pipeline on every prompt of a JSONL file.")
+    batch.add_argument("input", help="JSONL file with one {'id', 'prompt'} object per line.")
+    batch.add_argument("-o", "--output", required=True, help="JSONL file the results are appended to.")
+    batch.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS, help="Worker processes (1 runs inline). Each one runs its own Orchestrator against the same backend.")
+    batch.add_argument("--client", choices=[client.value for client in LLMClientType], default=LLMClientType.OLLAMA.value)
+    batch.add_argument("--temperature", type=float, default=LLM_TEMPERATURE)
+    batch.add_argument("--api-key", default=github_token, help="GitHub Models API key.")
+    batch.add_argument("--max-orchestrator-iterations", type=int, default=MAX_ORCHESTRATOR_ITERATIONS)
+    batch.add_argument("--max-validation-iterations", type=int, default=MAX_VALIDATION_ITERATIONS)
+    batch.add_argument("--max-evaluation-retries", type=int, default=MAX_EVALUATION_RETRIES)
+    batch.add_argument("--candidates", type=int, default=SPECULATIVE_CANDIDATES, help="Initial code candidates generated in parallel.")
+    batch.add_argument("--contract-first-tests", action=argparse.BooleanOptionalAction, default=CONTRACT_FIRST_TESTS, help="Write the tests from the contract while the code is validated.")
+    batch.add_argument("--fused-planning", action=argparse.BooleanOptionalAction, default=FUSED_PLANNING, help="Rate the complexity and design the contract with a single LLM call.")
+    batch.add_argument("--local-estimator", action=argparse.BooleanOptionalAction, default=LOCAL_COMPLEXITY_ESTIMATOR, help="Rate the complexity locally, asking the evaluator LLM only when unsure.")
+    batch.add_argument("--solution-store", action=argparse.BooleanOptionalAction, default=SOLUTION_STORE, help="Reuse the stored solutions of repeated and near-duplicate prompts.")
+    batch.add_argument("--revalidate-solutions", action=argparse.BooleanOptionalAction, default=REVALIDATE_STORED_SOLUTIONS, help="Run the stored tests again before reusing a stored solution.")
+    batch.add_argument("--few-shot", action=argparse.BooleanOptionalAction, default=FEW_SHOT_RETRIEVAL, help="Add validated programs of similar contracts to the coder prompt.")
+    batch.add_argument("--trace", action=argparse.BooleanOptionalAction, default=TRACING, help="Write a Chrome trace file of the phases, LLM and tool calls of each prompt.")
+    batch.add_argument("--retry-failed", action="store_true", help="Also run again the ids that did not succeed.")
+    batch.add_argument("-v", "--verbose", action="store_true", help="Show the pipeline output.")
+    batch.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default=LOG_LEVEL, help="Level of the pipeline output shown with --verbose.")
+    batch.add_argument("--log-format", choices=["text", "json"], default=LOG_FORMAT, help="Pipeline output as text lines or JSON objects.")
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        settings = {
+            "llm_client_type": LLMClientType(args.client),
+            "temperature": args.temperature,
+            "api_key": args.api_key,
+            "max_orchestrator_iterations": args.max_orchestrator_iterations,
+            "max_validation_iterations": args.max_validation_iterations,
+            "max_evaluation_retries": args.max_evaluation_retries,
+            "speculative_candidates": args.candidates,
+            "contract_first_tests": args.contract_first_tests,
+            "fused_planning": args.fused_planning,
+            "local_estimator": args.local_estimator,
+            "solution_store": args.solution_store,
+            "revalidate_solutions": args.revalidate_solutions,
+            "few_shot": args.few_shot,
+            "tracing": args.trace,
+            "verbose": args.verbose,
+            "log_level": args.log_level,
+            "log_format": args.log_format,
+        }
+        counts = run_batch(args.input, args.output, args.workers, settings, retry_failed=args.retry_failed)
+        return 0 if set(counts) <= {Status.SUCCESS.value} else 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
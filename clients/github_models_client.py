@@ -1,6 +1,10 @@
 import requests
+from typing import Dict, Any
 from config import github_token
 from clients.llm_client_abstract import LLMClient
+from helpers.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class GitHubModelsClient(LLMClient):
@@ -14,7 +18,7 @@ class GitHubModelsClient(LLMClient):
         self.requests = requests
         self.temperature = temperature
 
-    def generate(self, user_prompt: str, system_prompt: str = None, model: str = "gpt-4o") -> str:
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = "gpt-4o", schema: Dict[str, Any] = None, temperature: float = None) -> str:
         """
         Generate a response using GitHub Models API.
         """
@@ -36,10 +40,17 @@ class GitHubModelsClient(LLMClient):
             payload = {
                 "model": model,
                 "messages": messages,
-                "temperature": self.temperature,
+                "temperature": self.temperature if temperature is None else temperature,
                 "max_tokens": 4000,
             }
 
+            # Structured output constrained to the JSON schema
+            if schema:
+                payload["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "response", "schema": schema, "strict": False},
+                }
+
             response = self.requests.post(
                 f"{self.base_url}/inference/chat/completions",
                 headers=headers,
@@ -51,12 +62,12 @@ class GitHubModelsClient(LLMClient):
                 error_msg = (
                     f"GitHub Models API error {response.status_code}: {response.text}"
                 )
-                print(f"[GitHubModelsClient] {error_msg}")
+                logger.error("[GitHubModelsClient] %s", error_msg)
                 raise Exception(error_msg)
 
             result = response.json()
             return result["choices"][0]["message"]["content"].strip()
 
         except Exception as e:
-            print(f"[GitHubModelsClient] Error calling GitHub Models API: {e}")
+            logger.error("[GitHubModelsClient] Error calling GitHub Models API: %s", e)
             raise
@@ -0,0 +1,67 @@
+import requests
+from typing import Dict, Any
+from clients.llm_client_abstract import LLMClient
+from config import LLAMA_CPP_BASE_URL
+from helpers.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LlamaCppClient(LLMClient):
+    """
+    LLM client using a llama.cpp server (OpenAI compatible API).
+    Unlike Ollama, llama.cpp accepts a GBNF grammar, so the output can be
+    constrained to syntactically valid Reverty code.
+    """
+
+    supports_grammar = True
+
+    def __init__(self, base_url: str = LLAMA_CPP_BASE_URL, temperature: float = 0.3):
+        self.base_url = base_url
+        self.requests = requests
+        self.temperature = temperature
+
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None, schema: Dict[str, Any] = None, grammar: str = None, temperature: float = None) -> str:
+        """
+        Generate a response using llama.cpp. A GBNF grammar takes precedence over a JSON schema.
+        """
+
+        try:
+            messages = []
+
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+
+            messages.append({"role": "user", "content": user_prompt})
+
+            payload = {
+                "messages": messages,
+                "temperature": self.temperature if temperature is None else temperature,
+                "stream": False,
+            }
+
+            if model:
+                payload["model"] = model
+
+            # Constrain the output to the grammar or to the JSON schema
+            if grammar:
+                payload["grammar"] = grammar
+            elif schema:
+                payload["response_format"] = {"type": "json_object", "schema": schema}
+
+            response = self.requests.post(
+                f"{self.base_url}/v1/chat/completions", json=payload, timeout=120
+            )
+
+            if response.status_code != 200:
+                error_msg = f"llama.cpp API error {response.status_code}: {response.text}"
+                logger.error("[LlamaCppClient] %s", error_msg)
+                raise Exception(error_msg)
+
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+
+        except Exception as e:
+            error_msg = f"Error calling llama.cpp API: {e}"
+            logger.error("[LlamaCppClient] %s", error_msg)
+            raise Exception(error_msg)
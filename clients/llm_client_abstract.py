@@ -1,7 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Any
 
 
 class LLMClient(ABC):
+    # True if generate accepts a GBNF grammar constraining the output
+    supports_grammar = False
+
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: str = None, model: str = "mock") -> str:
+    def generate(self, prompt: str, system_prompt: str = None, model: str = "mock", schema: Dict[str, Any] = None, temperature: float = None) -> str:
+        """
+        Generates a response. If a JSON schema is given, the client asks the backend
+        for output constrained to that schema, when supported. A temperature overrides
+        the client's one for this call.
+        """
+        pass
+
+    def end_session(self, session: str):
+        """
+        Forgets the conversation state kept for the calls of a session (see
+        run_context.llm_session), once its run is over. Stateless clients do nothing.
+        """
         pass
@@ -1,9 +1,13 @@
 from clients.llm_client_abstract import LLMClient
+from typing import Dict, Any
 import json
+from helpers.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class MockLLMClient(LLMClient):
-    def generate(self, user_prompt: str, system_prompt: str = None, model: str = "mock") -> str:
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = "mock", schema: Dict[str, Any] = None, temperature: float = None) -> str:
         """
         Generate a hardcoded response.
         """
@@ -20,7 +24,7 @@ class MockLLMClient(LLMClient):
                 indent=4,
             )
             
-            print("[MockLLMClient - Evaluation] ", response)
+            logger.debug("[MockLLMClient - Evaluation] %s", response)
             return response
         
         # Hardcoded response for architect agent
@@ -36,7 +40,7 @@ class MockLLMClient(LLMClient):
                 },
                 indent=4,
             )
-            print("[MockLLMClient - Architect] ", response)
+            logger.debug("[MockLLMClient - Architect] %s", response)
             return response
 
         # Hardcoded response for type checking (takes priority over fix, for testing purposes)
@@ -53,7 +57,7 @@ class MockLLMClient(LLMClient):
                 },
                 indent=4,
             )
-            print("[MockLLMClient - Type Checking] ", response)
+            logger.debug("[MockLLMClient - Type Checking] %s", response)
             return response
 
         # Hardcoded response for fix (takes priority over coder)
@@ -70,7 +74,7 @@ class MockLLMClient(LLMClient):
                 },
                 indent=4,
             )
-            print("[MockLLMClient - Fix] ", response)
+            logger.debug("[MockLLMClient - Fix] %s", response)
             return response
 
         # Hardcoded response for coder agent
@@ -87,7 +91,7 @@ class MockLLMClient(LLMClient):
                 },
                 indent=4,
             )
-            print("[MockLLMClient - Coder] ", response)
+            logger.debug("[MockLLMClient - Coder] %s", response)
             return response
 
         # Hardcoded response for tester generator agent
@@ -1,16 +1,36 @@
 import requests
+import threading
+from collections import deque
 from clients.llm_client_abstract import LLMClient
-from pprint import pprint
-from config import LLM_TEMPERATURE
+from typing import Deque, Dict, Any, List, Tuple
+from config import OLLAMA_LLM_MODEL, OLLAMA_KEEP_ALIVE, OLLAMA_SESSION_MODE, OLLAMA_SESSION_MAX_TURNS, OLLAMA_LATENCY_HISTORY
+from helpers.enums import LatencyBreakdown
+from helpers.logger import get_logger
+from helpers.run_context import current_session
+
+logger = get_logger(__name__)
 
 
 class OllamaClient(LLMClient):
     """
     LLM client using Ollama (local models).
     Requires Ollama to be installed and running.
+
+    In session mode, the calls of a session (a run) sharing the same system prompt are sent
+    as one growing conversation: the system prompt and the previous turns form an identical
+    prefix, which Ollama reuses from its KV cache instead of evaluating it again. Calls
+    outside a session are stateless, so concurrent runs never share a conversation.
     """
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2", temperature: float = 0.3):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = OLLAMA_LLM_MODEL,
+        temperature: float = 0.3,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        session_mode: bool = OLLAMA_SESSION_MODE,
+        session_max_turns: int = OLLAMA_SESSION_MAX_TURNS,
+    ):
         """
         Initialize Ollama client.
         """
@@ -19,8 +39,20 @@ class OllamaClient(LLMClient):
         self.model = model
         self.requests = requests
         self.temperature = temperature
+        self.keep_alive = keep_alive
+
+        # Latency breakdown of the last calls made by this client
+        self.latencies: Deque[LatencyBreakdown] = deque(maxlen=OLLAMA_LATENCY_HISTORY)
+        self.last_latency: LatencyBreakdown | None = None
+        self._warmup_thread: threading.Thread | None = None
 
-    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None) -> str:
+        # Session mode: conversation history for each session and system prompt
+        self.session_mode = session_mode
+        self.session_max_turns = session_max_turns
+        self._sessions: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        self._sessions_lock = threading.Lock()
+
+    def generate(self, user_prompt: str, system_prompt: str = None, model: str = None, schema: Dict[str, Any] = None, temperature: float = None) -> str:
         """
         Generate a response using Ollama.
         """
@@ -31,6 +63,11 @@ class OllamaClient(LLMClient):
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
 
+            # Previous turns go right after the system prompt, so the prefix stays identical
+            session = self._session_key(system_prompt)
+            history = self._session_history(session)
+            messages.extend(history)
+
             messages.append({"role": "user", "content": user_prompt})
 
             # Ollama API format
@@ -38,25 +75,188 @@ class OllamaClient(LLMClient):
                 "model": model or self.model,
                 "messages": messages,
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
-                    "temperature": self.temperature,
+                    "temperature": self.temperature if temperature is None else temperature,
                 },
             }
 
+            # Constrain the output to the JSON schema
+            if schema:
+                payload["format"] = schema
+
             response = self.requests.post(
                 f"{self.base_url}/api/chat", json=payload, timeout=120
             )
 
             if response.status_code != 200:
                 error_msg = f"Ollama API error {response.status_code}: {response.text}"
-                print(f"[OllamaClient] {error_msg}")
+                logger.error("[OllamaClient] %s", error_msg)
                 raise Exception(error_msg)
 
             result = response.json()
-            pprint(result)
-            return result.get("message", {}).get("content", "")
+            logger.debug("[OllamaClient] Response: %s", result)
+            self._record_latency(result, session_turn=len(history) // 2)
+
+            content = result.get("message", {}).get("content", "")
+            self._append_to_session(session, user_prompt, content)
+            return content
 
         except Exception as e:
             error_msg = f"Error calling Ollama API: {e}"
-            print(f"[OllamaClient] {error_msg}")
+            logger.error("[OllamaClient] %s", error_msg)
+            raise Exception(error_msg)
+
+    def end_session(self, session: str):
+        """
+        Forgets the conversations of a session.
+        """
+
+        with self._sessions_lock:
+            for key in [key for key in self._sessions if key[0] == session]:
+                del self._sessions[key]
+
+    def _session_key(self, system_prompt: str) -> Tuple[str, str] | None:
+        """
+        Conversation of a call: its session and system prompt. None if the call is stateless.
+        """
+
+        session = current_session()
+        if not self.session_mode or session is None:
+            return None
+        return session, system_prompt or ""
+
+    def _session_history(self, key: Tuple[str, str] | None) -> List[Dict[str, str]]:
+        """
+        Returns a copy of the previous turns of the conversation.
+        """
+
+        if key is None:
+            return []
+
+        with self._sessions_lock:
+            return list(self._sessions.get(key, []))
+
+    def _append_to_session(self, key: Tuple[str, str] | None, user_prompt: str, response: str):
+        """
+        Appends a turn to the conversation. A full conversation starts over at the next call:
+        dropping only its oldest turns would change the prefix of every later call.
+        """
+
+        if key is None:
+            return
+
+        with self._sessions_lock:
+            history = self._sessions.setdefault(key, [])
+            history.append({"role": "user", "content": user_prompt})
+            history.append({"role": "assistant", "content": response})
+
+            if len(history) >= self.session_max_turns * 2:
+                history.clear()
+
+    def preload(self, model: str = None) -> LatencyBreakdown:
+        """
+        Loads the model into memory without generating anything.
+        Ollama loads the model when it receives a request with an empty prompt.
+        """
+
+        payload = {
+            "model": model or self.model,
+            "keep_alive": self.keep_alive,
+            "stream": False,
+        }
+
+        response = self.requests.post(
+            f"{self.base_url}/api/generate", json=payload, timeout=300
+        )
+
+        if response.status_code != 200:
+            error_msg = f"Ollama API error {response.status_code}: {response.text}"
+            logger.error("[OllamaClient] %s", error_msg)
             raise Exception(error_msg)
+
+        latency = parse_latency(response.json())
+        logger.info("[OllamaClient] Model %s preloaded in %.0f ms", model or self.model, latency.load_ms)
+        return latency
+
+    def warmup(self, background: bool = True):
+        """
+        Preloads the model and runs a tiny prompt, so the first real request
+        does not pay the cold-load latency.
+        """
+
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return
+
+        if background:
+            self._warmup_thread = threading.Thread(target=self._warmup, daemon=True)
+            self._warmup_thread.start()
+        else:
+            self._warmup()
+
+    def wait_for_warmup(self, timeout: float = None) -> bool:
+        """
+        Waits for a background warmup to finish. Returns True if no warmup is pending.
+        """
+
+        if self._warmup_thread is None:
+            return True
+
+        self._warmup_thread.join(timeout)
+        return not self._warmup_thread.is_alive()
+
+    def _warmup(self):
+        """
+        Runs the warmup sequence. Errors are only logged, warmup is best effort.
+        """
+
+        try:
+            self.preload()
+
+            payload = {
+                "model": self.model,
+                "prompt": "Hi",
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": 1},
+            }
+            response = self.requests.post(
+                f"{self.base_url}/api/generate", json=payload, timeout=300
+            )
+
+            if response.status_code == 200:
+                latency = parse_latency(response.json())
+                logger.info("[OllamaClient] Warmup done in %.0f ms", latency.total_ms)
+        except Exception as e:
+            logger.warning("[OllamaClient] Warmup failed: %s", e)
+
+    def _record_latency(self, result: Dict[str, Any], session_turn: int = 0):
+        """
+        Stores and logs the latency breakdown of a call.
+        """
+
+        latency = parse_latency(result)
+        self.latencies.append(latency)
+        self.last_latency = latency
+
+        logger.info(
+            "[OllamaClient] Latency (session turn %d): total %.0f ms | load %.0f ms | "
+            "prompt eval %.0f ms (%d tokens) | generation %.0f ms (%d tokens)",
+            session_turn, latency.total_ms, latency.load_ms,
+            latency.prompt_eval_ms, latency.prompt_eval_count, latency.eval_ms, latency.eval_count,
+        )
+
+
+def parse_latency(result: Dict[str, Any]) -> LatencyBreakdown:
+    """
+    Builds a latency breakdown from the timing fields returned by Ollama (nanoseconds).
+    """
+
+    return LatencyBreakdown(
+        total_ms=result.get("total_duration", 0) / 1e6,
+        load_ms=result.get("load_duration", 0) / 1e6,
+        prompt_eval_ms=result.get("prompt_eval_duration", 0) / 1e6,
+        eval_ms=result.get("eval_duration", 0) / 1e6,
+        prompt_eval_count=result.get("prompt_eval_count", 0),
+        eval_count=result.get("eval_count", 0),
+    )
@@ -3,13 +3,72 @@ import os
 
 load_dotenv()
 
-grammar_path = "grammar.lark"
+grammar_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.lark")
+evaluation_log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "evaluations.jsonl")  # Evaluator outputs the local estimator learns from
+trace_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")  # Chrome trace files of the traced runs
+conversation_log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "conversations")  # Oldest messages of the GUI logs past LOG_BUFFER_ENTRIES
+solution_store_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "solutions.jsonl")  # Successful runs reused by the solution store
 github_token = os.getenv("GITHUB_TOKEN")
 
 MAX_VALIDATION_ITERATIONS = 3
 MAX_EVALUATION_RETRIES = 3
 MAX_ORCHESTRATOR_ITERATIONS = 3
+MAX_CONTRACT_RETRIES = 1
+
+STRUCTURED_OUTPUT = True  # Ask the clients for output constrained to the agents' JSON schemas
 
 OLLAMA_LLM_MODEL = "llama3.2"
+OLLAMA_KEEP_ALIVE = "30m"  # How long Ollama keeps the model loaded after a request
+OLLAMA_PRELOAD = True  # Preload and warm up the model when the Orchestrator is created
+OLLAMA_SESSION_MODE = False  # Continue the same conversation for calls sharing a system prompt
+OLLAMA_SESSION_MAX_TURNS = 4  # Turns of a conversation in session mode before it starts over
+OLLAMA_LATENCY_HISTORY = 100  # Latency breakdowns of the last calls kept by the Ollama client
 LLM_TEMPERATURE = 0.3
 
+
+GRAMMAR_CONSTRAINED_DECODING = True  # Constrain Reverty generation with the GBNF grammar when the client supports it
+GBNF_MAX_INDENT_DEPTH = 4  # Deepest block nesting allowed by the exported GBNF grammar
+LLAMA_CPP_BASE_URL = "http://localhost:8080"
+SPECULATIVE_CANDIDATES = 1  # Initial code candidates generated and validated in parallel (1 disables speculation)
+SPECULATIVE_TEMPERATURE_STEP = 0.2  # Temperature added for each further candidate
+CONTRACT_FIRST_TESTS = False  # Write the initial tests from the contract while the code is being validated
+FUSED_PLANNING = False  # Rate the complexity and design the contract with a single LLM call
+LOCAL_COMPLEXITY_ESTIMATOR = False  # Rate the complexity locally, calling the evaluator LLM only when unsure
+ESTIMATOR_CONFIDENCE_THRESHOLD = 0.75  # Minimum confidence of the local estimate to skip the evaluator LLM
+CYCLE_DETECTION = True  # Change strategy when a fix loop produces the same code and errors again
+CYCLE_TEMPERATURE_STEP = 0.3  # Temperature added to the fix requests once a loop repeats
+CYCLE_MAX_REPEATS = 3  # Repeats after which a fix loop is stopped
+AUTO_REPAIR = True  # Repair mechanical parsing and linting errors locally before asking the LLM
+MAX_LOCAL_REPAIRS = 5  # Local repairs allowed in a single validation loop
+SOLUTION_STORE = False  # Answer repeated and near-duplicate requests from the stored successful runs
+SOLUTION_SIMILARITY_THRESHOLD = 0.8  # Minimum Jaccard similarity of a near-duplicate prompt to reuse its solution
+REVALIDATE_STORED_SOLUTIONS = False  # Run the stored tests again before reusing a stored solution
+FEW_SHOT_RETRIEVAL = False  # Add validated Reverty programs of similar contracts to the initial coder prompt
+FEW_SHOT_EXAMPLES = 2  # Most similar programs added as examples
+FEW_SHOT_TOKEN_BUDGET = 400  # Estimated tokens the examples may take in the prompt
+TOKENIZER_FAMILY = "llama"  # Tokenizer family prompts are counted with, until the Orchestrator sets the one of its client
+PROMPT_TOKEN_BUDGET = 6000  # Tokens a user prompt may take: trimmable sections are shrunk to fit
+PROMPT_SECTION_BUDGETS = {  # Tokens each trimmable prompt section may take
+    "errors": 1000,
+    "error_history": 400,
+    "python_code": 1000,
+    "implementation": 2000,
+    "tests": 1500,
+    "failed_tests": 200,
+}
+SCOPED_FIX_PROMPTS = True  # Send only the functions with errors, and the signatures of the others, in the fix prompts
+PAYLOAD_FORMAT = "toon"  # Encoding of the contracts in the prompts: toon, json or yaml
+CLIENT_PAYLOAD_FORMATS: dict = {}  # Format per client type, overriding PAYLOAD_FORMAT (pick it with benchmarks/payload_formats.py)
+LOG_LEVEL = "INFO"  # Level of the pipeline logs: DEBUG adds the full prompts, responses, programs and trees
+LOG_LEVELS: dict = {}  # Level per component, overriding LOG_LEVEL, like {"agents.coder_agent": "DEBUG"}
+LOG_FORMAT = "text"  # Pipeline log output: text lines, or json objects for a log pipeline
+LOG_SAMPLING: dict = {}  # Share of the records below WARNING kept per component, like {"tools": 0.1}
+LOG_BUFFER_ENTRIES = 1000  # Messages of a GUI log kept in memory, the older ones are moved to disk for the export
+LOG_VIEW_ENTRIES = 200  # Messages shown at most in the GUI log, the newest half kept when it is full
+RUN_WORKERS = 4  # GUI runs executed at once over all the sessions, the others wait in the queue
+RUN_POLL_SECONDS = 0.5  # Interval of the GUI updates while a run is in progress
+BATCH_WORKERS = 1  # Worker processes of the batch CLI: raise it only if the backend serves requests in parallel
+METRICS_PORT = None  # Local port serving the Prometheus metrics at /metrics, None to disable
+METRICS_HOST = "127.0.0.1"  # Interface of the metrics server: keep it local unless a scraper runs elsewhere
+TRACING = False  # Time every phase, agent call, LLM call and tool run, and export a Chrome trace per run
+LOCAL_FAILURE_TRIAGE = True  # Blame clear test failures on the code or the tests without asking the tester LLM
@@ -1,7 +1,157 @@
-import streamlit as st
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from itertools import islice
+from typing import Any, Callable, List
+from helpers.enums import LogEntry
+from config import LOG_BUFFER_ENTRIES, LOG_VIEW_ENTRIES, conversation_log_dir
 
-def log_message(message: str):
+
+class ConversationLog:
+    """
+    Append-only log of the messages of a run, with the newest max_entries in memory.
+    Past the cap the oldest messages are moved to a JSONL file, so the whole log can
+    still be exported while memory and rendering stay bounded.
+    """
+
+    def __init__(self, max_entries: int = LOG_BUFFER_ENTRIES, spill_dir: str = conversation_log_dir):
+        self.entries: deque[LogEntry] = deque(maxlen=max_entries)
+        self.spill_dir = spill_dir
+        self.spill_path: str | None = None
+        self.spilled = 0
+        self._next_sequence = 0
+        self._lock = threading.Lock()
+
+    def append(self, message: Any) -> LogEntry:
+        with self._lock:
+            entry = LogEntry(self._next_sequence, time.time(), str(message))
+            self._next_sequence += 1
+            if len(self.entries) == self.entries.maxlen:
+                self._spill(self.entries[0])
+            self.entries.append(entry)
+        return entry
+
+    def since(self, sequence: int) -> List[LogEntry]:
+        """
+        Entries in memory from the sequence number on.
+        """
+        with self._lock:
+            if not self.entries:
+                return []
+            return list(islice(self.entries, max(0, sequence - self.entries[0].sequence), None))
+
+    def tail(self, count: int) -> List[LogEntry]:
+        with self._lock:
+            return list(islice(self.entries, max(0, len(self.entries) - count), None))
+
+    def text(self) -> str:
+        """
+        Messages in memory, separated by blank lines.
+        """
+        return _join(self.since(0))
+
+    def export(self) -> str:
+        """
+        Every message of the log, the ones moved to disk included.
+        """
+        with self._lock:
+            entries = list(self.entries)
+            spilled = []
+            if self.spill_path is not None:
+                with open(self.spill_path, encoding="utf-8") as file:
+                    spilled = [LogEntry(**json.loads(line)) for line in file if line.strip()]
+        return _join(spilled + entries)
+
+    def clear(self):
+        """
+        Empties the log for a new run. Sequence numbers keep growing, so views notice the reset.
+        """
+        with self._lock:
+            self.entries.clear()
+            if self.spill_path is not None and os.path.exists(self.spill_path):
+                os.unlink(self.spill_path)
+            self.spill_path = None
+            self.spilled = 0
+
+    def _spill(self, entry: LogEntry):
+        if self.spill_path is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            descriptor, self.spill_path = tempfile.mkstemp(prefix="conversation-", suffix=".jsonl", dir=self.spill_dir)
+            os.close(descriptor)
+        with open(self.spill_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+        self.spilled += 1
+
+
+class LogView:
     """
-    Logs a message to the conversation log.
+    Renders a conversation log into a placeholder, adding only the messages not shown
+    yet. Once max_entries are shown the view is rebuilt with the newest half, so every
+    message is rendered a bounded number of times however long the run.
     """
-    st.session_state.shared_log_string += str(message) + "\n\n"
\ No newline at end of file
+
+    def __init__(self, log: ConversationLog, placeholder, max_entries: int = LOG_VIEW_ENTRIES, height: int = 550,
+                 render_entry: Callable[[LogEntry], None] | None = None, render_hidden: Callable[[int], None] | None = None):
+        self.log = log
+        self.placeholder = placeholder
+        self.max_entries = max_entries
+        self.height = height
+        self.render_entry = render_entry or _chat_message
+        self.render_hidden = render_hidden or _hidden_caption
+        self.container = None
+        self.shown = 0
+        self.next_sequence = 0
+
+    def update(self):
+        """
+        Shows the messages appended since the last update.
+        """
+        new_entries = self.log.since(self.next_sequence)
+        if self.container is not None and not new_entries:
+            return
+
+        if self.container is None or self.shown + len(new_entries) > self.max_entries:
+            self._rebuild()
+            return
+
+        with self.container:
+            for entry in new_entries:
+                self.render_entry(entry)
+        self.shown += len(new_entries)
+        self.next_sequence = new_entries[-1].sequence + 1
+
+    def _rebuild(self):
+        entries = self.log.tail(max(1, self.max_entries // 2))
+        hidden = self.log.spilled + len(self.log.entries) - len(entries)
+
+        self.container = self.placeholder.container(height=self.height, border=False)
+        with self.container:
+            if hidden:
+                self.render_hidden(hidden)
+            for entry in entries:
+                self.render_entry(entry)
+
+        self.shown = len(entries)
+        if entries:
+            self.next_sequence = entries[-1].sequence + 1
+
+
+def _join(entries: List[LogEntry]) -> str:
+    return "".join(entry.message + "\n\n" for entry in entries)
+
+
+def _chat_message(entry: LogEntry):
+    import streamlit as st
+
+    with st.chat_message("assistant"):
+        st.text(entry.message)
+
+
+def _hidden_caption(hidden: int):
+    import streamlit as st
+
+    st.caption(f"{hidden} earlier messages hidden, download the full log to read them.")
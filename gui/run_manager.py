@@ -0,0 +1,172 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Callable
+from helpers.enums import EventType, OrchestratorEvent, OrchestratorResult, RunProgress
+from helpers.logger import get_logger
+from gui.conversation_logger import ConversationLog
+from config import RUN_WORKERS, SOLUTION_STORE, FEW_SHOT_RETRIEVAL, LOCAL_COMPLEXITY_ESTIMATOR, solution_store_path, evaluation_log_path
+
+"""
+Background runs of the GUI. The Streamlit script submits a run and polls its handle:
+the run keeps going across reruns of the script, the sessions share a pool of workers,
+so a long generation in one session does not hold up the others.
+"""
+
+logger = get_logger(__name__)
+
+# Stage of a run once an event of the type was emitted
+STAGES = {
+    EventType.COMPLEXITY: "Designing the contract",
+    EventType.CONTRACT: "Generating code",
+    EventType.ITERATION: "Generating code",
+    EventType.CODE: "Generating tests",
+    EventType.TESTS: "Running tests",
+    EventType.TEST_RESULT: "Fixing code",
+    EventType.FINISHED: "Finished",
+}
+
+
+class RunHandle:
+    """
+    Run submitted to the RunManager. Its log and progress are filled by the worker and
+    read by the script; cancel() stops it at the next step or LLM call.
+    """
+
+    def __init__(self, prompt: str, log: ConversationLog):
+        self.prompt = prompt
+        self.log = log
+        self.future: Future | None = None
+        self._cancel = threading.Event()
+        self._progress = RunProgress()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def result(self) -> OrchestratorResult | None:
+        """
+        Result of the finished run, None while it runs or if it raised.
+        """
+        if not self.done or self.future.cancelled() or self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+    @property
+    def error(self) -> BaseException | None:
+        if not self.done or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def cancel(self):
+        """
+        Cancels the run: a queued run never starts, a running one stops at the next check.
+        """
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def progress(self) -> RunProgress:
+        with self._lock:
+            return replace(self._progress)
+
+    def on_event(self, event: OrchestratorEvent):
+        with self._lock:
+            progress = self._progress
+            if event.type == EventType.ITERATION:
+                progress.iteration = event.data
+            elif event.type == EventType.CODE:
+                progress.reverty_code = event.data["reverty_code"]
+                progress.python_code = event.data["python_code"]
+            elif event.type == EventType.AST:
+                progress.ast_string = event.data
+            elif event.type not in STAGES:
+                return
+
+            progress.stage = STAGES.get(event.type, progress.stage)
+            progress.version += 1
+
+    def _set_stage(self, stage: str):
+        with self._lock:
+            self._progress.stage = stage
+            self._progress.version += 1
+
+
+class RunManager:
+    """
+    Executes the GUI runs in a pool of worker threads shared by every session.
+    Each run gets its own Orchestrator, built in the worker from the given options, around
+    the solution store, example retriever and complexity estimator loaded once for all runs.
+    """
+
+    def __init__(self, max_workers: int = RUN_WORKERS, orchestrator_factory: Callable[..., Any] | None = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-run")
+        self._orchestrator_factory = orchestrator_factory
+
+        # Resources loaded from disk by the first run enabling them, shared by the next ones
+        self._resources: dict = {}
+        self._resources_lock = threading.Lock()
+
+    def submit(self, prompt: str, log: ConversationLog | None = None, **options) -> RunHandle:
+        """
+        Queues a run of the prompt. Options are passed to the Orchestrator, except the callbacks.
+        """
+        handle = RunHandle(prompt, log if log is not None else ConversationLog())
+        handle.future = self._pool.submit(self._execute, handle, options)
+        return handle
+
+    def shutdown(self):
+        """
+        Cancels every queued run and waits for the running ones to stop.
+        """
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _execute(self, handle: RunHandle, options: dict) -> OrchestratorResult:
+        factory = self._orchestrator_factory
+        if factory is None:
+            # Imported in the worker: the agents and tools are not needed to draw the page
+            from orchestrator import Orchestrator
+            factory = Orchestrator
+
+        handle._set_stage("Starting")
+        orchestrator = factory(on_log=handle.log.append, on_event=handle.on_event, **self._shared_resources(options), **options)
+        handle._set_stage("Evaluating the request")
+        try:
+            return orchestrator.run(handle.prompt, cancel=handle._cancel)
+        except Exception:
+            logger.exception("[Run Manager] Run of %r failed.", handle.prompt)
+            raise
+
+    def _shared_resources(self, options: dict) -> dict:
+        """
+        Resources of the options enabled by the run, as Orchestrator arguments. Each one is
+        loaded on first use and kept: reindexing the solution store for every run would cost
+        more than a stored answer saves.
+        """
+        # Imported in the worker, like the Orchestrator
+        from helpers.complexity_estimator import ComplexityEstimator
+        from helpers.example_retriever import ExampleRetriever
+        from helpers.solution_store import SolutionStore
+
+        loaders = {
+            "store": (options.get("solution_store", SOLUTION_STORE), lambda: SolutionStore(solution_store_path)),
+            "examples": (options.get("few_shot", FEW_SHOT_RETRIEVAL), lambda: ExampleRetriever.from_store(solution_store_path)),
+            "estimator": (options.get("local_estimator", LOCAL_COMPLEXITY_ESTIMATOR), lambda: ComplexityEstimator.from_log(evaluation_log_path)),
+        }
+
+        shared = {}
+        with self._resources_lock:
+            for name, (enabled, load) in loaders.items():
+                if not enabled:
+                    continue
+                if name not in self._resources:
+                    self._resources[name] = load()
+                shared[name] = self._resources[name]
+
+        return shared
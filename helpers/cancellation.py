@@ -0,0 +1,38 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+"""
+Cooperative cancellation of a run. The Orchestrator sets the cancel event of the run for
+its thread; the pipeline checks it between steps and before every LLM call, so a cancelled
+run stops at the next check without interrupting the request in flight.
+"""
+
+# Cancel event of the run executed by the current thread or task
+_cancel_event: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar("cancel_event", default=None)
+
+
+class RunCancelled(Exception):
+    """Raised at the next cancellation check once the run was cancelled."""
+
+
+@contextmanager
+def cancellation(event: threading.Event | None) -> Iterator[None]:
+    """
+    Makes the event the cancel event of the block.
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled():
+    """
+    Raises RunCancelled if the current run was cancelled.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise RunCancelled()
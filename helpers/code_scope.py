@@ -0,0 +1,198 @@
+import ast
+import re
+from typing import Dict, List, Set, Tuple
+from helpers.enums import CodeScope, ErrorType
+
+"""
+Scoping of fix prompts to the functions of a program that contain the errors.
+Reverty functions are found line by line, so code that does not parse can be scoped
+too; the functions returned by the LLM are spliced back into the full program.
+"""
+
+# Top-level Reverty function header: ": tni -> (tni: n) factorial fed"
+HEADER = re.compile(r"^:\s*\w+\s*->\s*\(.*\)\s*(\w+)\s+fed\b")
+
+# Line references of the errors, in the Reverty code or in the Python code
+REVERTY_LINE = re.compile(r"(at line )(\d+)")
+PYTHON_LINE = re.compile(r"(^Line |implementation\.py:)(\d+)", re.MULTILINE)
+
+# Function of an implementation.py traceback frame: "implementation.py:3: in helper"
+FRAME_FUNCTION = re.compile(r"implementation\.py:\d+: in (\w+)")
+
+# Characters the scoped request adds: the signatures header and the instruction to
+# return only the shown functions. Scoping must save more than this to be worth it.
+SCOPE_OVERHEAD = 160
+
+# Spans are (name, first line, last line), 0-based and inclusive
+Span = Tuple[str, int, int]
+
+
+def reverty_functions(reverty_code: str) -> List[Span]:
+    """
+    Top-level functions of Reverty code. A function ends at its last non-blank line
+    before the next line at column 0.
+    """
+    lines = reverty_code.split("\n")
+    spans: List[Span] = []
+    name, start, last = None, 0, 0
+
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        if line[0] not in " \t":
+            if name is not None:
+                spans.append((name, start, last))
+            match = HEADER.match(line)
+            name, start = (match.group(1), index) if match else (None, index)
+        last = index
+
+    if name is not None:
+        spans.append((name, start, last))
+    return spans
+
+
+def python_functions(python_code: str) -> List[Span]:
+    """
+    Top-level functions of Python code, empty if the code does not parse.
+    """
+    try:
+        tree = ast.parse(python_code)
+    except SyntaxError:
+        return []
+    return [(node.name, node.lineno - 1, node.end_lineno - 1) for node in tree.body if isinstance(node, ast.FunctionDef)]
+
+
+def failing_functions(errors: str, reverty_code: str, python_code: str = "", error_type: str | None = None, entry: str | None = None) -> Set[str]:
+    """
+    Names of the functions the errors point at. Parsing errors refer to Reverty lines,
+    the other errors to Python lines or traceback frames. Test failures without a frame
+    in the implementation blame the entry function and the functions it calls.
+    """
+    if error_type == ErrorType.PARSING.value:
+        spans, pattern = reverty_functions(reverty_code), REVERTY_LINE
+    else:
+        spans, pattern = python_functions(python_code), PYTHON_LINE
+
+    names = {name for name in FRAME_FUNCTION.findall(errors) if any(name == span[0] for span in spans)} if error_type is None else set()
+    for _, number in pattern.findall(errors):
+        names |= {name for name, start, end in spans if start <= int(number) - 1 <= end}
+
+    if not names and error_type is None and entry:
+        names = _callees(python_code, entry)
+    return names
+
+
+def scope_code(reverty_code: str, python_code: str, names: Set[str]) -> CodeScope | None:
+    """
+    Code of the named functions, with the signatures of the others as context.
+    None if scoping would not shrink the prompt: the program has a single function,
+    the names are unknown or cover every function, or the other functions are too
+    short for their signatures to save anything.
+    """
+    spans = reverty_functions(reverty_code)
+    known = {name for name, _, _ in spans}
+    if len(spans) < 2 or not names or not names <= known or names == known:
+        return None
+
+    lines = reverty_code.split("\n")
+    selected = [span for span in spans if span[0] in names]
+    python_spans = [span for span in python_functions(python_code) if span[0] in names]
+    python_lines = python_code.split("\n")
+
+    scope = CodeScope(
+        names=[name for name, _, _ in selected],
+        reverty_code=_join(lines, selected),
+        python_code=_join(python_lines, python_spans) if python_spans else python_code,
+        signatures=[lines[start].strip() for name, start, _ in spans if name not in names],
+        reverty_lines=_line_map(selected),
+        python_lines=_line_map(python_spans),
+    )
+
+    scoped_size = len(scope.reverty_code) + len(scope.python_code) + sum(len(signature) + 1 for signature in scope.signatures) + SCOPE_OVERHEAD
+    if scoped_size >= len(reverty_code) + len(python_code):
+        return None
+    return scope
+
+
+def renumber_errors(errors: str, scope: CodeScope, error_type: str | None = None) -> str:
+    """
+    Rewrites the line numbers of the errors to the lines of the scoped code.
+    References outside the scoped functions are left as they are.
+    """
+    pattern, mapping = (REVERTY_LINE, scope.reverty_lines) if error_type == ErrorType.PARSING.value else (PYTHON_LINE, scope.python_lines)
+
+    def replace(match: re.Match) -> str:
+        number = mapping.get(int(match.group(2)))
+        return f"{match.group(1)}{number}" if number is not None else match.group(0)
+
+    return pattern.sub(replace, errors)
+
+
+def splice_functions(reverty_code: str, scope: CodeScope, replacement: str) -> str:
+    """
+    Puts the functions of the replacement in place of the scoped ones of the program.
+    Scoped functions missing from the replacement are kept, new functions follow the
+    last scoped one. A replacement without any function header takes the place of the
+    first scoped function, so its errors are reported in context.
+    """
+    lines = reverty_code.split("\n")
+    spans = [span for span in reverty_functions(reverty_code) if span[0] in scope.names]
+    replacement_lines = replacement.strip("\n").split("\n")
+    chunks: Dict[str, List[str]] = {name: replacement_lines[start:end + 1] for name, start, end in reverty_functions(replacement)}
+    if not chunks:
+        chunks = {spans[0][0]: replacement_lines}
+
+    added = [chunk for name, chunk in chunks.items() if name not in scope.names]
+    spliced: List[str] = []
+    index = 0
+    for position, (name, start, end) in enumerate(spans):
+        spliced += lines[index:start]
+        spliced += chunks.get(name, lines[start:end + 1])
+        if position == len(spans) - 1:
+            for chunk in added:
+                spliced += [""] + chunk
+        index = end + 1
+    spliced += lines[index:]
+
+    return "\n".join(spliced)
+
+
+def _join(lines: List[str], spans: List[Span]) -> str:
+    return "\n\n".join("\n".join(lines[start:end + 1]) for _, start, end in spans) + "\n"
+
+
+def _line_map(spans: List[Span]) -> Dict[int, int]:
+    """
+    1-based line numbers of the program mapped to those of the scoped code, where
+    the functions are separated by a blank line.
+    """
+    mapping, scoped = {}, 1
+    for _, start, end in spans:
+        for line in range(start, end + 1):
+            mapping[line + 1] = scoped
+            scoped += 1
+        scoped += 1
+    return mapping
+
+
+def _callees(python_code: str, entry: str) -> Set[str]:
+    """
+    The entry function and every top-level function it calls, directly or not.
+    """
+    try:
+        tree = ast.parse(python_code)
+    except SyntaxError:
+        return set()
+
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    if entry not in functions:
+        return set()
+
+    reached, pending = set(), [entry]
+    while pending:
+        name = pending.pop()
+        if name in reached:
+            continue
+        reached.add(name)
+        pending += [node.func.id for node in ast.walk(functions[name]) if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in functions]
+    return reached
@@ -0,0 +1,175 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+from helpers.enums import ComplexityEstimate
+
+"""
+Local complexity estimator: a naive Bayes classifier over lexical features of the prompt.
+It starts from seed examples following the evaluator rubric and learns from the
+evaluator outputs logged by previous runs.
+"""
+
+# Rubric of EVALUATOR_SYSTEM_PROMPT as (prompt, complexity) examples
+SEED_EXAMPLES: List[Tuple[str, int]] = [
+    ("Write a function that sums two numbers.", 1),
+    ("Write a function that subtracts two numbers.", 1),
+    ("Write a function that multiplies two integers.", 1),
+    ("Write a function that reverses a string.", 1),
+    ("Write a function that checks if a number is even.", 1),
+    ("Write a function that returns the maximum of two numbers.", 1),
+    ("Write a function that converts celsius to fahrenheit.", 1),
+    ("Write a function that calculates the factorial of a number.", 2),
+    ("Write a function that calculates Fibonacci.", 2),
+    ("Write a function that checks if a string is a palindrome.", 2),
+    ("Write a function that counts the vowels in a string.", 2),
+    ("Write a function that filters the even numbers of a list.", 2),
+    ("Write a function that checks if a number is prime.", 2),
+    ("Write a function that implements the bubble sort algorithm.", 3),
+    ("Write a function that implements the binary search algorithm.", 3),
+    ("Write a function that counts word frequencies in a text using a dictionary.", 3),
+    ("Write a function that merges two sorted lists.", 3),
+    ("Implement merge sort with a helper function that merges the halves.", 4),
+    ("Implement a stack with push pop and peek functions.", 4),
+    ("Implement a binary search tree with insert and search functions.", 5),
+    ("Implement Dijkstra shortest path on a weighted graph using a heap.", 5),
+    ("Create a menu-driven calculator loop that handles both integers and floats. It must allow the user to continue or exit. Strictly enforce the use of at least two separate functions.", 5),
+    ("Create a bank account class hierarchy with deposits withdrawals and error handling for invalid operations.", 6),
+    ("Implement an inventory management system with several classes that keeps state between operations.", 7),
+    ("Build a thread-safe producer consumer queue with concurrency and worker threads.", 8),
+    ("Implement a distributed key value store with replication and consensus.", 9),
+    ("Implement a custom cryptographic hash function and a block cipher from scratch.", 10),
+]
+
+# Terms the rubric associates with each complexity band
+TERM_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "trivial": ("sum", "sums", "add", "subtract", "subtracts", "multiply", "multiplies", "divide", "reverse", "reverses", "even", "odd", "maximum", "minimum", "convert", "converts", "square", "absolute"),
+    "simple": ("factorial", "fibonacci", "palindrome", "prime", "vowels", "count", "counts", "filter", "filters", "average"),
+    "moderate": ("sort", "search", "binary", "list", "lists", "dictionary", "stack", "queue", "tree", "heap", "graph", "recursion", "loop", "menu", "functions"),
+    "complex": ("class", "classes", "hierarchy", "state", "system", "thread", "threads", "concurrency", "concurrent", "async", "optimization", "error", "handling", "exception"),
+    "extreme": ("distributed", "consensus", "replication", "cryptographic", "cipher", "memory", "kernel", "compiler", "research"),
+}
+
+STOPWORDS = frozenset("a an the that of to and or in on for with from is it its this be by as at write create implement function returns return".split())
+
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+_log_lock = threading.Lock()
+
+
+def extract_features(prompt: str) -> List[str]:
+    """
+    Lexical features of a prompt: content words, rubric term groups and a length bucket.
+    """
+    words = WORD_PATTERN.findall(prompt.lower())
+    features = [f"word:{word}" for word in words if word not in STOPWORDS]
+
+    for group, terms in TERM_GROUPS.items():
+        if any(word in terms for word in words):
+            features.append(f"group:{group}")
+
+    length = len(words)
+    bucket = "short" if length <= 10 else "medium" if length <= 25 else "long"
+    features.append(f"length:{bucket}")
+
+    return features
+
+
+class ComplexityEstimator:
+    """
+    Multinomial naive Bayes over the prompt features, with Laplace smoothing.
+    """
+
+    def __init__(self, smoothing: float = 1.0):
+        self.smoothing = smoothing
+        self.class_counts: Counter = Counter()
+        self.feature_counts: Dict[int, Counter] = {}
+        self.vocabulary: set = set()
+
+    def fit(self, examples: Iterable[Tuple[str, int]]) -> "ComplexityEstimator":
+        """
+        Adds (prompt, complexity) examples to the model.
+        """
+        for prompt, complexity in examples:
+            features = extract_features(prompt)
+            self.class_counts[complexity] += 1
+            self.feature_counts.setdefault(complexity, Counter()).update(features)
+            self.vocabulary.update(features)
+
+        return self
+
+    def estimate(self, prompt: str) -> ComplexityEstimate:
+        """
+        Most likely complexity of the prompt, with its posterior probability as confidence.
+        """
+        if not self.class_counts:
+            return ComplexityEstimate(complexity=5, confidence=0.0)
+
+        features = [feature for feature in extract_features(prompt) if feature in self.vocabulary]
+        total = sum(self.class_counts.values())
+        vocabulary_size = len(self.vocabulary)
+
+        log_scores: Dict[int, float] = {}
+        for complexity, count in self.class_counts.items():
+            counts = self.feature_counts[complexity]
+            denominator = sum(counts.values()) + self.smoothing * vocabulary_size
+            score = math.log(count / total)
+            for feature in features:
+                score += math.log((counts[feature] + self.smoothing) / denominator)
+            log_scores[complexity] = score
+
+        # Normalize in log space to get the posterior of the best class
+        best = max(log_scores, key=log_scores.get)
+        normalizer = sum(math.exp(score - log_scores[best]) for score in log_scores.values())
+
+        return ComplexityEstimate(complexity=best, confidence=1.0 / normalizer)
+
+    @classmethod
+    def from_log(cls, log_path: str | None = None, seed: bool = True) -> "ComplexityEstimator":
+        """
+        Builds an estimator from the seed examples and the logged evaluator outputs.
+        """
+        estimator = cls()
+        if seed:
+            estimator.fit(SEED_EXAMPLES)
+
+        if log_path:
+            estimator.fit((record["prompt"], record["complexity"]) for record in read_evaluation_log(log_path))
+
+        return estimator
+
+
+def read_evaluation_log(log_path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the logged evaluator outputs, skipping malformed lines.
+    """
+    records: List[Dict[str, Any]] = []
+    if not os.path.exists(log_path):
+        return records
+
+    with open(log_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if isinstance(record.get("prompt"), str) and isinstance(record.get("complexity"), int):
+                records.append(record)
+
+    return records
+
+
+def log_evaluation(log_path: str, prompt: str, complexity: int, latency_s: float):
+    """
+    Appends an evaluator output to the log.
+    """
+    record = {"prompt": prompt, "complexity": complexity, "latency_s": round(latency_s, 3)}
+
+    with _log_lock:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
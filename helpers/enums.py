@@ -1,5 +1,6 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
 
 
 class Status(Enum):
@@ -7,6 +8,7 @@ class Status(Enum):
 
     SUCCESS = "SUCCESS"
     ERROR = "ERROR"
+    CANCELLED = "CANCELLED"
 
 
 class ErrorType(Enum):
@@ -18,12 +20,43 @@ class ErrorType(Enum):
     TYPE_CHECKING = "type checking"
 
 
+class FixStrategy(Enum):
+    """How the next fix of a loop is requested, escalated each time the loop repeats itself."""
+
+    RETRY = "retry"
+    RAISE_TEMPERATURE = "raise_temperature"
+    ADD_HISTORY = "add_history"
+    ABORT = "abort"
+
+
+class Blame(Enum):
+    """Side a failing test run is blamed on by the local triage."""
+
+    CODE = "code"
+    TESTS = "tests"
+    AMBIGUOUS = "ambiguous"
+
+
 class LLMClientType(Enum):
     """Type of LLM client."""
     
     MOCK = "mock"
     OLLAMA = "ollama"
     GITHUB_MODELS = "github_models"
+    LLAMA_CPP = "llama_cpp"
+
+class EventType(Enum):
+    """Type of event emitted by the orchestrator during a run."""
+
+    LOG = "log"
+    COMPLEXITY = "complexity"
+    CONTRACT = "contract"
+    ITERATION = "iteration"
+    CODE = "code"
+    AST = "ast"
+    TESTS = "tests"
+    TEST_RESULT = "test_result"
+    FINISHED = "finished"
 
 class RequestType(Enum):
     """Type of request for coder agent."""
@@ -39,6 +72,50 @@ class AnalysisResult:
 
     status: Status
     message: str
+    data: Any = None
+    llm_calls_saved: int = 0
+
+@dataclass
+class ComplexityEstimate:
+    """Complexity rated by the local estimator, with the probability it is right."""
+
+    complexity: int
+    confidence: float
+
+@dataclass
+class TestFailure:
+    """A failed or errored test from the pytest report. origin is the innermost of tests.py and implementation.py in the traceback."""
+
+    __test__ = False
+
+    name: str
+    error_type: str
+    message: str
+    origin: str | None = None
+    source_line: str = ""
+    traceback: str = ""
+    collection: bool = False
+
+@dataclass
+class StoredSolution:
+    """Successful run kept in the solution store."""
+
+    prompt: str
+    contract: Dict[str, Any]
+    reverty_code: str
+    python_code: str
+    tests: str
+    complexity: int | None = None
+    ast_string: str | None = None
+
+@dataclass
+class SolutionMatch:
+    """Stored solution found for a prompt: kind is "exact" or "near", lookup_ms the time the lookup took."""
+
+    solution: StoredSolution
+    kind: str
+    similarity: float
+    lookup_ms: float = 0.0
 
 @dataclass
 class ExecutionResult:
@@ -46,4 +123,140 @@ class ExecutionResult:
     
     status: Status
     code_failures: str = None
-    failed_tests: str = None
\ No newline at end of file
+    failed_tests: str = None
+    failures: List[TestFailure] = field(default_factory=list)
+
+@dataclass
+class CodeScope:
+    """Functions of a program a fix prompt is scoped to, with the signatures of the other functions."""
+
+    names: List[str]
+    reverty_code: str
+    python_code: str
+    signatures: List[str]
+    reverty_lines: Dict[int, int] = field(default_factory=dict)
+    python_lines: Dict[int, int] = field(default_factory=dict)
+
+@dataclass
+class PromptSection:
+    """Part of a prompt: header and suffix are kept as they are, a body with a budget is trimmed, lowest priority first."""
+
+    name: str
+    body: str
+    header: str = ""
+    suffix: str = "\n"
+    budget: int | None = None
+    priority: int = 0
+    trimmers: Sequence[Callable[[str], str]] = ()
+
+    def render(self, body: str) -> str:
+        return f"{self.header}{body}{self.suffix}"
+
+@dataclass
+class LatencyBreakdown:
+    """Latency breakdown of a single LLM call, in milliseconds."""
+
+    total_ms: float = 0.0
+    load_ms: float = 0.0
+    prompt_eval_ms: float = 0.0
+    eval_ms: float = 0.0
+    prompt_eval_count: int = 0
+    eval_count: int = 0
+
+@dataclass
+class Span:
+    """Timed step of a traced run: times in microseconds from the tracer start, attributes like token counts."""
+
+    name: str
+    category: str
+    trace_id: str
+    span_id: int
+    parent_id: int | None
+    start_us: float
+    thread_id: int
+    duration_us: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+@dataclass
+class LogEntry:
+    """Message of a conversation log: sequence numbers grow by one from the first message, time is a Unix timestamp."""
+
+    sequence: int
+    time: float
+    message: str
+
+@dataclass
+class OrchestratorEvent:
+    """Progress or artifact emitted by the orchestrator. run_id identifies the run it belongs to."""
+
+    type: EventType
+    run_id: str
+    message: str = ""
+    data: Any = None
+
+@dataclass
+class RunProgress:
+    """Progress of a background run, built from its events. version grows with every change."""
+
+    stage: str = "Queued"
+    iteration: int = 0
+    reverty_code: str | None = None
+    python_code: str | None = None
+    ast_string: str | None = None
+    version: int = 0
+
+@dataclass
+class OrchestratorResult:
+    """Final result of an orchestrator run."""
+
+    status: Status
+    message: str = ""
+    reverty_code: str | None = None
+    python_code: str | None = None
+    tests: str | None = None
+    ast_string: str | None = None
+    complexity: int | None = None
+    contract: Dict[str, Any] = field(default_factory=dict)
+    iterations: int = 0
+    logs: List[str] = field(default_factory=list)
+    llm_calls_saved: int = 0
+
+    # "exact" or "near" when the solution was reused from the solution store
+    store_hit: str | None = None
+
+    # Chrome trace file of the run, if tracing is enabled
+    trace_file: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.status == Status.SUCCESS
+
+@dataclass
+class RunState:
+    """Mutable state of a single orchestrator run."""
+
+    run_id: str
+    request_type: RequestType = RequestType.INITIAL
+    reverty_code: str | None = None
+    python_code: str | None = None
+    tests: str | None = None
+    ast_string: str | None = None
+    code_errors: str | None = None
+    test_errors: str | None = None
+    logs: List[str] = field(default_factory=list)
+
+    # Future of the tests written from the contract alone, in contract-first mode
+    contract_tests: Any = None
+
+    # FixHistory of the test-driven fix loop and the strategy of its next fix
+    fix_history: Any = None
+    fix_strategy: FixStrategy = FixStrategy.RETRY
+
+    # Errors repaired locally instead of with an LLM call
+    llm_calls_saved: int = 0
+
+    # Kind of solution store match the run was answered from, if any
+    store_hit: str | None = None
@@ -0,0 +1,151 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from helpers.solution_store import read_solutions
+from config import FEW_SHOT_EXAMPLES, FEW_SHOT_TOKEN_BUDGET
+
+"""
+Retrieval of validated Reverty programs similar to a contract, added to the initial
+coder prompt as examples so the model does not relearn the reversed keywords every time.
+Programs come from a few seed examples and the solutions of the successful runs.
+"""
+
+# Validated programs covering loops, conditions and every type hint: (contract, code)
+SEED_EXAMPLES: List[Tuple[Dict[str, Any], str]] = [
+    (
+        {"function_name": "factorial", "args": [{"name": "n", "type": "int"}], "return_type": "int", "docstring": "Calculates the factorial of n iteratively."},
+        ": tni -> (tni: n) factorial fed\n    result: tni = 1\n    : n > 1 elihw\n        result = result * n\n        n = n - 1\n    nruter result\n",
+    ),
+    (
+        {"function_name": "sum_to_n", "args": [{"name": "n", "type": "int"}], "return_type": "int", "docstring": "Sums the numbers from 0 to n."},
+        ": tni -> (tni: n) sum_to_n fed\n    total: tni = 0\n    : range(n + 1) ni i rof\n        total = total + i\n    nruter total\n",
+    ),
+    (
+        {"function_name": "sign", "args": [{"name": "n", "type": "int"}], "return_type": "str", "docstring": "Tells whether a number is positive, negative or zero."},
+        ': rts -> (tni: n) sign fed\n    : n > 0 fi\n        nruter "positive"\n    : n < 0 file\n        nruter "negative"\n    : esle\n        nruter "zero"\n',
+    ),
+    (
+        {"function_name": "gcd", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}], "return_type": "int", "docstring": "Greatest common divisor of two numbers with the Euclidean algorithm."},
+        ": tni -> (tni: a, tni: b) gcd fed\n    : b != 0 elihw\n        remainder: tni = a % b\n        a = b\n        b = remainder\n    nruter a\n",
+    ),
+    (
+        {"function_name": "is_prime", "args": [{"name": "n", "type": "int"}], "return_type": "bool", "docstring": "Checks whether a number is prime."},
+        ": loob -> (tni: n) is_prime fed\n    : n < 2 fi\n        nruter eslaF\n    divisor: tni = 2\n    : divisor * divisor <= n elihw\n        : n % divisor == 0 fi\n            nruter eslaF\n        divisor = divisor + 1\n    nruter eurT\n",
+    ),
+    (
+        {"function_name": "average", "args": [{"name": "a", "type": "float"}, {"name": "b", "type": "float"}], "return_type": "float", "docstring": "Average of two numbers."},
+        ": taolf -> (taolf: a, taolf: b) average fed\n    nruter (a + b) / 2\n",
+    ),
+    (
+        {"function_name": "fibonacci", "args": [{"name": "n", "type": "int"}], "return_type": "int", "docstring": "Calculates the n-th Fibonacci number iteratively."},
+        ": tni -> (tni: n) fibonacci fed\n    previous: tni = 0\n    current: tni = 1\n    : range(n) ni i rof\n        following: tni = previous + current\n        previous = current\n        current = following\n    nruter previous\n",
+    ),
+]
+
+STOPWORDS = {"a", "an", "the", "of", "to", "and", "or", "is", "it", "if", "in", "on", "for", "with", "from", "by", "be", "that", "this", "must", "should", "return", "returns", "value"}
+TERM = re.compile(r"[a-z]+|\d+")
+CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text, about four characters per token.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def contract_terms(contract: Dict[str, Any]) -> List[str]:
+    """
+    Words of the contract: function and argument names split on underscores and case,
+    types, and the words of its docstring, requirements, constraints and edge cases.
+    """
+    parts = [contract.get("function_name") or "", contract.get("return_type") or ""]
+    for arg in contract.get("args") or []:
+        if isinstance(arg, dict):
+            parts += [arg.get("name") or "", arg.get("type") or ""]
+
+    for key in ("docstring", "requirements", "constraints", "edge_cases"):
+        value = contract.get(key)
+        parts += value if isinstance(value, list) else [value or ""]
+
+    text = CAMEL.sub(" ", " ".join(str(part) for part in parts)).lower()
+    return [term for term in TERM.findall(text) if term not in STOPWORDS]
+
+
+class ExampleRetriever:
+    """
+    TF-IDF index of contracts with a validated Reverty implementation.
+    """
+
+    def __init__(self, examples: List[Tuple[Dict[str, Any], str]] = (), k: int = FEW_SHOT_EXAMPLES, max_tokens: int = FEW_SHOT_TOKEN_BUDGET):
+        self.k = k
+        self.max_tokens = max_tokens
+        self.examples: List[Tuple[Counter, str]] = []
+        self._document_frequency: Counter = Counter()
+
+        for contract, reverty_code in examples:
+            self.add(contract, reverty_code)
+
+    @classmethod
+    def from_store(cls, store_path: str | None, seed: bool = True, **options) -> "ExampleRetriever":
+        """
+        Builds a retriever from the seed examples and the solutions of the solution store file.
+        """
+        examples = list(SEED_EXAMPLES) if seed else []
+        examples += [(solution.contract, solution.reverty_code) for solution in read_solutions(store_path) if isinstance(solution.contract, dict)]
+        return cls(examples, **options)
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def add(self, contract: Dict[str, Any], reverty_code: str):
+        """
+        Indexes the validated code of a contract. The same code is indexed once.
+        """
+        if not reverty_code or any(code == reverty_code for _, code in self.examples):
+            return
+
+        terms = Counter(contract_terms(contract))
+        self.examples.append((terms, reverty_code))
+        self._document_frequency.update(terms.keys())
+
+    def retrieve(self, contract: Dict[str, Any]) -> List[str]:
+        """
+        Code of the k most similar contracts, most similar first, within the token budget.
+        """
+        query = self._weights(Counter(contract_terms(contract)))
+        if not query:
+            return []
+
+        scored = []
+        for index, (terms, reverty_code) in enumerate(self.examples):
+            score = self._cosine(query, self._weights(terms))
+            if score > 0:
+                scored.append((score, -index, reverty_code))
+
+        selected, tokens = [], 0
+        for _, _, reverty_code in sorted(scored, reverse=True):
+            cost = estimate_tokens(reverty_code)
+            if tokens + cost > self.max_tokens:
+                continue
+            selected.append(reverty_code)
+            tokens += cost
+            if len(selected) == self.k:
+                break
+
+        return selected
+
+    def _weights(self, terms: Counter) -> Dict[str, float]:
+        """
+        TF-IDF weights with smoothed inverse document frequency.
+        """
+        documents = len(self.examples)
+        return {term: count * (math.log((1 + documents) / (1 + self._document_frequency[term])) + 1) for term, count in terms.items()}
+
+    @staticmethod
+    def _cosine(first: Dict[str, float], second: Dict[str, float]) -> float:
+        dot = sum(weight * second.get(term, 0.0) for term, weight in first.items())
+        if not dot:
+            return 0.0
+        return dot / (math.sqrt(sum(w * w for w in first.values())) * math.sqrt(sum(w * w for w in second.values())))
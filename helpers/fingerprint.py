@@ -0,0 +1,94 @@
+import hashlib
+import re
+from typing import Dict, List
+from helpers.enums import FixStrategy
+from config import CYCLE_MAX_REPEATS
+
+"""
+Fingerprints of fix loop candidates, to detect loops returning the same broken code
+or flipping between a few versions.
+"""
+
+# Strategy used after each repeat: the escalation is kept for the rest of the loop
+ESCALATION = (FixStrategy.RETRY, FixStrategy.RAISE_TEMPERATURE, FixStrategy.ADD_HISTORY)
+
+SPACES = re.compile(r"[ \t]+")
+TEMP_FILE = re.compile(r"\S*tmp\w*\.py")
+
+
+def normalize_code(code: str | None) -> str:
+    """
+    Code without blank lines, trailing spaces and repeated inner spaces. Indentation is kept.
+    """
+    lines = []
+    for line in (code or "").splitlines():
+        stripped = line.strip()
+        if stripped:
+            indent = line[: len(line) - len(line.lstrip())]
+            lines.append(indent + SPACES.sub(" ", stripped))
+    return "\n".join(lines)
+
+
+def normalize_errors(errors: str | None) -> str:
+    """
+    Sorted set of error lines, without temporary file names.
+    """
+    lines = {SPACES.sub(" ", TEMP_FILE.sub("<file>", line)).strip() for line in (errors or "").splitlines()}
+    return "\n".join(sorted(line for line in lines if line))
+
+
+def fingerprint(reverty_code: str | None, python_code: str | None = None, errors: str | None = None, tests: str | None = None) -> str:
+    """
+    Hash of a normalized candidate: equal for attempts differing only by formatting.
+    """
+    parts = (normalize_code(reverty_code), normalize_code(python_code), normalize_errors(errors), normalize_code(tests))
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class FixHistory:
+    """
+    Candidates seen by a fix loop. Every repeat escalates the strategy of the next fixes:
+    higher temperature, then the earlier errors in the prompt, then abort.
+    """
+
+    def __init__(self, max_repeats: int = CYCLE_MAX_REPEATS, enabled: bool = True):
+        self.max_repeats = max_repeats
+        self.enabled = enabled
+        self.seen: Dict[str, int] = {}
+        self.errors: List[str] = []
+        self.repeats = 0
+
+        # Errors fixed by local rules instead of the LLM, and whether the last one was
+        self.local_repairs = 0
+        self.repaired_locally = False
+
+    def record(self, reverty_code: str | None, errors: str | None, python_code: str | None = None, tests: str | None = None) -> FixStrategy:
+        """
+        Records a failed candidate and returns the strategy for the next fix.
+        """
+        key = fingerprint(reverty_code, python_code, errors, tests)
+
+        if key in self.seen and self.enabled:
+            self.repeats += 1
+        self.seen.setdefault(key, len(self.seen))
+        self.errors.append(errors or "")
+
+        return self.strategy
+
+    @property
+    def strategy(self) -> FixStrategy:
+        if self.repeats >= self.max_repeats:
+            return FixStrategy.ABORT
+        return ESCALATION[min(self.repeats, len(ESCALATION) - 1)]
+
+    def previous_errors(self) -> List[str]:
+        """
+        Distinct errors of the earlier attempts, oldest first, without the latest one.
+        """
+        latest = normalize_errors(self.errors[-1]) if self.errors else None
+        distinct: Dict[str, str] = {}
+        for errors in self.errors[:-1]:
+            key = normalize_errors(errors)
+            if key and key != latest:
+                distinct.setdefault(key, errors.strip())
+        return list(distinct.values())
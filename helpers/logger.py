@@ -0,0 +1,121 @@
+import json
+import logging
+import sys
+import threading
+from typing import Dict
+from config import LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_SAMPLING
+
+"""
+Logging of the pipeline components. Every module logs through its own logger under
+"reverty" (like "reverty.agents.coder_agent"), so levels and sampling can be set per
+component. Messages take %-style arguments: they are formatted only if the record is
+emitted, so the programs, prompts and responses logged at DEBUG cost a level check at INFO.
+"""
+
+ROOT = "reverty"
+
+# Attributes of every LogRecord; the others were passed as extra and are logged as fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger of a component, named after its module.
+    """
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def component(record: logging.LogRecord) -> str:
+    return record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name
+
+
+class StdoutHandler(logging.Handler):
+    """
+    Writes to the current sys.stdout, so the output still follows redirect_stdout, as the prints did.
+    """
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, for log pipelines: time, level, component, message and the extra fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "component": component(record),
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one record in every 1/rate of a component, the first included. Warnings and
+    errors are always kept. A component matches its sub-components, the longest name wins.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) if rate > 0 else 0 for name, rate in rates.items()}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.every:
+            return True
+
+        name = component(record)
+        matches = [sampled for sampled in self.every if name == sampled or name.startswith(sampled + ".")]
+        if not matches:
+            return True
+
+        sampled = max(matches, key=len)
+        if self.every[sampled] == 0:
+            return False
+        with self._lock:
+            seen = self._seen.get(sampled, 0)
+            self._seen[sampled] = seen + 1
+        return seen % self.every[sampled] == 0
+
+
+_handler: logging.Handler | None = None
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT, levels: Dict[str, str] = LOG_LEVELS, sampling: Dict[str, float] = LOG_SAMPLING):
+    """
+    Sets the level, the per-component levels and sampling and the output format ("text"
+    or "json") of the pipeline logs. Calling it again replaces the previous configuration.
+    """
+    global _handler
+    if log_format not in ("text", "json"):
+        raise ValueError(f"Unknown log format: {log_format}. Available: text, json")
+
+    root = logging.getLogger(ROOT)
+    root.setLevel(level)
+    root.propagate = False
+    for name, component_level in levels.items():
+        get_logger(name).setLevel(component_level)
+
+    handler = StdoutHandler()
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter("%(message)s"))
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+
+    if _handler is not None:
+        root.removeHandler(_handler)
+    root.addHandler(handler)
+    _handler = handler
+
+
+configure_logging()
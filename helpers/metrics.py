@@ -0,0 +1,260 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from helpers.logger import get_logger
+from config import METRICS_HOST
+
+"""
+In-process metrics of a long-running deployment: latency histograms and counters,
+exposed in the Prometheus text format on a local port. Recording a value takes a lock
+and a few additions, so the metrics are always collected; only the server is optional.
+"""
+
+logger = get_logger(__name__)
+
+# Upper bounds in seconds, from a tool run to a slow LLM generation
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metric:
+    """
+    Named metric with one series per combination of label values.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes the labels {', '.join(self.labels) or 'none'}, got {', '.join(labels) or 'none'}")
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _series(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {_escape(self.description, quotes=False)}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    """
+    Monotonic count, like runs or errors.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name} can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return super().render() + [f"{self.name}{self._series(key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values over fixed buckets, with their sum and count.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+        # Per series: count of each bucket (not cumulative, the last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Observes the seconds the block takes, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels)) or ([0], 0.0)
+            return sum(counts)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = super().render()
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._series(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._series(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._series(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of the process, rendered together for the scraper.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format of every metric.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    """
+    Escapes a label value, or a help text without escaping its quotes.
+    """
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+LLM_LATENCY = registry.histogram("reverty_llm_request_duration_seconds", "Seconds of an LLM generation request.", ["client", "model"])
+TOOL_LATENCY = registry.histogram("reverty_tool_duration_seconds", "Seconds of a validation tool run.", ["tool"])
+RUN_LATENCY = registry.histogram("reverty_run_duration_seconds", "Seconds of an Orchestrator run, from the request to the result.", ["status"])
+RUNS = registry.counter("reverty_runs_total", "Orchestrator runs by final status.", ["status"])
+ITERATIONS = registry.counter("reverty_orchestrator_iterations_total", "Orchestrator iterations (code, tests, test run) over all runs.")
+ERRORS = registry.counter("reverty_validation_errors_total", "Errors found by the validation loop, by error type.", ["error_type"])
+STORE_LOOKUPS = registry.counter("reverty_solution_store_lookups_total", "Solution store lookups by result: exact or near hit, or miss.", ["result"])
+LLM_CALLS_SAVED = registry.counter("reverty_llm_calls_saved_total", "LLM calls saved by local repairs and failure triage.")
+
+
+def timed(histogram: Histogram, label: str) -> Callable:
+    """
+    Decorator observing the seconds of every call of a method, labelled with its class name.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            with histogram.time(**{label: type(self).__name__}):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Metrics server of the process, started by serve_metrics
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port: int, host: str = METRICS_HOST, metrics: MetricsRegistry = registry):
+    """
+    Serves the metrics at http://host:port/metrics from a daemon thread. The process has a
+    single server: later calls return it. Returns None if the port cannot be bound.
+    The HTTP server is imported only when the metrics are served.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the pipeline output
+            pass
+
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        try:
+            server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            logger.error("[Metrics] Cannot serve the metrics on %s:%s: %s", host, port, e)
+            return None
+
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info("[Metrics] Serving metrics at http://%s:%d/metrics", host, server.server_port)
+        _server = server
+        return server
+
+
+def stop_metrics():
+    """
+    Stops the metrics server of the process, if any.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
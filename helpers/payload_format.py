@@ -0,0 +1,328 @@
+import contextvars
+import json
+import re
+from contextlib import contextmanager
+from textwrap import dedent
+from typing import Any, Dict, Iterator, List, Tuple
+from config import PAYLOAD_FORMAT
+
+"""
+Text encodings of the structured payloads put in the prompts, like contracts, and of
+the structured responses. Each client configuration picks one; the measured token cost
+and parse failures of each model are reported by benchmarks/payload_formats.py.
+"""
+
+
+class PayloadFormat:
+    """
+    Encoding of a payload. decode raises ValueError if the text is not valid.
+    """
+
+    name = ""
+
+    # Language of the markdown fences holding a payload in this format
+    fences: Tuple[str, ...] = ()
+
+    def encode(self, value: Any) -> str:
+        raise NotImplementedError
+
+    def decode(self, text: str) -> Any:
+        raise NotImplementedError
+
+
+class ToonFormat(PayloadFormat):
+    """
+    TOON: keys once per table, rows as comma separated values. The library is imported on first use.
+    """
+
+    name = "toon"
+    fences = ("toon",)
+
+    def encode(self, value: Any) -> str:
+        from toon_format import encode
+
+        return encode(value)
+
+    def decode(self, text: str) -> Any:
+        from toon_format import DecodeOptions, decode
+
+        # Models indent with 2 or 4 spaces: the decoder needs the exact step
+        text = dedent(text).strip()
+        indents = [len(line) - len(line.lstrip(" ")) for line in text.split("\n") if line.startswith(" ")]
+        try:
+            return decode(text, DecodeOptions(indent=min(indents, default=2), strict=False))
+        except Exception as e:
+            raise ValueError(f"Invalid TOON: {e}") from e
+
+
+class JsonFormat(PayloadFormat):
+    """
+    Compact JSON, without whitespace between the tokens.
+    """
+
+    name = "json"
+    fences = ("json", "")
+
+    def encode(self, value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+    def decode(self, text: str) -> Any:
+        return json.loads(text)
+
+
+class YamlFormat(PayloadFormat):
+    """
+    Block-style subset of YAML: mappings, lists of mappings with "- " items, flow lists
+    of scalars and plain or double-quoted scalars. Enough for contracts and responses,
+    without depending on a YAML library.
+    """
+
+    name = "yaml"
+    fences = ("yaml", "yml")
+
+    def encode(self, value: Any) -> str:
+        if not isinstance(value, (dict, list)) or not value:
+            return _flow(value)
+        return "\n".join(_block(value, 0))
+
+    def decode(self, text: str) -> Any:
+        lines = []
+        for raw in dedent(text).split("\n"):
+            if raw.strip() and not raw.lstrip().startswith("#"):
+                lines.append((len(raw) - len(raw.lstrip(" ")), raw.strip()))
+        if not lines:
+            raise ValueError("Empty YAML document")
+        if len(lines) == 1 and not KEY.match(lines[0][1]) and not lines[0][1].startswith("- "):
+            return _parse_flow(lines[0][1])
+
+        value, index = _parse_block(lines, 0, lines[0][0])
+        if index != len(lines):
+            raise ValueError(f"Unexpected indentation: {lines[index][1]!r}")
+        return value
+
+
+FORMATS: Dict[str, PayloadFormat] = {payload_format.name: payload_format for payload_format in (ToonFormat(), JsonFormat(), YamlFormat())}
+
+# Format of the process, and of the run executed by the current thread or task
+_default = FORMATS.get(PAYLOAD_FORMAT, FORMATS["toon"])
+_run_format: contextvars.ContextVar[PayloadFormat | None] = contextvars.ContextVar("payload_format", default=None)
+
+
+def get_payload_format() -> PayloadFormat:
+    """
+    Format of the payloads of the current run, or of the process outside a run.
+    """
+    return _run_format.get() or _default
+
+
+def set_payload_format(name: str):
+    """
+    Encodes the payloads in another format, outside the runs setting their own.
+    """
+    global _default
+    _default = _lookup(name)
+
+
+@contextmanager
+def payload_format(name: str) -> Iterator[None]:
+    """
+    Encodes the payloads of the prompts built in the block in the format.
+    """
+    token = _run_format.set(_lookup(name))
+    try:
+        yield
+    finally:
+        _run_format.reset(token)
+
+
+def _lookup(name: str) -> PayloadFormat:
+    if name not in FORMATS:
+        raise ValueError(f"Unknown payload format: {name}. Available: {', '.join(FORMATS)}")
+    return FORMATS[name]
+
+
+def format_of_fence(language: str) -> PayloadFormat | None:
+    """
+    Format of a markdown fence language, None for code and unknown languages.
+    """
+    return next((payload_format for payload_format in FORMATS.values() if language in payload_format.fences), None)
+
+
+# --- YAML-like encoding ---
+
+PLAIN = re.compile(r"^[A-Za-z0-9_(][^\n]*\Z")
+RESERVED = {"true", "false", "null", "~", "yes", "no", "on", "off"}
+NUMBER = re.compile(r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+KEY = re.compile(r'^("(?:[^"\\]|\\.)*"|[^\s"\'\[\]{}#,&*!|>%@`-][^:]*?|-[^\s:][^:]*?):(?:\s+(.*))?$')
+
+
+def _scalar(value: Any, in_flow: bool = False) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return json.dumps(value)
+
+    text = str(value)
+    plain = (
+        PLAIN.match(text)
+        and text == text.strip()
+        and ": " not in text and " #" not in text and not text.endswith(":")
+        and text.lower() not in RESERVED and not NUMBER.match(text)
+        and not (in_flow and any(char in text for char in ",[]{}"))
+    )
+    return text if plain else json.dumps(text, ensure_ascii=False)
+
+
+def _flow(value: Any) -> str:
+    if isinstance(value, list):
+        return "[" + ", ".join(_flow(item) if isinstance(item, (list, dict)) else _scalar(item, in_flow=True) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_scalar(str(key), in_flow=True)}: {_flow(item) if isinstance(item, (list, dict)) else _scalar(item, in_flow=True)}" for key, item in value.items()) + "}"
+    return _scalar(value)
+
+
+def _is_block(value: Any) -> bool:
+    """
+    True for values written on their own lines: non-empty mappings and lists holding mappings or lists.
+    """
+    if isinstance(value, dict):
+        return bool(value)
+    return isinstance(value, list) and any(isinstance(item, (dict, list)) for item in value)
+
+
+def _block(value: Any, indent: int) -> List[str]:
+    pad = "  " * indent
+    lines = []
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            key = _scalar(str(key))
+            if _is_block(item):
+                lines.append(f"{pad}{key}:")
+                lines += _block(item, indent + 1)
+            else:
+                lines.append(f"{pad}{key}: {_flow(item)}")
+        return lines
+
+    for item in value:
+        if _is_block(item):
+            # The first line of the item goes on the dash, the others under it
+            item_lines = _block(item, indent + 1)
+            lines.append(f"{pad}- {item_lines[0].lstrip()}")
+            lines += item_lines[1:]
+        else:
+            lines.append(f"{pad}- {_flow(item)}")
+    return lines
+
+
+# --- YAML-like decoding ---
+
+def _parse_block(lines: List[Tuple[int, str]], index: int, indent: int) -> Tuple[Any, int]:
+    if lines[index][1] == "-" or lines[index][1].startswith("- "):
+        return _parse_list(lines, index, indent)
+    return _parse_mapping(lines, index, indent)
+
+
+def _parse_mapping(lines: List[Tuple[int, str]], index: int, indent: int) -> Tuple[Dict[str, Any], int]:
+    mapping: Dict[str, Any] = {}
+
+    while index < len(lines) and lines[index][0] == indent:
+        match = KEY.match(lines[index][1])
+        if match is None:
+            raise ValueError(f"Expected a key: {lines[index][1]!r}")
+
+        key = json.loads(match.group(1)) if match.group(1).startswith('"') else match.group(1).strip()
+        index += 1
+        if match.group(2) is not None:
+            mapping[key] = _parse_flow(match.group(2))
+        elif index < len(lines) and (lines[index][0] > indent or (lines[index][0] == indent and lines[index][1].startswith("-"))):
+            mapping[key], index = _parse_block(lines, index, lines[index][0])
+        else:
+            mapping[key] = None
+
+    return mapping, index
+
+
+def _parse_list(lines: List[Tuple[int, str]], index: int, indent: int) -> Tuple[List[Any], int]:
+    items: List[Any] = []
+
+    while index < len(lines) and lines[index][0] == indent and (lines[index][1] == "-" or lines[index][1].startswith("- ")):
+        content = lines[index][1][2:].strip()
+        if not content:
+            index += 1
+            if index >= len(lines) or lines[index][0] <= indent:
+                items.append(None)
+                continue
+            item, index = _parse_block(lines, index, lines[index][0])
+        elif KEY.match(content) and not content.startswith(("[", "{")):
+            # A mapping starting on the dash: its keys are aligned with the content
+            column = indent + len(lines[index][1]) - len(content)
+            lines[index] = (column, content)
+            item, index = _parse_mapping(lines, index, column)
+        else:
+            item = _parse_flow(content)
+            index += 1
+        items.append(item)
+
+    return items, index
+
+
+def _parse_flow(text: str) -> Any:
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_parse_flow(item) for item in _split_flow(text[1:-1])]
+    if text.startswith("{") and text.endswith("}"):
+        mapping = {}
+        for item in _split_flow(text[1:-1]):
+            match = KEY.match(item)
+            if match is None:
+                raise ValueError(f"Expected a key: {item!r}")
+            key = json.loads(match.group(1)) if match.group(1).startswith('"') else match.group(1).strip()
+            mapping[key] = _parse_flow(match.group(2) or "null")
+        return mapping
+    if text.startswith('"'):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid quoted string: {text!r}") from e
+    if text.startswith("'") and text.endswith("'") and len(text) > 1:
+        return text[1:-1].replace("''", "'")
+
+    lowered = text.lower()
+    if lowered in ("null", "~", ""):
+        return None
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    if NUMBER.match(text):
+        return float(text) if any(char in text for char in ".eE") else int(text)
+    return text
+
+
+def _split_flow(text: str) -> List[str]:
+    """
+    Items of a flow collection: commas inside quotes or nested brackets do not split.
+    """
+    items, depth, quote, start = [], 0, None, 0
+    for position, char in enumerate(text):
+        if quote:
+            if char == quote and text[position - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(text[start:position])
+            start = position + 1
+    if quote or depth:
+        raise ValueError(f"Unbalanced flow collection: [{text}]")
+    last = text[start:]
+    if last.strip() or items:
+        items.append(last)
+    return [item.strip() for item in items]
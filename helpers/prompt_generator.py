@@ -1,136 +1,217 @@
-from toon_format import encode
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, List
+from helpers.payload_format import get_payload_format
+from helpers.token_budget import Prompt, PromptBuilder, compact_test_output, focus_code
+from config import PROMPT_SECTION_BUDGETS
 
 """
 Helper functions for generating user requests from user prompts.
+Requests are assembled by a PromptBuilder: trimmable sections (errors, Python code,
+tests) are shrunk to their token budget, lowest priority first.
 """
 
+# Trimming order of the sections when the whole prompt is over budget: lowest first
+PRIORITIES = {"python_code": 0, "failed_tests": 1, "error_history": 1, "tests": 2, "errors": 3, "implementation": 4}
 
-def generate_architect_request(user_prompt: str, complexity: int) -> str:
+
+def _budgeted(name: str) -> Dict[str, Any]:
+    return {"budget": PROMPT_SECTION_BUDGETS.get(name), "priority": PRIORITIES[name]}
+
+
+def _scope_note(signatures: List[str] | None) -> str:
+    """
+    Instruction of a fix request scoped to some functions of the program.
+    """
+    if not signatures:
+        return ""
+    return "Only the functions with errors are shown: return only their corrected code, the other functions are kept as they are.\n"
+
+
+def generate_architect_request(user_prompt: str, complexity: int) -> Prompt:
     """
     Generates a request for the architect agent.
     """
 
-    return (
-        f"User request: {user_prompt}\n"
+    return PromptBuilder().add("user_request", user_prompt, header="User request: ").text("instructions", (
         "Design a technical specification (contract) for this function. \n"
         "IMPORTANT: Focus ONLY on the 'User Request' above.\n"
         f"IMPORTANT: Complexity rating: {complexity}\n"
         "IMPORTANT: If the complexity is lower than 6, do not add docstrings or any other text if not explicitly mentioned in the user prompt.\n"
         "IMPORTANT: The techical specification must be in line with the complexity rating. DO NOT OVERCOMPLICATE THE TECHNICAL SPECIFICATION FOR COMPLEXITY LOWER THAN 6.\n"
         "IMPORTANT: Return ONLY a valid TOON object, with no additional text, no markdown, no explanations.\n"
+    )).build()
+
+
+def generate_planner_request(user_prompt: str) -> Prompt:
+    """
+    Generates a request for the planner agent.
+    """
+
+    return PromptBuilder().add("user_request", user_prompt, header="User request: ").text("instructions", (
+        "Rate the complexity of this request and design its technical specification (contract).\n"
+        "IMPORTANT: Focus ONLY on the 'User Request' above.\n"
+        "IMPORTANT: Return ONLY a valid TOON object, with no additional text, no markdown, no explanations.\n"
+    )).build()
+
+
+def generate_static_fix_request(reverty_code: str, errors: str, error_type: str, contract: Dict[str, Any], error_history: str = "", signatures: List[str] | None = None) -> Prompt:
+    """
+    Generates a request for the fix agent. With signatures, the code is only the functions
+    with errors and the signatures are those of the other functions of the program.
+    """
+
+    contract_payload = _encode(contract)
+
+    return (
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract:\n")
+        .add("signatures", "\n".join(signatures or []), header="Other functions of the program:\n" if signatures else "", suffix="\n" if signatures else "")
+        .add("code", reverty_code, header="Code:\n")
+        .add("errors", errors, header="Errors:\n", trimmers=(compact_test_output,), **_budgeted("errors"))
+        .add("error_history", error_history, suffix="", **_budgeted("error_history"))
+        .text("instructions", (
+            "I have a broken Reverty code that needs fixing based on the Static Analysis errors.\n"
+            f"Fix these {error_type} errors and return only the corrected code.\n"
+            "Check closely the contract and the errors in order to understand where the errors come from.\n"
+            "Do not add any extra text, no markdown, no explanations.\n"
+            + _scope_note(signatures)
+        ))
+        .build()
     )
 
 
-def generate_static_fix_request(reverty_code: str, errors: str, error_type: str, contract: Dict[str, Any]) -> str:
+def generate_test_fix_request(contract: Dict[str, Any], reverty_code: str, python_code: str, errors: str, signatures: List[str] | None = None) -> Prompt:
     """
-    Generates a request for the fix agent.
+    Generates a request for the fix agent. The Python code mirrors the Reverty code: it is
+    the first to be cut down to the lines the failures point at. With signatures, both
+    codes are only the functions with errors.
     """
 
-    contract_toon = encode(contract)
+    contract_payload = _encode(contract)
 
     return (
-        "Contract:\n"
-        f"{contract_toon}\n"
-        "Code:\n"
-        f"{reverty_code}\n"
-        "Errors:\n"
-        f"{errors}\n"
-        "I have a broken Reverty code that needs fixing based on the Static Analysis errors.\n"
-        f"Fix these {error_type} errors and return only the corrected code.\n"
-        "Check closely the contract and the errors in order to understand where the errors come from.\n"
-        "Do not add any extra text, no markdown, no explanations.\n"
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract:\n")
+        .add("signatures", "\n".join(signatures or []), header="Other functions of the program:\n" if signatures else "", suffix="\n" if signatures else "")
+        .add("code", reverty_code, header="Reverty Code:\n")
+        .add("python_code", python_code, header="Equivalent Python Code:\n", trimmers=(partial(focus_code, errors=errors),), **_budgeted("python_code"))
+        .add("errors", errors, header="Test Execution Output (Failures):\n", trimmers=(compact_test_output,), **_budgeted("errors"))
+        .text("instructions", (
+            "Analyze the failures. The contract is the single source of truth.\n"
+            "Return ONLY the corrected reverty code, with no additional text, no markdown, no explanations.\n"
+            + _scope_note(signatures)
+        ))
+        .build()
     )
 
 
-def generate_test_fix_request(contract: Dict[str, Any], reverty_code: str, python_code: str, errors: str) -> str:
+def generate_error_history(previous_errors: List[str], repeats: int) -> str:
     """
-    Generates a request for the fix agent.
+    Generates the note added to a fix request once the fix loop repeats itself.
     """
 
-    contract_toon = encode(contract)
+    history = "".join(f"- {errors}\n" for errors in previous_errors)
 
     return (
-        "Contract:\n"
-        f"{contract_toon}\n"
-        "Reverty Code:\n"
-        f"{reverty_code}\n"
-        "Equivalent Python Code:\n"
-        f"{python_code}\n"
-        "Test Execution Output (Failures):\n"
-        f"{errors}\n"
-        "Analyze the failures. The contract is the single source of truth.\n"
-        "Return ONLY the corrected reverty code, with no additional text, no markdown, no explanations.\n"
+        f"IMPORTANT: {repeats} of your previous fixes returned code that had already been tried and failed.\n"
+        "Do not return the same code again: change approach.\n"
+        + (f"Errors of the earlier attempts:\n{history}" if history else "")
     )
 
 
-def generate_initial_code_request(contract: Dict[str, Any]) -> str:
+def generate_initial_code_request(contract: Dict[str, Any], examples: List[str] | None = None) -> Prompt:
     """
-    Generates a request for the coder agent.
+    Generates a request for the coder agent, with validated programs of similar contracts as examples.
     """
 
-    contract_toon = encode(contract)
+    contract_payload = _encode(contract)
+    examples_text = "".join(f"Example {i}:\n{example.rstrip()}\n\n" for i, example in enumerate(examples or [], start=1))
 
     return (
-        "Contract Specification:\n"
-        f"{contract_toon}\n"
-        "Implement the function according to this contract.\n"
+        PromptBuilder()
+        .add("examples", examples_text, header="Valid Reverty programs written for similar contracts:\n\n" if examples_text else "", suffix="")
+        .add("contract", contract_payload, header="Contract Specification:\n")
+        .text("instructions", "Implement the function according to this contract.\n")
+        .build()
     )
 
 
-def generate_test_generator_request(contract: Dict[str, Any], code: str) -> str:
+def generate_test_generator_request(contract: Dict[str, Any], code: str) -> Prompt:
     """
     Generates a request for the test generator agent.
     """
 
-    contract_toon = encode(contract)
+    contract_payload = _encode(contract)
 
     return (
-        "Contract Specification:\n"
-        f"{contract_toon}\n"
-        "Implementation Code:\n"
-        f"{code}\n"
-        "Write comprehensive pytest tests for this implementation based on the contract.\n"
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract Specification:\n")
+        .add("implementation", code, header="Implementation Code:\n", **_budgeted("implementation"))
+        .text("instructions", "Write comprehensive pytest tests for this implementation based on the contract.\n")
+        .build()
     )
 
 
-def generate_test_generator_fix_request(contract: Dict[str, Any], code: str, errors: str) -> str:
+def generate_contract_test_request(contract: Dict[str, Any]) -> Prompt:
+    """
+    Generates a request for the test generator agent when the implementation is not ready yet.
+    """
+
+    contract_payload = _encode(contract)
+
+    return (
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract Specification:\n")
+        .text("instructions", (
+            "The implementation is not available yet.\n"
+            "Write comprehensive pytest tests based ONLY on the contract.\n"
+            "Call the function with the arguments in the order given by the contract.\n"
+        ))
+        .build()
+    )
+
+
+def generate_test_generator_fix_request(contract: Dict[str, Any], code: str, errors: str) -> Prompt:
     """
     Generates a request for the test generator agent.
     """
-    contract_toon = encode(contract)
+    contract_payload = _encode(contract)
 
     return (
-        "Contract Specification:\n"
-        f"{contract_toon}\n"
-        "Implementation Code:\n"
-        f"{code}\n"
-        "Errors:\n"
-        f"{errors}\n"
-        "Fix the tests based on the errors and the contract.\n"
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract Specification:\n")
+        .add("implementation", code, header="Implementation Code:\n", **_budgeted("implementation"))
+        .add("errors", errors, header="Errors:\n", trimmers=(compact_test_output,), **_budgeted("errors"))
+        .text("instructions", "Fix the tests based on the errors and the contract.\n")
+        .build()
     )
 
 
-def generate_tester_request(contract: Dict[str, Any], python_code: str, reverty_code: str, tests: str, failed_tests: str, error_output: str) -> str:
+def generate_tester_request(contract: Dict[str, Any], python_code: str, reverty_code: str, tests: str, failed_tests: str, error_output: str) -> Prompt:
     """
     Generates a prompt for the tester agent.
     """
 
-    contract_toon = encode(contract)
+    contract_payload = _encode(contract)
 
     return (
-        "Contract (The Specification):\n"
-        f"{contract_toon}\n"
-        "Reverty Code:\n"
-        f"{reverty_code}\n"
-        "Equivalent Python Code:\n"
-        f"{python_code}\n"
-        "Current Tests:\n"
-        f"{tests}\n"
-        "Test Execution Output (Failures):\n"
-        f"{error_output}\n"
-        "Failed Tests:\n"
-        f"{failed_tests}\n"
-        "Analyze the failures. The contract is the single source of truth.\n"
-        "Either the code violates the contract, or the tests make incorrect assumptions.\n"
+        PromptBuilder()
+        .add("contract", contract_payload, header="Contract (The Specification):\n")
+        .add("code", reverty_code, header="Reverty Code:\n")
+        .add("python_code", python_code, header="Equivalent Python Code:\n", trimmers=(partial(focus_code, errors=error_output),), **_budgeted("python_code"))
+        .add("tests", tests, header="Current Tests:\n", **_budgeted("tests"))
+        .add("errors", error_output, header="Test Execution Output (Failures):\n", trimmers=(compact_test_output,), **_budgeted("errors"))
+        .add("failed_tests", failed_tests, header="Failed Tests:\n", **_budgeted("failed_tests"))
+        .text("instructions", (
+            "Analyze the failures. The contract is the single source of truth.\n"
+            "Either the code violates the contract, or the tests make incorrect assumptions.\n"
+        ))
+        .build()
     )
+
+
+def _encode(value: Any) -> str:
+    """
+    Encodes a value in the payload format of the current client, TOON by default.
+    """
+    return get_payload_format().encode(value)
@@ -0,0 +1,39 @@
+import contextvars
+import functools
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+"""
+Context of a run. The Orchestrator keeps the state of a run in context variables set for
+its duration, like its cancel event, LLM session, tracing switch and prompt settings, so the runs
+executed at once by the same process each see their own.
+"""
+
+
+def propagate(function: Callable) -> Callable:
+    """
+    Runs the function in the context of the current run, for work handed to another thread.
+    Each call makes a new copy, so a propagated function runs in one thread at a time.
+    """
+    context = contextvars.copy_context()
+    return functools.partial(context.run, function)
+
+
+# LLM conversation of the run executed by the current thread or task, None outside a run
+_session: contextvars.ContextVar[str | None] = contextvars.ContextVar("llm_session", default=None)
+
+
+@contextmanager
+def llm_session(session: str | None) -> Iterator[None]:
+    """
+    Makes the LLM calls of the block part of the session, or of none if it is None.
+    """
+    token = _session.set(session)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def current_session() -> str | None:
+    return _session.get()
@@ -0,0 +1,87 @@
+from typing import Dict, Any, List, Tuple
+from jsonschema import Draft7Validator
+
+"""
+JSON schemas of the agents' outputs and their local validation.
+The schemas are sent to the clients to request constrained output and
+checked again locally before a response reaches the next stage.
+"""
+
+
+EVALUATOR_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "complexity": {"type": "integer", "minimum": 1, "maximum": 10},
+        "detected_logic": {"type": "string"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["complexity"],
+}
+
+CONTRACT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "function_name": {"type": "string"},
+        "args": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string"},
+                },
+                "required": ["name", "type"],
+            },
+        },
+        "return_type": {"type": "string"},
+        "docstring": {"type": "string"},
+        "requirements": {"type": "array", "items": {"type": "string"}},
+        "constraints": {"type": "array", "items": {"type": "string"}},
+        "edge_cases": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["function_name"],
+}
+
+# Fused evaluator + architect answer: the contract with its complexity
+PLAN_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        **CONTRACT_SCHEMA["properties"],
+        "complexity": EVALUATOR_SCHEMA["properties"]["complexity"],
+    },
+    "required": ["complexity", "function_name"],
+}
+
+CODE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "code": {"type": "string"},
+    },
+    "required": ["code"],
+}
+
+TESTER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "analysis": {"type": "string"},
+        "code_failures": {"type": ["string", "null"]},
+        "test_failures": {"type": ["string", "null"]},
+    },
+    "required": ["code_failures", "test_failures"],
+}
+
+
+# Validator of each schema, built on first use: the schema is kept so its id is not reused
+_validators: Dict[int, Tuple[Dict[str, Any], Draft7Validator]] = {}
+
+
+def validate_schema(instance: Any, schema: Dict[str, Any]) -> List[str]:
+    """
+    Validates an instance against a JSON schema.
+    Returns the list of violations with their path, empty if the instance is valid.
+    """
+    cached = _validators.get(id(schema))
+    if cached is None or cached[0] is not schema:
+        cached = _validators[id(schema)] = (schema, Draft7Validator(schema))
+
+    return [f"{error.json_path}: {error.message}" for error in cached[1].iter_errors(instance)]
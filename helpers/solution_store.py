@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict, List, Set, Tuple
+from helpers.enums import SolutionMatch, StoredSolution
+from config import SOLUTION_SIMILARITY_THRESHOLD
+
+"""
+Persistent store of the successful runs, looked up before running the pipeline.
+Prompts are matched exactly once normalized, or as near duplicates through a MinHash
+LSH index over their words and word pairs, confirmed with the exact Jaccard similarity.
+"""
+
+# MinHash signature of NUM_PERMUTATIONS values, split in BANDS buckets of rows
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures must stay comparable across processes and runs
+_rng = random.Random(2166136261)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+# Words that do not tell two requests apart
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "for", "in", "on", "and", "or", "that", "which", "with", "using", "by", "is", "it", "its", "if", "whether",
+    "please", "write", "create", "make", "implement", "program", "function", "python", "code", "me", "given", "i", "want", "need",
+}
+SUFFIXES = ("ing", "es", "ed", "s")
+WORD = re.compile(r"[a-z0-9]+")
+NUMBER = re.compile(r"\d+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Lowercase words and numbers only, separated by single spaces.
+    """
+    text = unicodedata.normalize("NFKC", prompt).lower()
+    return " ".join(WORD.findall(text))
+
+
+def prompt_shingles(prompt: str) -> Set[str]:
+    """
+    Stemmed content words of the prompt and the pairs of consecutive ones.
+    """
+    words = []
+    for word in normalize_prompt(prompt).split():
+        if word in STOPWORDS:
+            continue
+        for suffix in SUFFIXES:
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                word = word[: -len(suffix)]
+                break
+        words.append(word)
+
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def minhash_signature(shingles: Set[str]) -> Tuple[int, ...]:
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles]
+    if not hashes:
+        return tuple([MERSENNE_PRIME] * NUM_PERMUTATIONS)
+    return tuple(min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS)
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def read_solutions(path: str | None) -> List[StoredSolution]:
+    """
+    Solutions of a store file, skipping malformed lines.
+    """
+    solutions: List[StoredSolution] = []
+    if not path or not os.path.exists(path):
+        return solutions
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                solutions.append(StoredSolution(**json.loads(line)))
+            except (json.JSONDecodeError, TypeError):
+                continue
+
+    return solutions
+
+
+class SolutionStore:
+    """
+    JSONL file of solved requests, with an exact and a near-duplicate index kept in memory.
+    """
+
+    def __init__(self, path: str | None, threshold: float = SOLUTION_SIMILARITY_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.solutions: List[StoredSolution | None] = []
+
+        self._lock = threading.Lock()
+        self._exact: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._shingles: List[Set[str]] = []
+
+        for solution in read_solutions(path):
+            self._index(solution)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def lookup(self, prompt: str) -> SolutionMatch | None:
+        """
+        Stored solution of the same request, or of the most similar one above the threshold.
+        """
+        start = time.perf_counter()
+
+        with self._lock:
+            index = self._exact.get(normalize_prompt(prompt))
+            if index is not None:
+                return SolutionMatch(self.solutions[index], "exact", 1.0, (time.perf_counter() - start) * 1000)
+
+            shingles = prompt_shingles(prompt)
+            signature = minhash_signature(shingles)
+            candidates = {candidate for band in range(BANDS) for candidate in self._buckets.get(self._band_key(signature, band), [])}
+
+            best, best_similarity = None, 0.0
+            for candidate in candidates:
+                solution = self.solutions[candidate]
+                if solution is None or not self._same_numbers(prompt, solution.prompt):
+                    continue
+
+                similarity = jaccard(shingles, self._shingles[candidate])
+                if similarity > best_similarity:
+                    best, best_similarity = solution, similarity
+
+        if best is None or best_similarity < self.threshold:
+            return None
+        return SolutionMatch(best, "near", best_similarity, (time.perf_counter() - start) * 1000)
+
+    def add(self, solution: StoredSolution):
+        """
+        Stores a solution, replacing the one of the same request if any.
+        """
+        with self._lock:
+            self._index(solution)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(asdict(solution), ensure_ascii=False) + "\n")
+
+    def discard(self, solution: StoredSolution):
+        """
+        Removes a solution that no longer passes its tests, from the indexes and the file.
+        """
+        with self._lock:
+            key = normalize_prompt(solution.prompt)
+            index = self._exact.pop(key, None)
+            if index is None:
+                return
+            self.solutions[index] = None
+
+            if self.path:
+                with open(self.path, "w", encoding="utf-8") as file:
+                    for stored in self.solutions:
+                        if stored is not None:
+                            file.write(json.dumps(asdict(stored), ensure_ascii=False) + "\n")
+
+    def _index(self, solution: StoredSolution):
+        key = normalize_prompt(solution.prompt)
+
+        # The newest solution of a request replaces the older one
+        previous = self._exact.get(key)
+        if previous is not None:
+            self.solutions[previous] = None
+
+        index = len(self.solutions)
+        self.solutions.append(solution)
+        self._exact[key] = index
+
+        shingles = prompt_shingles(solution.prompt)
+        self._shingles.append(shingles)
+        signature = minhash_signature(shingles)
+        for band in range(BANDS):
+            self._buckets[self._band_key(signature, band)].append(index)
+
+    @staticmethod
+    def _band_key(signature: Tuple[int, ...], band: int) -> Tuple[int, Tuple[int, ...]]:
+        return band, signature[band * ROWS:(band + 1) * ROWS]
+
+    @staticmethod
+    def _same_numbers(first: str, second: str) -> bool:
+        """
+        "first 10 primes" and "first 20 primes" are near duplicates asking for different results.
+        """
+        return sorted(NUMBER.findall(first)) == sorted(NUMBER.findall(second))
@@ -0,0 +1,260 @@
+import contextvars
+import math
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from helpers.enums import PromptSection
+from config import PROMPT_TOKEN_BUDGET, TOKENIZER_FAMILY
+
+"""
+Token-budgeted prompt assembly. Sections are counted with a local tokenizer of the
+target model family and trimmed, least useful content first, to their budget and to
+the budget of the whole prompt.
+"""
+
+# tiktoken encodings close to the vocabulary of each family, used if tiktoken is installed
+ENCODINGS = {"llama": "cl100k_base", "gpt": "o200k_base"}
+
+# Family of the models served by each client type
+CLIENT_FAMILIES = {"mock": "llama", "ollama": "llama", "llama_cpp": "llama", "github_models": "gpt"}
+
+# Pre-tokenization of the BPE tokenizers: contractions, words, numbers of up to 3 digits,
+# punctuation runs and whitespace. Common words with their leading space are one token.
+PIECE = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+(?!\S)|\s+")
+
+# Characters a long word takes per token, and the longest word still counted as one token
+CHARS_PER_TOKEN = {"llama": 4.0, "gpt": 4.5}
+SINGLE_TOKEN_WORD = 7
+
+FRAME = re.compile(r"^\S+\.py:\d+: in \S+$")
+CARETS = re.compile(r"^\s*[\^~]+\s*$")
+PROGRESS = re.compile(r"^[.FEsxX]+\s*(\[\s*\d+%\])?$")
+PASSED = re.compile(r"(PASSED|XPASS)")
+LINE_REFERENCE = re.compile(r"(?:implementation\.py:|[Ll]ine )(\d+)")
+
+
+class TokenCounter:
+    """
+    Counts tokens locally for a model family.
+    """
+
+    def __init__(self, family: str = TOKENIZER_FAMILY):
+        self.family = family if family in ENCODINGS else "llama"
+        self._encoding = self._load_encoding(self.family)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+
+        chars_per_token = CHARS_PER_TOKEN[self.family]
+        tokens = 0
+        for piece in PIECE.findall(text):
+            length = len(piece.strip()) or 1
+            tokens += 1 if length <= SINGLE_TOKEN_WORD or not piece.strip().isalpha() else math.ceil(length / chars_per_token)
+        return tokens
+
+    @staticmethod
+    def _load_encoding(family: str):
+        """
+        tiktoken encoding of the family, None if tiktoken or its encoding files are not available.
+        """
+        try:
+            import tiktoken
+            return tiktoken.get_encoding(ENCODINGS[family])
+        except Exception:
+            return None
+
+
+# Shared counter of each family, created on first use
+_counters: Dict[str, TokenCounter] = {}
+
+# Family of the process, and of the run executed by the current thread or task
+_default_family = TOKENIZER_FAMILY
+_run_family: contextvars.ContextVar[str | None] = contextvars.ContextVar("tokenizer_family", default=None)
+
+
+def get_counter() -> TokenCounter:
+    """
+    Counter of the family of the current run, or of the process outside a run.
+    """
+    family = _run_family.get() or _default_family
+    counter = _counters.get(family)
+    if counter is None:
+        counter = _counters.setdefault(family, TokenCounter(family))
+    return counter
+
+
+def set_tokenizer_family(family: str):
+    """
+    Counts the tokens of the prompts for another model family, outside the runs setting their own.
+    """
+    global _default_family
+    _default_family = family
+
+
+@contextmanager
+def tokenizer_family(family: str) -> Iterator[None]:
+    """
+    Counts the tokens of the prompts built in the block for the model family.
+    """
+    token = _run_family.set(family)
+    try:
+        yield
+    finally:
+        _run_family.reset(token)
+
+
+# --- Trimmers: each returns a shorter text, or the same text if it has nothing to remove ---
+
+def compact_test_output(text: str) -> str:
+    """
+    Drops passing tests, progress lines and caret markers, and collapses traceback frames
+    repeated one after the other, like those of a recursion.
+    """
+    lines = [line for line in text.split("\n") if not CARETS.match(line) and not PROGRESS.match(line.strip()) and not PASSED.search(line)]
+
+    compacted: List[str] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if FRAME.match(line):
+            frame = lines[index:index + 2]
+            repeats = 0
+            while lines[index + 2 * (repeats + 1):index + 2 * (repeats + 2)] == frame:
+                repeats += 1
+            compacted += frame
+            if repeats:
+                compacted.append(f"... [the frame above repeats {repeats} more times]")
+            index += 2 * (repeats + 1)
+            continue
+        compacted.append(line)
+        index += 1
+
+    return "\n".join(compacted)
+
+
+def focus_code(code: str, errors: str, context: int = 3) -> str:
+    """
+    Keeps the lines of code around those the errors refer to, replacing the unchanged
+    regions in between with a marker. The code is kept whole if no line is referenced.
+    """
+    lines = code.split("\n")
+    referenced = {int(number) for number in LINE_REFERENCE.findall(errors or "") if 0 < int(number) <= len(lines)}
+    if not referenced:
+        return code
+
+    keep = {index for number in referenced for index in range(number - 1 - context, number + context) if 0 <= index < len(lines)}
+    focused, skipped = [], 0
+    for index, line in enumerate(lines):
+        if index in keep:
+            if skipped:
+                focused.append(f"# ... {skipped} unchanged lines ...")
+                skipped = 0
+            focused.append(line)
+        else:
+            skipped += 1
+    if skipped:
+        focused.append(f"# ... {skipped} unchanged lines ...")
+
+    return "\n".join(focused)
+
+
+def truncate_middle(text: str, max_tokens: int, counter: TokenCounter) -> str:
+    """
+    Keeps the first and last lines of the text within max_tokens, the middle is omitted.
+    """
+    if counter.count(text) <= max_tokens:
+        return text
+
+    lines = text.split("\n")
+    head: List[str] = []
+    tail: List[str] = []
+    used = counter.count("... [N lines omitted] ...")
+    start, end = 0, len(lines) - 1
+
+    # Alternate between head and tail, the head first: errors start with their cause
+    while start <= end:
+        line = lines[start] if len(head) <= len(tail) else lines[end]
+        cost = counter.count(line) + 1
+        if used + cost > max_tokens:
+            break
+        used += cost
+        if len(head) <= len(tail):
+            head.append(line)
+            start += 1
+        else:
+            tail.insert(0, line)
+            end -= 1
+
+    omitted = end - start + 1
+    return "\n".join(head + [f"... [{omitted} lines omitted] ..."] + tail)
+
+
+class Prompt(str):
+    """
+    Prompt text with the token count of each section: {name: (before trimming, after)}.
+    """
+
+    sections: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def tokens(self) -> int:
+        return sum(final for _, final in self.sections.values())
+
+
+class PromptBuilder:
+    """
+    Assembles sections into a prompt within the token budget.
+    """
+
+    def __init__(self, max_tokens: int = PROMPT_TOKEN_BUDGET, counter: TokenCounter | None = None):
+        self.max_tokens = max_tokens
+        self.counter = counter or get_counter()
+        self.sections: List[PromptSection] = []
+
+    def add(self, name: str, body: str, header: str = "", suffix: str = "\n", budget: int | None = None, priority: int = 0, trimmers: Sequence[Callable[[str], str]] = ()) -> "PromptBuilder":
+        self.sections.append(PromptSection(name, body or "", header, suffix, budget, priority, trimmers))
+        return self
+
+    def text(self, name: str, text: str) -> "PromptBuilder":
+        """
+        Adds fixed text, like instructions, never trimmed.
+        """
+        return self.add(name, text, suffix="")
+
+    def build(self) -> Prompt:
+        original = {section.name: self.counter.count(section.render(section.body)) for section in self.sections}
+        bodies = {section.name: self._fit(section) for section in self.sections}
+        tokens = {section.name: self.counter.count(section.render(bodies[section.name])) for section in self.sections}
+
+        # Over the whole budget: shrink the trimmable bodies, least useful first
+        excess = sum(tokens.values()) - self.max_tokens
+        for section in sorted((s for s in self.sections if s.budget is not None), key=lambda s: s.priority):
+            if excess <= 0:
+                break
+            target = self.counter.count(bodies[section.name]) - excess
+            bodies[section.name] = truncate_middle(bodies[section.name], target, self.counter) if target > 0 else "... [omitted] ..."
+            fitted = self.counter.count(section.render(bodies[section.name]))
+            excess -= tokens[section.name] - fitted
+            tokens[section.name] = fitted
+
+        prompt = Prompt("".join(section.render(bodies[section.name]) for section in self.sections))
+        prompt.sections = {section.name: (original[section.name], tokens[section.name]) for section in self.sections}
+        return prompt
+
+    def _fit(self, section: PromptSection) -> str:
+        """
+        Applies the trimmers of the section until its body fits the budget, then truncates it.
+        """
+        body = section.body
+        if section.budget is None:
+            return body
+
+        for trimmer in section.trimmers:
+            if self.counter.count(body) <= section.budget:
+                return body
+            body = trimmer(body)
+
+        return truncate_middle(body, section.budget, self.counter)
@@ -0,0 +1,207 @@
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+from helpers.enums import Span
+from helpers.logger import get_logger
+from config import TRACING, trace_dir
+
+"""
+Lightweight tracing: nested, timed spans for the orchestrator phases, the agent calls,
+the LLM calls and the tool runs, exported per run as a Chrome trace file (open it in
+chrome://tracing or https://ui.perfetto.dev). While disabled, spans cost a flag check.
+"""
+
+logger = get_logger(__name__)
+
+# Innermost open span of the current thread or task
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoSpan:
+    """
+    Span handed out while tracing is disabled: attributes are dropped.
+    """
+
+    def set(self, **attributes):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """
+    Collects the finished spans of each trace until the trace is exported.
+    """
+
+    def __init__(self, enabled: bool = TRACING, directory: str = trace_dir):
+        # Switch of the process, and of the run executed by the current thread or task
+        self.default_enabled = enabled
+        self._run_enabled: contextvars.ContextVar[bool | None] = contextvars.ContextVar("tracing_enabled", default=None)
+        self.directory = directory
+        self._spans: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        run_enabled = self._run_enabled.get()
+        return self.default_enabled if run_enabled is None else run_enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self.default_enabled = enabled
+
+    @contextmanager
+    def enable(self, enabled: bool) -> Iterator[None]:
+        """
+        Traces the block, or not, whatever the switch of the process.
+        """
+        token = self._run_enabled.set(enabled)
+        try:
+            yield
+        finally:
+            self._run_enabled.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str, trace_id: str | None = None, **attributes) -> Iterator[Span | _NoSpan]:
+        """
+        Times the block as a child of the current span. A span without parent starts a
+        trace: trace_id names it, otherwise the span id does.
+        """
+        if not self.enabled:
+            yield NO_SPAN
+            return
+
+        parent = _current.get()
+        span_id = next(self._ids)
+        span = Span(
+            name=name,
+            category=category,
+            trace_id=parent.trace_id if parent is not None else (trace_id or str(span_id)),
+            span_id=span_id,
+            parent_id=parent.span_id if parent is not None else None,
+            start_us=(time.perf_counter() - self._origin) * 1e6,
+            thread_id=threading.get_ident(),
+            attributes=attributes,
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.duration_us = (time.perf_counter() - self._origin) * 1e6 - span.start_us
+            _current.reset(token)
+            with self._lock:
+                self._spans.setdefault(span.trace_id, []).append(span)
+
+    def bind(self, function: Callable) -> Callable:
+        """
+        Runs the function in the current trace context, for work handed to another thread.
+        Each call of bind makes a new copy, so a bound function runs in one thread at a time.
+        """
+        if not self.enabled:
+            return function
+        context = contextvars.copy_context()
+        return functools.partial(context.run, function)
+
+    def spans(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return list(self._spans.get(trace_id, []))
+
+    def finish(self, trace_id: str) -> str | None:
+        """
+        Exports the spans of a trace to a Chrome trace file and forgets them.
+        Returns the path of the file, None if the trace has no spans.
+        """
+        with self._lock:
+            spans = self._spans.pop(trace_id, [])
+        if not spans:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{trace_id}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(chrome_trace(spans, trace_id), file, ensure_ascii=False, default=str)
+
+        logger.info("[Tracer] %s", summarize(spans))
+        logger.info("[Tracer] Trace written to %s", path)
+        return path
+
+
+def chrome_trace(spans: List[Span], trace_id: str) -> Dict[str, Any]:
+    """
+    Chrome trace event format: one complete ("X") event per span.
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round(span.start_us, 1),
+            "dur": round(span.duration_us, 1),
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": {"span_id": span.span_id, "parent_id": span.parent_id, **span.attributes},
+        }
+        for span in sorted(spans, key=lambda span: span.start_us)
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": trace_id}}
+
+
+def summarize(spans: List[Span]) -> str:
+    """
+    Seconds of the trace and of each category, counting only the outermost span of a
+    category so nested spans of the same kind are not counted twice.
+    """
+    by_id = {span.span_id: span for span in spans}
+    roots = [span for span in spans if span.parent_id not in by_id]
+    total = sum(span.duration_us for span in roots) / 1e6
+
+    seconds: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for span in spans:
+        parent = by_id.get(span.parent_id)
+        while parent is not None and parent.category != span.category:
+            parent = by_id.get(parent.parent_id)
+        if parent is None:
+            seconds[span.category] = seconds.get(span.category, 0.0) + span.duration_us / 1e6
+            counts[span.category] = counts.get(span.category, 0) + 1
+
+    parts = [f"{category} {seconds[category]:.2f} s ({counts[category]})" for category in sorted(seconds, key=seconds.get, reverse=True)]
+    tokens = [span.attributes for span in spans if span.category == "llm"]
+    if tokens:
+        prompt = sum(attributes.get("prompt_tokens", 0) for attributes in tokens)
+        completion = sum(attributes.get("completion_tokens", 0) for attributes in tokens)
+        parts.append(f"{prompt} prompt / {completion} completion tokens")
+    return f"Trace {spans[0].trace_id}: {total:.2f} s, " + ", ".join(parts)
+
+
+tracer = Tracer()
+
+
+def traced(category: str, name: str | None = None) -> Callable:
+    """
+    Decorator timing every call of a function or method in a span of the category,
+    named after the class and the function.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            owner = type(args[0]).__name__ + "." if args and hasattr(args[0], function.__name__) else ""
+            with tracer.span(name or f"{owner}{function.__name__}", category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
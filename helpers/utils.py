@@ -1,7 +1,8 @@
 from config import grammar_path
-from lark import Tree
-from typing import List
-import streamlit_antd_components as sac
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from lark import Tree
 
 def load_grammar():
     """Loads the grammar from the configured file."""
@@ -19,6 +20,8 @@ def print_ast(node, indent="", last=True):
         indent: The indentation level.
         last: Whether the node is the last child of its parent.
     """
+    from lark import Tree
+
     prefix = "└── " if last else "├── "
     if isinstance(node, Tree):
         print(indent + prefix + node.data)
@@ -28,7 +31,7 @@ def print_ast(node, indent="", last=True):
     else:
         print(indent + prefix + str(node))
 
-def print_ast_string(ast_tree: Tree) -> str:
+def print_ast_string(ast_tree: "Tree") -> str:
     """
     Prints the Abstract Syntax Tree (AST) as String.
     """
@@ -45,6 +48,9 @@ def parse_ast_string_to_sac(ast_string):
     Converts a Lark AST string into sac.TreeItem objects for rendering in the UI.
     Each line is parsed based on indentation to reconstruct the tree hierarchy.
     """
+    # GUI-only dependency, imported when the UI renders the tree
+    import streamlit_antd_components as sac
+
     lines = ast_string.strip().split('\n')
     if not lines:
         return []
@@ -1,31 +1,103 @@
+import time
 import streamlit as st
 import streamlit_antd_components as sac
-from orchestrator import Orchestrator
-from helpers.enums import LLMClientType
-from config import github_token
+from helpers.enums import LLMClientType, RunProgress
+from gui.conversation_logger import ConversationLog, LogView
+from gui.run_manager import RunHandle, RunManager
+from config import github_token, OLLAMA_LLM_MODEL, RUN_POLL_SECONDS
+from clients.ollama_client import OllamaClient
 from gui.examples import examples
 from helpers.utils import parse_ast_string_to_sac  
 
 
-def update_log_ui(message, container):
+@st.cache_resource
+def get_run_manager() -> RunManager:
     """
-    Updates the log UI by appending a new message to the session log list.
-    It re-renders all previous logs inside the provided container.
+    Workers of the runs, shared by every session of the server.
     """
-    if "log_list" not in st.session_state:
-        st.session_state.log_list = []
-    
-    st.session_state.log_list.append(message)
-    
-    container.empty()
-    with container.container(height=550, border=False):
-        for msg in st.session_state.log_list:
-            with st.chat_message("assistant"):
-                st.text(msg)
+    return RunManager()
+
+def show_code(placeholders, reverty_code: str | None, python_code: str | None, ast_string: str | None):
+    """
+    Shows the code of the last or of the running generation in the result tabs.
+    """
+    reverty_placeholder, python_placeholder, ast_placeholder = placeholders
+
+    with reverty_placeholder.container():
+        if reverty_code:
+            st.code(reverty_code, language="rust")
+        else:
+            st.info("No Reverty code available. Click 'Generate' to start.")
+    with python_placeholder.container():
+        if python_code:
+            st.code(python_code, language="python")
+        else:
+            st.info("No Python code available.")
+    with ast_placeholder.container():
+        if ast_string:
+            sac_items = parse_ast_string_to_sac(ast_string)
+            sac.tree(items=sac_items, open_all=True, show_line=True, size='sm')
+        else:
+            st.info("No AST available.")
+
+def describe_progress(run: RunHandle, progress: RunProgress, seconds: float) -> str:
+    """
+    Status line of a running generation.
+    """
+    stage = "Cancelling" if run.cancelled else progress.stage
+    if progress.iteration:
+        stage += f" (iteration {progress.iteration}/{st.session_state.max_orchestrator_iterations})"
+    return f"↺ {stage}... {seconds:.0f} s"
+
+def follow_run(run: RunHandle, log_view: LogView, status, code_placeholders):
+    """
+    Polls the background run of the session until it finishes, adding its new messages and
+    showing its stage and partial code. The page stays live: a click reruns the script,
+    which resumes polling the same run.
+    """
+    start = time.monotonic()
+    shown = None
+    while True:
+        done = run.done
+        progress = run.progress()
+        log_view.update()
+        status.caption(describe_progress(run, progress, time.monotonic() - start))
+
+        code = (progress.reverty_code, progress.python_code, progress.ast_string)
+        if code != shown:
+            show_code(code_placeholders, *code)
+            shown = code
+
+        if done:
+            break
+        time.sleep(RUN_POLL_SECONDS)
+
+    st.session_state.active_run = None
+    result = run.result
+    if result is not None:
+        st.session_state.last_run = {
+            "reverty": result.reverty_code,
+            "python": result.python_code,
+            "ast": result.ast_string or "",
+            "logs": "\n\n".join(result.logs),
+            "success": result.success,
+            "message": result.message,
+        }
+    elif run.error is not None:
+        st.session_state.run_error = f"Errore: {run.error}"
+    st.rerun()
+
+def cancel_run():
+    """Cancels the run of the session: it stops at its next step or LLM call."""
+    if st.session_state.active_run is not None:
+        st.session_state.active_run.cancel()
 
 def reset_generation():
-    """Resets generation state variables and clears logs."""
-    st.session_state.log_list = []
+    """Resets generation state variables, cancels the running generation and clears logs."""
+    cancel_run()
+    st.session_state.active_run = None
+    st.session_state.run_error = None
+    st.session_state.agent_log.clear()
     st.session_state.last_run = None
     st.session_state.final_prompt = ""
     st.session_state.prompt_height = 140
@@ -119,8 +191,12 @@ def main():
     # Initialize session state variables
     if "last_run" not in st.session_state:
         st.session_state.last_run = None
-    if "shared_log_string" not in st.session_state:
-        st.session_state.shared_log_string = ""
+    if "agent_log" not in st.session_state:
+        st.session_state.agent_log = ConversationLog()
+    if "active_run" not in st.session_state:
+        st.session_state.active_run = None
+    if "run_error" not in st.session_state:
+        st.session_state.run_error = None
     if "prompt_height" not in st.session_state:
         st.session_state.prompt_height = 140
 
@@ -139,6 +215,7 @@ def main():
         client_mapping = {
             "GitHub Models": LLMClientType.GITHUB_MODELS,
             "Ollama": LLMClientType.OLLAMA, 
+            "llama.cpp": LLMClientType.LLAMA_CPP,
             "Mock Client": LLMClientType.MOCK, 
         }
         st.markdown("""
@@ -166,6 +243,11 @@ def main():
 
 
         selected_client_enum = client_mapping[selected_client_str]
+
+        # Warm up Ollama as soon as it is selected, so the first generation skips the cold model load
+        if selected_client_enum == LLMClientType.OLLAMA and not st.session_state.get("ollama_warmed_up"):
+            OllamaClient(model=OLLAMA_LLM_MODEL).warmup(background=True)
+            st.session_state.ollama_warmed_up = True
         
         st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
         
@@ -185,6 +267,13 @@ def main():
         st.slider("Orchestrator", min_value=0, max_value=20, value=3, step=1, key="max_orchestrator_iterations")
         st.slider("Validation", min_value=0, max_value=20, value=3, step=1, key="max_validation_iterations")
         st.slider("Evaluation", min_value=0, max_value=20, value=3, step=1, key="max_evaluation_retries")
+        st.slider("Candidates", min_value=1, max_value=5, value=1, step=1, key="speculative_candidates", help="Initial code candidates generated in parallel")
+        st.toggle("Contract-first tests", value=False, key="contract_first_tests", help="Write the tests from the contract while the code is validated")
+        st.toggle("Fused planning", value=False, key="fused_planning", help="Rate the complexity and design the contract with a single LLM call")
+        st.toggle("Local complexity estimate", value=False, key="local_estimator", help="Rate the complexity locally, asking the evaluator LLM only when unsure")
+        st.toggle("Solution store", value=False, key="solution_store", help="Reuse the stored solutions of repeated and near-duplicate requests")
+        st.toggle("Few-shot examples", value=False, key="few_shot", help="Add validated programs of similar contracts to the coder prompt")
+        st.toggle("Tracing", value=False, key="tracing", help="Write a Chrome trace file of the phases, LLM and tool calls of each run")
 
         st.markdown("<div style='margin-top: 1s0px;'></div>", unsafe_allow_html=True)
 
@@ -211,13 +300,29 @@ def main():
     
 
     with col_left:
+        active_run = st.session_state.active_run
         log_container = st.empty()
+        log_view = LogView(st.session_state.agent_log, log_container)
+        run_status = st.empty()
         
-        if st.session_state.get("log_list"):
-            with log_container.container(height=550, border=False):
-                for msg in st.session_state.log_list:
-                    with st.chat_message("assistant"):
-                        st.text(msg)
+        if st.session_state.agent_log.entries:
+            log_view.update()
+
+        if active_run is not None:
+            st.button("Cancel", on_click=cancel_run, disabled=active_run.cancelled, type="secondary")
+        elif st.session_state.run_error:
+            st.error(st.session_state.run_error)
+        elif st.session_state.last_run and not st.session_state.last_run["success"] and st.session_state.last_run.get("message"):
+            run_status.caption(st.session_state.last_run["message"])
+
+        if active_run is None and st.session_state.agent_log.entries:
+            st.download_button(
+                "Download full log",
+                data=st.session_state.agent_log.export(),
+                file_name="reverty-log.txt",
+                mime="text/plain",
+                type="tertiary",
+            )
         
         # Centered input area
         col_spacer1, col_prompt, col_spacer2 = st.columns([0.2, 1, 0.2])
@@ -225,7 +330,7 @@ def main():
         with col_prompt:
             message_placeholder = st.empty()
             
-            if not st.session_state.get("last_run"):
+            if not st.session_state.get("last_run") and active_run is None:
                 with message_placeholder:
                     message_placeholder.markdown("""
                         <h2 style='margin: 0;margin-bottom: 20px; color: rgba(255, 255, 255, 0.7);font-weight: 300;'>
@@ -252,7 +357,7 @@ def main():
                 "Generate", 
                 use_container_width=True, 
                 type="primary" if not is_input_empty else "secondary",
-                disabled=is_input_empty,
+                disabled=is_input_empty or active_run is not None,
                 on_click=process_submission,
             )
         
@@ -276,42 +381,30 @@ def main():
             
 
     # --- Run logic ---
-    if btn_run:
-        st.session_state.prompt_height = 50
-        message_placeholder.empty()
-        st.session_state.log_list = []
-        log_container.empty()
-        
-        with col_left:
-            try:
-                callback = lambda msg: update_log_ui(msg, log_container)
-                
-                orchestrator = Orchestrator(
-                    selected_client_enum, 
-                    temperature, 
-                    api_key=st.session_state.api_key, 
-                    on_log=callback,
-                    max_orchestrator_iterations=st.session_state.max_orchestrator_iterations,
-                    max_validation_iterations=st.session_state.max_validation_iterations,
-                    max_evaluation_retries=st.session_state.max_evaluation_retries,
-                )
-                
-                result = orchestrator.run(prompt_utente)
-                
-                ast_data = st.session_state.get("shared_ast_string", "")
-                
-                st.session_state.last_run = {
-                    "reverty": st.session_state.shared_reverty_code,
-                    "python": st.session_state.shared_python_code,
-                    "ast": ast_data,
-                    "logs": st.session_state.shared_log_string,
-                    "success": result.get("status") == "success"
-                }
-                
-                st.rerun()
-                    
-            except Exception as e:
-                st.error(f"Errore: {e}")
+    if btn_run and active_run is None:
+        # Each run logs into its own buffer: a cancelled run may still add its last messages
+        st.session_state.agent_log.clear()
+        st.session_state.run_error = None
+        st.session_state.active_run = get_run_manager().submit(
+            prompt_utente,
+            log=ConversationLog(),
+            llm_client_type=selected_client_enum,
+            temperature=temperature,
+            api_key=st.session_state.api_key,
+            max_orchestrator_iterations=st.session_state.max_orchestrator_iterations,
+            max_validation_iterations=st.session_state.max_validation_iterations,
+            max_evaluation_retries=st.session_state.max_evaluation_retries,
+            speculative_candidates=st.session_state.speculative_candidates,
+            contract_first_tests=st.session_state.contract_first_tests,
+            fused_planning=st.session_state.fused_planning,
+            local_estimator=st.session_state.local_estimator,
+            solution_store=st.session_state.solution_store,
+            few_shot=st.session_state.few_shot,
+            tracing=st.session_state.tracing,
+            preload_model=not st.session_state.get("ollama_warmed_up", False),
+        )
+        st.session_state.agent_log = st.session_state.active_run.log
+        st.rerun()
 
     # --- Display results ---
     res = st.session_state.last_run
@@ -331,21 +424,20 @@ def main():
         tab_reverty, tab_python, tab_ast = st.tabs(["Reverty", "Python", "AST Explorer"])
         
         with tab_reverty:
-            if res and res.get("reverty"):
-                st.code(res["reverty"], language="rust")
-            else:
-                st.info("No Reverty code available. Click 'Generate' to start.")
+            reverty_placeholder = st.empty()
         with tab_python:
-            if res and res.get("python"):
-                st.code(res["python"], language="python")
-            else:
-                st.info("No Python code available.")
+            python_placeholder = st.empty()
         with tab_ast:
-            if res and res.get("ast"):
-                sac_items = parse_ast_string_to_sac(res["ast"])
-                sac.tree(items=sac_items, open_all=True, show_line=True, size='sm')
-            else:
-                st.info("No AST available.")
+            ast_placeholder = st.empty()
+        code_placeholders = (reverty_placeholder, python_placeholder, ast_placeholder)
+
+        if active_run is None:
+            show_code(code_placeholders, res and res.get("reverty"), res and res.get("python"), res and res.get("ast"))
+
+    # --- Progress of the running generation ---
+    if active_run is not None:
+        with col_left:
+            follow_run(active_run, log_view, run_status, code_placeholders)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,21 +1,40 @@
 import json
-from gui.conversation_logger import log_message
-from helpers.enums import AnalysisResult
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from helpers.enums import AnalysisResult, EventType, OrchestratorEvent, OrchestratorResult, RunState, StoredSolution
 from agents.tester_agent import TesterAgent
 from agents.architect_agent import ArchitectAgent
 from agents.coder_agent import CoderAgent
 from agents.evaluator_agent import EvaluatorAgent
+from agents.planner_agent import PlannerAgent
+from helpers.complexity_estimator import ComplexityEstimator
+from helpers.fingerprint import FixHistory
+from helpers.solution_store import SolutionStore
+from helpers.example_retriever import ExampleRetriever
+from helpers.prompt_generator import generate_error_history
+from helpers.token_budget import CLIENT_FAMILIES, tokenizer_family
+from helpers.payload_format import payload_format
+from helpers.cancellation import RunCancelled, cancellation, check_cancelled
+from helpers.run_context import llm_session, propagate
+from helpers.logger import get_logger
+from helpers.metrics import ITERATIONS, LLM_CALLS_SAVED, RUN_LATENCY, RUNS, STORE_LOOKUPS, serve_metrics
+from helpers.tracing import traced, tracer
 from agents.test_generator_agent import TestGeneratorAgent
 from clients.mock_llm_client import MockLLMClient
 from helpers.utils import load_grammar
 from helpers.enums import LLMClientType
-from clients.ollama_client import OllamaClient
-from clients.github_models_client import GitHubModelsClient
-from helpers.enums import Status, RequestType
-from config import MAX_ORCHESTRATOR_ITERATIONS, MAX_VALIDATION_ITERATIONS, MAX_EVALUATION_RETRIES
-import streamlit as st
+from helpers.enums import Status, RequestType, FixStrategy
+from config import MAX_ORCHESTRATOR_ITERATIONS, MAX_VALIDATION_ITERATIONS, MAX_EVALUATION_RETRIES, OLLAMA_LLM_MODEL, OLLAMA_KEEP_ALIVE, OLLAMA_PRELOAD, OLLAMA_SESSION_MODE, SPECULATIVE_CANDIDATES, CONTRACT_FIRST_TESTS, FUSED_PLANNING, LOCAL_COMPLEXITY_ESTIMATOR, CYCLE_DETECTION, SOLUTION_STORE, REVALIDATE_STORED_SOLUTIONS, FEW_SHOT_RETRIEVAL, TRACING, METRICS_PORT, RUN_WORKERS, PAYLOAD_FORMAT, CLIENT_PAYLOAD_FORMATS, evaluation_log_path, solution_store_path
 from typing import Dict, Any
 
+logger = get_logger(__name__)
+
+# Background writers of the contract-first tests, shared by all the Orchestrators: one per concurrent run
+_test_pool = ThreadPoolExecutor(max_workers=RUN_WORKERS, thread_name_prefix="contract-tests")
+
 
 class Orchestrator:
     """
@@ -28,51 +47,116 @@ class Orchestrator:
         temperature: float = 0.3, 
         api_key: str = None, 
         on_log = None, 
+        on_event = None,
         max_orchestrator_iterations: int = MAX_ORCHESTRATOR_ITERATIONS, 
         max_validation_iterations: int = MAX_VALIDATION_ITERATIONS, 
-        max_evaluation_retries: int = MAX_EVALUATION_RETRIES
+        max_evaluation_retries: int = MAX_EVALUATION_RETRIES,
+        ollama_keep_alive: str = OLLAMA_KEEP_ALIVE,
+        preload_model: bool = OLLAMA_PRELOAD,
+        session_mode: bool = OLLAMA_SESSION_MODE,
+        speculative_candidates: int = SPECULATIVE_CANDIDATES,
+        contract_first_tests: bool = CONTRACT_FIRST_TESTS,
+        fused_planning: bool = FUSED_PLANNING,
+        local_estimator: bool = LOCAL_COMPLEXITY_ESTIMATOR,
+        solution_store: bool = SOLUTION_STORE,
+        revalidate_solutions: bool = REVALIDATE_STORED_SOLUTIONS,
+        few_shot: bool = FEW_SHOT_RETRIEVAL,
+        tracing: bool = TRACING,
+        metrics_port: int | None = METRICS_PORT,
+        store: SolutionStore | None = None,
+        examples: ExampleRetriever | None = None,
+        estimator: ComplexityEstimator | None = None
     ):
         """
         Initializes the Orchestrator with the necessary agents and LLM client.
+        The solution store, example retriever and complexity estimator of the enabled options
+        are loaded from disk, unless already loaded ones are given to share them between
+        Orchestrators.
         """
         self.grammar = load_grammar()
         self.on_log = on_log
 
+        # Receives an OrchestratorEvent for every progress step and artifact of a run
+        self.on_event = on_event
+
+        # Backend clients are imported only when selected
         match llm_client_type:
             case LLMClientType.MOCK:
-                print("[Orchestrator] Using MOCK LLM")
+                logger.info("[Orchestrator] Using MOCK LLM")
                 self.client = MockLLMClient()
 
             case LLMClientType.OLLAMA:
-                print("[Orchestrator] Using OLLAMA LLM")
-                self.client = OllamaClient(temperature = temperature)
+                logger.info("[Orchestrator] Using OLLAMA LLM")
+                from clients.ollama_client import OllamaClient
+                self.client = OllamaClient(model = OLLAMA_LLM_MODEL, temperature = temperature, keep_alive = ollama_keep_alive, session_mode = session_mode)
+
+                # Load the model in background while the first agents are set up
+                if preload_model:
+                    self.client.warmup(background=True)
 
             case LLMClientType.GITHUB_MODELS:
-                print("[Orchestrator] Using GITHUB MODELS LLM")
+                logger.info("[Orchestrator] Using GITHUB MODELS LLM")
+                from clients.github_models_client import GitHubModelsClient
                 self.client = GitHubModelsClient(temperature = temperature, api_key = api_key)
 
+            case LLMClientType.LLAMA_CPP:
+                logger.info("[Orchestrator] Using LLAMA.CPP LLM")
+                from clients.llama_cpp_client import LlamaCppClient
+                self.client = LlamaCppClient(temperature = temperature)
+
             case _:
                 self.client = None
 
+        # Prompt sections are counted with the tokenizer of the served model family
+        self.tokenizer_family = CLIENT_FAMILIES.get(llm_client_type.value, "llama")
+
+        # Contracts are encoded in the format measured as cheapest and reliable for the client
+        self.payload_format = CLIENT_PAYLOAD_FORMATS.get(llm_client_type.value, PAYLOAD_FORMAT)
+
         # Agents
-        self.evaluator = EvaluatorAgent(self.client, max_evaluation_retries=max_evaluation_retries)
+        # The local estimator learns from the evaluations logged while it is in use
+        if local_estimator:
+            if estimator is None:
+                estimator = ComplexityEstimator.from_log(evaluation_log_path)
+            self.evaluator = EvaluatorAgent(self.client, max_evaluation_retries=max_evaluation_retries, estimator=estimator, evaluation_log=evaluation_log_path)
+        else:
+            self.evaluator = EvaluatorAgent(self.client, max_evaluation_retries=max_evaluation_retries)
         self.architect = ArchitectAgent(self.client)
-        self.coder = CoderAgent(self.client, self.grammar, max_validation_iterations=max_validation_iterations)
+        self.planner = PlannerAgent(self.client)
+        self.coder = CoderAgent(self.client, self.grammar, max_validation_iterations=max_validation_iterations, candidates=speculative_candidates)
         self.test_generator = TestGeneratorAgent(self.client)
         self.tester = TesterAgent(self.client)
 
-        # State
-        self.request_type = RequestType.INITIAL
-        self.reverty_code: str | None = None
-        self.python_code: str | None = None
-        self.tests: str | None = None
-        self.code_errors: str | None = None
-        self.test_errors: str | None = None
-
         # Iteration limits
         self.max_orchestrator_iterations = max_orchestrator_iterations
         self.max_validation_iterations = max_validation_iterations
 
+        # Change the fix strategy when the test-driven loop repeats itself
+        self.cycle_detection = CYCLE_DETECTION
+
+        # Complexity and contract from a single call, with the two-step flow as fallback
+        self.fused_planning = fused_planning
+
+        # Initial tests written from the contract alone, concurrently with the code validation
+        self.contract_first_tests = contract_first_tests
+
+        # Repeated and near-duplicate requests are answered from the successful runs
+        if solution_store and store is None:
+            store = SolutionStore(solution_store_path)
+        self.solution_store = store if solution_store else None
+        self.revalidate_solutions = revalidate_solutions
+
+        # Validated programs of similar contracts given to the coder as examples
+        if few_shot:
+            self.coder.examples = examples if examples is not None else ExampleRetriever.from_store(solution_store_path)
+
+        # Each run is exported as a Chrome trace file of its phases, agent, LLM and tool calls
+        self.tracing = tracing
+
+        # Metrics of every run in the process, served once for a scraper
+        if metrics_port is not None:
+            serve_metrics(metrics_port)
+
         # Set logger for agents
         self.set_logger(on_log)
 
@@ -83,6 +167,7 @@ class Orchestrator:
         self.on_log = on_log
         self.evaluator.set_logger(on_log)
         self.architect.set_logger(on_log)
+        self.planner.set_logger(on_log)
         self.coder.set_logger(on_log)
         self.test_generator.set_logger(on_log)
         self.tester.set_logger(on_log)
@@ -90,144 +175,374 @@ class Orchestrator:
     # --- Main Flow ---
 
 
-    def run(self, user_prompt: str):
+    def run(self, user_prompt: str, cancel: threading.Event | None = None) -> OrchestratorResult:
 
         """
         Executes the entire compilation and translation workflow.
+        Progress and artifacts are emitted as events; the state of the run is kept in a
+        RunState, so the same instance can serve several runs, even concurrently.
+        Setting the cancel event stops the run at the next step or LLM call, with a CANCELLED result.
         """
 
-        
-        print(f"--- Starting Workflow for: {user_prompt} ---")
+        state = RunState(run_id=uuid.uuid4().hex[:8], fix_history=FixHistory(enabled=self.cycle_detection))
+        logger.info("--- Starting Workflow %s for: %s ---", state.run_id, user_prompt)
+
+        start = time.perf_counter()
+
+        # The settings hold for this run only: runs of other Orchestrators may be going on at once.
+        # The LLM conversations of the run are its own, and are forgotten when it ends.
+        with tokenizer_family(self.tokenizer_family), payload_format(self.payload_format), tracer.enable(self.tracing), cancellation(cancel), llm_session(state.run_id):
+            with tracer.span("Orchestrator.run", "orchestrator", trace_id=state.run_id, run_id=state.run_id) as span:
+                try:
+                    result = self._run(state, user_prompt)
+                except RunCancelled:
+                    logger.warning("\n[Orchestrator] Workflow finished. Reason: run cancelled")
+                    result = self._finish(state, Status.CANCELLED, "Run cancelled.", None, {}, 0)
+                finally:
+                    self.client.end_session(state.run_id)
+                span.set(status=result.status.value, iterations=result.iterations)
+
+        RUN_LATENCY.observe(time.perf_counter() - start, status=result.status.value)
+        RUNS.inc(status=result.status.value)
+        ITERATIONS.inc(result.iterations)
+        LLM_CALLS_SAVED.inc(result.llm_calls_saved)
+
+        if self.tracing:
+            tracer.finish(state.run_id)
+        return result
+
+    def _run(self, state: RunState, user_prompt: str) -> OrchestratorResult:
+        """
+        Steps of a run, from the request to the result.
+        """
+
+        # 0. Reuse the solution of the same or a near-duplicate request
+        if self.solution_store is not None:
+            reused = self._reuse_solution(state, user_prompt)
+            if reused is not None:
+                return reused
+
+        self._log(state, f"↺ Generating {state.request_type.value.upper()} for the requested task.")
 
-        log_message(f"↺ Generating {self.request_type.value.upper()} for the requested task.")
+        # 1-2. Evaluate complexity and create the contract, in a single call if fused
+        plan = self._plan_request(user_prompt) if self.fused_planning else None
 
-        # 1. Evaluate complexity
-        complexity: int = self._evaluate_request_complexity(user_prompt)
+        if plan is not None:
+            complexity, contract = plan
+        else:
+            if self.fused_planning:
+                self._log(state, "⚠️ The fused plan was invalid, falling back to separate evaluation and design.")
 
-        log_message(f"Evaluated complexity of the requested task is {complexity}")
-        print(f"[Orchestrator] Complexity: {complexity}")
+            # 1. Evaluate complexity
+            complexity: int = self._evaluate_request_complexity(user_prompt)
+
+        self._emit(state, EventType.COMPLEXITY, data=complexity)
+        self._log(state, f"Evaluated complexity of the requested task is {complexity}")
+        logger.info("[Orchestrator] Complexity: %s", complexity)
+
+        if plan is None:
+            # 2. Define requirements and create the contract
+            contract: Dict[str, Any] = self._design_technical_contract(user_prompt, complexity)
+
+        # Stop before any code is generated if the contract was rejected
+        if not contract:
+            logger.warning("\n[Orchestrator] Workflow finished. Reason: contract design failed")
+            self._log(state, "❌ The technical contract could not be created.")
+            return self._finish(state, Status.ERROR, "Contract design failed.", complexity, contract, 0)
 
-        # 2. Define requirements and create the contract
-        contract: Dict[str, Any] = self._design_technical_contract(user_prompt, complexity)
         formatted_contract = json.dumps(contract, indent=2, ensure_ascii=False)
-        log_message(f"Technical Contract Created:\n{formatted_contract}")
+        self._emit(state, EventType.CONTRACT, data=contract)
+        self._log(state, f"Technical Contract Created:\n{formatted_contract}")
+
+        # The tests depend mostly on the contract: write them while the code is generated and validated
+        if self.contract_first_tests:
+            self._log(state, "↺ Generating tests from the contract in background.")
+            state.contract_tests = _test_pool.submit(propagate(self.test_generator.build_tests_from_contract), contract)
 
 
-        print("[Orchestrator] Max orchestrator iterations: ", self.max_orchestrator_iterations)
-        print("[Orchestrator] Max validation iterations: ", self.max_validation_iterations)
+        logger.info("[Orchestrator] Max orchestrator iterations: %d", self.max_orchestrator_iterations)
+        logger.info("[Orchestrator] Max validation iterations: %d", self.max_validation_iterations)
+        result = AnalysisResult(Status.ERROR, "No iterations run.")
         for i in range(self.max_orchestrator_iterations):
-            print(f"[Orchestrator] --------------- Starting iteration {i + 1}/{self.max_orchestrator_iterations} --------------------------")
-            log_message(f"----- STARTING ITERATION {i + 1}/{self.max_orchestrator_iterations} -----")
+            logger.info("[Orchestrator] --------------- Starting iteration %d/%d --------------------------", i + 1, self.max_orchestrator_iterations)
+            self._emit(state, EventType.ITERATION, data=i + 1)
+            self._log(state, f"----- STARTING ITERATION {i + 1}/{self.max_orchestrator_iterations} -----")
             # 3. Generate Reverty/Python code with result based on request type (starting code generation or fix code)
 
-            log_message(f"↺ Generating initial code for {self.request_type.value.upper()} request.")
-            result: AnalysisResult = self._generate_or_fix_code(contract)
+            self._log(state, f"↺ Generating initial code for {state.request_type.value.upper()} request.")
+            result: AnalysisResult = self._generate_or_fix_code(state, contract)
+            state.llm_calls_saved += result.llm_calls_saved
 
-            st.session_state.shared_reverty_code = self.reverty_code
-            st.session_state.shared_python_code = self.python_code
+            if result.data is not None:
+                state.ast_string = result.data
+                self._emit(state, EventType.AST, data=state.ast_string)
+            self._emit(state, EventType.CODE, data={"reverty_code": state.reverty_code, "python_code": state.python_code})
 
             if result.status == Status.SUCCESS:
                 # 4. Build test suite
-                self._generate_or_fix_tests(contract)
+                self._generate_or_fix_tests(state, contract)
+                self._emit(state, EventType.TESTS, data=state.tests)
 
                 # 5. Test the code
-                tester_result = self._execute_tests(contract)
-                print("[Orchestrator] Tester result: \n", tester_result)
+                tester_result = self._execute_tests(state, contract)
+                state.llm_calls_saved += tester_result.get("llm_calls_saved", 0)
+                logger.debug("[Orchestrator] Tester result: \n%s", tester_result)
+                self._emit(state, EventType.TEST_RESULT, data=tester_result)
 
                 # Check if the code is correct, otherwise fix it and retry
                 if tester_result["status"] == Status.SUCCESS.value:
-                    print("\n[Orchestrator] Workflow finished successfully!")
+                    logger.info("\n[Orchestrator] Workflow finished successfully!")
 
-                    st.session_state.shared_log_string += tester_result["status"] + "\n"
-                    # TODO: Costruire Payload per inviare al client
-                    return {"status": result.status.value, "reverty_code": self.reverty_code, "python_code": self.python_code}
+                    self._log(state, tester_result["status"])
+                    self._store_solution(state, user_prompt, complexity, contract)
+                    return self._finish(state, Status.SUCCESS, "Workflow finished successfully.", complexity, contract, i + 1)
                 else:
-                    self.code_errors = tester_result["code_failures"]
-                    self.test_errors = tester_result["test_failures"]
-
-                    st.session_state.shared_log_string += f"⚠️ Errore Test: {self.test_errors}\n"
-                    st.session_state.shared_log_string += f"❌ Errore Codice: {self.code_errors}\n"
-
-                    self._set_new_request_type(self.code_errors, self.test_errors)
+                    state.code_errors = tester_result["code_failures"]
+                    state.test_errors = tester_result["test_failures"]
+
+                    self._log(state, f"⚠️ Errore Test: {state.test_errors}")
+                    self._log(state, f"❌ Errore Codice: {state.code_errors}")
+
+                    # Stop when the same code, tests and failures keep coming back
+                    state.fix_strategy = state.fix_history.record(state.reverty_code, "\n".join(filter(None, (state.code_errors, state.test_errors))), state.python_code, state.tests)
+                    if state.fix_strategy == FixStrategy.ABORT:
+                        logger.warning("\n[Orchestrator] Workflow finished. Reason: fix loop cycle")
+                        self._log(state, f"❌ The same failing attempt came back {state.fix_history.repeats} times, stopping.")
+                        return self._finish(state, Status.ERROR, "Fix loop cycle detected.", complexity, contract, i + 1)
+                    if state.fix_strategy != FixStrategy.RETRY:
+                        self._log(state, f"↺ Repeated attempt detected, fix strategy: {state.fix_strategy.value}")
+
+                    self._set_new_request_type(state, state.code_errors, state.test_errors)
                     continue
             else:
                 # Exit from loop if code generation failed
-                print("\n[Orchestrator] Workflow finished. Reason: code generation failed")
-                return {"status": result.status.value, "message": result.message}
+                logger.warning("\n[Orchestrator] Workflow finished. Reason: code generation failed")
+                return self._finish(state, result.status, result.message, complexity, contract, i + 1)
 
         # Exit from loop if max retries reached
-        print("\n[Orchestrator] Workflow finished. Reason: max retries reached")
+        logger.warning("\n[Orchestrator] Workflow finished. Reason: max retries reached")
 
-        # TODO: Costruire Payload per inviare al client
-        return {"status": result.status.value, "reverty_code": self.reverty_code, "python_code": self.python_code}
+        return self._finish(state, Status.ERROR, "Max orchestrator iterations reached.", complexity, contract, self.max_orchestrator_iterations)
+
+    # --- Events ---
+    def _emit(self, state: RunState, event_type: EventType, message: str = "", data: Any = None):
+        """
+        Sends an event to the callback, if any. Every event but the last is a cancellation check.
+        """
+        if event_type != EventType.FINISHED:
+            check_cancelled()
+        if self.on_event:
+            self.on_event(OrchestratorEvent(type=event_type, run_id=state.run_id, message=message, data=data))
+
+    def _log(self, state: RunState, message: str):
+        """
+        Adds a message to the conversation log of the run and emits it.
+        """
+        state.logs.append(str(message))
+        self._emit(state, EventType.LOG, message=str(message))
+
+    def _finish(self, state: RunState, status: Status, message: str, complexity: int, contract: Dict[str, Any], iterations: int) -> OrchestratorResult:
+        """
+        Builds the result of the run and emits it.
+        """
+        if state.contract_tests is not None:
+            state.contract_tests.cancel()
+
+        if state.llm_calls_saved:
+            logger.info("[Orchestrator] LLM calls saved by local repairs and triage: %d", state.llm_calls_saved)
+
+        result = OrchestratorResult(
+            status=status,
+            message=message,
+            reverty_code=state.reverty_code,
+            python_code=state.python_code,
+            tests=state.tests,
+            ast_string=state.ast_string,
+            complexity=complexity,
+            contract=contract,
+            iterations=iterations,
+            logs=state.logs,
+            llm_calls_saved=state.llm_calls_saved,
+            store_hit=state.store_hit,
+            trace_file=os.path.join(tracer.directory, f"{state.run_id}.json") if tracer.enabled else None,
+        )
+        self._emit(state, EventType.FINISHED, message=message, data=result)
+        return result
+
+    # --- Solution Store ---
+    @traced("orchestrator")
+    def _reuse_solution(self, state: RunState, user_prompt: str) -> OrchestratorResult | None:
+        """
+        Finishes the run with a stored solution, if the store has one for the prompt.
+        With revalidation, the stored tests must still pass, otherwise the solution is discarded.
+        """
+        match = self.solution_store.lookup(user_prompt)
+        STORE_LOOKUPS.inc(result=match.kind if match is not None else "miss")
+        if match is None:
+            return None
+
+        solution = match.solution
+        logger.info("[Orchestrator] Solution store hit (%s, similarity %.2f) in %.2f ms", match.kind, match.similarity, match.lookup_ms)
+
+        if self.revalidate_solutions:
+            execution = self.tester.executor.run_tests(solution.python_code, solution.tests)
+            if execution.status != Status.SUCCESS:
+                self._log(state, "⚠️ The stored solution no longer passes its tests, running the full workflow.")
+                self.solution_store.discard(solution)
+                return None
+
+        state.store_hit = match.kind
+        state.reverty_code = solution.reverty_code
+        state.python_code = solution.python_code
+        state.tests = solution.tests
+        state.ast_string = solution.ast_string
+
+        self._log(state, f"✅ Reusing the stored solution of: {solution.prompt}")
+        self._emit(state, EventType.COMPLEXITY, data=solution.complexity)
+        self._emit(state, EventType.CONTRACT, data=solution.contract)
+        if state.ast_string is not None:
+            self._emit(state, EventType.AST, data=state.ast_string)
+        self._emit(state, EventType.CODE, data={"reverty_code": state.reverty_code, "python_code": state.python_code})
+        self._emit(state, EventType.TESTS, data=state.tests)
+
+        return self._finish(state, Status.SUCCESS, f"Solution reused from the store ({match.kind} match).", solution.complexity, solution.contract, 0)
+
+    @traced("orchestrator")
+    def _store_solution(self, state: RunState, user_prompt: str, complexity: int, contract: Dict[str, Any]):
+        """
+        Adds the solution of a successful run to the store and to the coder examples.
+        """
+        if self.coder.examples is not None:
+            self.coder.examples.add(contract, state.reverty_code)
+
+        if self.solution_store is None:
+            return
+
+        self.solution_store.add(StoredSolution(
+            prompt=user_prompt,
+            contract=contract,
+            reverty_code=state.reverty_code,
+            python_code=state.python_code,
+            tests=state.tests,
+            complexity=complexity,
+            ast_string=state.ast_string,
+        ))
 
     # --- Coordination Actions ---
+    @traced("orchestrator")
+    def _plan_request(self, user_prompt: str):
+        """
+        Interacts with the Planner Agent to get complexity and contract with one call.
+        Returns None if the plan is invalid.
+        """
+
+        logger.info("[Orchestrator] Planning request...")
+        return self.planner.plan_request(user_prompt)
+
+    @traced("orchestrator")
     def _evaluate_request_complexity(self, user_prompt: str) -> int:
         """
         Interacts with the Evaluator Agent to evaluate the complexity of the user prompt.
         """
 
-        print("[Orchestrator] Evaluating request...")
+        logger.info("[Orchestrator] Evaluating request...")
         complexity: int = self.evaluator.evaluate_request(user_prompt)
         return complexity
 
+    @traced("orchestrator")
     def _design_technical_contract(self, user_prompt: str, complexity: int) -> Dict[str, Any]:
         """
         Interacts with the Architect Agent to define the technical requirements.
         """
         
-        print("[Orchestrator] Designing technical contract...")
+        logger.info("[Orchestrator] Designing technical contract...")
         contract: Dict[str, Any] = self.architect.create_contract(user_prompt, complexity)
         return contract
 
-    def _generate_or_fix_code(self, contract: Dict[str, Any]) -> AnalysisResult:
+    @traced("orchestrator")
+    def _generate_or_fix_code(self, state: RunState, contract: Dict[str, Any]) -> AnalysisResult:
         """
         Interacts with the CoderAgent to generate Reverty code with its Python equivalent.
         """
 
-        if self.request_type == RequestType.INITIAL:
-            print("\n[Orchestrator] Generating Reverty code...")
-            self.reverty_code, self.python_code, result = self.coder.build_initial_code(contract)
+        if state.request_type == RequestType.INITIAL:
+            logger.info("\n[Orchestrator] Generating Reverty code...")
+            state.reverty_code, state.python_code, result = self.coder.build_initial_code(contract)
             return result
 
-        elif self.request_type == RequestType.FIX_CODE or self.request_type == RequestType.FIX_BOTH:
-            print("\n[Orchestrator] Fixing Reverty code...")
-            self.reverty_code, self.python_code, result = self.coder.fix_code(contract, self.reverty_code, self.python_code, self.code_errors)
+        elif state.request_type == RequestType.FIX_CODE or state.request_type == RequestType.FIX_BOTH:
+            logger.info("\n[Orchestrator] Fixing Reverty code...")
+            temperature, history = self._fix_escalation(state)
+            state.reverty_code, state.python_code, result = self.coder.fix_code(contract, state.reverty_code, state.python_code, state.code_errors + history, temperature)
             return result
 
         return AnalysisResult(status=Status.SUCCESS, message="No coding actions needed.")
 
-    def _generate_or_fix_tests(self, contract: Dict[str, Any]):
+    @traced("orchestrator")
+    def _generate_or_fix_tests(self, state: RunState, contract: Dict[str, Any]):
         """
         Interacts with the Tester Agent to generate tests.
         """
 
-        if self.request_type == RequestType.INITIAL:
-            print("\n[Orchestrator] Generating tests...")
-            self.tests = self.test_generator.build_tests(contract, self.python_code)
-        elif self.request_type == RequestType.FIX_TESTS or self.request_type == RequestType.FIX_BOTH:
-            print("\n[Orchestrator] Fixing tests...")
-            self.tests = self.test_generator.fix_tests(contract, self.python_code, self.test_errors)
+        if state.request_type == RequestType.INITIAL:
+            state.tests = self._collect_contract_tests(state, contract)
+            if state.tests is None:
+                logger.info("\n[Orchestrator] Generating tests...")
+                state.tests = self.test_generator.build_tests(contract, state.python_code)
+        elif state.request_type == RequestType.FIX_TESTS or state.request_type == RequestType.FIX_BOTH:
+            logger.info("\n[Orchestrator] Fixing tests...")
+            temperature, history = self._fix_escalation(state)
+            state.tests = self.test_generator.fix_tests(contract, state.python_code, state.test_errors + history, temperature)
+
+        logger.debug("\n[Tests]\n%s", state.tests)
+
+    def _collect_contract_tests(self, state: RunState, contract: Dict[str, Any]) -> str | None:
+        """
+        Waits for the tests written from the contract and adapts them to the validated code.
+        Returns None when there are none or they cannot be adapted.
+        """
+        future, state.contract_tests = state.contract_tests, None
+        if future is None:
+            return None
+
+        logger.info("\n[Orchestrator] Reconciling the tests written from the contract...")
+        try:
+            tests = future.result()
+        except Exception as e:
+            logger.warning("[Orchestrator] Contract test generation failed: %s", e)
+            return None
+
+        return self.test_generator.reconcile_tests(contract, state.python_code, tests)
+
+    def _fix_escalation(self, state: RunState):
+        """
+        Temperature and error history note of the next fix, following the fix strategy.
+        """
+        if state.fix_strategy == FixStrategy.RETRY:
+            return None, ""
+
+        history = ""
+        if state.fix_strategy == FixStrategy.ADD_HISTORY:
+            history = "\n" + generate_error_history(state.fix_history.previous_errors(), state.fix_history.repeats)
 
-        print(f"\n[Tests]\n{self.tests}")
+        return self.coder.escalated_temperature(), history
 
-    def _execute_tests(self, contract):
+    @traced("orchestrator")
+    def _execute_tests(self, state: RunState, contract):
         """
         Interacts with the TesterAgent to execute tests.
         """
-        print("\n[Orchestrator] Executing tests...")
-        result = self.tester.test(contract, self.python_code, self.reverty_code, self.tests)
+        logger.info("\n[Orchestrator] Executing tests...")
+        result = self.tester.test(contract, state.python_code, state.reverty_code, state.tests)
         return result
 
-    def _set_new_request_type(self, code_errors: str | None, test_errors: str | None):
+    def _set_new_request_type(self, state: RunState, code_errors: str | None, test_errors: str | None):
         """
         Sets the new request type based on the errors.
         """
         if code_errors is not None and test_errors is not None:
-            self.request_type = RequestType.FIX_BOTH
+            state.request_type = RequestType.FIX_BOTH
         elif code_errors is not None:
-            self.request_type = RequestType.FIX_CODE
+            state.request_type = RequestType.FIX_CODE
         elif test_errors is not None:
-            self.request_type = RequestType.FIX_TESTS
-    
-    
+            state.request_type = RequestType.FIX_TESTS
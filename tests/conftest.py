@@ -5,7 +5,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from tools.parser import Parser
 from helpers.utils import load_grammar
 from clients.llm_client_abstract import LLMClient
-from typing import List
+from typing import List, Dict, Any
 from unittest.mock import MagicMock
 
 
@@ -34,7 +34,7 @@ def mock_llm():
             self.responses = responses
             self.call_count = 0
 
-        def generate(self, user_prompt: str, system_prompt: str = None, model: str = "mock") -> str:
+        def generate(self, user_prompt: str, system_prompt: str = None, model: str = "mock", schema: Dict[str, Any] = None, temperature: float = None) -> str:
             # Get the current response and advance the index
             if self.call_count < len(self.responses):
                 response = self.responses[self.call_count]
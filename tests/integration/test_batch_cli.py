@@ -0,0 +1,58 @@
+import json
+import cli
+from helpers.enums import Status
+
+
+def write_jsonl(path, entries):
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_read_prompts_assigns_missing_ids(tmp_path):
+    """Test that prompts without an id get one from their line number."""
+
+    input_path = tmp_path / "prompts.jsonl"
+    write_jsonl(input_path, [{"id": 7, "prompt": "first"}, {"prompt": "second"}])
+
+    assert list(cli.read_prompts(str(input_path))) == [("7", "first"), ("line-2", "second")]
+
+
+def test_batch_resumes_after_crash(tmp_path):
+    """Test that completed ids are skipped and a truncated record is run again."""
+
+    input_path = tmp_path / "prompts.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_jsonl(input_path, [{"id": "done", "prompt": "factorial"}, {"id": "crashed", "prompt": "factorial"}])
+
+    # Previous run: one record written, the second one cut by the crash
+    output_path.write_text(json.dumps({"id": "done", "status": "SUCCESS"}) + '\n{"id": "crashed", "sta', encoding="utf-8")
+
+    counts = cli.run_batch(str(input_path), str(output_path), workers=1, settings={"llm_client_type": cli.LLMClientType.MOCK})
+
+    assert counts == {Status.SUCCESS.value: 1}
+
+    lines = output_path.read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[-1])
+    assert record["id"] == "crashed"
+    assert "def factorial(n: int) -> int:" in record["python_code"]
+    assert record["iterations"] == 1
+    assert record["timings"]["total_s"] >= record["timings"]["contract_s"]
+
+    assert cli.completed_ids(str(output_path)) == {"done", "crashed"}
+
+
+def test_batch_retry_failed(tmp_path):
+    """Test that failed ids are skipped unless retry_failed is set, and that prompts which raised always run again."""
+
+    output_path = tmp_path / "results.jsonl"
+    write_jsonl(output_path, [
+        {"id": "a", "status": "SUCCESS"},
+        {"id": "b", "status": "ERROR", "message": "Max orchestrator iterations reached."},
+        {"id": "c", "status": "ERROR", "message": "Exception: Error calling Ollama API: connection refused"},
+    ])
+
+    assert cli.completed_ids(str(output_path)) == {"a", "b"}
+    assert cli.completed_ids(str(output_path), retry_failed=True) == {"a"}
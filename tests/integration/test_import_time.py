@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Imported only when the GUI renders or a backend is selected
+DEFERRED_MODULES = {"streamlit", "streamlit_antd_components", "requests", "toon_format"}
+
+# Cumulative import time allowed for a single pipeline module, in milliseconds
+IMPORT_BUDGET_MS = 300
+
+
+def pipeline_modules():
+    modules = ["orchestrator"]
+    for package in ("agents", "tools"):
+        for file_name in sorted(os.listdir(os.path.join(PROJECT_ROOT, package))):
+            if file_name.endswith(".py"):
+                modules.append(f"{package}.{file_name[:-3]}")
+    return modules
+
+
+def import_times(module: str):
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+    Returns the cumulative time (ms) of every imported module.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+@pytest.mark.parametrize("module", pipeline_modules())
+def test_pipeline_module_defers_gui_and_backend_imports(module):
+    """Test that pipeline modules import neither GUI nor backend-specific packages."""
+
+    times = import_times(module)
+
+    imported_roots = {name.split(".")[0] for name in times}
+    assert not imported_roots & DEFERRED_MODULES, f"{module} imports {sorted(imported_roots & DEFERRED_MODULES)}"
+    assert times[module] < IMPORT_BUDGET_MS, f"{module} took {times[module]:.0f} ms to import"
@@ -0,0 +1,364 @@
+import pytest
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from orchestrator import Orchestrator
+from helpers.enums import LLMClientType, Status, EventType, OrchestratorResult, StoredSolution
+from helpers.solution_store import SolutionStore
+from helpers import metrics
+from helpers.payload_format import get_payload_format
+from helpers.tracing import tracer
+from helpers.system_prompts import TESTER_SYSTEM_PROMPT
+from clients.llm_client_abstract import LLMClient
+from config import trace_dir
+
+@pytest.fixture
+def SequentialMockLLM(mock_llm):
+    return mock_llm
+
+
+RESP_EVALUATOR = json.dumps({"complexity": 2})
+
+RESP_ARCHITECT = json.dumps({
+    "function_name": "add",
+    "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}],
+    "return_type": "int"
+})
+
+RESP_CODER = json.dumps({"code": ": tni -> (tni: b, tni: a) add fed\n    nruter a + b\n"})
+
+RESP_TEST_GEN = json.dumps({"code": "from implementation import add\n\ndef test_add():\n    assert add(1, 2) == 3\n"})
+
+
+def build_orchestrator(client, on_event=None, **options):
+    """
+    Builds an orchestrator whose agents all use the given client.
+    """
+    orchestrator = Orchestrator(LLMClientType.MOCK, on_event=on_event, **options)
+
+    orchestrator.client = client
+    for agent in (orchestrator.evaluator, orchestrator.architect, orchestrator.planner, orchestrator.coder, orchestrator.test_generator, orchestrator.tester):
+        agent.client = client
+
+    return orchestrator
+
+
+def test_orchestrator_emits_events_and_returns_result(SequentialMockLLM):
+    """Test that a run reports its progress as events and returns a result object."""
+
+    events = []
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, on_event=events.append)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert isinstance(result, OrchestratorResult)
+    assert result.success
+    assert result.complexity == 2
+    assert result.contract["function_name"] == "add"
+    assert "def add(b: int, a: int) -> int:" in result.python_code
+    assert result.ast_string
+
+    types = [event.type for event in events]
+    for expected in (EventType.LOG, EventType.COMPLEXITY, EventType.CONTRACT, EventType.CODE, EventType.AST, EventType.TESTS, EventType.TEST_RESULT):
+        assert expected in types
+    assert types[-1] == EventType.FINISHED
+    assert events[-1].data is result
+
+    # Every event belongs to the same run, and the log events are the result's log
+    assert len({event.run_id for event in events}) == 1
+    assert [event.message for event in events if event.type == EventType.LOG] == result.logs
+
+
+def test_orchestrator_cancelled_run_stops_at_next_step(SequentialMockLLM):
+    """Test that a run cancelled after the contract stops before generating code, with a CANCELLED result."""
+
+    cancel = threading.Event()
+    events = []
+
+    def on_event(event):
+        events.append(event)
+        if event.type == EventType.CONTRACT:
+            cancel.set()
+
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, on_event=on_event)
+
+    result = orchestrator.run("Sum two numbers", cancel=cancel)
+
+    types = [event.type for event in events]
+    assert result.status == Status.CANCELLED
+    assert EventType.CODE not in types and EventType.ITERATION not in types
+    assert types[-1] == EventType.FINISHED
+    assert client.call_count == 2
+
+
+def test_orchestrator_runs_do_not_share_state(SequentialMockLLM):
+    """Test that consecutive and concurrent runs keep separate state."""
+
+    client = SequentialMockLLM(responses=[json.dumps({"complexity": 3}), json.dumps({"args": []})])
+    orchestrator = build_orchestrator(client)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(orchestrator.run, ["first", "second", "third", "fourth"]))
+
+    for result in results:
+        assert result.status == Status.ERROR
+        assert result.message == "Contract design failed."
+        assert result.reverty_code is None
+        assert len(result.logs) == 3
+
+
+def test_orchestrator_contract_first_tests_overlap_validation():
+    """Test that contract-first tests are written while the code is generated, then reconciled."""
+
+    from clients.llm_client_abstract import LLMClient
+    from helpers.system_prompts import TESTER_GENERATOR_SYSTEM_PROMPT
+    import threading
+    import time
+
+    class RoutingLLM(LLMClient):
+        """Answers by agent; the coder is slow, the test generator records when it is called."""
+
+        def __init__(self):
+            self.coder_done = threading.Event()
+            self.test_prompts = []
+            self.tests_started_before_code = False
+            self.responses = iter([RESP_EVALUATOR, RESP_ARCHITECT])
+
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            if system_prompt.startswith(TESTER_GENERATOR_SYSTEM_PROMPT):
+                self.tests_started_before_code = not self.coder_done.is_set()
+                self.test_prompts.append(user_prompt)
+                return json.dumps({"code": "from implementation import add\n\ndef test_add():\n    assert add(2, 1) == 3\n"})
+            if "Contract Specification" in user_prompt:
+                time.sleep(0.3)
+                self.coder_done.set()
+                return RESP_CODER
+            return next(self.responses)
+
+    client = RoutingLLM()
+    orchestrator = build_orchestrator(client, contract_first_tests=True)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.success
+    assert client.tests_started_before_code
+    assert len(client.test_prompts) == 1 and "Implementation Code" not in client.test_prompts[0]
+
+    # The implementation is add(b, a): the contract-order call is rewritten with keywords
+    assert "add(a=2, b=1)" in result.tests
+
+
+def test_orchestrator_contract_first_tests_share_one_pool(SequentialMockLLM):
+    """Test that the orchestrators write their contract-first tests on a shared pool instead of one each."""
+
+    from helpers.system_prompts import TESTER_GENERATOR_SYSTEM_PROMPT
+    from config import RUN_WORKERS
+
+    class TestRoutingLLM(SequentialMockLLM):
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            if system_prompt.startswith(TESTER_GENERATOR_SYSTEM_PROMPT):
+                return RESP_TEST_GEN
+            return super().generate(user_prompt, system_prompt, model, schema)
+
+    orchestrators = []
+    for _ in range(RUN_WORKERS + 2):
+        client = TestRoutingLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER])
+        orchestrators.append(build_orchestrator(client, contract_first_tests=True))
+        assert orchestrators[-1].run("Sum two numbers").success
+
+    pool_threads = [thread for thread in threading.enumerate() if thread.name.startswith("contract-tests")]
+    assert 1 <= len(pool_threads) <= RUN_WORKERS
+
+
+def test_orchestrator_fused_planning_saves_a_call(SequentialMockLLM):
+    """Test that fused planning gets complexity and contract from one call."""
+
+    plan = json.dumps({"complexity": 2, **json.loads(RESP_ARCHITECT)})
+    client = SequentialMockLLM(responses=[plan, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, fused_planning=True)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.success
+    assert result.complexity == 2
+    assert result.contract["function_name"] == "add"
+    assert client.call_count == 3
+
+
+def test_orchestrator_fused_planning_falls_back_to_two_steps(SequentialMockLLM):
+    """Test that an invalid fused plan falls back to evaluator and architect."""
+
+    client = SequentialMockLLM(responses=["no plan here", RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, fused_planning=True)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.success
+    assert result.complexity == 2
+    assert result.contract["function_name"] == "add"
+    assert client.call_count == 5
+    assert any("falling back" in log for log in result.logs)
+
+
+class StuckLLM(LLMClient):
+    """The tests always fail and every fix returns the same code."""
+
+    def __init__(self):
+        self.responses = iter([RESP_EVALUATOR, RESP_ARCHITECT])
+        self.fix_temperatures = []
+
+    def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+        if system_prompt.startswith(TESTER_SYSTEM_PROMPT):
+            return json.dumps({"code_failures": "add returns the wrong sum", "test_failures": None})
+        if "pytest tests" in user_prompt:
+            return json.dumps({"code": "from implementation import add\n\ndef test_add():\n    assert add(1, 2) == 4\n"})
+        if "Contract" in user_prompt:
+            if "Test Execution Output" in user_prompt:
+                self.fix_temperatures.append(temperature)
+            return RESP_CODER
+        return next(self.responses)
+
+
+def test_orchestrator_stops_repeating_fix_loop():
+    """Test that the test-driven loop stops when the same failing attempt keeps coming back."""
+
+    client = StuckLLM()
+    orchestrator = build_orchestrator(client, max_orchestrator_iterations=10)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.status == Status.ERROR
+    assert result.message == "Fix loop cycle detected."
+    assert result.iterations == 4
+    assert client.fix_temperatures == [None, 0.6, 0.6]
+
+
+def test_orchestrator_fails_when_iterations_run_out():
+    """Test that a run whose tests fail on every iteration ends with an error."""
+
+    client = StuckLLM()
+    orchestrator = build_orchestrator(client, max_orchestrator_iterations=2)
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.status == Status.ERROR
+    assert result.message == "Max orchestrator iterations reached."
+    assert result.iterations == 2
+
+
+@pytest.mark.parametrize("revalidate", [False, True])
+def test_orchestrator_reuses_stored_solution(SequentialMockLLM, tmp_path, revalidate):
+    """Test that a repeated request is answered from the solution store without LLM calls."""
+
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, solution_store=True, revalidate_solutions=revalidate)
+    orchestrator.solution_store = SolutionStore(str(tmp_path / "solutions.jsonl"))
+
+    first = orchestrator.run("Sum two numbers")
+    calls = client.call_count
+
+    events = []
+    orchestrator.on_event = events.append
+    second = orchestrator.run("sum two numbers!")
+
+    assert first.success and first.store_hit is None
+    assert second.success and second.store_hit == "exact"
+    assert client.call_count == calls
+    assert second.python_code == first.python_code
+    assert second.contract == first.contract
+    assert second.iterations == 0
+    assert {EventType.CONTRACT, EventType.CODE, EventType.TESTS, EventType.FINISHED} <= {event.type for event in events}
+
+
+def test_orchestrator_discards_stored_solution_failing_revalidation(SequentialMockLLM, tmp_path):
+    """Test that a stored solution whose tests fail is discarded and the workflow runs."""
+
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, solution_store=True, revalidate_solutions=True)
+    orchestrator.solution_store = SolutionStore(str(tmp_path / "solutions.jsonl"))
+    orchestrator.solution_store.add(StoredSolution(
+        prompt="Sum two numbers",
+        contract={"function_name": "add"},
+        reverty_code="",
+        python_code="def add(a, b):\n    return a - b\n",
+        tests="from implementation import add\n\ndef test_add():\n    assert add(1, 2) == 3\n",
+    ))
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.success and result.store_hit is None
+    assert client.call_count == 4
+    assert "return b + a" in result.python_code or "return a + b" in result.python_code
+
+
+def test_orchestrator_writes_trace_file(SequentialMockLLM, tmp_path):
+    """Test that a traced run exports its phases, agent, LLM and tool calls."""
+
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client, tracing=True)
+    try:
+        tracer.directory = str(tmp_path)
+        result = orchestrator.run("Sum two numbers")
+    finally:
+        tracer.directory = trace_dir
+
+    assert result.success
+    with open(result.trace_file, encoding="utf-8") as file:
+        events = json.load(file)["traceEvents"]
+    names = {event["name"] for event in events}
+    assert {"Orchestrator.run", "Orchestrator._generate_or_fix_code", "CoderAgent.build_initial_code", "Parser.run", "Linter.run"} <= names
+    assert {event["cat"] for event in events} == {"orchestrator", "agent", "llm", "tool"}
+    assert all(event["args"]["prompt_tokens"] > 0 for event in events if event["cat"] == "llm")
+
+
+def test_orchestrator_settings_hold_for_its_runs_only(SequentialMockLLM, tmp_path):
+    """Test that concurrent runs of orchestrators with different settings keep their own payload format and tracing."""
+
+    class RecordingLLM(SequentialMockLLM):
+        def generate(self, user_prompt, *args, **kwargs):
+            self.prompts.append(user_prompt)
+            return super().generate(user_prompt, *args, **kwargs)
+
+    default_format = get_payload_format().name
+    runs = []
+    for name, tracing in (("json", True), ("yaml", False)):
+        client = RecordingLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+        client.prompts = []
+        orchestrator = build_orchestrator(client, tracing=tracing)
+        orchestrator.payload_format = name
+        runs.append((client, orchestrator))
+
+    try:
+        tracer.directory = str(tmp_path)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda run: run[1].run("Sum two numbers"), runs))
+    finally:
+        tracer.directory = trace_dir
+
+    (json_client, _), (yaml_client, _) = runs
+    assert all(result.success for result in results)
+    assert any('Contract Specification:\n{"function_name":"add"' in prompt for prompt in json_client.prompts)
+    assert any("Contract Specification:\nfunction_name: add" in prompt for prompt in yaml_client.prompts)
+    assert results[0].trace_file is not None and results[1].trace_file is None
+    assert get_payload_format().name == default_format and not tracer.enabled
+
+
+def test_orchestrator_records_metrics(SequentialMockLLM):
+    """Test that a run observes its latency, the LLM and tool latencies and the run counters."""
+
+    client = SequentialMockLLM(responses=[RESP_EVALUATOR, RESP_ARCHITECT, RESP_CODER, RESP_TEST_GEN])
+    orchestrator = build_orchestrator(client)
+    runs = metrics.RUNS.value(status="SUCCESS")
+    llm_calls = metrics.LLM_LATENCY.count(client=type(client).__name__, model="default")
+    linter_runs = metrics.TOOL_LATENCY.count(tool="Linter")
+
+    result = orchestrator.run("Sum two numbers")
+
+    assert result.success
+    assert metrics.RUNS.value(status="SUCCESS") == runs + 1
+    assert metrics.LLM_LATENCY.count(client=type(client).__name__, model="default") == llm_calls + 4
+    assert metrics.TOOL_LATENCY.count(tool="Linter") == linter_runs + 1
+    assert metrics.TOOL_LATENCY.count(tool="TestExecutor") >= 1
+    assert "reverty_run_duration_seconds_count" in metrics.registry.render()
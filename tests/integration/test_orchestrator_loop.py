@@ -142,17 +142,17 @@ def test_calculator_flow():
     # --- ASSERTIONS ---
     
     # Verify result
-    assert result["status"] == Status.SUCCESS.value, f"Orchestrator failed: {result.get('error')}"
+    assert result.status == Status.SUCCESS, f"Orchestrator failed: {result.message}"
     
     # Verify output code
-    assert "def calculator_app() -> None:" in result["python_code"]
-    assert "while running:" in result["python_code"] # Verify transpiler of loop
+    assert "def calculator_app() -> None:" in result.python_code
+    assert "while running:" in result.python_code # Verify transpiler of loop
     
     # Verify calls flow (Eval -> Arch -> Coder -> TestGen)
     # It should be 4 because the Coder got it right on the first try (mocked)
     assert mock_client.call_count == 4
     
     # Verify Architect Contract (at least 2 functions)
-    assert "calc_sum fed" in result["reverty_code"]
-    assert "calculator_app fed" in result["reverty_code"]
+    assert "calc_sum fed" in result.reverty_code
+    assert "calculator_app fed" in result.reverty_code
 
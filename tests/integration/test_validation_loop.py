@@ -7,12 +7,13 @@ from helpers.enums import Status
 def SequentialMockLLM(mock_llm):
     return mock_llm
 
-def test_validation_loop_recovery(SequentialMockLLM, grammar):
+@pytest.mark.parametrize("local_repair", [False, True])
+def test_validation_loop_recovery(SequentialMockLLM, grammar, local_repair):
     """
     Test a full validation loop where:
     1. Initial code has syntax error (parser fails).
     2. Fixed code has linting error (variable unused).
-    3. Final code is correct.
+    3. Final code is correct: from the LLM, or from the local repair of the unused variable.
     """
     
     # Invalid Syntax
@@ -39,6 +40,7 @@ def test_validation_loop_recovery(SequentialMockLLM, grammar):
     
     mock_client = SequentialMockLLM(responses=[code_syntax_error, code_lint_error, code_valid])
     agent = CoderAgent(client=mock_client, grammar=grammar)
+    agent.local_repair = local_repair
     
     contract = {
         "function_name": "test_func",
@@ -50,7 +52,15 @@ def test_validation_loop_recovery(SequentialMockLLM, grammar):
     
     # Verify success
     assert result.status == Status.SUCCESS, f"Failed with message: {result.message}"
-    assert "success" in reverty_code
-    
-    # Verify the loop happened
-    assert mock_client.call_count == 3
+
+    if local_repair:
+        # The unused variable is removed without asking the LLM
+        assert "lint_fail" in reverty_code and "unused" not in reverty_code
+        assert mock_client.call_count == 2
+        assert result.llm_calls_saved == 1
+    else:
+        assert "success" in reverty_code
+
+        # Verify the loop happened
+        assert mock_client.call_count == 3
+        assert result.llm_calls_saved == 0
@@ -1,4 +1,5 @@
 import pytest
+import time
 from agents.agent import Agent
 from unittest.mock import MagicMock
 
@@ -15,8 +16,9 @@ def agent():
     # Markdown JSON
     (' Ecco il codice:\n```json\n{"complexity": 3}\n```', "complexity", 3),
     
-    # Custom formats (TOON)
+    # Custom formats (TOON, YAML)
     ('```toon\ncomplexity: 2\n```', "complexity", 2),
+    ('```yaml\ncomplexity: 4\n```', "complexity", 4),
     
     # "Dirty" (Text before and after)
     ('Certo! Ecco la risposta: {"complexity": 1} Spero aiuti.', "complexity", 1),
@@ -33,4 +35,70 @@ def test_extract_response(agent, input_str, expected_key, expected_value):
     
     assert isinstance(result, dict)
     assert result.get(expected_key) == expected_value
-    
\ No newline at end of file
+    
+
+def test_extract_response_returns_first_schema_valid_object(agent):
+    """Test that objects violating the schema are skipped in favour of a valid one."""
+
+    agent.output_schema = {"type": "object", "required": ["complexity"]}
+    response = 'Example: {"detected_logic": "x"}\nAnswer:\n```json\n{"complexity": 4}\n```'
+
+    assert agent.extract_response(response) == {"complexity": 4}
+
+
+def test_extract_response_without_valid_object_returns_first_candidate(agent):
+    """Test that the first object is returned when none satisfies the schema."""
+
+    agent.output_schema = {"type": "object", "required": ["complexity"]}
+
+    assert agent.extract_response('{"a": 1} and {"b": 2}') == {"a": 1}
+
+
+def test_extract_response_skips_braces_in_text(agent):
+    """Test extraction after prose and code containing unbalanced braces."""
+
+    response = 'Use {x} or { y, then: {"complexity": 7} } trailing {'
+
+    assert agent.extract_response(response) == {"complexity": 7}
+
+
+def test_extract_response_falls_back_to_raw_code(agent):
+    """Test that a response without any object is returned as code."""
+
+    assert agent.extract_response(": tni -> () foo fed\n    nruter 0") == {"code": ": tni -> () foo fed\n    nruter 0"}
+
+
+def test_extract_response_many_unclosed_objects_is_linear(agent):
+    """Test that a response full of objects failing to decode is scanned in linear time."""
+
+    response = '{"' * 200000
+
+    start = time.perf_counter()
+    assert agent.extract_response(response) == {"code": response}
+    assert time.perf_counter() - start < 1
+
+
+@pytest.mark.parametrize("response", [
+    '{"a": [' * 1000,
+    '```json\n' + '{"a": [' * 1000 + '\n```',
+], ids=["object", "fenced"])
+def test_extract_response_deeply_nested_input(agent, response):
+    """Test that nesting too deep to decode falls back to the raw response instead of raising."""
+
+    assert agent.extract_response(response) == {"code": response}
+
+
+def test_generate_records_prompt_section_tokens(agent):
+    """Test that the tokens of each prompt section are logged and accumulated."""
+    from helpers.token_budget import PromptBuilder
+
+    logs = []
+    agent.set_logger(logs.append)
+    prompt = PromptBuilder().add("code", "x = 1", header="Code:\n").text("instructions", "Fix it.\n").build()
+
+    agent.generate(prompt, "system")
+    agent.generate(prompt, "system")
+
+    assert agent.section_tokens["code"] == 2 * prompt.sections["code"][1]
+    assert logs[0].startswith("[Agent] Prompt tokens: ")
+    agent.client.generate.assert_called_with(user_prompt=prompt, system_prompt="system", schema=None)
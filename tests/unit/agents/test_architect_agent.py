@@ -60,13 +60,29 @@ def test_architect_complex_contract(SequentialMockLLM):
 def test_architect_retry_on_bad_response(SequentialMockLLM):
     """Test handling of invalid response."""
     
-    bad_response = "Fail fast!" # TODO: corretto far failare fast il contratto oppure rigeneriamo?
+    bad_response = "Fail fast!"
     valid_response = """```toon
     function_name: retry_success
     ```"""
     
     mock_client = SequentialMockLLM(responses=[bad_response, valid_response])
     agent = ArchitectAgent(client=mock_client)
+    messages = []
+    agent.set_logger(messages.append)
 
     result = agent.create_contract("Bad prompt", complexity=1)
-    assert result == {"code": "Fail fast!"}
+    assert result == {"function_name": "retry_success"}
+    assert mock_client.call_count == 2
+    assert "[Architect Agent] No contract found in the response: Fail fast!" in messages
+
+def test_architect_rejects_invalid_contract(SequentialMockLLM):
+    """Test that a contract violating the schema never reaches the next stages."""
+    
+    bad_response = "Fail fast!"
+    
+    mock_client = SequentialMockLLM(responses=[bad_response, bad_response])
+    agent = ArchitectAgent(client=mock_client, max_contract_retries=1)
+
+    result = agent.create_contract("Bad prompt", complexity=1)
+    assert result == {}
+    assert mock_client.call_count == 2
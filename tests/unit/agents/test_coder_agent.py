@@ -1,6 +1,10 @@
 import pytest
+import threading
+import time
 from agents.coder_agent import CoderAgent
+from clients.llm_client_abstract import LLMClient
 from helpers.enums import Status
+from helpers.run_context import current_session, llm_session
 
 @pytest.fixture
 def SequentialMockLLM(mock_llm):
@@ -102,4 +106,220 @@ def text_coder_fix_code_fail(SequentialMockLLM, grammar):
         
     code, py_code, result = agent.fix_code(contract, invalid_code, "", errors)
     assert result.status == Status.ERROR
-    assert mock_client.call_count == 3
\ No newline at end of file
+    assert mock_client.call_count == 3
+
+
+def test_coder_uses_grammar_when_supported(SequentialMockLLM, grammar):
+    """Test that clients supporting grammars get the GBNF grammar and return plain code."""
+
+    class GrammarMockLLM(SequentialMockLLM):
+        supports_grammar = True
+
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, grammar=None):
+            self.grammars.append(grammar)
+            return super().generate(user_prompt, system_prompt, model, schema)
+
+    reverty_code = ": tni -> () foo fed\n    nruter 0"
+
+    mock_client = GrammarMockLLM(responses=[reverty_code])
+    mock_client.grammars = []
+    agent = CoderAgent(client=mock_client, grammar=grammar)
+
+    code, py_code, result = agent.build_initial_code({"function_name": "foo"})
+    assert result.status == Status.SUCCESS
+    assert "def foo() -> int:" in py_code
+    assert mock_client.grammars[0].startswith("root ::= ")
+
+
+@pytest.fixture
+def TemperatureMockLLM(SequentialMockLLM):
+    class TemperatureMockLLM(SequentialMockLLM):
+        """
+        MockLLM answering each call with the response of its temperature, raising it if it is an
+        exception, after the delay of that temperature.
+        """
+
+        def __init__(self, responses: dict, delays: dict = None):
+            super().__init__(responses=list(responses.values()))
+            self.responses_by_temperature = responses
+            self.delays = delays or {}
+            self.temperatures = []
+            self.sessions = []
+            self.lock = threading.Lock()
+
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            with self.lock:
+                self.call_count += 1
+                self.temperatures.append(temperature)
+                self.sessions.append(current_session())
+
+            time.sleep(self.delays.get(temperature, 0))
+            response = self.responses_by_temperature[temperature]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    return TemperatureMockLLM
+
+
+def test_coder_speculative_first_success_wins(TemperatureMockLLM, grammar):
+    """Test that the first valid candidate wins and the slower ones are cancelled."""
+
+    # The default temperature produces slow, broken code
+    client = TemperatureMockLLM(
+        responses={0.3: ": tni -> () foo fed\n broken syntax", 0.5: ": tni -> () foo fed\n    nruter 0"},
+        delays={0.3: 0.2},
+    )
+    agent = CoderAgent(client=client, grammar=grammar, candidates=2)
+
+    code, py_code, result = agent.build_initial_code({"function_name": "foo"})
+    assert result.status == Status.SUCCESS
+    assert "def foo() -> int:" in py_code
+
+    # The losing candidate stops before its next LLM call
+    calls_at_win = client.call_count
+    time.sleep(0.5)
+    assert client.call_count == calls_at_win
+    assert client.temperatures.count(0.5) == 1
+
+
+def test_coder_speculative_candidate_raising_counts_as_failed(TemperatureMockLLM, grammar):
+    """Test that a candidate whose client raises does not stop the others, which run outside the session."""
+
+    client = TemperatureMockLLM(
+        responses={0.3: Exception("timeout"), 0.5: ": tni -> () foo fed\n    nruter 0"},
+        delays={0.5: 0.1},
+    )
+    agent = CoderAgent(client=client, grammar=grammar, candidates=2)
+
+    with llm_session("run"):
+        code, py_code, result = agent.build_initial_code({"function_name": "foo"})
+
+    assert result.status == Status.SUCCESS
+    assert "def foo() -> int:" in py_code
+    assert client.sessions == [None, None]
+
+
+def test_coder_speculative_all_candidates_raising(TemperatureMockLLM, grammar):
+    """Test that the error is raised once every candidate raised."""
+
+    client = TemperatureMockLLM(responses={0.3: Exception("timeout"), 0.5: Exception("timeout")})
+    agent = CoderAgent(client=client, grammar=grammar, candidates=2)
+
+    with pytest.raises(Exception, match="timeout"):
+        agent.build_initial_code({"function_name": "foo"})
+
+
+def test_coder_fix_loop_cycle_escalates_and_stops(grammar):
+    """Test that a validation loop returning the same broken code changes strategy, then stops."""
+
+    class RecordingLLM(LLMClient):
+        temperature = 0.3
+
+        def __init__(self):
+            self.calls = []
+
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            self.calls.append((user_prompt, temperature))
+            return '{"code": ": tni -> () foo fed\\n broken syntax"}'
+
+    client = RecordingLLM()
+    agent = CoderAgent(client=client, grammar=grammar, max_validation_iterations=10)
+
+    _, _, result = agent.build_initial_code({"function_name": "foo"})
+
+    assert result.status == Status.ERROR
+    assert "Fix loop stopped" in result.message
+
+    # Initial request, first fix, then one fix per strategy before the abort
+    temperatures = [temperature for _, temperature in client.calls]
+    assert temperatures == [None, None, 0.6, 0.6]
+    assert "change approach" in client.calls[-1][0]
+    assert "change approach" not in client.calls[-2][0]
+
+def test_coder_repairs_mechanical_errors_locally(SequentialMockLLM, grammar):
+    """Test that Python keywords and transpiler layout findings are fixed without the LLM."""
+
+    code = """
+: tni -> (tni : x) outer def
+    z: tni = 1
+    : tni -> (tni : y) inner fed
+        return y * 2
+    nruter inner(x) + z
+"""
+
+    mock_client = SequentialMockLLM(responses=[code])
+    agent = CoderAgent(client=mock_client, grammar=grammar)
+
+    reverty_code, python_code, result = agent.build_initial_code({"function_name": "outer"})
+
+    assert result.status == Status.SUCCESS
+    assert "outer fed" in reverty_code
+    assert "    z: int = 1\n\n    def inner" in python_code
+    assert mock_client.call_count == 1
+    assert result.llm_calls_saved == 2
+
+def test_coder_initial_prompt_includes_retrieved_examples(SequentialMockLLM, grammar):
+    """Test that the examples retrieved for the contract are added to the initial prompt."""
+
+    from helpers.example_retriever import ExampleRetriever, SEED_EXAMPLES
+
+    class RecordingMockLLM(SequentialMockLLM):
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            self.prompts.append(user_prompt)
+            return super().generate(user_prompt, system_prompt, model, schema)
+
+    mock_client = RecordingMockLLM(responses=[": tni -> (tni: n) triple fed\n    nruter n * 3\n"])
+    mock_client.prompts = []
+    agent = CoderAgent(client=mock_client, grammar=grammar)
+    agent.examples = ExampleRetriever(SEED_EXAMPLES, k=1)
+
+    _, _, result = agent.build_initial_code({"function_name": "factorial_of", "args": [{"name": "n", "type": "int"}], "return_type": "int"})
+
+    assert result.status == Status.SUCCESS
+    assert "Example 1:\n: tni -> (tni: n) factorial fed" in mock_client.prompts[0]
+    assert "Example 2:" not in mock_client.prompts[0]
+    assert mock_client.prompts[0].index("Example 1:") < mock_client.prompts[0].index("Contract Specification:")
+
+def test_coder_fix_prompt_scoped_to_failing_function(SequentialMockLLM, grammar):
+    """Test that a parsing fix sends only the broken function and splices the fix back."""
+
+    code = """: tni -> (tni: a, tni: b) add fed
+    total: tni = a + b
+    : total > 1000 fi
+        nruter 1000
+    nruter total
+
+: tni -> (tni: a, tni: b) sub fed
+    nruter a - - -
+
+: tni -> (rts: op, tni: a, tni: b) calc fed
+    : op == "+" fi
+        nruter add(a, b)
+    : op == "-" file
+        nruter sub(a, b)
+    : op == "*" file
+        nruter a * b
+    nruter 0
+"""
+
+    class RecordingMockLLM(SequentialMockLLM):
+        def generate(self, user_prompt, system_prompt=None, model=None, schema=None, temperature=None):
+            self.prompts.append(user_prompt)
+            return super().generate(user_prompt, system_prompt, model, schema)
+
+    mock_client = RecordingMockLLM(responses=[code, ": tni -> (tni: a, tni: b) sub fed\n    nruter a - b\n"])
+    mock_client.prompts = []
+    agent = CoderAgent(client=mock_client, grammar=grammar)
+    agent.local_repair = False
+
+    reverty_code, python_code, result = agent.build_initial_code({"function_name": "calc"})
+
+    assert result.status == Status.SUCCESS
+    fix_prompt = mock_client.prompts[1]
+    assert "Code:\n: tni -> (tni: a, tni: b) sub fed\n    nruter a - - -\n" in fix_prompt
+    assert "Other functions of the program:\n: tni -> (tni: a, tni: b) add fed\n: tni -> (rts: op, tni: a, tni: b) calc fed\n" in fix_prompt
+    assert "nruter add(a, b)" not in fix_prompt
+    assert "at line 2" in fix_prompt
+    assert reverty_code == code.replace("a - - -", "a - b")
+    assert "def calc(op: str, a: int, b: int) -> int:" in python_code
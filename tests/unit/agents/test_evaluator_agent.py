@@ -70,3 +70,30 @@ def test_evaluator_broken_response(SequentialMockLLM):
 
     result = agent.evaluate_request("test")
     assert result == 5
+
+def test_evaluator_out_of_range_complexity(SequentialMockLLM):
+    """Test that a complexity outside the schema range is rejected and retried."""
+    
+    mock_client = SequentialMockLLM(responses=['{"complexity": 42}', '{"complexity": 4}'])
+    agent = EvaluatorAgent(client=mock_client)
+
+    result = agent.evaluate_request("task")
+    assert result == 4
+    assert mock_client.call_count == 2
+
+def test_evaluator_uses_confident_local_estimate(SequentialMockLLM, tmp_path):
+    """Test that a confident local estimate skips the LLM and an unsure one is logged."""
+
+    import json
+    from helpers.complexity_estimator import ComplexityEstimator, read_evaluation_log
+
+    log_path = str(tmp_path / "evaluations.jsonl")
+    mock_client = SequentialMockLLM(responses=[json.dumps({"complexity": 7})])
+    agent = EvaluatorAgent(mock_client, estimator=ComplexityEstimator.from_log(), confidence_threshold=0.75, evaluation_log=log_path)
+
+    assert agent.evaluate_request("Write a function that sums two numbers.") == 1
+    assert mock_client.call_count == 0
+
+    assert agent.evaluate_request("Implement a REST API client with retries and caching") == 7
+    assert mock_client.call_count == 1
+    assert [record["complexity"] for record in read_evaluation_log(log_path)] == [7]
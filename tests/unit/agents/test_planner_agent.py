@@ -0,0 +1,34 @@
+import json
+import pytest
+from agents.planner_agent import PlannerAgent
+
+@pytest.fixture
+def SequentialMockLLM(mock_llm):
+    return mock_llm
+
+def test_planner_returns_complexity_and_contract(SequentialMockLLM):
+    """Test that a single call returns both complexity and contract."""
+
+    response = json.dumps({
+        "complexity": 2,
+        "reasoning": "simple sum",
+        "function_name": "add",
+        "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}],
+        "return_type": "int",
+    })
+    mock_client = SequentialMockLLM(responses=[response])
+    agent = PlannerAgent(mock_client)
+
+    complexity, contract = agent.plan_request("Sum two numbers")
+
+    assert complexity == 2
+    assert contract["function_name"] == "add"
+    assert "reasoning" not in contract
+    assert mock_client.call_count == 1
+
+def test_planner_rejects_invalid_plan(SequentialMockLLM):
+    """Test that a plan without complexity or contract is rejected."""
+
+    for response in (json.dumps({"complexity": 3}), json.dumps({"function_name": "add"}), "Sorry, I cannot help."):
+        agent = PlannerAgent(SequentialMockLLM(responses=[response]))
+        assert agent.plan_request("Sum two numbers") is None
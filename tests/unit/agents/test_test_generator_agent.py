@@ -38,3 +38,38 @@ def test_test_generator_fix_tests(SequentialMockLLM):
     tests = agent.fix_tests(contract, python_code, errors)
     assert expected_tests in tests
     assert mock_client.call_count == 1
+
+def test_test_generator_build_tests_from_contract(SequentialMockLLM):
+    """Test generating tests before the implementation exists."""
+
+    contract = {"function_name": "add", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}]}
+    expected_tests = "from implementation import add\n\ndef test_add(): assert add(1, 1) == 2"
+
+    mock_client = SequentialMockLLM(responses=[json.dumps({"code": expected_tests})])
+    agent = TestGeneratorAgent(client=mock_client)
+
+    tests = agent.build_tests_from_contract(contract)
+    assert expected_tests in tests
+    assert mock_client.call_count == 1
+
+def test_test_generator_reconcile_tests():
+    """Test adapting contract tests to the signature of the implementation."""
+
+    agent = TestGeneratorAgent(client=None)
+    contract = {"function_name": "sub", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}]}
+    tests = "from implementation import sub\n\ndef test_sub():\n    assert sub(5, 3) == 2\n    assert sub(a=1, b=1) == 0\n"
+
+    # Matching signature: the tests are kept as they are
+    assert agent.reconcile_tests(contract, "def sub(a: int, b: int) -> int:\n    return a - b\n", tests) == tests
+
+    # Renamed function with reversed parameters: imported under the contract name, called by keyword
+    adapted = agent.reconcile_tests(contract, "def subtract(b: int, a: int) -> int:\n    return a - b\n", tests)
+    namespace = {}
+    exec(adapted.replace("from implementation import subtract as sub", "subtract = lambda b, a: a - b\nsub = subtract"), namespace)
+    namespace["test_sub"]()
+    assert "from implementation import subtract as sub" in adapted
+    assert "sub(a=5, b=3)" in adapted
+
+    # Different parameters cannot be reconciled
+    assert agent.reconcile_tests(contract, "def sub(x: int, y: int) -> int:\n    return x - y\n", tests) is None
+    assert agent.reconcile_tests(contract, "def sub(a: int, b: int) -> int:\n    return a - b\n", "def broken(:\n") is None
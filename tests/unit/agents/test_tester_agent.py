@@ -53,3 +53,43 @@ def test_tester_agent_failure(SequentialMockLLM):
     assert result["status"] == Status.ERROR.value
     assert result["code_failures"] == "SyntaxError"
     assert mock_client.call_count == 1
+
+def test_tester_agent_local_triage(SequentialMockLLM):
+    """Test that failures with an obvious culprit are blamed without calling the LLM."""
+
+    mock_client = SequentialMockLLM(responses=[])
+    agent = TesterAgent(client=mock_client)
+
+    contract = {"function_name": "add", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}], "return_type": "int"}
+    python_code = "def add(a: int, b: int) -> int:\n    return a + b\n"
+    tests = "from implementation import add\n\ndef test_add():\n    assert sum_numbers(1, 2) == 3\n"
+
+    result = agent.test(contract, python_code, "reverty", tests)
+
+    assert result["status"] == Status.ERROR.value
+    assert result["code_failures"] is None
+    assert "NameError" in result["test_failures"]
+    assert result["llm_calls_saved"] == 1
+    assert mock_client.call_count == 0
+
+def test_tester_agent_ambiguous_failure_asks_llm(SequentialMockLLM):
+    """Test that a plain value mismatch is still analyzed by the LLM."""
+
+    analysis_json = json.dumps({
+        "status": Status.ERROR.value,
+        "code_failures": "add subtracts instead of adding",
+        "test_failures": None
+    })
+
+    mock_client = SequentialMockLLM(responses=[analysis_json])
+    agent = TesterAgent(client=mock_client)
+
+    contract = {"function_name": "add", "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}], "return_type": "int"}
+    python_code = "def add(a: int, b: int) -> int:\n    return a - b\n"
+    tests = "from implementation import add\n\ndef test_add():\n    assert add(1, 2) == 3\n"
+
+    result = agent.test(contract, python_code, "reverty", tests)
+
+    assert result["code_failures"] == "add subtracts instead of adding"
+    assert "llm_calls_saved" not in result
+    assert mock_client.call_count == 1
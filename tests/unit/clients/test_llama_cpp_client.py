@@ -0,0 +1,54 @@
+from clients.llama_cpp_client import LlamaCppClient
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeRequests:
+    """
+    Records every POST and answers with a chat completion.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append((url, json))
+        return FakeResponse({"choices": [{"message": {"content": self.content}}]})
+
+
+def test_generate_sends_grammar():
+    """Test that a GBNF grammar is forwarded to the server."""
+
+    client = LlamaCppClient(base_url="http://llama")
+    client.requests = FakeRequests("nruter 1")
+
+    assert client.generate("Hi", system_prompt="System", grammar='root ::= "a"') == "nruter 1"
+
+    url, payload = client.requests.calls[0]
+    assert url == "http://llama/v1/chat/completions"
+    assert payload["grammar"] == 'root ::= "a"'
+    assert "response_format" not in payload
+    assert [m["role"] for m in payload["messages"]] == ["system", "user"]
+
+
+def test_generate_sends_schema_without_grammar():
+    """Test that a JSON schema is used when no grammar is given."""
+
+    client = LlamaCppClient()
+    client.requests = FakeRequests("{}")
+    schema = {"type": "object"}
+
+    client.generate("Hi", schema=schema)
+
+    payload = client.requests.calls[0][1]
+    assert payload["response_format"] == {"type": "json_object", "schema": schema}
+    assert "grammar" not in payload
@@ -0,0 +1,190 @@
+import pytest
+from clients.ollama_client import OllamaClient, parse_latency
+from helpers.run_context import llm_session
+from config import OLLAMA_LATENCY_HISTORY
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeRequests:
+    """
+    Records every POST and answers with predefined payloads.
+    """
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append((url, json))
+        return FakeResponse(self.payloads[min(len(self.calls), len(self.payloads)) - 1])
+
+
+OLLAMA_RESULT = {
+    "message": {"role": "assistant", "content": "hello"},
+    "total_duration": 5_000_000_000,
+    "load_duration": 3_000_000_000,
+    "prompt_eval_duration": 1_000_000_000,
+    "eval_duration": 500_000_000,
+    "prompt_eval_count": 120,
+    "eval_count": 8,
+}
+
+
+@pytest.fixture
+def client():
+    return OllamaClient(model="test-model", keep_alive="10m")
+
+
+def test_parse_latency():
+    """Test conversion of Ollama timing fields to milliseconds."""
+
+    latency = parse_latency(OLLAMA_RESULT)
+    assert latency.total_ms == 5000
+    assert latency.load_ms == 3000
+    assert latency.prompt_eval_ms == 1000
+    assert latency.eval_ms == 500
+    assert latency.prompt_eval_count == 120
+    assert latency.eval_count == 8
+
+
+def test_generate_records_latency_and_keep_alive(client):
+    """Test that generate sends keep_alive and stores the latency breakdown."""
+
+    client.requests = FakeRequests([OLLAMA_RESULT])
+
+    assert client.generate("Hi", system_prompt="System") == "hello"
+
+    url, payload = client.requests.calls[0]
+    assert url.endswith("/api/chat")
+    assert payload["keep_alive"] == "10m"
+    assert payload["model"] == "test-model"
+    assert client.last_latency.load_ms == 3000
+    assert len(client.latencies) == 1
+    assert client.latencies.maxlen == OLLAMA_LATENCY_HISTORY
+
+
+def test_warmup_preloads_and_runs_tiny_prompt(client):
+    """Test the warmup sequence: empty preload request followed by a one-token prompt."""
+
+    client.requests = FakeRequests([{"load_duration": 2_000_000_000}, {"total_duration": 100_000_000}])
+
+    client.warmup(background=True)
+    assert client.wait_for_warmup(timeout=5)
+
+    (preload_url, preload), (warmup_url, warmup) = client.requests.calls
+    assert preload_url.endswith("/api/generate")
+    assert "prompt" not in preload
+    assert preload["keep_alive"] == "10m"
+    assert warmup["options"]["num_predict"] == 1
+
+
+def test_warmup_errors_are_not_raised(client):
+    """Test that a failing warmup does not break the client."""
+
+    client.requests = FakeRequests([{"error": "model not found"}])
+    client.requests.post = lambda *args, **kwargs: FakeResponse({}, status_code=404)
+
+    client.warmup(background=False)
+    assert client.wait_for_warmup()
+
+
+def test_session_mode_continues_conversation():
+    """Test that calls with the same system prompt continue the previous turn."""
+
+    client = OllamaClient(model="test-model", session_mode=True)
+    client.requests = FakeRequests([OLLAMA_RESULT])
+
+    with llm_session("run"):
+        client.generate("first", system_prompt="Coder")
+        client.generate("fix it", system_prompt="Coder")
+        client.generate("other agent", system_prompt="Tester")
+
+    first, second, other = [payload["messages"] for _, payload in client.requests.calls]
+    assert [m["content"] for m in first] == ["Coder", "first"]
+    assert [m["content"] for m in second] == ["Coder", "first", "hello", "fix it"]
+    assert [m["content"] for m in other] == ["Tester", "other agent"]
+
+    # The shared prefix must be sent unchanged
+    assert second[: len(first)] == first
+
+
+def test_session_mode_starts_over_at_the_limit():
+    """Test that a full conversation starts over instead of sliding, so every call extends the previous prefix."""
+
+    client = OllamaClient(model="test-model", session_mode=True, session_max_turns=2)
+    client.requests = FakeRequests([OLLAMA_RESULT])
+
+    with llm_session("run"):
+        for prompt in ("one", "two", "three", "four"):
+            client.generate(prompt, system_prompt="Coder")
+
+    sent = [payload["messages"] for _, payload in client.requests.calls]
+    assert [[m["content"] for m in messages] for messages in sent] == [
+        ["Coder", "one"],
+        ["Coder", "one", "hello", "two"],
+        ["Coder", "three"],
+        ["Coder", "three", "hello", "four"],
+    ]
+
+    # Within a conversation, every call sends the previous messages unchanged as its prefix
+    for previous, current in ((sent[0], sent[1]), (sent[2], sent[3])):
+        assert current[: len(previous)] == previous
+
+
+def test_session_mode_keeps_one_conversation_per_run():
+    """Test that runs sharing a system prompt do not share turns, and that ending one keeps the others."""
+
+    client = OllamaClient(model="test-model", session_mode=True)
+    client.requests = FakeRequests([OLLAMA_RESULT])
+
+    with llm_session("first"):
+        client.generate("one", system_prompt="Coder")
+    with llm_session("second"):
+        client.generate("other run", system_prompt="Coder")
+    client.generate("outside a run", system_prompt="Coder")
+
+    client.end_session("second")
+    with llm_session("first"):
+        client.generate("two", system_prompt="Coder")
+    with llm_session("second"):
+        client.generate("fresh", system_prompt="Coder")
+
+    sent = [[m["content"] for m in payload["messages"]] for _, payload in client.requests.calls]
+    assert sent[1] == ["Coder", "other run"]
+    assert sent[2] == ["Coder", "outside a run"]
+    assert sent[3] == ["Coder", "one", "hello", "two"]
+    assert sent[4] == ["Coder", "fresh"]
+
+
+def test_stateless_mode_sends_no_history(client):
+    """Test that the default mode never sends previous turns."""
+
+    client.requests = FakeRequests([OLLAMA_RESULT])
+
+    with llm_session("run"):
+        client.generate("one", system_prompt="Coder")
+        client.generate("two", system_prompt="Coder")
+
+    assert len(client.requests.calls[-1][1]["messages"]) == 2
+
+
+def test_generate_sends_schema_as_format(client):
+    """Test that a JSON schema is forwarded as Ollama's structured output format."""
+
+    client.requests = FakeRequests([OLLAMA_RESULT])
+    schema = {"type": "object", "properties": {"code": {"type": "string"}}}
+
+    client.generate("Hi", system_prompt="System", schema=schema)
+    client.generate("Hi", system_prompt="System")
+
+    assert client.requests.calls[0][1]["format"] == schema
+    assert "format" not in client.requests.calls[1][1]
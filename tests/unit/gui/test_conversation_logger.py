@@ -0,0 +1,91 @@
+import os
+import pytest
+from contextlib import nullcontext
+from gui.conversation_logger import ConversationLog, LogView
+
+
+class FakePlaceholder:
+    """Placeholder recording the containers built by the view."""
+
+    def __init__(self):
+        self.containers = 0
+
+    def container(self, height, border):
+        self.containers += 1
+        return nullcontext()
+
+
+@pytest.fixture
+def log(tmp_path):
+    return ConversationLog(max_entries=3, spill_dir=str(tmp_path))
+
+
+def test_log_keeps_newest_entries_and_spills_the_oldest(log):
+    """Test that past the cap the oldest messages move to disk and the export still has every message."""
+
+    for i in range(5):
+        log.append(f"message {i}")
+
+    assert [entry.sequence for entry in log.entries] == [2, 3, 4]
+    assert log.spilled == 2
+    assert log.text() == "message 2\n\nmessage 3\n\nmessage 4\n\n"
+    assert log.export() == "".join(f"message {i}\n\n" for i in range(5))
+
+
+def test_since_returns_entries_from_a_sequence_number(log):
+    """Test that since() skips the entries already read, also after a spill."""
+
+    for i in range(4):
+        log.append(i)
+
+    assert [entry.message for entry in log.since(2)] == ["2", "3"]
+    assert [entry.message for entry in log.since(0)] == ["1", "2", "3"]
+    assert log.since(4) == []
+
+
+def test_clear_removes_spill_file_and_keeps_sequence(log):
+    """Test that a cleared log starts empty without reusing sequence numbers."""
+
+    for i in range(4):
+        log.append(i)
+    spill_path = log.spill_path
+
+    log.clear()
+    entry = log.append("next run")
+
+    assert spill_path is not None and not os.path.exists(spill_path)
+    assert entry.sequence == 4
+    assert log.export() == "next run\n\n"
+
+
+def test_view_renders_only_new_entries(tmp_path):
+    """Test that every update renders the messages appended since the previous one."""
+
+    log = ConversationLog(max_entries=100, spill_dir=str(tmp_path))
+    rendered, placeholder = [], FakePlaceholder()
+    view = LogView(log, placeholder, max_entries=10, render_entry=lambda entry: rendered.append(entry.message))
+
+    for i in range(5):
+        log.append(i)
+        view.update()
+    view.update()
+
+    assert rendered == ["0", "1", "2", "3", "4"]
+    assert placeholder.containers == 1
+
+
+def test_view_rebuilds_with_newest_half_at_the_cap(tmp_path):
+    """Test that the view is rebuilt with the newest messages once its cap is reached."""
+
+    log = ConversationLog(max_entries=100, spill_dir=str(tmp_path))
+    rendered, hidden, placeholder = [], [], FakePlaceholder()
+    view = LogView(log, placeholder, max_entries=4, render_entry=lambda entry: rendered.append(entry.message), render_hidden=hidden.append)
+
+    for i in range(5):
+        log.append(i)
+        view.update()
+
+    assert rendered == ["0", "1", "2", "3", "3", "4"]
+    assert hidden == [3]
+    assert placeholder.containers == 2
+    assert view.shown == 2
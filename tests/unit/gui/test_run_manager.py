@@ -0,0 +1,123 @@
+import threading
+import pytest
+from helpers.cancellation import RunCancelled, cancellation, check_cancelled
+from helpers.enums import EventType, OrchestratorEvent, OrchestratorResult, Status
+from gui.run_manager import RunManager
+
+
+class FakeOrchestrator:
+    """Orchestrator emitting a few events, then running the given step."""
+
+    step = staticmethod(lambda cancel: None)
+
+    def __init__(self, on_log=None, on_event=None, **options):
+        self.on_log = on_log
+        self.on_event = on_event
+        self.options = options
+
+    def run(self, user_prompt, cancel=None):
+        self.on_log(f"Generating {user_prompt}")
+        self.on_event(OrchestratorEvent(EventType.ITERATION, "run", data=1))
+        self.on_event(OrchestratorEvent(EventType.CODE, "run", data={"reverty_code": "edoc", "python_code": "code"}))
+        try:
+            with cancellation(cancel):
+                self.step(cancel)
+        except RunCancelled:
+            return OrchestratorResult(Status.CANCELLED, "Run cancelled.")
+        return OrchestratorResult(Status.SUCCESS, str(self.options))
+
+
+def orchestrator_with(step):
+    return type("StepOrchestrator", (FakeOrchestrator,), {"step": staticmethod(step)})
+
+
+@pytest.fixture
+def manager_factory():
+    managers = []
+
+    def build(step=lambda cancel: None, max_workers=2):
+        manager = RunManager(max_workers=max_workers, orchestrator_factory=orchestrator_with(step))
+        managers.append(manager)
+        return manager
+
+    yield build
+    for manager in managers:
+        manager.shutdown()
+
+
+def test_run_streams_log_and_progress(manager_factory):
+    """Test that a run fills its log and progress from the worker and returns the result."""
+
+    handle = manager_factory().submit("add", temperature=0.5)
+    handle.future.result(timeout=5)
+
+    progress = handle.progress()
+    assert handle.done and handle.error is None
+    assert handle.result.status == Status.SUCCESS
+    assert "'temperature': 0.5" in handle.result.message
+    assert handle.log.text() == "Generating add\n\n"
+    assert (progress.iteration, progress.reverty_code, progress.python_code) == (1, "edoc", "code")
+    assert progress.stage == "Generating tests"
+    assert progress.version >= 2
+
+
+def test_cancel_stops_running_run(manager_factory):
+    """Test that cancelling a running run stops it at its next check."""
+
+    started = threading.Event()
+
+    def step(cancel):
+        started.set()
+        cancel.wait(5)
+        check_cancelled()
+
+    handle = manager_factory(step).submit("add")
+    assert started.wait(5)
+    handle.cancel()
+    handle.future.result(timeout=5)
+
+    assert handle.cancelled
+    assert handle.result.status == Status.CANCELLED
+
+
+def test_sessions_run_concurrently_and_queued_run_can_be_cancelled(manager_factory):
+    """Test that runs of different sessions overlap, and that a queued run cancelled never starts."""
+
+    barrier = threading.Barrier(2, timeout=5)
+    manager = manager_factory(lambda cancel: barrier.wait(), max_workers=2)
+
+    first, second = manager.submit("first"), manager.submit("second")
+    queued = manager.submit("third")
+    queued.cancel()
+
+    assert first.future.result(timeout=5).success
+    assert second.future.result(timeout=5).success
+    assert queued.done and queued.result is None and queued.error is None
+    assert len(queued.log.entries) == 0
+
+
+def test_runs_share_resources_loaded_once(monkeypatch, tmp_path):
+    """Test that the store, retriever and estimator are loaded by the first run enabling them only."""
+
+    monkeypatch.setattr("gui.run_manager.solution_store_path", str(tmp_path / "solutions.jsonl"))
+    monkeypatch.setattr("gui.run_manager.evaluation_log_path", str(tmp_path / "evaluations.jsonl"))
+
+    built = []
+
+    class RecordingOrchestrator(FakeOrchestrator):
+        def __init__(self, **options):
+            super().__init__(**options)
+            built.append(self.options)
+
+    manager = RunManager(max_workers=1, orchestrator_factory=RecordingOrchestrator)
+    try:
+        manager.submit("plain").future.result(timeout=5)
+        for prompt in ("first", "second"):
+            manager.submit(prompt, solution_store=True, few_shot=True, local_estimator=True).future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    plain, first, second = built
+    assert not {"store", "examples", "estimator"} & plain.keys()
+    for name in ("store", "examples", "estimator"):
+        assert first[name] is second[name]
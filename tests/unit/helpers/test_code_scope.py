@@ -0,0 +1,85 @@
+from helpers.code_scope import failing_functions, python_functions, renumber_errors, reverty_functions, scope_code, splice_functions
+from helpers.enums import ErrorType
+
+CODE = """# calculator
+: tni -> (tni: a, tni: b) add fed
+    nruter a + b
+
+: tni -> (tni: a, tni: b) sub fed
+    nruter a - b
+
+: tni -> (rts: op, tni: a, tni: b) calc fed
+    : op == "+" fi
+        nruter add(a, b)
+    nruter sub(a, b)
+"""
+
+PYTHON = """def add(a: int, b: int) -> int:
+    return a + b
+
+
+def sub(a: int, b: int) -> int:
+    return a - b
+
+
+def calc(op: str, a: int, b: int) -> int:
+    if op == "+":
+        return add(a, b)
+    return sub(a, b)
+"""
+
+
+def test_reverty_functions_spans():
+    """Test that top-level functions are found without parsing, comments excluded."""
+
+    assert reverty_functions(CODE) == [("add", 1, 2), ("sub", 4, 5), ("calc", 7, 10)]
+    assert reverty_functions(CODE.replace("nruter a - b", "return a - b"))[1] == ("sub", 4, 5)
+
+
+def test_failing_functions_from_lines_and_frames():
+    """Test that parsing errors map to Reverty lines and the other errors to Python lines or frames."""
+
+    assert failing_functions("Unexpected token at line 6, column 12.", CODE, error_type=ErrorType.PARSING.value) == {"sub"}
+    assert failing_functions("Line 6:5: E225 missing whitespace", CODE, PYTHON, ErrorType.LINTING.value) == {"sub"}
+    assert failing_functions("implementation.py:6: in sub\nE   TypeError", CODE, PYTHON) == {"sub"}
+
+
+def test_failing_functions_without_frames_blame_entry_callees():
+    """Test that a test failure without implementation frames scopes to the entry and its callees."""
+
+    assert failing_functions("assert 3 == 4", CODE, PYTHON, entry="add") == {"add"}
+    assert failing_functions("assert 3 == 4", CODE, PYTHON, entry="calc") == {"add", "sub", "calc"}
+
+
+def test_scope_code_and_renumber_errors():
+    """Test that the scoped code holds the failing functions and the errors their lines."""
+
+    scope = scope_code(CODE, PYTHON, {"sub"})
+
+    assert scope.reverty_code == ": tni -> (tni: a, tni: b) sub fed\n    nruter a - b\n"
+    assert scope.python_code == "def sub(a: int, b: int) -> int:\n    return a - b\n"
+    assert scope.signatures == [": tni -> (tni: a, tni: b) add fed", ": tni -> (rts: op, tni: a, tni: b) calc fed"]
+    assert renumber_errors("Line 6:5: E225", scope, ErrorType.LINTING.value) == "Line 2:5: E225"
+    assert renumber_errors("Unexpected token at line 6, column 12.", scope, ErrorType.PARSING.value) == "Unexpected token at line 2, column 12."
+
+
+def test_scope_code_not_worth_it():
+    """Test that single-function programs and scopes covering every function are sent whole."""
+
+    assert scope_code(": tni -> (tni: n) f fed\n    nruter n\n", "", {"f"}) is None
+    assert scope_code(CODE, PYTHON, {"add", "sub", "calc"}) is None
+    assert scope_code(CODE, PYTHON, {"unknown"}) is None
+    assert python_functions("def (:") == []
+
+
+def test_splice_functions():
+    """Test that fixed functions replace the scoped ones and new functions follow them."""
+
+    scope = scope_code(CODE, PYTHON, {"add", "sub"})
+    replacement = ": tni -> (tni: a, tni: b) sub fed\n    nruter a - b - 0\n\n: tni -> (tni: a) neg fed\n    nruter 0 - a\n"
+
+    spliced = splice_functions(CODE, scope, replacement)
+
+    assert "nruter a + b" in spliced
+    assert "nruter a - b - 0\n\n: tni -> (tni: a) neg fed\n    nruter 0 - a\n\n: tni -> (rts: op" in spliced
+    assert spliced.startswith("# calculator\n")
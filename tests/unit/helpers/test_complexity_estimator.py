@@ -0,0 +1,42 @@
+import json
+from helpers.complexity_estimator import ComplexityEstimator, extract_features, log_evaluation, read_evaluation_log
+
+
+def test_estimator_is_confident_on_trivial_requests():
+    """Test that the seeded estimator rates simple requests confidently."""
+
+    estimator = ComplexityEstimator.from_log()
+
+    estimate = estimator.estimate("Write a function that sums two numbers.")
+    assert estimate.complexity <= 2
+    assert estimate.confidence > 0.9
+
+    # Unknown wording is left to the LLM
+    assert estimator.estimate("Implement a REST API client with retries and caching").confidence < 0.75
+
+
+def test_estimator_learns_from_logged_evaluations(tmp_path):
+    """Test that logged evaluator outputs are learned and malformed lines skipped."""
+
+    log_path = str(tmp_path / "logs" / "evaluations.jsonl")
+    for _ in range(5):
+        log_evaluation(log_path, "Build a websocket chat server with rooms", 8, 1.5)
+    with open(log_path, "a", encoding="utf-8") as file:
+        file.write("{truncated\n" + json.dumps({"prompt": "no complexity"}) + "\n")
+
+    assert len(read_evaluation_log(log_path)) == 5
+
+    estimate = ComplexityEstimator.from_log(log_path).estimate("Build a websocket chat server with rooms")
+    assert estimate.complexity == 8
+    assert estimate.confidence > 0.9
+
+
+def test_extract_features():
+    """Test the lexical features of a prompt."""
+
+    features = extract_features("Write a function that reverses a string.")
+
+    assert "word:reverses" in features
+    assert "word:function" not in features
+    assert "group:trivial" in features
+    assert "length:short" in features
@@ -0,0 +1,51 @@
+import json
+from dataclasses import asdict
+from helpers.enums import Status, StoredSolution
+from helpers.example_retriever import ExampleRetriever, SEED_EXAMPLES, contract_terms, estimate_tokens
+
+
+def test_seed_examples_are_valid_reverty(parser):
+    """Test that every seed example parses: they are shown to the model as valid code."""
+
+    for _, reverty_code in SEED_EXAMPLES:
+        assert parser.run(reverty_code).status == Status.SUCCESS
+
+
+def test_contract_terms_split_names():
+    """Test that names are split into words and filler words are dropped."""
+
+    terms = contract_terms({"function_name": "sumOfSquares", "args": [{"name": "max_value", "type": "int"}], "docstring": "Returns the sum"})
+
+    assert terms == ["sum", "squares", "max", "int", "sum"]
+
+
+def test_retrieve_most_similar_within_budget():
+    """Test that the closest contracts come first and the examples fit the token budget."""
+
+    retriever = ExampleRetriever(SEED_EXAMPLES, k=2)
+    contract = {"function_name": "fibonacci_sequence", "args": [{"name": "n", "type": "int"}], "return_type": "int", "docstring": "n-th Fibonacci number"}
+
+    examples = retriever.retrieve(contract)
+
+    assert len(examples) == 2
+    assert "fibonacci fed" in examples[0]
+
+    small = ExampleRetriever(SEED_EXAMPLES, k=3, max_tokens=estimate_tokens(SEED_EXAMPLES[5][1]))
+    assert small.retrieve({"function_name": "average", "return_type": "float"}) == [SEED_EXAMPLES[5][1]]
+
+
+def test_from_store_adds_past_solutions(tmp_path):
+    """Test that the solutions of the solution store are indexed after the seeds."""
+
+    path = tmp_path / "solutions.jsonl"
+    solution = StoredSolution(prompt="power", contract={"function_name": "power", "args": [{"name": "base", "type": "int"}]}, reverty_code=": tni -> (tni: base) power fed\n    nruter base * base\n", python_code="", tests="")
+    path.write_text(json.dumps(asdict(solution)) + "\nnot json\n")
+
+    retriever = ExampleRetriever.from_store(str(path), k=1)
+
+    assert len(retriever) == len(SEED_EXAMPLES) + 1
+    assert retriever.retrieve({"function_name": "power", "args": [{"name": "base", "type": "int"}]}) == [solution.reverty_code]
+
+    # The same code is indexed once
+    retriever.add(solution.contract, solution.reverty_code)
+    assert len(retriever) == len(SEED_EXAMPLES) + 1
@@ -0,0 +1,31 @@
+from helpers.enums import FixStrategy
+from helpers.fingerprint import FixHistory, fingerprint
+
+
+def test_fingerprint_ignores_formatting():
+    """Test that candidates differing only by formatting have the same fingerprint."""
+
+    code = ": tni -> (tni: a) f fed\n    nruter a + 1\n"
+    reformatted = "\n: tni ->  (tni: a) f fed   \n\n    nruter a  + 1\n"
+
+    assert fingerprint(code, errors="E1\nE2") == fingerprint(reformatted, errors="E2\nE1\nE2")
+    assert fingerprint(code, errors="E1") != fingerprint(code, errors="E2")
+    assert fingerprint(code) != fingerprint(code.replace("    nruter", "        nruter"))
+
+
+def test_fix_history_escalates_on_repeats():
+    """Test that repeats and flips escalate the strategy until abort."""
+
+    history = FixHistory(max_repeats=3)
+
+    assert history.record("A", "error a") == FixStrategy.RETRY
+    assert history.record("B", "error b") == FixStrategy.RETRY
+    assert history.record("A", "error a") == FixStrategy.RAISE_TEMPERATURE
+    assert history.record("C", "error c") == FixStrategy.RAISE_TEMPERATURE
+    assert history.record("B", "error b") == FixStrategy.ADD_HISTORY
+    assert history.previous_errors() == ["error a", "error c"]
+    assert history.record("B", "error b") == FixStrategy.ABORT
+
+    disabled = FixHistory(enabled=False)
+    for _ in range(5):
+        assert disabled.record("A", "error a") == FixStrategy.RETRY
@@ -0,0 +1,96 @@
+import json
+import logging
+import pytest
+from unittest.mock import MagicMock
+from agents.agent import Agent
+from helpers.logger import JsonFormatter, SamplingFilter, configure_logging, get_logger
+
+
+@pytest.fixture(autouse=True)
+def default_logging():
+    yield
+    configure_logging()
+
+
+class Payload:
+    """Argument counting how many times it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "payload"
+
+
+def test_disabled_level_is_not_formatted(capsys):
+    """Test that a record below the level is neither formatted nor written."""
+
+    configure_logging("INFO")
+    payload = Payload()
+
+    get_logger("tools.parser").debug("[Parser] Tree: %s", payload)
+    assert payload.formatted == 0
+
+    get_logger("tools.parser").info("[Parser] Syntax OK: %s", payload)
+    assert capsys.readouterr().out == "[Parser] Syntax OK: payload\n"
+
+
+def test_component_level_overrides_root(capsys):
+    """Test that a component can log at DEBUG while the others stay at INFO."""
+
+    configure_logging("INFO", levels={"agents": "DEBUG"})
+    try:
+        get_logger("agents.coder_agent").debug("[Coder Agent] Response: code")
+        get_logger("tools.linter").debug("[Linter] Running flake8")
+    finally:
+        get_logger("agents").setLevel(logging.NOTSET)
+
+    assert capsys.readouterr().out == "[Coder Agent] Response: code\n"
+
+
+def test_sampling_keeps_one_in_n_and_all_warnings():
+    """Test that a sampled component keeps every n-th record and every warning."""
+
+    sampling = SamplingFilter({"tools": 0.25})
+
+    def record(name, level=logging.INFO):
+        return logging.makeLogRecord({"name": f"reverty.{name}", "levelno": level})
+
+    kept = [sampling.filter(record("tools.linter")) for _ in range(8)]
+
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert sampling.filter(record("tools.linter", logging.WARNING))
+    assert all(sampling.filter(record("agents.coder_agent")) for _ in range(3))
+    assert not SamplingFilter({"tools": 0}).filter(record("tools.parser"))
+
+
+def test_json_format_has_component_and_extra_fields(capsys):
+    """Test that the JSON lines hold the level, the component, the message and the extra fields."""
+
+    configure_logging("INFO", log_format="json")
+
+    get_logger("orchestrator").warning("[Orchestrator] Workflow finished. Reason: %s", "max retries reached", extra={"run_id": "abc"})
+
+    entry = json.loads(capsys.readouterr().out)
+    assert entry["level"] == "WARNING"
+    assert entry["component"] == "orchestrator"
+    assert entry["message"] == "[Orchestrator] Workflow finished. Reason: max retries reached"
+    assert entry["run_id"] == "abc"
+    assert json.loads(JsonFormatter().format(logging.makeLogRecord({"name": "other", "msg": "x"})))["component"] == "other"
+    with pytest.raises(ValueError):
+        configure_logging(log_format="xml")
+
+
+def test_agent_log_skips_callback_below_level():
+    """Test that the agent callback only receives the messages of enabled levels, formatted."""
+
+    configure_logging("INFO")
+    agent = Agent(MagicMock())
+    logs = []
+    agent.set_logger(logs.append)
+
+    agent.log("[Agent] Response: %s", "full response", level=logging.DEBUG)
+    agent.log("[Agent] Iteration %d/%d", 1, 3)
+
+    assert logs == ["[Agent] Iteration 1/3"]
@@ -0,0 +1,80 @@
+import urllib.error
+import urllib.request
+import pytest
+from helpers.metrics import MetricsRegistry, TOOL_LATENCY, serve_metrics, stop_metrics, timed
+
+
+def test_counter_renders_labelled_series():
+    """Test that a counter renders one sample per label combination."""
+
+    metrics = MetricsRegistry()
+    errors = metrics.counter("errors_total", "Errors by type.", ["error_type"])
+
+    errors.inc(error_type="parsing")
+    errors.inc(2, error_type="type checking")
+
+    text = metrics.render()
+    assert "# TYPE errors_total counter" in text
+    assert 'errors_total{error_type="parsing"} 1' in text
+    assert 'errors_total{error_type="type checking"} 2' in text
+    with pytest.raises(ValueError):
+        errors.inc(-1, error_type="parsing")
+    with pytest.raises(ValueError):
+        errors.inc(stage="parsing")
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that the buckets are cumulative and end with +Inf, sum and count."""
+
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("latency_seconds", "Latency.", ["tool"], buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, tool="Linter")
+
+    text = metrics.render()
+    assert 'latency_seconds_bucket{tool="Linter",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tool="Linter",le="1"} 3' in text
+    assert 'latency_seconds_bucket{tool="Linter",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{tool="Linter"} 4.25' in text
+    assert 'latency_seconds_count{tool="Linter"} 4' in text
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines in label values are escaped."""
+
+    metrics = MetricsRegistry()
+    metrics.counter("calls_total", "Calls.", ["model"]).inc(model='a"b\\c\nd')
+
+    assert 'calls_total{model="a\\"b\\\\c\\nd"} 1' in metrics.render()
+
+
+def test_timed_labels_with_class_name():
+    """Test that the decorator observes the calls of a method under its class name."""
+
+    class TypeChecker:
+        @timed(TOOL_LATENCY, "tool")
+        def run(self, code):
+            return code
+
+    before = TOOL_LATENCY.count(tool="TypeChecker")
+    assert TypeChecker().run("x") == "x"
+    assert TOOL_LATENCY.count(tool="TypeChecker") == before + 1
+
+
+def test_server_exposes_metrics():
+    """Test that the metrics are served in the Prometheus text format on a local port."""
+
+    metrics = MetricsRegistry()
+    metrics.counter("runs_total", "Runs.", ["status"]).inc(status="SUCCESS")
+
+    server = serve_metrics(0, metrics=metrics)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert 'runs_total{status="SUCCESS"} 1' in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=5)
+    finally:
+        stop_metrics()
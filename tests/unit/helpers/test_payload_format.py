@@ -0,0 +1,74 @@
+import pytest
+from helpers.example_retriever import SEED_EXAMPLES
+from helpers.payload_format import FORMATS, format_of_fence, get_payload_format, set_payload_format
+from helpers.prompt_generator import generate_test_generator_request
+
+CONTRACT = {
+    "function_name": "calculator",
+    "args": [{"name": "op", "type": "str"}, {"name": "a", "type": "float"}],
+    "return_type": "float",
+    "docstring": "Applies op: +, -, * or /",
+    "constraints": ["b != 0 when op is /", "op in [+, -]", "true", "42", ""],
+    "edge_cases": [],
+    "extra": {"depth": 1.5, "flag": True, "missing": None, "rows": [[1, 2], {"x": "y"}]},
+}
+
+
+@pytest.mark.parametrize("name", FORMATS)
+def test_formats_round_trip(name):
+    """Test that every format decodes its own encoding of the contracts unchanged."""
+
+    payload_format = FORMATS[name]
+
+    for contract in [CONTRACT] + [contract for contract, _ in SEED_EXAMPLES]:
+        assert payload_format.decode(payload_format.encode(contract)) == contract
+
+
+def test_yaml_decodes_model_written_variants():
+    """Test that the YAML-like decoder accepts the usual variations of hand-written YAML."""
+
+    text = """
+    # contract
+    function_name: word_count
+    args:
+    -   name: text
+        type: str
+    constraints:
+      - 'text, may be empty'
+      - n > 0
+    edge_cases: ["", spaces only]
+    """
+
+    assert FORMATS["yaml"].decode(text) == {
+        "function_name": "word_count",
+        "args": [{"name": "text", "type": "str"}],
+        "constraints": ["text, may be empty", "n > 0"],
+        "edge_cases": ["", "spaces only"],
+    }
+    with pytest.raises(ValueError):
+        FORMATS["yaml"].decode("function_name: f\n  bad indentation: 1\n")
+
+
+def test_toon_decodes_four_space_indent():
+    """Test that TOON written with 4 spaces per level decodes like the 2 spaces encoding."""
+
+    text = "function_name: f\nargs[1]{name,type}:\n    n,int\n"
+
+    assert FORMATS["toon"].decode(text) == {"function_name": "f", "args": [{"name": "n", "type": "int"}]}
+
+
+def test_prompt_payload_follows_selected_format():
+    """Test that prompts encode the contract in the selected format."""
+
+    try:
+        set_payload_format("json")
+        prompt = generate_test_generator_request({"function_name": "f"}, "code")
+    finally:
+        set_payload_format("toon")
+
+    assert 'Contract Specification:\n{"function_name":"f"}\n' in prompt
+    assert get_payload_format().name == "toon"
+    assert format_of_fence("yml").name == "yaml"
+    assert format_of_fence("python") is None
+    with pytest.raises(ValueError):
+        set_payload_format("xml")
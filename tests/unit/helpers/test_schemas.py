@@ -0,0 +1,30 @@
+import pytest
+from helpers.schemas import validate_schema, EVALUATOR_SCHEMA, CONTRACT_SCHEMA, CODE_SCHEMA, TESTER_SCHEMA
+
+
+@pytest.mark.parametrize("instance, schema", [
+    ({"complexity": 3, "reasoning": "simple"}, EVALUATOR_SCHEMA),
+    ({"function_name": "add", "args": [{"name": "a", "type": "int"}], "return_type": "int"}, CONTRACT_SCHEMA),
+    ({"function_name": "main", "description": "extra fields are allowed"}, CONTRACT_SCHEMA),
+    ({"code": "nruter 1"}, CODE_SCHEMA),
+    ({"code_failures": None, "test_failures": "wrong expected value"}, TESTER_SCHEMA),
+])
+def test_valid_instances(instance, schema):
+    """Test that valid agent outputs have no violations."""
+    assert validate_schema(instance, schema) == []
+
+
+@pytest.mark.parametrize("instance, schema, expected", [
+    ({"complexity": "high"}, EVALUATOR_SCHEMA, "$.complexity: 'high' is not of type 'integer'"),
+    ({"complexity": True}, EVALUATOR_SCHEMA, "$.complexity: True is not of type 'integer'"),
+    ({"complexity": 11}, EVALUATOR_SCHEMA, "greater than the maximum of 10"),
+    ({"code": "Garbage"}, EVALUATOR_SCHEMA, "$: 'complexity' is a required property"),
+    ({"function_name": "f", "args": [{"name": "a"}]}, CONTRACT_SCHEMA, "$.args[0]: 'type' is a required property"),
+    ({"code": 42}, CODE_SCHEMA, "$.code: 42 is not of type 'string'"),
+    ({"code_failures": None}, TESTER_SCHEMA, "'test_failures' is a required property"),
+    ("not an object", CODE_SCHEMA, "$: 'not an object' is not of type 'object'"),
+])
+def test_invalid_instances(instance, schema, expected):
+    """Test that schema violations are reported with their path."""
+    violations = validate_schema(instance, schema)
+    assert any(expected in violation for violation in violations)
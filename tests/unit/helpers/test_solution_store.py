@@ -0,0 +1,72 @@
+import pytest
+from helpers.enums import StoredSolution
+from helpers.solution_store import SolutionStore, normalize_prompt
+
+
+def solution(prompt):
+    return StoredSolution(
+        prompt=prompt,
+        contract={"function_name": "factorial"},
+        reverty_code=": tni -> (tni: n) factorial fed\n    nruter n\n",
+        python_code="def factorial(n: int) -> int:\n    return n\n",
+        tests="from implementation import factorial\n",
+        complexity=2,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SolutionStore(str(tmp_path / "solutions.jsonl"))
+
+
+def test_exact_lookup_ignores_case_and_punctuation(store):
+    """Test that the same request written differently is an exact match."""
+
+    store.add(solution("Compute the factorial of n."))
+
+    match = store.lookup("  compute THE factorial, of n")
+
+    assert normalize_prompt("Compute the factorial of n.") == "compute the factorial of n"
+    assert match.kind == "exact"
+    assert match.solution.prompt == "Compute the factorial of n."
+    assert match.lookup_ms < 100
+
+
+@pytest.mark.parametrize("stored, prompt, hit", [
+    ("Write a function that computes the factorial of n", "Create a function computing the factorial of n", True),
+    ("Sort a list of integers using bubble sort", "Write a python function to sort a list of integers with bubble sort", True),
+    ("Sort a list of integers in ascending order", "Sort a list of integers in descending order", False),
+    ("Return the first 10 prime numbers", "Return the first 20 prime numbers", False),
+    ("Compute the factorial of n", "Compute the fibonacci number of n", False),
+])
+def test_near_duplicate_lookup(store, stored, prompt, hit):
+    """Test that paraphrases are matched, and requests asking for something else are not."""
+
+    store.add(solution(stored))
+
+    match = store.lookup(prompt)
+
+    assert (match is not None) == hit
+    if hit:
+        assert match.kind == "near"
+        assert match.similarity >= store.threshold
+
+
+def test_store_persists_and_discards(tmp_path):
+    """Test that solutions survive a restart and discarded ones do not."""
+
+    path = str(tmp_path / "solutions.jsonl")
+    store = SolutionStore(path)
+    store.add(solution("factorial"))
+    store.add(solution("bubble sort"))
+    store.add(solution("Factorial!"))
+
+    reloaded = SolutionStore(path)
+    assert len(reloaded) == 2
+    assert reloaded.lookup("factorial").solution.prompt == "Factorial!"
+
+    reloaded.discard(reloaded.lookup("factorial").solution)
+
+    assert reloaded.lookup("factorial") is None
+    assert SolutionStore(path).lookup("factorial") is None
+    assert SolutionStore(path).lookup("bubble sort") is not None
@@ -0,0 +1,97 @@
+from helpers.prompt_generator import generate_static_fix_request, generate_tester_request
+from helpers.token_budget import PromptBuilder, TokenCounter, compact_test_output, focus_code, truncate_middle
+
+CONTRACT = {"function_name": "f", "args": [{"name": "n", "type": "int"}], "return_type": "int"}
+
+
+def test_counter_counts_common_words_as_one_token():
+    """Test that the heuristic count is close to the BPE count on plain text and code."""
+
+    counter = TokenCounter("llama")
+
+    assert counter.count("") == 0
+    assert 5 <= counter.count("def f(n: int) -> int:") <= 12
+
+
+def test_compact_test_output_collapses_recursion():
+    """Test that repeated frames, progress and passing lines are dropped from pytest output."""
+
+    frame = ["implementation.py:3: in f", "    return f(n - 1)"]
+    output = "\n".join(["tests.py F.  [100%]", "tests.py::test_a PASSED", *frame * 50, "E   RecursionError: maximum recursion depth exceeded"])
+
+    compacted = compact_test_output(output)
+
+    assert "PASSED" not in compacted
+    assert compacted.count("in f") == 1
+    assert "... [the frame above repeats 49 more times]" in compacted
+    assert compacted.endswith("RecursionError: maximum recursion depth exceeded")
+
+
+def test_focus_code_keeps_referenced_lines():
+    """Test that only the lines around the error references are kept."""
+
+    code = "\n".join(f"x{i} = {i}" for i in range(1, 31))
+
+    focused = focus_code(code, "implementation.py:15: in f", context=1)
+
+    assert focused.split("\n") == ["# ... 13 unchanged lines ...", "x14 = 14", "x15 = 15", "x16 = 16", "# ... 14 unchanged lines ..."]
+    assert focus_code(code, "no reference") == code
+
+
+def test_truncate_middle_keeps_head_and_tail():
+    """Test that the first and last lines survive the truncation."""
+
+    counter = TokenCounter("llama")
+    text = "\n".join(f"line {i}" for i in range(200))
+
+    truncated = truncate_middle(text, 50, counter)
+
+    assert counter.count(truncated) <= 50
+    assert truncated.startswith("line 0\n")
+    assert truncated.endswith("line 199")
+    assert "lines omitted" in truncated
+
+
+def test_builder_trims_lowest_priority_first():
+    """Test that over the total budget the lowest priority section is trimmed first."""
+
+    long_text = "\n".join(f"value {i}" for i in range(300))
+
+    prompt = (
+        PromptBuilder(max_tokens=400)
+        .add("low", long_text, budget=1000, priority=0)
+        .add("high", long_text, budget=1000, priority=1)
+        .build()
+    )
+
+    assert prompt.tokens <= 400
+    low_original, low_final = prompt.sections["low"]
+    high_original, high_final = prompt.sections["high"]
+    assert low_final < low_original
+    assert high_final < high_original
+    assert low_final < high_final
+
+
+def test_requests_unchanged_within_budget():
+    """Test that a request within budget is plain text with its sections recorded."""
+
+    prompt = generate_static_fix_request("code", "E1: error", "flake8", CONTRACT)
+
+    assert "Code:\ncode\nErrors:\nE1: error\nI have a broken" in prompt
+    assert set(prompt.sections) == {"contract", "signatures", "code", "errors", "error_history", "instructions"}
+    assert all(original == final for original, final in prompt.sections.values())
+
+
+def test_tester_request_trims_python_code_first():
+    """Test that the Python code is focused on the failing lines before the errors are cut."""
+
+    python_code = "\n".join(f"    x{i} = {i}" for i in range(1, 601))
+    errors = "implementation.py:300: in f\nE   ValueError: bad value"
+
+    prompt = generate_tester_request(CONTRACT, python_code, "code", "def test_a(): pass", "test_a", errors)
+
+    original, final = prompt.sections["python_code"]
+    assert final < original
+    assert "x300 = 300" in prompt
+    assert "E   ValueError: bad value" in prompt
+    assert prompt.sections["errors"][0] == prompt.sections["errors"][1]
@@ -0,0 +1,121 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from helpers.tracing import NO_SPAN, Tracer, chrome_trace, summarize, traced, tracer
+
+
+def test_spans_nest_in_one_trace():
+    """Test that a span opened inside another is its child and shares its trace."""
+
+    spans = Tracer(enabled=True)
+
+    with spans.span("run", "orchestrator", trace_id="abc") as root:
+        with spans.span("call", "llm", prompt_tokens=10) as child:
+            child.set(completion_tokens=5)
+
+    recorded = {span.name: span for span in spans.spans("abc")}
+    assert recorded["call"].parent_id == root.span_id
+    assert recorded["run"].parent_id is None
+    assert recorded["call"].attributes == {"prompt_tokens": 10, "completion_tokens": 5}
+    assert recorded["run"].duration_us >= recorded["call"].duration_us
+
+
+def test_disabled_tracer_records_nothing():
+    """Test that a disabled tracer hands out the no-op span and keeps no spans."""
+
+    spans = Tracer(enabled=False)
+
+    with spans.span("run", "orchestrator", trace_id="abc") as span:
+        span.set(status="SUCCESS")
+
+    assert span is NO_SPAN
+    assert spans.spans("abc") == []
+    assert spans.finish("abc") is None
+
+
+def test_bound_function_keeps_trace_in_another_thread():
+    """Test that work handed to a pool through bind is a child of the submitting span."""
+
+    spans = Tracer(enabled=True)
+
+    def work():
+        with spans.span("work", "agent"):
+            pass
+
+    with spans.span("run", "orchestrator", trace_id="abc") as root:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(spans.bind(work)).result()
+
+    work_span = next(span for span in spans.spans("abc") if span.name == "work")
+    assert work_span.parent_id == root.span_id
+    assert work_span.thread_id != root.thread_id
+
+
+def test_span_records_error():
+    """Test that an exception leaving a span is recorded on it and propagated."""
+
+    spans = Tracer(enabled=True)
+
+    try:
+        with spans.span("call", "tool", trace_id="abc"):
+            raise ValueError("bad")
+    except ValueError:
+        pass
+
+    assert spans.spans("abc")[0].attributes["error"] == "ValueError"
+
+
+def test_finish_writes_chrome_trace(tmp_path, capsys):
+    """Test that a finished trace is written as Chrome trace events and summarized."""
+
+    spans = Tracer(enabled=True, directory=str(tmp_path))
+    with spans.span("run", "orchestrator", trace_id="abc"):
+        with spans.span("call", "llm", prompt_tokens=10, completion_tokens=5):
+            pass
+        with spans.span("run", "tool"):
+            pass
+
+    path = spans.finish("abc")
+
+    with open(path, encoding="utf-8") as file:
+        trace = json.load(file)
+    assert path == str(tmp_path / "abc.json")
+    assert [event["cat"] for event in trace["traceEvents"]] == ["orchestrator", "llm", "tool"]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"])
+    assert "10 prompt / 5 completion tokens" in capsys.readouterr().out
+    assert spans.spans("abc") == []
+
+
+def test_summarize_counts_outermost_span_of_category():
+    """Test that nested spans of the same category are not counted twice."""
+
+    spans = Tracer(enabled=True)
+    with spans.span("run", "orchestrator", trace_id="abc"):
+        with spans.span("phase", "orchestrator"):
+            with spans.span("agent", "agent"):
+                pass
+
+    summary = summarize(spans.spans("abc"))
+
+    assert "orchestrator" in summary and "(1)" in summary
+    assert "agent" in summary
+    assert chrome_trace(spans.spans("abc"), "abc")["otherData"] == {"trace_id": "abc"}
+
+
+def test_traced_names_span_after_class():
+    """Test that the decorator names the span after the class and the method."""
+
+    class Linter:
+        @traced("tool")
+        def run(self, code):
+            return code.upper()
+
+    tracer.enabled = True
+    try:
+        with tracer.span("run", "orchestrator", trace_id="decorated"):
+            assert Linter().run("ok") == "OK"
+        names = {span.name: span.category for span in tracer.spans("decorated")}
+    finally:
+        tracer.enabled = False
+        tracer._spans.pop("decorated", None)
+
+    assert names["Linter.run"] == "tool"
@@ -0,0 +1,52 @@
+import pytest
+from tools.auto_repair import AutoRepair
+from helpers.enums import ErrorType, Status
+
+
+@pytest.fixture
+def auto_repair():
+    return AutoRepair()
+
+
+@pytest.mark.parametrize("code, errors", [
+    # Python keywords, keeping int(...) calls and strings
+    (': tni -> (tni: x) f def\n    return int(x) + len("def")\n', "Unexpected token Token('NAME', 'def') at line 1, column 21."),
+    # Markdown fences, CRLF, tabs and trailing spaces
+    ("```reverty\r\n: tni -> (tni: x) f fed\r\n\tnruter x   \r\n```\r\n", "No terminal matches '`' in the current parser context, at line 1 col 1"),
+    # Dedent to a column no block was opened at
+    (": tni -> (tni: x) f fed\n    y: tni = 1\n   nruter x + y\n", "Unexpected dedent to column 3. Expected dedent to 0"),
+])
+def test_repair_reverty_parsing_errors(auto_repair, parser, code, errors):
+    """Test that mechanical parsing errors are repaired into parsable code."""
+
+    assert parser.run(code).status == Status.ERROR
+
+    repaired = auto_repair.repair_reverty(code, errors, ErrorType.PARSING.value)
+
+    assert parser.run(repaired).status == Status.SUCCESS
+    assert 'len("def")' in repaired or "def" not in repaired
+
+
+def test_repair_reverty_unused_variables(auto_repair):
+    """Test that only safe unused assignments are removed."""
+
+    errors = "Line 2:5: F841 local variable 'y' is assigned to but never used"
+
+    assert auto_repair.repair_reverty(": tni -> (tni: x) f fed\n    y: tni = 10\n    nruter x\n", errors, ErrorType.LINTING.value) == ": tni -> (tni: x) f fed\n    nruter x\n"
+
+    # A call may have side effects, and a block cannot be left empty
+    assert auto_repair.repair_reverty(": tni -> (tni: x) f fed\n    y = g(x)\n    nruter x\n", errors, ErrorType.LINTING.value) is None
+    assert auto_repair.repair_reverty(": tni -> (tni: x) f fed\n    : x > 1 fi\n        y = 10\n    nruter x\n", errors, ErrorType.LINTING.value) is None
+
+    # Other error types have no rules
+    assert auto_repair.repair_reverty("anything", errors, ErrorType.TYPE_CHECKING.value) is None
+
+
+def test_repair_python_layout(auto_repair):
+    """Test that layout findings of the transpiled code are repaired, and nothing else."""
+
+    code = "def outer(x: int) -> int:\n    z: int = 1\n    def inner(y: int) -> int:\n        return y * 2\n    return inner(x) + z\n"
+    errors = "Line 3:5: E306 expected 1 blank line before a nested definition, found 0"
+
+    assert auto_repair.repair_python(code, errors) == code.replace("= 1\n", "= 1\n\n")
+    assert auto_repair.repair_python(code, errors + "\nLine 5:12: F821 undefined name 'w'") is None
@@ -0,0 +1,81 @@
+import pytest
+from tools.failure_triage import FailureTriage
+from tools.test_executor import TestExecutor
+from helpers.enums import Blame
+
+CONTRACT = {
+    "function_name": "divide",
+    "args": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}],
+    "return_type": "int",
+    "edge_cases": ["Division by zero raises ValueError"],
+}
+
+CODE = """
+def divide(a: int, b: int) -> int:
+    if b == 0:
+        raise ValueError("division by zero")
+    return a // b
+"""
+
+
+@pytest.fixture
+def triage():
+    return FailureTriage()
+
+
+def run_failures(python_code, tests):
+    return TestExecutor().run_tests(python_code, tests).failures
+
+
+@pytest.mark.parametrize("python_code, tests, blame", [
+    # Errors of the test file itself
+    (CODE, "from implementation import divide\ndef test_a():\n    assert divide_numbers(4, 2) == 2\n", Blame.TESTS),
+    (CODE, "from implementation import divide\ndef test_a(numbers):\n    assert divide(4, 2) == 2\n", Blame.TESTS),
+    (CODE, "from implementation import divide, helper\ndef test_a():\n    assert divide(4, 2) == 2\n", Blame.TESTS),
+    (CODE, "from implementation import divide\ndef test_a():\n    assert divide(4) == 2\n", Blame.TESTS),
+    (CODE, "from implementation import divide\ndef test_a():\n    assert divide(4, 0) == 0\n", Blame.TESTS),
+    (CODE, "from implementation import divide\ndef test_a():\n    assert divide(4, 2) == '2'\n", Blame.TESTS),
+    # Errors of the implementation
+    ("def divide(a: int, b: int) -> int:\n    return a // b\n", "import pytest\nfrom implementation import divide\ndef test_a():\n    with pytest.raises(ValueError):\n        divide(4, 0)\n", Blame.CODE),
+    ("def divide(a: int, b: int) -> int:\n    return divide(a, b)\n", "from implementation import divide\ndef test_a():\n    assert divide(4, 2) == 2\n", Blame.CODE),
+    ("def divide(a: int, b: int) -> int:\n    a // b\n", "from implementation import divide\ndef test_a():\n    assert divide(4, 2) == 2\n", Blame.CODE),
+    ("def div(a: int, b: int) -> int:\n    return a // b\n", "from implementation import divide\ndef test_a():\n    assert divide(4, 2) == 2\n", Blame.CODE),
+    ("def divide(x: int) -> int:\n    return x\n", "from implementation import divide\ndef test_a():\n    assert divide(4, 2) == 2\n", Blame.CODE),
+])
+def test_triage_clear_failures(triage, python_code, tests, blame):
+    """Test that failures with an obvious culprit are blamed locally."""
+
+    failures = run_failures(python_code, tests)
+    assert failures
+
+    assert {triage.blame(CONTRACT, python_code, failure)[0] for failure in failures} == {blame}
+
+    result = triage.triage(CONTRACT, python_code, failures)
+    assert result is not None
+    assert (result["code_failures"] is not None) == (blame == Blame.CODE)
+    assert (result["test_failures"] is not None) == (blame == Blame.TESTS)
+    assert failures[0].name in (result["code_failures"] or result["test_failures"])
+
+
+@pytest.mark.parametrize("tests", [
+    # A wrong value: either the code or the expectation is wrong
+    "from implementation import divide\ndef test_a():\n    assert divide(7, 2) == 4\n",
+    # An exception the contract does not ask for, raised on test input
+    "from implementation import divide\ndef test_a():\n    assert divide('7', 2) == 3\n",
+])
+def test_triage_ambiguous_failures(triage, tests):
+    """Test that failures needing judgment are left to the LLM."""
+
+    failures = run_failures(CODE, tests)
+
+    assert triage.triage(CONTRACT, CODE, failures) is None
+
+
+def test_triage_ambiguous_failure_leaves_whole_run_to_llm(triage):
+    """Test that one ambiguous failure sends the whole run to the LLM, even if others are clear."""
+
+    tests = "from implementation import divide\ndef test_a():\n    assert divide(7, 2) == 4\ndef test_b():\n    assert missing(1) == 1\n"
+    failures = run_failures(CODE, tests)
+
+    assert len(failures) == 2
+    assert triage.triage(CONTRACT, CODE, failures) is None
@@ -0,0 +1,132 @@
+import random
+import re
+import pytest
+from helpers.enums import Status
+from tools.gbnf_exporter import GbnfExporter
+
+TOKEN = re.compile(r'\s*(?:("(?:\\.|[^"\\])*")|(\[(?:\\.|[^\]\\])*\])|([a-z0-9-]+)|([()|?*+]))')
+
+
+@pytest.fixture
+def gbnf(grammar):
+    return GbnfExporter(grammar, max_depth=2).export()
+
+
+def parse_gbnf(text):
+    """
+    Parses GBNF rules into nested lists: a rule is a list of alternatives,
+    an alternative a list of (kind, value, quantifier) items.
+    """
+    rules = {}
+    for line in text.strip().splitlines():
+        name, body = line.split(" ::= ", 1)
+        tokens = [next(t for t in match.groups() if t is not None) for match in TOKEN.finditer(body) if match.group().strip()]
+        alternatives, _ = _parse_alternatives(tokens, 0)
+        rules[name] = alternatives
+    return rules
+
+
+def _parse_alternatives(tokens, i):
+    alternatives = [[]]
+    while i < len(tokens) and tokens[i] != ")":
+        token = tokens[i]
+        if token == "|":
+            alternatives.append([])
+            i += 1
+            continue
+        if token == "(":
+            item, i = _parse_alternatives(tokens, i + 1)
+            item = ("group", item)
+            i += 1
+        elif token.startswith('"'):
+            item = ("literal", token[1:-1].encode().decode("unicode_escape"))
+            i += 1
+        elif token.startswith("["):
+            item = ("class", token)
+            i += 1
+        else:
+            item = ("ref", token)
+            i += 1
+        quantifier = ""
+        if i < len(tokens) and tokens[i] in "?*+":
+            quantifier = tokens[i]
+            i += 1
+        alternatives[-1].append((*item, quantifier))
+    return alternatives, i
+
+
+def sample(rules, rng, name="root"):
+    """
+    Generates a random string of the GBNF grammar, preferring short expansions.
+    """
+    out = []
+    _sample_alternatives(rules, rules[name], rng, out, 0)
+    return "".join(out)
+
+
+def _sample_alternatives(rules, alternatives, rng, out, depth):
+    alternative = rng.choice(alternatives) if depth < 25 else min(alternatives, key=len)
+    for kind, value, quantifier in alternative:
+        repeat = {"": 1, "?": rng.randint(0, 1), "*": rng.randint(0, 2), "+": rng.randint(1, 2)}[quantifier]
+        if depth >= 25 and quantifier in ("?", "*"):
+            repeat = 0
+        for _ in range(repeat):
+            if kind == "literal":
+                out.append(value)
+            elif kind == "class":
+                chars = [chr(c) for c in range(32, 127) if re.fullmatch(value, chr(c))]
+                out.append(rng.choice(chars))
+            elif kind == "ref":
+                _sample_alternatives(rules, rules[value], rng, out, depth + 1)
+            else:
+                _sample_alternatives(rules, value, rng, out, depth + 1)
+
+
+def test_gbnf_rules_are_defined_and_well_named(gbnf):
+    """Test that every referenced rule is defined and every name is valid GBNF."""
+
+    rules = parse_gbnf(gbnf)
+
+    assert "root" in rules
+    for name, alternatives in rules.items():
+        assert re.fullmatch(r"[a-z0-9-]+", name)
+        stack = list(alternatives)
+        while stack:
+            for kind, value, _ in stack.pop():
+                if kind == "ref":
+                    assert value in rules, f"{name} references undefined rule {value}"
+                elif kind == "group":
+                    stack.extend(value)
+
+
+def test_gbnf_unrolls_indentation_depths(gbnf):
+    """Test that nested blocks get one rule per depth, up to the maximum depth."""
+
+    rules = parse_gbnf(gbnf)
+
+    assert {"stmt-0", "stmt-1", "stmt-2"} <= set(rules)
+    assert "stmt-3" not in rules
+    assert 'stmt-2 ::= "        "' in gbnf
+
+
+def test_gbnf_identifiers_exclude_keywords(gbnf):
+    """Test that identifiers can never be Reverty keywords."""
+
+    rules = parse_gbnf(gbnf)
+    rng = random.Random(0)
+
+    names = {sample(rules, rng, "name-tok") for _ in range(2000)}
+    assert names.isdisjoint({"nruter", "fed", "fi", "rof", "ni", "eurT", "tni"})
+    assert all(re.fullmatch(r"[a-zA-Z_]\w*", name) for name in names)
+
+
+def test_gbnf_samples_are_parsed(gbnf, parser):
+    """Test that random programs generated by the GBNF grammar are valid Reverty code."""
+
+    rules = parse_gbnf(gbnf)
+    rng = random.Random(42)
+
+    for _ in range(200):
+        code = sample(rules, rng)
+        result = parser.run(code + "\n")
+        assert result.status == Status.SUCCESS, f"Rejected sample:\n{code}\n{result.message}"
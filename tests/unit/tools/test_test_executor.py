@@ -49,3 +49,29 @@ def test_executor_syntax_error_in_tests(test_executor):
     result = test_executor.run_tests(py_code, test_code)
     assert result.status == Status.ERROR
     assert "SyntaxError" in result.code_failures or "SyntaxError" in result.failed_tests or result.code_failures
+
+def test_executor_reports_structured_failures(test_executor):
+    """Test that failures carry the exception and the file it comes from."""
+
+    py_code = """
+def divide(a, b):
+    return a // b
+"""
+    test_code = """
+from implementation import divide
+def test_divide_by_zero():
+    assert divide(1, 0) == 0
+def test_divide():
+    assert divide(4, 2) == 3
+"""
+
+    result = test_executor.run_tests(py_code, test_code)
+    failures = {failure.name: failure for failure in result.failures}
+
+    assert failures["test_divide_by_zero"].error_type == "ZeroDivisionError"
+    assert failures["test_divide_by_zero"].origin == "implementation.py"
+    assert failures["test_divide_by_zero"].source_line == "return a // b"
+
+    assert failures["test_divide"].error_type == "AssertionError"
+    assert failures["test_divide"].origin == "tests.py"
+    assert "where 2 = divide(4, 2)" in failures["test_divide"].message
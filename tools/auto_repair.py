@@ -0,0 +1,237 @@
+import re
+from typing import Callable, Dict, List, Tuple
+from helpers.enums import ErrorType
+
+"""
+Rule-based repairs of mechanical errors, tried before asking the LLM for a fix.
+Reverty repairs are returned to the validation loop, which parses them again;
+Python repairs only touch the layout of the transpiled code.
+"""
+
+# Python words an LLM writes in place of the Reverty ones
+PYTHON_KEYWORDS: Dict[str, str] = {
+    "def": "fed",
+    "return": "nruter",
+    "if": "fi",
+    "elif": "file",
+    "else": "esle",
+    "while": "elihw",
+    "for": "rof",
+    "in": "ni",
+    "and": "dna",
+    "or": "ro",
+    "not": "ton",
+    "True": "eurT",
+    "False": "eslaF",
+    "None": "enoN",
+    "int": "tni",
+    "str": "rts",
+    "bool": "loob",
+    "float": "taolf",
+}
+
+# Builtins sharing their name with a type: replaced only outside calls like int(...)
+TYPE_WORDS = ("int", "str", "bool", "float")
+
+# flake8 line of the linter output: "Line 3:5: E306 expected 1 blank line ..."
+LINT_ERROR = re.compile(r"Line (\d+):\d+: ([A-Z]\d+) (.*)")
+UNUSED_VARIABLE = re.compile(r"local variable '(\w+)' is assigned to but never used")
+
+# Blank lines required before a definition, by flake8 code
+BLANK_LINES_BEFORE = {"E301": 1, "E306": 1, "E302": 2, "E305": 2}
+
+WORD = re.compile(r"\b[A-Za-z_]\w*\b")
+STRING_OR_COMMENT = re.compile(r'"[^"\n]*"|#[^\n]*')
+CALL = re.compile(r"\b\w+\s*\(")
+
+
+class AutoRepair:
+    """
+    Local repairs of mechanical parsing and linting errors.
+    """
+
+    def repair_reverty(self, code: str, errors: str, error_type: str) -> str | None:
+        """
+        Applies the Reverty rules matching the error type. Returns None if nothing changed.
+        """
+        rules: List[Callable[[str, str], str]] = []
+
+        if error_type == ErrorType.PARSING.value:
+            rules = [self._normalize_whitespace, self._strip_fences, self._reverse_python_keywords, self._realign_dedents]
+        elif error_type == ErrorType.LINTING.value:
+            rules = [self._remove_unused_assignments]
+
+        repaired = code
+        for rule in rules:
+            repaired = rule(repaired, errors)
+
+        return repaired if repaired != code else None
+
+    def repair_python(self, code: str, errors: str) -> str | None:
+        """
+        Fixes the blank line and whitespace findings of flake8 on transpiled code.
+        Returns None if any finding is not a layout one.
+        """
+        findings = self._lint_findings(errors)
+        if not findings or any(not self._is_layout(finding_code) for _, finding_code, _ in findings):
+            return None
+
+        lines = code.split("\n")
+
+        # Bottom-up, so the reported line numbers stay valid
+        for line_number, finding_code, _ in sorted(findings, reverse=True):
+            index = line_number - 1
+            if finding_code in BLANK_LINES_BEFORE:
+                index = self._definition_start(lines, index)
+                blank = 0
+                while index - blank - 1 >= 0 and not lines[index - blank - 1].strip():
+                    blank += 1
+                lines[index:index] = [""] * max(BLANK_LINES_BEFORE[finding_code] - blank, 0)
+            elif finding_code == "E303":
+                while index > 0 and not lines[index - 1].strip() and not lines[index - 2].strip():
+                    del lines[index - 1]
+                    index -= 1
+            elif finding_code in ("W291", "W293"):
+                lines[index] = lines[index].rstrip()
+
+        repaired = "\n".join(lines).rstrip("\n") + "\n"
+        return repaired if repaired != code else None
+
+    @staticmethod
+    def _is_layout(finding_code: str) -> bool:
+        return finding_code in BLANK_LINES_BEFORE or finding_code in ("E303", "W291", "W293", "W391", "W292")
+
+    @staticmethod
+    def _lint_findings(errors: str) -> List[Tuple[int, str, str]]:
+        return [(int(match.group(1)), match.group(2), match.group(3)) for match in LINT_ERROR.finditer(errors or "")]
+
+    @staticmethod
+    def _definition_start(lines: List[str], index: int) -> int:
+        """
+        flake8 reports missing blank lines on the line of the definition: comments right above it stay attached.
+        """
+        while index > 0 and lines[index - 1].strip().startswith("#"):
+            index -= 1
+        return index
+
+    # --- Reverty rules ---
+
+    @staticmethod
+    def _normalize_whitespace(code: str, errors: str) -> str:
+        """
+        LF line endings, tabs in indentation as 4 spaces, no trailing or non-breaking spaces.
+        """
+        lines = []
+        for line in code.replace("\r\n", "\n").replace("\r", "\n").replace("\u00a0", " ").split("\n"):
+            content = line.lstrip(" \t")
+            indent = line[: len(line) - len(content)].replace("\t", "    ")
+            lines.append((indent + content).rstrip())
+        return "\n".join(lines).strip("\n") + "\n"
+
+    @staticmethod
+    def _strip_fences(code: str, errors: str) -> str:
+        """
+        Removes markdown fence lines left around or inside the code.
+        """
+        return "\n".join(line for line in code.split("\n") if not line.strip().startswith("```"))
+
+    @staticmethod
+    def _reverse_python_keywords(code: str, errors: str) -> str:
+        """
+        Replaces Python keywords with the Reverty ones, outside strings and comments,
+        when the parser stopped on one of them.
+        """
+        unexpected = re.findall(r"Token\('\w+', '(\w+)'\)", errors or "")
+        if not any(word in PYTHON_KEYWORDS for word in unexpected[:1]):
+            return code
+
+        def replace_word(match: re.Match) -> str:
+            word = match.group(0)
+            if word in TYPE_WORDS and match.string[match.end():].lstrip().startswith("("):
+                return word
+            return PYTHON_KEYWORDS.get(word, word)
+
+        def replace_words(segment: str) -> str:
+            return WORD.sub(replace_word, segment)
+
+        repaired, position = [], 0
+        for match in STRING_OR_COMMENT.finditer(code):
+            repaired.append(replace_words(code[position:match.start()]))
+            repaired.append(match.group(0))
+            position = match.end()
+        repaired.append(replace_words(code[position:]))
+
+        return "".join(repaired)
+
+    @staticmethod
+    def _realign_dedents(code: str, errors: str) -> str:
+        """
+        Moves lines dedented to a column no block was opened at onto the nearest open block.
+        """
+        if "dedent" not in (errors or "").lower():
+            return code
+
+        levels = [0]
+        lines = code.split("\n")
+        for index, line in enumerate(lines):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+
+            indent = len(line) - len(line.lstrip(" "))
+            if indent > levels[-1]:
+                levels.append(indent)
+                continue
+
+            closed = None
+            while len(levels) > 1 and levels[-1] > indent:
+                closed = levels.pop()
+
+            # In between two open levels: snap to the nearest one
+            if levels[-1] != indent:
+                if closed is not None and closed - indent <= indent - levels[-1]:
+                    levels.append(closed)
+                lines[index] = " " * levels[-1] + line.lstrip(" ")
+
+        return "\n".join(lines)
+
+    def _remove_unused_assignments(self, code: str, errors: str) -> str:
+        """
+        Removes the assignment of variables flake8 reports as unused (F841), when it is the
+        only assignment to that name, has no calls on its right side and is not alone in its block.
+        """
+        names = [UNUSED_VARIABLE.search(message).group(1) for _, finding_code, message in self._lint_findings(errors) if finding_code == "F841" and UNUSED_VARIABLE.search(message)]
+
+        lines = code.split("\n")
+        for name in names:
+            assignment = re.compile(rf"^\s*{name}\s*(:\s*\w+\s*)?=(?!=)(.*)$")
+            matches = [index for index, line in enumerate(lines) if assignment.match(line)]
+            if len(matches) != 1:
+                continue
+
+            index = matches[0]
+            value = STRING_OR_COMMENT.sub('""', assignment.match(lines[index]).group(2))
+            if CALL.search(value) or self._alone_in_block(lines, index):
+                continue
+
+            del lines[index]
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _alone_in_block(lines: List[str], index: int) -> bool:
+        """
+        True if the line is the only statement of its block: removing it would leave the block empty.
+        """
+        def indent_of(line: str) -> int:
+            return len(line) - len(line.lstrip(" "))
+
+        def is_statement(line: str) -> bool:
+            return bool(line.strip()) and not line.lstrip().startswith("#")
+
+        indent = indent_of(lines[index])
+        statements = [line for line in lines if is_statement(line)]
+        position = sum(is_statement(line) for line in lines[:index])
+
+        previous_opens = position == 0 or indent_of(statements[position - 1]) < indent
+        next_closes = position == len(statements) - 1 or indent_of(statements[position + 1]) < indent
+        return previous_opens and next_closes
@@ -0,0 +1,189 @@
+"""
+Local triage of failing test runs: decides from the pytest report whether the code or the
+tests are to blame, so the tester LLM is only asked about the ambiguous failures.
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, List, Tuple
+from helpers.enums import Blame, TestFailure
+
+# Errors a test file raises on its own: missing names, imports, fixtures and syntax
+TEST_ERRORS = ("NameError", "UnboundLocalError", "ImportError", "ModuleNotFoundError", "SyntaxError", "IndentationError", "FixtureLookupError")
+
+# Errors implementation.py raises by mistake, whatever the input. TypeError and ValueError
+# are left out: they also come from tests calling the function with invalid input.
+CODE_ERRORS = ("RecursionError", "ZeroDivisionError", "IndexError", "KeyError", "NameError", "UnboundLocalError", "ImportError", "ModuleNotFoundError", "SyntaxError", "IndentationError")
+
+# Python types of the values a contract return type allows
+RETURN_TYPES = {
+    "int": (int,),
+    "float": (int, float),
+    "str": (str,),
+    "bool": (bool,),
+    "list": (list,),
+    "dict": (dict,),
+    "tuple": (tuple,),
+    "set": (set,),
+    "none": (type(None),),
+}
+
+MISSING_NAME = re.compile(r"cannot import name '(\w+)' from 'implementation'")
+MISSING_ATTRIBUTE = re.compile(r"module 'implementation' has no attribute '(\w+)'")
+WRONG_CALL = re.compile(r"^(\w+)\(\) (?:missing|takes|got)")
+NOT_RAISED = re.compile(r"DID NOT RAISE (?:<class ')?([\w.]+)")
+COMPARISON = re.compile(r"^assert (.+?) == (.+)$")
+EXCEPTION_WORDS = re.compile(r"\b(raise[sd]?|error|exception|invalid)\b", re.IGNORECASE)
+
+
+class FailureTriage:
+    """
+    Blames each failed test on the code or on the tests, using the contract as the reference.
+    """
+
+    def triage(self, contract: Dict[str, Any], python_code: str, failures: List[TestFailure]) -> Dict[str, str | None] | None:
+        """
+        Returns the code and test failures if every failed test has a clear culprit, None otherwise.
+        """
+        if not failures:
+            return None
+
+        blamed: Dict[Blame, List[str]] = {Blame.CODE: [], Blame.TESTS: []}
+        for failure in failures:
+            blame, reason = self.blame(contract, python_code, failure)
+            if blame == Blame.AMBIGUOUS:
+                return None
+            blamed[blame].append(self._describe(failure, reason))
+
+        return {
+            "code_failures": "\n\n".join(blamed[Blame.CODE]) or None,
+            "test_failures": "\n\n".join(blamed[Blame.TESTS]) or None,
+        }
+
+    def blame(self, contract: Dict[str, Any], python_code: str, failure: TestFailure) -> Tuple[Blame, str]:
+        """
+        Culprit of a single failed test, with the reason.
+        """
+        function_name = contract.get("function_name")
+
+        # The tests import or reference a function implementation.py does not define
+        missing = MISSING_NAME.search(failure.message) or MISSING_ATTRIBUTE.search(failure.message)
+        if missing:
+            if missing.group(1) == function_name:
+                return Blame.CODE, f"implementation.py does not define the contract function '{function_name}'"
+            return Blame.TESTS, f"the tests use '{missing.group(1)}', which is not part of the contract"
+
+        if failure.origin == "implementation.py":
+            return self._blame_implementation(contract, failure)
+
+        if failure.origin == "tests.py" or failure.error_type == "FixtureLookupError":
+            return self._blame_tests(contract, python_code, failure)
+
+        return Blame.AMBIGUOUS, "the failure is not located in the code nor in the tests"
+
+    def _blame_implementation(self, contract: Dict[str, Any], failure: TestFailure) -> Tuple[Blame, str]:
+        if failure.collection:
+            return Blame.CODE, f"implementation.py fails on import with {failure.error_type}"
+
+        # Raised on purpose: right only if the contract asks for it
+        if failure.source_line.startswith("raise"):
+            if failure.error_type and failure.error_type in self._contract_text(contract):
+                return Blame.TESTS, f"the code raises {failure.error_type} as the contract requires, the tests do not expect it"
+            return Blame.AMBIGUOUS, "the code raises an exception the contract does not mention"
+
+        if failure.error_type in CODE_ERRORS:
+            return Blame.CODE, f"{failure.error_type} raised inside implementation.py"
+
+        return Blame.AMBIGUOUS, f"{failure.error_type} inside implementation.py may come from the test input"
+
+    def _blame_tests(self, contract: Dict[str, Any], python_code: str, failure: TestFailure) -> Tuple[Blame, str]:
+        function_name = contract.get("function_name")
+        first_line = failure.message.split("\n", 1)[0]
+
+        not_raised = NOT_RAISED.search(first_line)
+        if not_raised:
+            exception = not_raised.group(1).split(".")[-1]
+            contract_text = self._contract_text(contract)
+            if exception in contract_text:
+                return Blame.CODE, f"the contract requires {exception}, the code does not raise it"
+            if not EXCEPTION_WORDS.search(contract_text):
+                return Blame.TESTS, f"the tests expect {exception}, the contract does not ask for any exception"
+            return Blame.AMBIGUOUS, "the contract mentions errors but not the expected exception"
+
+        wrong_call = WRONG_CALL.match(first_line) if failure.error_type == "TypeError" else None
+        if wrong_call and wrong_call.group(1) == function_name:
+            if self._implementation_params(python_code, function_name) == [arg.get("name") for arg in contract.get("args", [])]:
+                return Blame.TESTS, f"the tests call '{function_name}' with arguments not matching the contract"
+            return Blame.CODE, f"the signature of '{function_name}' does not match the contract"
+
+        if failure.error_type == "AssertionError":
+            return self._blame_assertion(contract, failure)
+
+        if failure.error_type in TEST_ERRORS:
+            return Blame.TESTS, f"{failure.error_type} raised by the tests themselves"
+
+        return Blame.AMBIGUOUS, f"{failure.error_type} raised in tests.py"
+
+    def _blame_assertion(self, contract: Dict[str, Any], failure: TestFailure) -> Tuple[Blame, str]:
+        """
+        Compares the types of the values of a failed equality with the contract return type.
+        A plain value mismatch is left to the LLM.
+        """
+        lines = failure.message.split("\n")
+        comparison = COMPARISON.match(lines[0])
+        allowed = self._return_types(contract.get("return_type"))
+        if not comparison or allowed is None:
+            return Blame.AMBIGUOUS, "the assertion does not compare a returned value"
+
+        # "+  where 2 = add(1, 2)": the side of the comparison holding the returned value
+        call = f"= {contract.get('function_name')}("
+        returned = next((line.split("where", 1)[1].split("=", 1)[0].strip() for line in lines[1:] if "where" in line and call in line), None)
+        left, right = comparison.group(1).strip(), comparison.group(2).strip()
+        if returned not in (left, right):
+            return Blame.AMBIGUOUS, "the assertion does not compare a returned value"
+
+        expected = right if returned == left else left
+        actual_value, expected_value = self._literal(returned), self._literal(expected)
+
+        if actual_value is not NotImplemented and not isinstance(actual_value, allowed):
+            return Blame.CODE, f"the code returns {returned}, not a {contract.get('return_type')} as the contract requires"
+        if expected_value is not NotImplemented and not isinstance(expected_value, allowed):
+            return Blame.TESTS, f"the tests expect {expected}, not a {contract.get('return_type')} as the contract returns"
+
+        return Blame.AMBIGUOUS, "the returned value differs from the expected one"
+
+    @staticmethod
+    def _describe(failure: TestFailure, reason: str) -> str:
+        location = f" at `{failure.source_line}`" if failure.source_line else ""
+        return f"{failure.name}: {reason}{location}.\n{failure.error_type}: {failure.message}".strip()
+
+    @staticmethod
+    def _contract_text(contract: Dict[str, Any]) -> str:
+        return " ".join(json.dumps(contract.get(key, "")) for key in ("docstring", "requirements", "constraints", "edge_cases"))
+
+    @staticmethod
+    def _return_types(return_type: str | None) -> Tuple[type, ...] | None:
+        """
+        Types allowed by the contract return type, None for types the triage cannot check (Optional, Any, unions).
+        """
+        base = (return_type or "").strip().split("[", 1)[0].lower()
+        return RETURN_TYPES.get(base)
+
+    @staticmethod
+    def _literal(text: str) -> Any:
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return NotImplemented
+
+    @staticmethod
+    def _implementation_params(python_code: str, function_name: str) -> List[str] | None:
+        try:
+            tree = ast.parse(python_code)
+        except SyntaxError:
+            return None
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == function_name:
+                return [arg.arg for arg in node.args.args]
+        return None
@@ -0,0 +1,682 @@
+import re
+from lark import Tree
+from lark.grammar import Terminal, NonTerminal
+from lark.load_grammar import load_grammar as load_lark_grammar
+from typing import Dict, List, Set, Tuple
+from helpers.enums import AnalysisResult, Status
+from helpers.logger import get_logger
+from config import GBNF_MAX_INDENT_DEPTH
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+logger = get_logger(__name__)
+
+
+class GbnfExporter:
+    """
+    GBNF Exporter: Lark -> GBNF.
+    Converts the Reverty grammar into a GBNF grammar for llama.cpp-compatible servers,
+    so the model can only sample code accepted by the parser.
+
+    GBNF is context free, so the indentation handled by RevertyIndenter is unrolled:
+    every rule that contains statements gets one copy per nesting depth, and each
+    statement starts with the indentation of its depth. The exported language is a
+    subset of Reverty (no comments, no blank lines inside blocks, four spaces per level,
+    an if without else is followed by a simple statement).
+    """
+
+    NEWLINE = "_NEWLINE"
+    INDENT = "_INDENT"
+    DEDENT = "_DEDENT"
+    STATEMENT_RULE = "stmt"
+    CONDITIONAL_RULE = "conditional_stmt"
+
+    def __init__(self, grammar: str, max_depth: int = GBNF_MAX_INDENT_DEPTH, indent: str = "    "):
+        self.max_depth = max_depth
+        self.indent = indent
+
+        lark_grammar, _ = load_lark_grammar(grammar, "<reverty>", [], False)
+        self.rules: Dict[str, Tree] = {str(name): tree for name, _, tree, _ in lark_grammar.rule_defs}
+        self.terminals: Dict[str, Tree] = {str(name): tree for name, (tree, _) in lark_grammar.term_defs}
+
+        self._depth_rules = self._find_depth_rules()
+        self._block_rules = {name for name, tree in self.rules.items() if self.INDENT in self._terminal_references(tree)}
+        self._analyze_edges()
+
+    def run(self) -> AnalysisResult:
+        """
+        Exports the grammar to GBNF.
+        """
+        try:
+            logger.info("[GbnfExporter] Exporting grammar to GBNF...")
+            gbnf = self.export()
+            logger.info("[GbnfExporter] Export complete.")
+            return AnalysisResult(status=Status.SUCCESS, message=gbnf)
+
+        except Exception as e:
+            logger.error("[GbnfExporter] Error: %s", e)
+            return AnalysisResult(status=Status.ERROR, message=str(e))
+
+    def export(self) -> str:
+        """
+        Builds the GBNF grammar text. The root is the 'start' rule at depth 0.
+        """
+        lines = [f"root ::= {self._rule_name('start', 0)}"]
+
+        for name, tree in self.rules.items():
+            if name in self._depth_rules:
+                for depth in range(self.max_depth + 1):
+                    lines.append(f"{self._rule_name(name, depth)} ::= {self._render_rule(name, tree, depth)}")
+            else:
+                lines.append(f"{self._rule_name(name)} ::= {self._render_rule(name, tree, 0)}")
+
+        keywords = self._keywords()
+        for name in self._used_terminals():
+            lines.extend(self._render_terminal(name, keywords))
+
+        return "\n".join(self._reachable(lines)) + "\n"
+
+    # --- Rule rendering ---
+
+    def _render_rule(self, name: str, tree: Tree, depth: int) -> str:
+        if name == self.CONDITIONAL_RULE:
+            return self._render_conditional(depth)
+
+        # Blocks: the inline alternative needs a space after the keyword, the
+        # indented one starts right away with the newline
+        if name in self._block_rules:
+            alternatives = []
+            for alternative in tree.children:
+                body = self._render(alternative, depth)
+                if body is None:
+                    continue
+                if not self._starts_with_newline(alternative):
+                    body = f'" " {body}'
+                alternatives.append(body)
+            return " | ".join(alternatives)
+
+        body = self._render(tree, depth)
+
+        # Statements start with the indentation of their depth
+        if name == self.STATEMENT_RULE and depth > 0:
+            return f"{self._quote(self.indent * depth)} ( {body} )"
+
+        return body
+
+    def _render_conditional(self, depth: int) -> str:
+        """
+        The parser reads a ':' after an if without else as the start of an elif, so an
+        if without else must be followed by a simple statement (e.g. 'nruter').
+        """
+        indent = f"{self._quote(self.indent * depth)} " if depth > 0 else ""
+        head = f"{self._rule_name('if_stmt', depth)} ( {indent}{self._rule_name('elif_stmt', depth)} )*"
+        return f"{head} ( {indent}{self._rule_name('else_stmt', depth)} | {indent}simple-stmt )"
+
+    def _render(self, node, depth: int) -> str | None:
+        if isinstance(node, Tree):
+            if node.data == "expansions":
+                alternatives = [self._render(child, depth) for child in node.children]
+                alternatives = [alt for alt in alternatives if alt is not None]
+                return " | ".join(alternatives) if alternatives else None
+
+            if node.data == "alias":
+                return self._render(node.children[0], depth)
+
+            if node.data == "expansion":
+                return self._render_sequence(node.children, depth)
+
+            if node.data in ("expr", "maybe"):
+                body, optional = self._render_repetition(node, depth)
+                return f"( {body} )?" if optional else body
+
+            if node.data == "value":
+                return self._render(node.children[0], depth)
+
+            if node.data == "literal":
+                return self._render_literal(node.children[0])
+
+            raise ValueError(f"Unsupported grammar construct: {node.data}")
+
+        if isinstance(node, NonTerminal):
+            if node.name in self._depth_rules:
+                return self._rule_name(node.name, depth)
+            return self._rule_name(node.name)
+
+        if isinstance(node, Terminal):
+            if node.name == self.NEWLINE:
+                return self._quote("\n")
+            return self._rule_name(node.name)
+
+        raise ValueError(f"Unsupported grammar symbol: {node!r}")
+
+    def _render_repetition(self, node: Tree, depth: int) -> Tuple[str, bool]:
+        """
+        Renders 'x*', 'x+', 'x?' and '[x]' as their non-empty form plus a flag telling
+        if the whole item is optional. Repetitions become 'x (sep x)*', so that two
+        iterations are separated like any other pair of tokens.
+        """
+        if node.data == "maybe":
+            inner, op = node.children[0], "?"
+        else:
+            inner, op = node.children
+
+        body = self._render(inner, depth)
+
+        if op == "?":
+            return body, True
+
+        if op not in ("*", "+"):
+            raise ValueError(f"Unsupported grammar operator: {op}")
+
+        separator = self._separator(self._kinds(inner, last=True), inner, depth)
+        repeated = f"{separator} {body}" if separator else body
+        return f"( {body} ) ( {repeated} )*", op == "*"
+
+    def _render_sequence(self, items: List, depth: int) -> str | None:
+        """
+        Renders a sequence, inserting the whitespace the lexer ignores between tokens
+        and switching depth after an _INDENT. Returns None if the sequence would nest
+        deeper than max_depth.
+        """
+        parts: List[str] = []
+
+        # Kinds of characters that can precede the current item, None at the start
+        left: Set[str] | None = None
+
+        for item in items:
+            symbol = self._symbol(item)
+
+            if symbol == self.INDENT:
+                depth += 1
+                if depth > self.max_depth:
+                    return None
+                continue
+
+            if symbol == self.DEDENT:
+                depth -= 1
+                continue
+
+            separator = self._separator(left, item, depth) if left is not None else ""
+
+            if isinstance(item, Tree) and item.data in ("expr", "maybe"):
+                body, optional = self._render_repetition(item, depth)
+            else:
+                body, optional = self._render(item, depth), False
+
+            if separator:
+                body = f"{separator} {body}"
+            parts.append(f"( {body} )?" if optional else body)
+
+            last = self._kinds(item, last=True)
+            left = (left or set()) | last if optional else last
+
+        return " ".join(parts) if parts else '""'
+
+    def _separator(self, left: Set[str], right, depth: int) -> str:
+        """
+        Whitespace between two tokens: none around newlines, mandatory when both sides
+        can be word characters (e.g. 'nruter x'), optional otherwise. A clause continuing
+        a statement on a new line (e.g. ': esle') gets the indentation of its depth.
+        """
+        right_symbol = self._unwrap(right)
+        if isinstance(right_symbol, NonTerminal) and right_symbol.name in self._block_rules:
+            return ""
+
+        first = self._kinds(right, last=False)
+
+        if self.NEWLINE in left and self.NEWLINE not in first and depth > 0:
+            return "" if self._starts_with_statement(right) else self._quote(self.indent * depth)
+
+        if self.NEWLINE in left or self.NEWLINE in first:
+            return ""
+        if self.WORD in left and self.WORD in first:
+            return '" "'
+        return '" "?'
+
+    def _render_terminal(self, name: str, keywords: List[str]) -> List[str]:
+        """
+        Renders a terminal. Identifiers exclude the keywords they would collide with,
+        since the lexer would turn e.g. 'nruter' into the keyword.
+        """
+        pattern = self._terminal_regex(name)
+        colliding = [keyword for keyword in keywords if pattern and re.fullmatch(pattern, keyword)]
+
+        if colliding:
+            identifier = _identifier_classes(pattern)
+            if identifier is not None:
+                return _identifier_rules(self._rule_name(name), colliding, *identifier)
+
+        return [f"{self._rule_name(name)} ::= {self._render(self.terminals[name], 0)}"]
+
+    def _terminal_regex(self, name: str) -> str | None:
+        tree = self.terminals[name]
+        literals = [node for node in tree.iter_subtrees() if node.data == "literal"]
+        if len(literals) == 1 and literals[0].children[0].type == "REGEXP":
+            value = str(literals[0].children[0])
+            return value[1:value.rindex("/")]
+        return None
+
+    def _keywords(self) -> List[str]:
+        keywords = set()
+        for tree in self.rules.values():
+            for node in tree.iter_subtrees():
+                if node.data == "literal" and node.children[0].type == "STRING":
+                    keywords.add(str(node.children[0])[1:-1])
+        return sorted(keywords)
+
+    def _reachable(self, lines: List[str]) -> List[str]:
+        """
+        Drops the rules not reachable from the root (e.g. depth copies never used).
+        """
+        bodies = {line.split(" ::= ")[0]: line.split(" ::= ", 1)[1] for line in lines}
+        reachable = set()
+        pending = ["root"]
+
+        while pending:
+            name = pending.pop()
+            if name in reachable:
+                continue
+            reachable.add(name)
+            # Remove literals and character classes before looking for rule names
+            body = re.sub(r'"(\\.|[^"\\])*"|\[(\\.|[^\]\\])*\]', " ", bodies[name])
+            pending.extend(ref for ref in re.findall(r"[a-z0-9-]+", body) if ref in bodies)
+
+        return [line for line in lines if line.split(" ::= ")[0] in reachable]
+
+    def _render_literal(self, token) -> str:
+        value = str(token)
+        if token.type == "STRING":
+            return self._quote(value[1:-1].encode().decode("unicode_escape"))
+        return _regex_to_gbnf(value[1:value.rindex("/")])
+
+    # --- Grammar analysis ---
+
+    WORD = "word"
+    OTHER = "other"
+
+    def _find_depth_rules(self) -> set:
+        """
+        Finds the rules that (transitively) contain statements, which need a copy per depth.
+        """
+        references = {name: self._references(tree) for name, tree in self.rules.items()}
+        depth_rules = {self.STATEMENT_RULE}
+
+        changed = True
+        while changed:
+            changed = False
+            for name, refs in references.items():
+                if name not in depth_rules and refs & depth_rules:
+                    depth_rules.add(name)
+                    changed = True
+
+        return depth_rules
+
+    def _references(self, node) -> set:
+        if isinstance(node, NonTerminal):
+            return {node.name}
+        if isinstance(node, Tree):
+            refs = set()
+            for child in node.children:
+                refs |= self._references(child)
+            return refs
+        return set()
+
+    def _analyze_edges(self):
+        """
+        Computes, with a fixed point over the rules, which rules can be empty and which
+        kinds of characters (word, newline, other) they can start and end with.
+        """
+        self._nullable: Dict[str, bool] = {name: False for name in self.rules}
+        self._first: Dict[str, Set[str]] = {name: set() for name in self.rules}
+        self._last: Dict[str, Set[str]] = {name: set() for name in self.rules}
+
+        changed = True
+        while changed:
+            changed = False
+            for name, tree in self.rules.items():
+                values = (self._is_nullable(tree), self._kinds(tree, last=False), self._kinds(tree, last=True))
+                if values != (self._nullable[name], self._first[name], self._last[name]):
+                    self._nullable[name], self._first[name], self._last[name] = values
+                    changed = True
+
+    def _is_nullable(self, node) -> bool:
+        if isinstance(node, NonTerminal):
+            return self._nullable.get(node.name, False)
+        if isinstance(node, Terminal):
+            return node.name in (self.INDENT, self.DEDENT)
+        if node.data == "expansions":
+            return any(self._is_nullable(child) for child in node.children)
+        if node.data == "expansion":
+            return all(self._is_nullable(child) for child in node.children)
+        if node.data == "expr":
+            return node.children[1] in ("*", "?") or self._is_nullable(node.children[0])
+        if node.data == "maybe":
+            return True
+        if node.data in ("alias", "value"):
+            return self._is_nullable(node.children[0])
+        return False
+
+    def _kinds(self, node, last: bool) -> Set[str]:
+        """
+        Returns the kinds of characters the node can start (or end, if last) with.
+        """
+        if isinstance(node, NonTerminal):
+            table = self._last if last else self._first
+            return set(table.get(node.name, set()))
+
+        if isinstance(node, Terminal):
+            if node.name == self.NEWLINE:
+                return {self.NEWLINE}
+            if node.name in (self.INDENT, self.DEDENT):
+                return set()
+            return self._kinds(self.terminals[node.name], last)
+
+        if node.data == "expansions":
+            kinds = set()
+            for child in node.children:
+                kinds |= self._kinds(child, last)
+            return kinds
+
+        if node.data == "expansion":
+            kinds = set()
+            for child in (reversed(node.children) if last else node.children):
+                kinds |= self._kinds(child, last)
+                if not self._is_nullable(child):
+                    break
+            return kinds
+
+        if node.data in ("alias", "value", "expr", "maybe"):
+            return self._kinds(node.children[0], last)
+
+        if node.data == "literal":
+            token = node.children[0]
+            value = str(token)
+            if token.type == "STRING":
+                text = value[1:-1]
+                char = text[-1] if last else text[0]
+                return {self.WORD} if char.isalnum() or char == "_" else {self.OTHER}
+            return {self.WORD} if _regex_edge(value[1:value.rindex("/")], last) else {self.OTHER}
+
+        return set()
+
+    def _starts_with_newline(self, node) -> bool:
+        return self._kinds(node, last=False) == {self.NEWLINE}
+
+    def _starts_with_statement(self, node) -> bool:
+        """
+        True if the node begins with a statement, which already starts with its indentation.
+        """
+        node = self._unwrap(node)
+        if isinstance(node, NonTerminal):
+            return node.name == self.STATEMENT_RULE
+        if isinstance(node, Tree) and node.data in ("expr", "maybe", "expansion", "alias"):
+            return bool(node.children) and self._starts_with_statement(node.children[0])
+        if isinstance(node, Tree) and node.data == "expansions":
+            return any(self._starts_with_statement(child) for child in node.children)
+        return False
+
+    def _unwrap(self, node):
+        if isinstance(node, Tree) and node.data == "value":
+            return node.children[0]
+        return node
+
+    def _symbol(self, node) -> str | None:
+        node = self._unwrap(node)
+        if isinstance(node, Terminal):
+            return node.name
+        return None
+
+    def _used_terminals(self) -> List[str]:
+        used = set()
+        for tree in self.rules.values():
+            used |= self._terminal_references(tree)
+        used -= {self.NEWLINE, self.INDENT, self.DEDENT}
+        return sorted(used)
+
+    def _terminal_references(self, node) -> set:
+        if isinstance(node, Terminal):
+            return {node.name}
+        if isinstance(node, Tree):
+            refs = set()
+            for child in node.children:
+                refs |= self._terminal_references(child)
+            return refs
+        return set()
+
+    # --- Naming ---
+
+    def _rule_name(self, name: str, depth: int | None = None) -> str:
+        # GBNF rule names only allow letters, digits and dashes
+        gbnf_name = name.strip("_").replace("_", "-").lower()
+        if name.isupper():
+            gbnf_name += "-tok"
+        return gbnf_name if depth is None else f"{gbnf_name}-{depth}"
+
+    @staticmethod
+    def _quote(text: str) -> str:
+        escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+        return f'"{escaped}"'
+
+
+# --- Regex conversion ---
+
+_CATEGORY_CLASSES = {
+    sre_constants.CATEGORY_DIGIT: "0-9",
+    sre_constants.CATEGORY_WORD: "a-zA-Z0-9_",
+    sre_constants.CATEGORY_SPACE: " \\t\\n",
+}
+
+
+def _regex_to_gbnf(pattern: str) -> str:
+    """
+    Converts a terminal regex (the subset used by grammar.lark) to a GBNF expression.
+    """
+    return _render_regex_items(list(sre_parse.parse(pattern)))
+
+
+def _render_regex_items(items: List) -> str:
+    parts = []
+    for i, (op, arg) in enumerate(items):
+        following = items[i + 1] if i + 1 < len(items) else None
+        parts.append(_render_regex_item(op, arg, following))
+    return " ".join(part for part in parts if part)
+
+
+def _render_regex_item(op, arg, following) -> str:
+    if op == sre_constants.LITERAL:
+        return GbnfExporter._quote(chr(arg))
+
+    if op == sre_constants.NOT_LITERAL:
+        return f"[^{_escape_class_char(chr(arg))}]"
+
+    if op == sre_constants.ANY:
+        return "[^\\n]"
+
+    if op == sre_constants.IN:
+        return _render_class(arg)
+
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        low, high, sub = arg
+        sub_items = list(sub)
+
+        # A lazy '.*?' followed by a literal stops at the first occurrence of that literal
+        if op == sre_constants.MIN_REPEAT and following is not None and following[0] == sre_constants.LITERAL:
+            stop = _escape_class_char(chr(following[1]))
+            if len(sub_items) == 1 and sub_items[0][0] == sre_constants.ANY:
+                body = f"[^{stop}\\n]"
+            else:
+                body = f"( {_render_regex_items(sub_items)} )"
+        else:
+            body = f"( {_render_regex_items(sub_items)} )"
+
+        return _render_repeat(body, low, high)
+
+    if op == sre_constants.SUBPATTERN:
+        return f"( {_render_regex_items(list(arg[-1]))} )"
+
+    if op == sre_constants.BRANCH:
+        return "( " + " | ".join(_render_regex_items(list(alt)) for alt in arg[1]) + " )"
+
+    if op == sre_constants.AT:
+        return ""
+
+    raise ValueError(f"Unsupported regex construct: {op}")
+
+
+def _render_repeat(body: str, low: int, high) -> str:
+    if high == sre_constants.MAXREPEAT:
+        if low == 0:
+            return f"{body}*"
+        if low == 1:
+            return f"{body}+"
+        return " ".join([body] * (low - 1) + [f"{body}+"])
+
+    if low == 0 and high == 1:
+        return f"{body}?"
+
+    return " ".join([body] * low + [f"{body}?"] * (high - low))
+
+
+def _render_class(items: List) -> str:
+    negate = ""
+    ranges = []
+    for op, arg in items:
+        if op == sre_constants.NEGATE:
+            negate = "^"
+        elif op == sre_constants.LITERAL:
+            ranges.append(_escape_class_char(chr(arg)))
+        elif op == sre_constants.RANGE:
+            ranges.append(f"{_escape_class_char(chr(arg[0]))}-{_escape_class_char(chr(arg[1]))}")
+        elif op == sre_constants.CATEGORY and arg in _CATEGORY_CLASSES:
+            ranges.append(_CATEGORY_CLASSES[arg])
+        else:
+            raise ValueError(f"Unsupported character class item: {op}")
+    return f"[{negate}{''.join(ranges)}]"
+
+
+def _identifier_classes(pattern: str) -> Tuple[Set[str], Set[str]] | None:
+    """
+    Returns the characters allowed at the start and in the rest of an identifier
+    regex of the form '[first][rest]*', or None for any other shape.
+    """
+    items = list(sre_parse.parse(pattern))
+    if len(items) != 2 or items[0][0] != sre_constants.IN or items[1][0] != sre_constants.MAX_REPEAT:
+        return None
+
+    low, high, sub = items[1][1]
+    sub = list(sub)
+    if low != 0 or high != sre_constants.MAXREPEAT or len(sub) != 1 or sub[0][0] != sre_constants.IN:
+        return None
+
+    printable = [chr(code) for code in range(32, 127)]
+    first = {char for char in printable if re.fullmatch(pattern[: _class_end(pattern)], char)}
+    rest = {char for char in printable if re.fullmatch(f"(?:{pattern})", "a" + char) or re.fullmatch(f"(?:{pattern})", "_" + char)}
+    return first, rest
+
+
+def _class_end(pattern: str) -> int:
+    """
+    Index right after the first character class (or escape) of a regex.
+    """
+    if pattern.startswith("["):
+        return pattern.index("]", 1) + 1
+    return 2 if pattern.startswith("\\") else 1
+
+
+def _identifier_rules(name: str, keywords: List[str], first: Set[str], rest: Set[str]) -> List[str]:
+    """
+    Builds the rules of an identifier that is not one of the keywords: a trie of the
+    keywords where every node can leave the trie with any other character, and can
+    end the identifier unless the prefix read so far is a keyword.
+    """
+    trie: Dict[str, Dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    rules: List[str] = []
+    tail = f"{name}-tail"
+    counter = [0]
+
+    def build(node: Dict, allowed: Set[str], is_root: bool) -> str:
+        rule_name = name if is_root else f"{name}-{counter[0]}"
+        counter[0] += 1
+
+        alternatives = []
+        children = sorted(char for char in node if char)
+        for char in children:
+            alternatives.append(f"{GbnfExporter._quote(char)} {build(node[char], rest, False)}")
+
+        others = allowed - set(children)
+        if others:
+            alternatives.append(f"{_render_char_set(others)} {tail}")
+
+        body = " | ".join(alternatives)
+        # A prefix that is not a keyword can end the identifier
+        if not is_root and "" not in node:
+            body = f"( {body} )?"
+        rules.append(f"{rule_name} ::= {body}")
+        return rule_name
+
+    build(trie, first, True)
+    rules.append(f"{tail} ::= {_render_char_set(rest)}*")
+    return rules
+
+
+def _render_char_set(chars: Set[str]) -> str:
+    """
+    Renders a set of characters as a compact GBNF character class.
+    """
+    codes = sorted(ord(char) for char in chars)
+    ranges = []
+    start = previous = codes[0]
+    for code in codes[1:] + [None]:
+        if code is not None and code == previous + 1:
+            previous = code
+            continue
+        if previous - start >= 2:
+            ranges.append(f"{_escape_class_char(chr(start))}-{_escape_class_char(chr(previous))}")
+        else:
+            ranges.extend(_escape_class_char(chr(c)) for c in range(start, previous + 1))
+        if code is not None:
+            start = previous = code
+    return f"[{''.join(ranges)}]"
+
+
+def _escape_class_char(char: str) -> str:
+    escapes = {"\n": "\\n", "\t": "\\t", "\r": "\\r", "\f": "\\f", "]": "\\]", "[": "\\[", "\\": "\\\\", "^": "\\^", "-": "\\-"}
+    return escapes.get(char, char)
+
+
+def _regex_edge(pattern: str, last: bool) -> bool:
+    """
+    Returns True if the regex can start (or end, if last) with a word character.
+    """
+    items = list(sre_parse.parse(pattern))
+    if not items:
+        return False
+
+    op, arg = items[-1] if last else items[0]
+
+    if op == sre_constants.LITERAL:
+        char = chr(arg)
+        return char.isalnum() or char == "_"
+
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.SUBPATTERN):
+        # Be conservative with groups and repetitions
+        return True
+
+    return op in (sre_constants.IN, sre_constants.ANY, sre_constants.NOT_LITERAL)
+
+
+if __name__ == "__main__":
+    from helpers.utils import load_grammar
+
+    print(GbnfExporter(load_grammar()).export(), end="")
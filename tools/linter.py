@@ -4,6 +4,11 @@ import sys
 import os
 from helpers.enums import AnalysisResult, Status
 from helpers.utils import build_errors_string
+from helpers.logger import get_logger
+from helpers.metrics import TOOL_LATENCY, timed
+from helpers.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class Linter:
@@ -11,6 +16,8 @@ class Linter:
     Wrapper class for Flake8.
     """
 
+    @traced("tool")
+    @timed(TOOL_LATENCY, "tool")
     def run(self, code: str) -> AnalysisResult:
         """Runs flake8 on the provided code string."""
         # Write code to temporary file
@@ -19,7 +26,7 @@ class Linter:
             tmp_path = tmp.name
 
         try:
-            print(f"[Linter] Running flake8 on {tmp_path}...", flush=True)
+            logger.debug("[Linter] Running flake8 on %s...", tmp_path)
             # Run flake8 using current python interpreter
             result = subprocess.run(
                 [
@@ -33,17 +40,14 @@ class Linter:
                 text=True,
                 timeout=120,
             )
-            print(f"[Linter] Flake8 finished with code {result.returncode}", flush=True)
+            logger.debug("[Linter] Flake8 finished with code %d", result.returncode)
 
             # Return critical errors and package not installed error
             if result.stderr:
                 if "No module named flake8" in result.stderr:
-                    print(
-                        "[Linter] Flake8 is not installed, run pip install flake8: ",
-                        result.stderr,
-                    )
+                    logger.error("[Linter] Flake8 is not installed, run pip install flake8: %s", result.stderr)
                     return AnalysisResult(Status.ERROR, message="Flake8 not installed")
-                print("[Linter] Critical error: ", result.stderr)
+                logger.error("[Linter] Critical error: %s", result.stderr)
                 return AnalysisResult(Status.ERROR, message="Critical error")
 
             # No errors
@@ -59,13 +63,13 @@ class Linter:
                 if line.strip()
             ]
 
-            print(f"[Linter] Errors: {errors}")
+            logger.info("[Linter] Errors: %s", errors)
             return AnalysisResult(
                 status=Status.ERROR, message=build_errors_string(errors)
             )
 
         except subprocess.TimeoutExpired:
-            print("[Linter] Flake8 timed out", flush=True)
+            logger.warning("[Linter] Flake8 timed out")
             return AnalysisResult(status=Status.ERROR, message="Flake8 timed out")
         finally:
             os.unlink(tmp_path)
@@ -1,6 +1,12 @@
+import threading
 from lark import Lark
 from lark.indenter import Indenter
 from helpers.enums import AnalysisResult, Status
+from helpers.metrics import TOOL_LATENCY, timed
+from helpers.logger import get_logger
+from helpers.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class RevertyIndenter(Indenter):
@@ -19,23 +25,37 @@ class Parser:
     """
 
     def __init__(self, grammar):
-        self.parser = Lark(
-            grammar, parser="lalr", postlex=RevertyIndenter(), start="start"
-        )
-
+        self.grammar = grammar
+
+        # The LALR tables are built on first use. The indenter keeps state while
+        # parsing, so every thread gets its own Lark instance.
+        self._local = threading.local()
+
+    @property
+    def parser(self) -> Lark:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = Lark(
+                self.grammar, parser="lalr", postlex=RevertyIndenter(), start="start"
+            )
+            self._local.parser = parser
+        return parser
+
+    @traced("tool")
+    @timed(TOOL_LATENCY, "tool")
     def run(self, code: str) -> AnalysisResult:
         """
         Parses the input code and returns the AST.
         """
-        print("[Parser] Validating Syntax...")
+        logger.debug("[Parser] Validating Syntax...")
         try:
             if not code.endswith("\n"):
                 code = code.strip() + "\n"
 
             ast = self.parser.parse(code)
-            print("[Parser] Syntax OK! Tree generated.")
+            logger.info("[Parser] Syntax OK! Tree generated.")
             return AnalysisResult(status=Status.SUCCESS, message=ast)
 
         except Exception as e:
-            print(f"[Parser] Syntax Error: {e}")
+            logger.info("[Parser] Syntax Error: %s", e)
             return AnalysisResult(status=Status.ERROR, message=str(e))
@@ -3,8 +3,23 @@ from helpers.enums import Status
 import sys
 import subprocess
 import os
-from helpers.enums import ExecutionResult
+from helpers.enums import ExecutionResult, TestFailure
+from helpers.token_budget import compact_test_output
+from helpers.logger import get_logger
+from helpers.metrics import TOOL_LATENCY, timed
+from helpers.tracing import traced
+from typing import List
+import re
 import tempfile
+import xml.etree.ElementTree as ET
+
+# Traceback frame of the --tb=short output: "implementation.py:2: in div"
+FRAME = re.compile(r"^(\S+?\.py):\d+: in ", re.MULTILINE)
+SYNTAX_ERROR_FILE = re.compile(r'^E\s+File "([^"]+)", line \d+', re.MULTILINE)
+EXCEPTION_LINE = re.compile(r"^E\s+(\w+(?:\.\w+)*): ?(.*)$", re.MULTILINE)
+ORIGINS = ("tests.py", "implementation.py")
+
+logger = get_logger(__name__)
 
 class TestExecutor:
     """
@@ -13,18 +28,22 @@ class TestExecutor:
     def __init__(self, work_dir: str = "."):
         self.work_dir = work_dir
 
+    @traced("tool")
+    @timed(TOOL_LATENCY, "tool")
     def run_tests(self, python_code: str, tests: str) -> ExecutionResult:
         """
         Writes code and tests to disk, runs pytest, and returns the result.
         """
 
-        print("[EXECUTOR] Running tests...\n", tests)
-        print("[EXECUTOR] Python code...\n", python_code)
+        logger.info("[EXECUTOR] Running tests...")
+        logger.debug("[EXECUTOR] Tests:\n%s", tests)
+        logger.debug("[EXECUTOR] Python code:\n%s", python_code)
 
         with tempfile.TemporaryDirectory() as temp_dir:
             # 1. Write files
             impl_path = os.path.join(temp_dir, "implementation.py")
             test_path = os.path.join(temp_dir, "tests.py")
+            report_path = os.path.join(temp_dir, "report.xml")
             
             with open(impl_path, "w") as f:
                 f.write(python_code)
@@ -37,8 +56,9 @@ class TestExecutor:
                 # Run pytest on the test file
                 # -q: quiet
                 # --tb=short: shorter traceback
+                # --junitxml: structured report of the failures, for the local triage
                 result = subprocess.run(
-                    [sys.executable, "-m", "pytest", test_path, "-q", "--tb=short"],
+                    [sys.executable, "-m", "pytest", test_path, "-q", "--tb=short", f"--junitxml={report_path}", "-p", "no:cacheprovider"],
                     capture_output=True,
                     text=True,
                     cwd=temp_dir
@@ -51,31 +71,23 @@ class TestExecutor:
                 success = result.returncode == 0
                 raw_output = result.stdout + result.stderr
 
-                # Truncate output if too long
-                # Useful as a workaround for online LLMs that have a max token limit
-                MAX_CHARS = 2500  
-                if len(raw_output) > MAX_CHARS:
-                    half = MAX_CHARS // 2
-                    omitted = len(raw_output) - MAX_CHARS
-                    final_output = (
-                        raw_output[:half] 
-                        + f"\n\n... [LOG TRUNCATED: {omitted} chars omitted to hide recursion loops] ...\n\n" 
-                        + raw_output[-half:]
-                    )
-                else:
-                    final_output = raw_output
-
-                print("[EXECUTOR] stdout:", result.stdout)
-                print("[EXECUTOR] output:", result.stderr)
-                print("[EXECUTOR] return code:", result.returncode)
+                # Passing tests, progress lines and repeated recursion frames are dropped here;
+                # what is left is fitted to the token budget of the prompt it goes into
+                final_output = compact_test_output(raw_output)
+
+                logger.debug("[EXECUTOR] stdout: %s", result.stdout)
+                logger.debug("[EXECUTOR] output: %s", result.stderr)
+                logger.info("[EXECUTOR] return code: %d", result.returncode)
 
                 
                 failed_tests = self._parse_failures(final_output) if not success else []
+                failures = self._parse_report(report_path) if not success else []
                 
                 return ExecutionResult(
                     status=Status.SUCCESS if success else Status.ERROR,
                     code_failures=final_output,
-                    failed_tests=failed_tests
+                    failed_tests=failed_tests,
+                    failures=failures
                 )
             
             except Exception as e:
@@ -96,4 +108,66 @@ class TestExecutor:
                     test_name = parts[1].split(" ")[0]
                     failures.append(test_name)
         
-        return build_errors_string(failures)
\ No newline at end of file
+        return build_errors_string(failures)
+
+    def _parse_report(self, report_path: str) -> List[TestFailure]:
+        """
+        Reads the failed and errored tests from the JUnit XML report written by pytest.
+        """
+        try:
+            root = ET.parse(report_path).getroot()
+        except (OSError, ET.ParseError):
+            return []
+
+        failures = []
+        for testcase in root.iter("testcase"):
+            for outcome in testcase:
+                if outcome.tag not in ("failure", "error"):
+                    continue
+                failures.append(self._build_failure(testcase, outcome))
+
+        return failures
+
+    @staticmethod
+    def _build_failure(testcase: ET.Element, outcome: ET.Element) -> TestFailure:
+        """
+        Exception and innermost frame in tests.py or implementation.py of a report entry.
+        """
+        traceback = outcome.text or ""
+        collection = not testcase.get("classname") and outcome.get("message") == "collection failure"
+
+        exceptions = list(EXCEPTION_LINE.finditer(traceback))
+        error_type, message = ("", outcome.get("message") or "")
+        if exceptions:
+            # The message goes on in the next "E" lines, like the "where" explanations of assertions
+            error_type, message = exceptions[-1].group(1), exceptions[-1].group(2)
+            for line in traceback[exceptions[-1].end():].split("\n")[1:]:
+                if not line.startswith("E "):
+                    break
+                message += "\n" + line[4:]
+        if not exceptions and message.startswith("assert"):
+            error_type = "AssertionError"
+        elif not exceptions and "fixture '" in message:
+            error_type = "FixtureLookupError"
+
+        origin, source_line = None, ""
+        frames = [match for match in FRAME.finditer(traceback) if os.path.basename(match.group(1)) in ORIGINS]
+        if frames:
+            origin = os.path.basename(frames[-1].group(1))
+            following = traceback[frames[-1].end():].split("\n")[1:2]
+            source_line = following[0].strip() if following else ""
+
+        # Syntax errors are raised by the import machinery: the file is in the message
+        syntax_file = SYNTAX_ERROR_FILE.search(traceback)
+        if error_type in ("SyntaxError", "IndentationError") and syntax_file:
+            origin = os.path.basename(syntax_file.group(1))
+
+        return TestFailure(
+            name=testcase.get("name", ""),
+            error_type=error_type.split(".")[-1],
+            message=message.strip(),
+            origin=origin,
+            source_line=source_line,
+            traceback=traceback,
+            collection=collection,
+        )
@@ -1,6 +1,11 @@
 from lark import Transformer, Tree
 from typing import Any
 from helpers.enums import AnalysisResult, Status
+from helpers.logger import get_logger
+from helpers.metrics import TOOL_LATENCY, timed
+from helpers.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class Transpiler:
@@ -197,19 +202,21 @@ class Transpiler:
     def __init__(self):
         pass
 
+    @traced("tool")
+    @timed(TOOL_LATENCY, "tool")
     def run(self, ast: Tree[Any]) -> AnalysisResult:
         """
         Transpiles the AST to Python code.
         """
         try:
-            print("[Transpiler] Starting conversion to python code...")
+            logger.debug("[Transpiler] Starting conversion to python code...")
             transpiler = self.RevertyToPython()
             python_code = transpiler.transform(ast)
             python_code += "\n"
-            print(python_code)
-            print("[Transpiler] Conversion complete.")
+            logger.debug("%s", python_code)
+            logger.info("[Transpiler] Conversion complete.")
             return AnalysisResult(status=Status.SUCCESS, message=python_code)
 
         except Exception as e:
-            print("[Transpiler] Error: {e}")
+            logger.info("[Transpiler] Error: %s", e)
             return AnalysisResult(status=Status.ERROR, message=str(e))
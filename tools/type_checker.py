@@ -1,16 +1,23 @@
 from helpers.enums import AnalysisResult, Status
 from helpers.utils import build_errors_string
+from helpers.logger import get_logger
+from helpers.metrics import TOOL_LATENCY, timed
+from helpers.tracing import traced
 import tempfile
 import subprocess
 import os
 import sys
 
+logger = get_logger(__name__)
+
 
 class TypeChecker:
     """
     Wrapper class for Mypy.
     """
 
+    @traced("tool")
+    @timed(TOOL_LATENCY, "tool")
     def run(self, code: str) -> AnalysisResult:
         """Runs mypy on the provided code string."""
 
@@ -20,7 +27,7 @@ class TypeChecker:
             tmp_path = tmp.name
 
         try:
-            print(f"[TypeChecker] Running mypy on {tmp_path}...", flush=True)
+            logger.debug("[TypeChecker] Running mypy on %s...", tmp_path)
             # Run mypy using current python interpreter
             result = subprocess.run(
                 [
@@ -35,19 +42,14 @@ class TypeChecker:
                 text=True,
                 timeout=120,
             )
-            print(
-                f"[TypeChecker] MyPy finished with code {result.returncode}", flush=True
-            )
+            logger.debug("[TypeChecker] MyPy finished with code %d", result.returncode)
 
             # Return critical errors and package not installed error
             if result.stderr:
                 if "No module named mypy" in result.stderr:
-                    print(
-                        "[TypeChecker] MyPy is not installed, run pip install mypy: ",
-                        result.stderr,
-                    )
+                    logger.error("[TypeChecker] MyPy is not installed, run pip install mypy: %s", result.stderr)
                     return AnalysisResult(Status.ERROR, message="MyPy not installed")
-                print("[TypeChecker] Critical error: ", result.stderr)
+                logger.error("[TypeChecker] Critical error: %s", result.stderr)
                 return AnalysisResult(Status.ERROR, message="Critical error")
 
             # Mypy returns 0 on success
@@ -62,7 +64,7 @@ class TypeChecker:
             return AnalysisResult(Status.ERROR, message=build_errors_string(errors))
 
         except subprocess.TimeoutExpired:
-            print("[TypeChecker] MyPy timed out")
+            logger.warning("[TypeChecker] MyPy timed out")
             return AnalysisResult(Status.ERROR, message="MyPy timed out")
         finally:
             os.unlink(tmp_path)